@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark van de kaartgeneratie (create_map) per render modus
+
+Genereert synthetische listings rond Amsterdam en meet per aantal listings
+de bouwtijd (create_map + HTML renderen) en de grootte van map.html.
+
+Gebruik:
+    python scripts/benchmark_map.py
+    python scripts/benchmark_map.py --sizes 1000 10000 50000 --modes cluster
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from shapely.geometry import box
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.visualization.map_creator import PROPERTY_COLORS, create_map  # noqa: E402
+
+BBOX = (4.75, 52.30, 5.05, 52.43)  # lon_min, lat_min, lon_max, lat_max
+
+
+def make_listings(n: int, seed: int = 42) -> pd.DataFrame:
+    """Maak n synthetische listings (één rij per listing, zoals df_map)"""
+    rng = np.random.default_rng(seed)
+    total_days = 30
+    days_available = rng.integers(0, total_days + 1, n)
+    room_ids = rng.integers(10**7, 10**9, n).astype(str)
+    return pd.DataFrame(
+        {
+            "room_id": room_ids,
+            "latitude": rng.uniform(BBOX[1], BBOX[3], n),
+            "longitude": rng.uniform(BBOX[0], BBOX[2], n),
+            "listing_title": [f"Appartement {i} in het centrum" for i in range(n)],
+            "property_type_airbnb": rng.choice(list(PROPERTY_COLORS), n),
+            "price": rng.uniform(50, 400, n).round(2),
+            "rating": np.where(rng.random(n) < 0.8, rng.uniform(3.5, 5, n), np.nan),
+            "days_available": days_available,
+            "total_days": total_days,
+            "availability_rate": days_available / total_days * 100,
+            "listing_url": [f"https://www.airbnb.nl/rooms/{r}" for r in room_ids],
+            "gemeente": "Amsterdam",
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark create_map render modi")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 50000]
+    )
+    parser.add_argument(
+        "--modes", nargs="+", default=["markers", "cluster"], choices=["markers", "cluster"]
+    )
+    args = parser.parse_args()
+
+    gdf_gemeenten = gpd.GeoDataFrame(
+        {"naam": ["Amsterdam"]}, geometry=[box(*BBOX)], crs="EPSG:4326"
+    )
+
+    print("=" * 60)
+    print(f"{'listings':>10} │ {'modus':<8} │ {'bouwtijd':>10} │ {'map.html':>10}")
+    print("-" * 60)
+    for n in args.sizes:
+        df_map = make_listings(n)
+        for mode in args.modes:
+            start = time.perf_counter()
+            m = create_map(df_map, gdf_gemeenten, ["Amsterdam"], render_mode=mode)
+            html = m.get_root().render()
+            elapsed = time.perf_counter() - start
+            size_mb = len(html.encode("utf-8")) / 1024**2
+            print(f"{n:>10,} │ {mode:<8} │ {elapsed:>9.2f}s │ {size_mb:>7.1f} MB")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -18,8 +18,10 @@ import geopandas as gpd
 from shapely.geometry import Point
 from datetime import date, timedelta, datetime
 from src.config.room_type_config import get_mapped_property_type
+from src.core.boundaries import get_gemeente_bbox, get_gemeente_geometry
 from src.core.scraper_core import generate_scan_combinations
 from src.core.room_classifier import extract_room_type
+from src.core.run_estimator import RunEstimator, load_history
 from src.utils import extract_beds_info
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
@@ -50,6 +52,7 @@ NUM_REPEAT_CALLS = 3  # Optimale balans tussen dekking en API-gebruik
 
 # ── Extra Configuratie ────────────────────────────────────────────────────────
 gpkg_path = "assets/BestuurlijkeGebieden_2025.gpkg"  # Gemeentegrenzen
+data_dir = "data"  # Eerdere runs (voor de tijdsschatting)
 currency = "EUR"
 language = "nl"
 
@@ -107,19 +110,13 @@ def scrape_one(gm, check_in, check_out, nights, guests, scan_id):
     """Scrape één gemeente met parallelle API calls voor maximale dekking"""
     print(f" {gm:12s} {check_in}→{check_out} {nights}n/{guests}g", end="")
 
-    # Laad gemeentegrenzen
-    gdf_all = (
-        gpd.read_file(gpkg_path, layer="gemeentegebied")
-        .set_crs("EPSG:28992")
-        .to_crs("EPSG:4326")
-    )
-    sel = gdf_all[gdf_all["naam"] == gm]
-    if sel.empty:
+    # Haal bounding box op uit de gemeente index
+    bbox = get_gemeente_bbox(gpkg_path, gm)
+    if bbox is None:
         print(" ⚠️  Geen grens")
         return pd.DataFrame()
 
-    # Haal bounding box op
-    minx, miny, maxx, maxy = sel.total_bounds
+    minx, miny, maxx, maxy = bbox
 
     # ✨ PARALLELLE API CALLS - elk retourneert verschillende willekeurige subset
     all_raw_results = []
@@ -236,7 +233,7 @@ def scrape_one(gm, check_in, check_out, nights, guests, scan_id):
         geometry=[Point(xy) for xy in zip(df_dedup.longitude, df_dedup.latitude)],
         crs="EPSG:4326",
     )
-    inside = gdf_pts[gdf_pts.within(sel.geometry.union_all())].copy()
+    inside = gdf_pts[gdf_pts.within(get_gemeente_geometry(gpkg_path, gm))].copy()
 
     return inside
 
@@ -259,19 +256,29 @@ if __name__ == "__main__":
     print(f"🛏️  Nachten Variaties: {valid_nights}")
     print(f"👥 Gasten Variaties: {guests_variations}")
 
-    # Tijdsduur schatting
+    # Tijdsduur schatting (latency geleerd uit eerdere runs in data_dir)
     total_scans = len(scan_combinations) * len(gemeenten)
     total_api_calls = total_scans * NUM_REPEAT_CALLS
-    est_time_per_call = 2  # seconden (conservatieve schatting)
-    est_parallel_time = (
-        total_scans * est_time_per_call
-    ) / 60  # minuten (calls lopen parallel)
+    # Scans lopen na elkaar (één worker); de geleerde scan duur dekt de herhaalde calls
+    estimate = RunEstimator(load_history(data_dir)).estimate(
+        {
+            "num_repeat_calls": NUM_REPEAT_CALLS,
+            "max_workers": 1,
+            "delay_between_scans": 0.0,
+            "delay_between_calls": 0.0,
+        },
+        total_scans,
+    )
 
     print("\n⏱️  Geschatte tijd:")
     print(
         f"   • Totaal: {total_scans} zoekopdrachten × {NUM_REPEAT_CALLS} calls = {total_api_calls} API calls"
     )
-    print(f"   • Geschatte duur: ~{est_parallel_time:.1f} minuten")
+    print(
+        f"   • Geschatte duur: ~{estimate.seconds / 60:.1f} minuten "
+        f"(p90 {estimate.seconds_high / 60:.1f})"
+    )
+    print(f"   • Verwachte rate limits: ~{estimate.rate_limit_hits:.0f}")
 
     # Scrape alle combinaties
     print("\n" + "=" * 80)
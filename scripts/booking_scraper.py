@@ -10,13 +10,21 @@ Architecture:
 - Unified data format compatible with Airbnb scraper
 """
 
+import sys
 import time
 import logging
 from datetime import date, timedelta, datetime
+from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 
 import pandas as pd
-import geopandas as gpd
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.boundaries import get_gemeente_bbox  # noqa: E402
 
 # Configure logging
 logging.basicConfig(
@@ -473,20 +481,15 @@ class BookingScraper:
         """
         logger.info(f"Scraping {gemeente}: {checkin}→{checkout} ({nights}n, {guests}g)")
 
-        # Load gemeente boundaries
+        # Gemeente bounding box from the prebuilt index (no GeoPackage read)
         try:
-            gdf_all = (
-                gpd.read_file(self.config.GPKG_PATH, layer="gemeentegebied")
-                .set_crs("EPSG:28992")
-                .to_crs("EPSG:4326")
-            )
-            sel = gdf_all[gdf_all["naam"] == gemeente]
+            bbox = get_gemeente_bbox(self.config.GPKG_PATH, gemeente)
 
-            if sel.empty:
+            if bbox is None:
                 logger.error(f"No boundary found for gemeente: {gemeente}")
                 return pd.DataFrame()
 
-            minx, miny, maxx, maxy = sel.total_bounds
+            minx, miny, maxx, maxy = bbox
             center_lat = (miny + maxy) / 2
             center_lon = (minx + maxx) / 2
 
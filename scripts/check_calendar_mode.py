@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Controle van de kalender modus (engine="calendar") van begin tot eind
+
+Draait een kleine run via create_run en execute_run (dus ook finalize_run:
+export, data.parquet, kaart) met een nagebootste Airbnb API: synthetische
+listings binnen de eerste gemeenten van de GeoPackage en een willekeurige
+kalender per listing. Er gaan geen requests naar Airbnb.
+
+Controleert dat de run voltooid is, dat de dataset geschreven is en dat de
+beschikbaarheid van elke gevonden listing gelijk is aan zijn kalender.
+
+Gebruik:
+    python scripts/check_calendar_mode.py
+    python scripts/check_calendar_mode.py --gpkg assets/BestuurlijkeGebieden_2025.gpkg --gemeenten 3
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+
+from shapely.geometry import Point
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core import api_client  # noqa: E402
+from src.core.boundaries import get_gemeente_geometry, load_gemeente_index  # noqa: E402
+from src.core.run_pipeline import create_run, execute_run  # noqa: E402
+from src.data.run_store import has_run_dataset, load_run_dataset  # noqa: E402
+
+DEFAULT_GPKG_PATH = project_root / "assets" / "BestuurlijkeGebieden_2025.gpkg"
+
+PERIOD_START = date(2025, 1, 1)
+PERIOD_END = date(2025, 2, 15)
+
+
+def make_listings(gpkg_path: str, gemeenten: list, per_gemeente: int, seed: int) -> dict:
+    """Synthetische listings (room_id -> lon, lat, kalender) binnen de gemeenten"""
+    rng = random.Random(seed)
+    listings = {}
+    for gemeente in gemeenten:
+        geometry = get_gemeente_geometry(gpkg_path, gemeente)
+        min_x, min_y, max_x, max_y = geometry.bounds
+        while sum(room_id.startswith(f"{gemeente}-") for room_id in listings) < per_gemeente:
+            x, y = rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)
+            if not geometry.contains(Point(x, y)):
+                continue
+            calendar = {
+                (PERIOD_START + timedelta(days=d)).isoformat(): rng.random() < 0.5
+                for d in range(400)
+            }
+            listings[f"{gemeente}-{len(listings)}"] = (x, y, calendar)
+    return listings
+
+
+def fake_api(listings: dict):
+    """Vervang search_listings en fetch_calendar door de synthetische listings"""
+
+    def search_listings(
+        check_in, check_out, ne_lat, ne_long, sw_lat, sw_long, *args, transform=None, **kwargs
+    ):
+        start = date.fromisoformat(check_in)
+        nights = (date.fromisoformat(check_out) - start).days
+        results = [
+            {
+                "room_id": room_id,
+                "coordinates": {"latitude": y, "longitude": x},
+                "title": room_id,
+            }
+            for room_id, (x, y, calendar) in listings.items()
+            if sw_long <= x <= ne_long
+            and sw_lat <= y <= ne_lat
+            and all(calendar[(start + timedelta(days=d)).isoformat()] for d in range(nights))
+        ]
+        if transform is None:
+            return results
+        return [r for r in map(transform, results) if r is not None]
+
+    def fetch_calendar(room_id, month, year, *args, **kwargs):
+        calendar = listings[room_id][2]
+        return [{"calendarDate": day, "available": free} for day, free in calendar.items()]
+
+    api_client.search_listings = search_listings
+    api_client.fetch_calendar = fetch_calendar
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Controleer de kalender modus met een nep API")
+    parser.add_argument("--gpkg", default=str(DEFAULT_GPKG_PATH))
+    parser.add_argument("--gemeenten", type=int, default=2, help="Aantal gemeenten")
+    parser.add_argument("--listings", type=int, default=10, help="Listings per gemeente")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+
+    gemeenten = sorted(load_gemeente_index(args.gpkg))[: args.gemeenten]
+    listings = make_listings(args.gpkg, gemeenten, args.listings, args.seed)
+    fake_api(listings)
+
+    config = {
+        "gemeenten": gemeenten,
+        "period_start": PERIOD_START.isoformat(),
+        "period_end": PERIOD_END.isoformat(),
+        "nights_list": [1, 3],
+        "guests_list": [2],
+        "measurement_interval": 1,
+        "num_repeat_calls": 1,
+        "zoom_value": 10,
+        "price_min": 0,
+        "price_max": 0,
+        "currency": "EUR",
+        "language": "nl",
+        "max_workers": 4,
+        "delay_between_scans": 0,
+        "delay_between_calls": 0,
+        "engine": "calendar",
+    }
+
+    errors = []
+    found = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        run_dir = create_run(data_dir, config)
+        if not execute_run(run_dir, args.gpkg):
+            with open(Path(run_dir) / "run_status.json", "r", encoding="utf-8") as f:
+                errors.append(f"run niet voltooid: {json.load(f).get('error')}")
+        elif not has_run_dataset(run_dir):
+            errors.append("geen data.parquet / manifest geschreven")
+        else:
+            _, df_availability = load_run_dataset(run_dir, config)
+            found = dict(zip(df_availability["room_id"].astype(str), df_availability["days_available"]))
+            if not found:
+                errors.append("geen listings in de dataset")
+            # Alleen listings die de discovery vond (vrij op een van de discovery datums)
+            period_days = (PERIOD_END - PERIOD_START).days + 1
+            for room_id, days_available in found.items():
+                calendar = listings[room_id][2]
+                expected = sum(
+                    calendar[(PERIOD_START + timedelta(days=d)).isoformat()]
+                    for d in range(period_days)
+                )
+                if int(days_available) != expected:
+                    errors.append(f"{room_id}: {days_available} dagen beschikbaar, verwacht {expected}")
+
+    print("=" * 60)
+    if errors:
+        print(f"❌ Kalender modus: {len(errors)} fouten")
+        for error in errors[:20]:
+            print(f"   • {error}")
+        sys.exit(1)
+    print(f"✅ Kalender modus: {len(found)}/{len(listings)} listings gevonden, beschikbaarheid klopt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Beheer de scrape job queue (zie src/core/job_runner.py)
+
+Het dashboard zet runs in de queue en start zelf een supervisor als die niet
+draait. Met dit script kan de supervisor ook los (bv. als service) draaien en
+kunnen jobs vanaf de command line bekeken, gestopt en hervat worden.
+
+Gebruik:
+    python scripts/jobs.py list
+    python scripts/jobs.py supervise --max-concurrent 2
+    python scripts/jobs.py cancel outputs/data/<run_dir>
+    python scripts/jobs.py resume outputs/data/<run_dir>
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.job_queue import JobQueue  # noqa: E402
+from src.core.job_runner import (  # noqa: E402
+    DEFAULT_MAX_CONCURRENT_RUNS,
+    JobSupervisor,
+    cancel_run,
+    submit_run,
+)
+
+DEFAULT_DATA_DIR = project_root / "outputs" / "data"
+DEFAULT_GPKG_PATH = project_root / "assets" / "BestuurlijkeGebieden_2025.gpkg"
+
+STATUS_EMOJI = {
+    "queued": "⏳",
+    "running": "🔵",
+    "completed": "✅",
+    "failed": "❌",
+    "cancelled": "⏹️",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Beheer de scrape job queue")
+    parser.add_argument(
+        "--data-dir",
+        default=str(DEFAULT_DATA_DIR),
+        help=f"Directory met run_* folders (default: {DEFAULT_DATA_DIR})",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="Toon jobs (nieuwste eerst)")
+
+    supervise = sub.add_parser("supervise", help="Voer jobs uit (voorgrond)")
+    supervise.add_argument(
+        "--max-concurrent", type=int, default=DEFAULT_MAX_CONCURRENT_RUNS
+    )
+
+    cancel = sub.add_parser("cancel", help="Stop een run")
+    cancel.add_argument("run_dir")
+
+    resume = sub.add_parser("resume", help="Hervat een run vanaf het laatste checkpoint")
+    resume.add_argument("run_dir")
+    resume.add_argument("--gpkg", default=str(DEFAULT_GPKG_PATH))
+
+    args = parser.parse_args()
+
+    if args.command == "list":
+        jobs = JobQueue(args.data_dir).list_jobs()
+        if not jobs:
+            print("Geen jobs gevonden.")
+        for job in jobs:
+            emoji = STATUS_EMOJI.get(job["status"], "❓")
+            print(
+                f"{emoji} #{job['id']:<4} {job['status']:<10} "
+                f"{(job['submitted_at'] or '')[:19]}  {os.path.basename(job['run_dir'])}"
+                + (f"  ({job['error']})" if job["error"] else "")
+            )
+    elif args.command == "supervise":
+        logging.basicConfig(
+            level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+        )
+        JobSupervisor(args.data_dir, args.max_concurrent).run()
+    elif args.command == "cancel":
+        if cancel_run(args.data_dir, args.run_dir):
+            print(f"⏹️ Run wordt gestopt: {args.run_dir}")
+        else:
+            print(f"⚠️ Geen actieve job voor {args.run_dir}")
+    elif args.command == "resume":
+        job_id = submit_run(args.data_dir, args.run_dir, args.gpkg, resume=True)
+        print(f"▶️ Job #{job_id} ingepland: {args.run_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Bulk migratie van historische runs naar het kolom-formaat (parquet)
+
+Loopt alle run_* directories af en converteert per run de Excel export naar
+data.parquet + availability.parquet + manifest.json (zie src/data/run_store.py).
+Ontbrekende run_status.json bestanden worden aangemaakt en de run catalog
+wordt bijgewerkt.
+
+De migratie is idempotent en hervatbaar: runs die al actueel zijn worden
+overgeslagen, en elke run wordt atomair geschreven. Een afgebroken migratie
+kan dus gewoon opnieuw gestart worden.
+
+Gebruik:
+    python scripts/migrate_runs.py
+    python scripts/migrate_runs.py --data-dir outputs/data --workers 8
+    python scripts/migrate_runs.py --force    # alles opnieuw converteren
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.run_catalog import RunCatalog  # noqa: E402
+from src.data.run_store import migrate_run  # noqa: E402
+
+DEFAULT_DATA_DIR = project_root / "outputs" / "data"
+
+
+def find_run_dirs(data_dir: str) -> list:
+    """Vind alle run_* directories in de data directory"""
+    if not os.path.isdir(data_dir):
+        return []
+    return sorted(
+        os.path.join(data_dir, name)
+        for name in os.listdir(data_dir)
+        if name.startswith("run_") and os.path.isdir(os.path.join(data_dir, name))
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Converteer historische Excel runs naar het parquet run formaat"
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=str(DEFAULT_DATA_DIR),
+        help=f"Directory met run_* folders (default: {DEFAULT_DATA_DIR})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Aantal processen (default: aantal CPU's)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Converteer ook runs waarvan de dataset al actueel is",
+    )
+    args = parser.parse_args()
+
+    run_dirs = find_run_dirs(args.data_dir)
+    if not run_dirs:
+        print(f"⚠️  Geen runs gevonden in {args.data_dir}")
+        return
+
+    print("=" * 80)
+    print("📦 RUN MIGRATIE")
+    print("=" * 80)
+    print(f"📁 Data directory: {args.data_dir}")
+    print(f"🗂️  Runs:           {len(run_dirs)}")
+    print(f"👷 Workers:        {args.workers}")
+    print("=" * 80)
+
+    start_time = time.time()
+    counts = {"migrated": 0, "skipped": 0, "empty": 0, "failed": 0}
+    icons = {"migrated": "✅", "skipped": "⏭️ ", "empty": "⚪", "failed": "❌"}
+
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {
+            executor.submit(migrate_run, run_dir, args.force): run_dir
+            for run_dir in run_dirs
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            counts[result["result"]] += 1
+            message = f" │ {result['message']}" if result["message"] else ""
+            print(
+                f"[{done:4d}/{len(run_dirs)}] {icons[result['result']]} "
+                f"{result['run_name']}{message}"
+            )
+
+    # Catalog bijwerken vanuit het hoofdproces (één schrijver)
+    RunCatalog(args.data_dir).reconcile()
+
+    elapsed = time.time() - start_time
+    print("=" * 80)
+    print(
+        f"✅ {counts['migrated']} gemigreerd │ ⏭️  {counts['skipped']} overgeslagen │ "
+        f"⚪ {counts['empty']} zonder data │ ❌ {counts['failed']} gefaald │ "
+        f"⏱️ {elapsed:.1f}s"
+    )
+    print("=" * 80)
+
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Voorbewerking van de gemeentegrenzen
+
+Leest de GeoPackage één keer in en schrijft per detailniveau vereenvoudigde
+grenzen (naam, code, bbox, centroid) als GeoParquet naar assets/boundaries/
+(zie src/core/boundaries.py). De kaarten en het ruimtelijk filter lezen daarna
+alleen deze bestanden. Wordt ook automatisch uitgevoerd als de GeoPackage
+nieuwer is dan de cache.
+
+Gebruik:
+    python scripts/prepare_boundaries.py
+    python scripts/prepare_boundaries.py --gpkg assets/BestuurlijkeGebieden_2025.gpkg
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.boundaries import get_cache_dir, prepare_boundaries  # noqa: E402
+
+DEFAULT_GPKG = project_root / "assets" / "BestuurlijkeGebieden_2025.gpkg"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Schrijf vereenvoudigde gemeentegrenzen per detailniveau"
+    )
+    parser.add_argument(
+        "--gpkg",
+        default=str(DEFAULT_GPKG),
+        help=f"GeoPackage met laag gemeentegebied (default: {DEFAULT_GPKG})",
+    )
+    args = parser.parse_args()
+
+    if not Path(args.gpkg).exists():
+        print(f"❌ GeoPackage niet gevonden: {args.gpkg}")
+        sys.exit(1)
+
+    start_time = time.time()
+    manifest = prepare_boundaries(args.gpkg)
+    elapsed = time.time() - start_time
+
+    print(f"📁 {get_cache_dir(args.gpkg)}")
+    for level, info in manifest["levels"].items():
+        print(
+            f"   • {level:<7} tolerantie {info['tolerance_m']:>5g} m │ "
+            f"{info['bytes'] / 1024:>8.0f} KB"
+        )
+    print(f"✅ Klaar in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Synchroniseer de run catalog met de run directories op schijf
+
+De catalog (run_catalog.sqlite, zie src/core/run_catalog.py) wordt bijgewerkt
+door de tracker en de exporter. Na handmatige wijzigingen (runs gekopieerd,
+verwijderd of aangepast) brengt dit script de catalog weer in lijn.
+
+Gebruik:
+    python scripts/reconcile_runs.py
+    python scripts/reconcile_runs.py --data-dir outputs/data
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.run_catalog import RunCatalog  # noqa: E402
+
+DEFAULT_DATA_DIR = project_root / "outputs" / "data"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Synchroniseer de run catalog met de run directories"
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=str(DEFAULT_DATA_DIR),
+        help=f"Directory met run_* folders (default: {DEFAULT_DATA_DIR})",
+    )
+    args = parser.parse_args()
+
+    start_time = time.time()
+    catalog = RunCatalog(args.data_dir)
+    result = catalog.reconcile()
+    elapsed = time.time() - start_time
+
+    print(
+        f"📇 {catalog.db_path}: ✅ {result['indexed']} runs geïndexeerd │ "
+        f"🗑️  {result['removed']} verwijderd │ ⏱️ {elapsed:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Coordinator voor distributed scraping (zie src/core/distributed.py)
+
+Maakt een run aan vanuit een config (zelfde velden als config.json van een
+dashboard run), publiceert de scan taken in de gedeelde queue, volgt de
+voortgang en exporteert het samengevoegde resultaat naar de run directory.
+Workers starten met scripts/scan_worker.py op elke node.
+
+Gebruik:
+    python scripts/scan_coordinator.py --queue-dir /mnt/shared/rigo_queue --config run.json
+    python scripts/scan_coordinator.py --queue-dir /mnt/shared/rigo_queue --run-dir outputs/data/<run_dir>
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.distributed import collect_run, publish_run  # noqa: E402
+from src.core.run_pipeline import create_run  # noqa: E402
+
+DEFAULT_DATA_DIR = project_root / "outputs" / "data"
+DEFAULT_GPKG_PATH = project_root / "assets" / "BestuurlijkeGebieden_2025.gpkg"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed scan coordinator")
+    parser.add_argument("--queue-dir", required=True, help="Gedeelde queue directory")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--config", help="Run config (JSON) voor een nieuwe run")
+    source.add_argument("--run-dir", help="Bestaande run (opnieuw publiceren/volgen)")
+    parser.add_argument(
+        "--data-dir",
+        default=str(DEFAULT_DATA_DIR),
+        help=f"Directory met run_* folders (default: {DEFAULT_DATA_DIR})",
+    )
+    parser.add_argument("--gpkg", default=str(DEFAULT_GPKG_PATH))
+    parser.add_argument(
+        "--publish-only", action="store_true", help="Alleen publiceren, niet volgen"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+
+    if args.config:
+        with open(args.config, "r") as f:
+            run_dir = create_run(args.data_dir, json.load(f))
+    else:
+        run_dir = args.run_dir
+
+    added = publish_run(run_dir, args.queue_dir)
+    print(f"📤 {added} taken gepubliceerd voor {run_dir}")
+    if args.publish_only:
+        return
+
+    print("⏳ Wachten op workers... (volg live met scripts/tail_run.py)")
+    ok = collect_run(run_dir, args.queue_dir, args.gpkg)
+    print(f"{'✅ Run voltooid' if ok else '❌ Run mislukt'}: {run_dir}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Worker voor distributed scraping (zie src/core/distributed.py)
+
+Draai dit op elke node (met eigen IP / egress budget). De worker leaset scan
+taken uit de gedeelde queue, scrapet ze, schrijft het resultaat naar de
+gedeelde result store en ackt. Verloren werk (crash, netwerk) wordt na het
+verlopen van de lease door een andere worker opgepakt.
+
+Gebruik:
+    python scripts/scan_worker.py --queue-dir /mnt/shared/rigo_queue
+    python scripts/scan_worker.py --queue-dir /mnt/shared/rigo_queue --threads 4 --idle-exit 600
+    python scripts/scan_worker.py --queue-dir /mnt/shared/rigo_queue --threads 8 --proxies proxies.txt
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.distributed import run_worker  # noqa: E402
+from src.core.proxy_pool import DEFAULT_RATE_PER_PROXY  # noqa: E402
+from src.core.work_queue import DEFAULT_LEASE_SECONDS  # noqa: E402
+
+DEFAULT_GPKG_PATH = project_root / "assets" / "BestuurlijkeGebieden_2025.gpkg"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distributed scan worker")
+    parser.add_argument("--queue-dir", required=True, help="Gedeelde queue directory")
+    parser.add_argument("--gpkg", default=str(DEFAULT_GPKG_PATH))
+    parser.add_argument("--worker-id", default=None, help="Default: hostnaam:pid")
+    parser.add_argument("--threads", type=int, default=1, help="Taken tegelijk")
+    parser.add_argument("--lease-seconds", type=float, default=DEFAULT_LEASE_SECONDS)
+    parser.add_argument(
+        "--idle-exit", type=float, default=None, help="Stop na N seconden zonder werk"
+    )
+    parser.add_argument(
+        "--proxies", default=None, help="Proxy lijst (één per regel, 'direct' = geen proxy)"
+    )
+    parser.add_argument(
+        "--proxy-rate",
+        type=float,
+        default=DEFAULT_RATE_PER_PROXY,
+        help="Requests per seconde per proxy",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s"
+    )
+    stats = run_worker(
+        args.queue_dir,
+        args.gpkg,
+        worker_id=args.worker_id,
+        threads=args.threads,
+        lease_seconds=args.lease_seconds,
+        idle_exit=args.idle_exit,
+        proxy_file=args.proxies,
+        proxy_rate=args.proxy_rate,
+    )
+    print(f"✅ {stats['done']} taken gedaan │ ❌ {stats['failed']} mislukt")
+
+
+if __name__ == "__main__":
+    main()
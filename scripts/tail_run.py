@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Volg de event stream (events.jsonl) van een run
+
+Toont de events van een run en blijft nieuwe events volgen tot de run klaar is
+(zoals tail -f). Leest incrementeel vanaf een byte offset, dus ook bij lange
+runs alleen de nieuwe regels.
+
+Gebruik:
+    python scripts/tail_run.py outputs/data/run_Amsterdam_20250101_120000
+    python scripts/tail_run.py <run_dir> --no-follow     # alleen huidige events
+    python scripts/tail_run.py <run_dir> --status        # afgeleide status
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).resolve().parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.core.run_events import RunEventLog, format_event  # noqa: E402
+from src.core.run_tracker import RunTracker  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Volg de events van een run")
+    parser.add_argument("run_dir", help="Run directory")
+    parser.add_argument(
+        "--no-follow",
+        action="store_true",
+        help="Toon de huidige events en stop",
+    )
+    parser.add_argument(
+        "--offset", type=int, default=0, help="Start byte offset (default: 0)"
+    )
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Toon de uit de events afgeleide status als JSON",
+    )
+    args = parser.parse_args()
+
+    if not Path(args.run_dir).is_dir():
+        print(f"❌ Run directory niet gevonden: {args.run_dir}")
+        sys.exit(1)
+
+    if args.status:
+        print(json.dumps(RunTracker(args.run_dir).get_status(), indent=2))
+        return
+
+    event_log = RunEventLog(args.run_dir)
+
+    if args.no_follow:
+        events, offset = event_log.read_since(args.offset)
+        for event in events:
+            print(format_event(event))
+        print(f"── offset {offset}")
+        return
+
+    try:
+        for event in event_log.follow(args.offset):
+            print(format_event(event), flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,379 @@
 #!/usr/bin/env python3
 """
 API client for Airbnb with retry logic
+
+Search requests gaan via een pool van keep-alive sessions (los van threads);
+de publieke API key wordt één keer opgehaald en gecached (TTL, ververst bij
+een auth fout).
 """
 
+import asyncio
+import functools
+import json
 import logging
+import threading
 import time
-from typing import Optional
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Executor, ThreadPoolExecutor, wait
+from datetime import date
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from curl_cffi import CurlInfo
+from curl_cffi.requests import Session
+from pyairbnb import api as airbnb_api
+from pyairbnb import standardize as airbnb_standardize
+from pyairbnb import utils as airbnb_utils
 
-from pyairbnb import search_all
+from src.core.errors import ApiError, CircuitBreaker, ClassifiedError, classify_error
+from src.core.hedging import HedgePolicy
+from src.core.proxy_pool import ProxyPool
 
 logger = logging.getLogger(__name__)
 
+# Hedge verliezers die nog lopen (asyncio houdt alleen zwakke referenties)
+_background_tasks = set()
+
+# Per record toegepast zodra een pagina binnenkomt; None = record overslaan
+RecordTransform = Callable[[dict], Optional[dict]]
+
+# StaysSearch persisted query (zelfde hash als pyairbnb.search_all standaard gebruikt)
+SEARCH_OPERATION_ID = "9f945886dcc032b9ef4ba770d9132eb0aa78053296b5405483944c229617b00b"
+SEARCH_URL = f"https://www.airbnb.com/api/v3/StaysSearch/{SEARCH_OPERATION_ID}"
+REQUEST_TIMEOUT = 60
+
+# PdpAvailabilityCalendar persisted query (zelfde hash als pyairbnb.get_calendar);
+# één request geeft hooguit CALENDAR_MAX_MONTHS maanden
+CALENDAR_OPERATION_ID = "8f08e03c7bd16fcad3c92a3592c19a8b559a0d0855a84028d1163d4733ed9ade"
+CALENDAR_URL = f"https://www.airbnb.com/api/v3/PdpAvailabilityCalendar/{CALENDAR_OPERATION_ID}"
+CALENDAR_MAX_MONTHS = 12
+
+# De publieke API key verandert zelden; na TTL of een auth fout wordt hij opnieuw opgehaald
+API_KEY_TTL = 6 * 3600
+AUTH_FAILURE_STATUS = (401, 403)
+
+_SEARCH_HEADERS = {
+    "Accept": "*/*",
+    "Accept-Language": "en",
+    "Cache-Control": "no-cache",
+    "content-type": "application/json",
+    "Pragma": "no-cache",
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+    ),
+}
+_TREATMENT_FLAGS = [
+    "feed_map_decouple_m11_treatment",
+    "stays_search_rehydration_treatment_desktop",
+    "stays_search_rehydration_treatment_moweb",
+    "selective_query_feed_map_homepage_desktop_treatment",
+    "selective_query_feed_map_homepage_moweb_treatment",
+]
+
+
+class SearchHttpError(Exception):
+    """API request met een onverwachte HTTP status (response blijft bewaard)"""
+
+    def __init__(self, response):
+        super().__init__(
+            "Unexpected status code: ", response.status_code, " response body: ", response.text[:500]
+        )
+        self.response = response
+
+
+class PersistedQueryError(ValueError):
+    """Airbnb kent de persisted query hash niet meer (pyairbnb versie bijwerken)"""
+
+    def __init__(self, operation: str, operation_id: str):
+        super().__init__(
+            f"Airbnb rejected the {operation} persisted query hash {operation_id[:12]}… "
+            f"(PersistedQueryNotFound). The hash was taken from pyairbnb 2.2; update "
+            f"pyairbnb and the operation id in src/core/api_client.py."
+        )
+        self.operation = operation
+        self.operation_id = operation_id
+
+
+# GraphQL foutcodes/berichten als de persisted query hash onbekend is
+_PERSISTED_QUERY_ERRORS = ("persistedquerynotfound", "persisted_query_not_found")
+
+
+def _check_persisted_query(response, operation: str, operation_id: str):
+    """Raise PersistedQueryError als de response een onbekende query hash meldt"""
+    try:
+        data = response.json()
+    except ValueError:
+        return
+    errors = data.get("errors") if isinstance(data, dict) else None
+    for error in errors or []:
+        text = json.dumps(error).lower()
+        if any(hint in text for hint in _PERSISTED_QUERY_ERRORS):
+            raise PersistedQueryError(operation, operation_id)
+
+
+class _ApiKeyCache:
+    """Gedeelde cache van de publieke API key (één bootstrap per TTL)"""
+
+    def __init__(self, ttl: float = API_KEY_TTL):
+        self.ttl = ttl
+        self._key: Optional[str] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, proxy_url: str) -> Tuple[str, float]:
+        """
+        Returns:
+            Tuple van (api key, seconden bootstrap in deze aanroep)
+        """
+        with self._lock:
+            if self._key is not None and time.monotonic() - self._fetched_at < self.ttl:
+                return self._key, 0.0
+            # Eén thread haalt de key op, de rest wacht op de lock
+            start = time.time()
+            self._key = airbnb_api.get(proxy_url, timeout=REQUEST_TIMEOUT)
+            self._fetched_at = time.monotonic()
+            logger.debug("Fetched Airbnb API key")
+            return self._key, time.time() - start
+
+    def invalidate(self, key: str):
+        """Gooi key weg na een auth fout (tenzij al vervangen)"""
+        with self._lock:
+            if self._key == key:
+                self._key = None
+
+
+class _SessionPool:
+    """
+    Keep-alive sessions die hergebruikt worden, los van de thread die ze maakte
+
+    Een curl Session is niet thread-safe: elke request leent een vrije session
+    en geeft hem daarna terug. Zo houdt ook een nieuwe thread (bv. de executor
+    van de volgende scan) de open connecties van de vorige requests; er komen
+    alleen sessions bij als er meer requests tegelijk lopen.
+    """
+
+    def __init__(self):
+        self._idle: List[Session] = []
+        self._lock = threading.Lock()
+        self._created = 0
+        self._borrowed = 0
+
+    @contextmanager
+    def session(self) -> Iterator[Session]:
+        with self._lock:
+            # Laatst teruggegeven eerst: die heeft het meest waarschijnlijk een open connectie
+            session = self._idle.pop() if self._idle else None
+            self._borrowed += 1
+            if session is None:
+                self._created += 1
+        if session is None:
+            session = Session(
+                impersonate="chrome124",
+                curl_infos=[CurlInfo.CONNECT_TIME, CurlInfo.APPCONNECT_TIME],
+            )
+        try:
+            yield session
+        finally:
+            with self._lock:
+                self._idle.append(session)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"sessions": self._created, "requests": self._borrowed}
+
+
+_api_keys = _ApiKeyCache()
+_sessions = _SessionPool()
+
+
+def session_stats() -> Dict[str, int]:
+    """
+    Aantal aangemaakte sessions en HTTP requests sinds de start van het proces
+
+    Returns:
+        Dict met "sessions" en "requests"; bij hergebruik blijft sessions
+        ongeveer gelijk aan het aantal requests dat tegelijk loopt
+    """
+    return _sessions.stats()
+
+
+def _search_payload(
+    cursor: str,
+    check_in: str,
+    check_out: str,
+    ne_lat: float,
+    ne_long: float,
+    sw_lat: float,
+    sw_long: float,
+    zoom_value: int,
+    price_min: int,
+    price_max: int,
+    amenities: list,
+) -> dict:
+    """StaysSearch request body (filters zoals pyairbnb.search_all ze stuurt)"""
+    raw_params = [
+        {"filterName": "cdnCacheSafe", "filterValues": ["false"]},
+        {"filterName": "channel", "filterValues": ["EXPLORE"]},
+        {"filterName": "datePickerType", "filterValues": ["calendar"]},
+        {"filterName": "itemsPerGrid", "filterValues": ["50"]},
+        {"filterName": "neLat", "filterValues": [str(ne_lat)]},
+        {"filterName": "neLng", "filterValues": [str(ne_long)]},
+        {"filterName": "priceFilterInputType", "filterValues": ["0"]},
+        {"filterName": "screenSize", "filterValues": ["large"]},
+        {"filterName": "refinementPaths", "filterValues": ["/homes"]},
+        {"filterName": "searchByMap", "filterValues": ["true"]},
+        {"filterName": "swLat", "filterValues": [str(sw_lat)]},
+        {"filterName": "swLng", "filterValues": [str(sw_long)]},
+        {"filterName": "tabId", "filterValues": ["home_tab"]},
+        {"filterName": "version", "filterValues": ["1.8.3"]},
+        {"filterName": "zoomLevel", "filterValues": [str(zoom_value)]},
+    ]
+    if check_in and check_out:
+        nights = (date.fromisoformat(check_out) - date.fromisoformat(check_in)).days
+        raw_params += [
+            {"filterName": "checkin", "filterValues": [check_in]},
+            {"filterName": "checkout", "filterValues": [check_out]},
+            {"filterName": "priceFilterNumNights", "filterValues": [str(nights)]},
+        ]
+    if price_min:
+        raw_params.append({"filterName": "price_min", "filterValues": [str(price_min)]})
+    if price_max:
+        raw_params.append({"filterName": "price_max", "filterValues": [str(price_max)]})
+    if amenities:
+        raw_params.append(
+            {"filterName": "amenities", "filterValues": [str(a) for a in amenities]}
+        )
+        for amenity in amenities:
+            raw_params.append(
+                {"filterName": "selected_filter_order", "filterValues": [f"amenities:{amenity}"]}
+            )
+
+    request = {
+        "cursor": cursor,
+        "requestedPageType": "STAYS_SEARCH",
+        "metadataOnly": False,
+        "source": "structured_search_input_header",
+        "searchType": "user_map_move",
+        "treatmentFlags": _TREATMENT_FLAGS,
+        "rawParams": raw_params,
+    }
+    return {
+        "operationName": "StaysSearch",
+        "extensions": {"persistedQuery": {"version": 1, "sha256Hash": SEARCH_OPERATION_ID}},
+        "variables": {
+            "skipExtendedSearchParams": False,
+            "includeMapResults": True,
+            "isLeanTreatment": False,
+            "aiSearchEnabled": False,
+            "staysMapSearchRequestV2": request,
+            "staysSearchRequest": {**request, "maxMapItems": 9999},
+        },
+    }
+
+
+def search_listings(
+    check_in: str,
+    check_out: str,
+    ne_lat: float,
+    ne_long: float,
+    sw_lat: float,
+    sw_long: float,
+    zoom_value: int,
+    price_min: int,
+    price_max: int,
+    amenities: list,
+    currency: str,
+    language: str,
+    proxy_url: str = "",
+    call_timing: Optional[Dict[str, float]] = None,
+    transform: Optional[RecordTransform] = None,
+) -> list:
+    """
+    Alle pagina's van een StaysSearch (vervangt pyairbnb.search_all)
+
+    Gebruikt de keep-alive session van de thread en de gedeelde API key
+    cache; bij een auth fout (401/403) wordt de key één keer ververst.
+
+    Args:
+        (same as make_api_call)
+        call_timing: Optionele dict; "setup" wordt verhoogd met de tijd voor
+            verbinding opzetten (TCP/TLS) en het ophalen van de API key
+        transform: Optionele functie per record, toegepast zodra een pagina
+            binnen is (None = overslaan); de ruwe pagina wordt niet bewaard
+
+    Returns:
+        List van listings (gestandaardiseerd zoals pyairbnb, of de output
+        van transform)
+
+    Raises:
+        SearchHttpError: Bij een onverwachte HTTP status
+        PersistedQueryError: Als Airbnb de query hash niet (meer) kent
+    """
+    proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
+    query = urlencode({"operationName": "StaysSearch", "locale": language, "currency": currency})
+    setup = 0.0
+
+    api_key, bootstrap = _api_keys.get(proxy_url)
+    setup += bootstrap
+    refreshed = False
+    all_results = []
+    cursor = ""
+    try:
+        while True:
+            payload = _search_payload(
+                cursor,
+                check_in,
+                check_out,
+                ne_lat,
+                ne_long,
+                sw_lat,
+                sw_long,
+                zoom_value,
+                price_min,
+                price_max,
+                amenities,
+            )
+            with _sessions.session() as session:
+                response = session.post(
+                    f"{SEARCH_URL}?{query}",
+                    json=payload,
+                    headers={**_SEARCH_HEADERS, "X-Airbnb-Api-Key": api_key},
+                    proxies=proxies,
+                    timeout=REQUEST_TIMEOUT,
+                )
+            # 0 bij een hergebruikte connectie; APPCONNECT is inclusief TLS
+            setup += max(
+                response.infos.get(CurlInfo.APPCONNECT_TIME) or 0.0,
+                response.infos.get(CurlInfo.CONNECT_TIME) or 0.0,
+            )
+
+            if response.status_code in AUTH_FAILURE_STATUS and not refreshed:
+                _api_keys.invalidate(api_key)
+                api_key, bootstrap = _api_keys.get(proxy_url)
+                setup += bootstrap
+                refreshed = True
+                continue
+            _check_persisted_query(response, "StaysSearch", SEARCH_OPERATION_ID)
+            if response.status_code != 200:
+                raise SearchHttpError(response)
+
+            data = response.json()
+            pagination = airbnb_utils.get_nested_value(
+                data, "data.presentation.staysSearch.results.paginationInfo", {}
+            )
+            cursor = (pagination or {}).get("nextPageCursor")
+            results = airbnb_standardize.from_search(data)
+            page_size = len(results)
+            if transform is not None:
+                results = [rec for rec in map(transform, results) if rec is not None]
+            all_results.extend(results)
+            if not page_size or not cursor:
+                return all_results
+    finally:
+        if call_timing is not None:
+            call_timing["setup"] = call_timing.get("setup", 0.0) + setup
+
 
 def make_api_call(
     check_in: str,
@@ -26,6 +389,8 @@ def make_api_call(
     currency: str,
     language: str,
     proxy_url: Optional[str],
+    call_timing: Optional[Dict[str, float]] = None,
+    transform: Optional[RecordTransform] = None,
 ) -> list:
     """
     Voer een enkele Airbnb API call uit
@@ -44,11 +409,14 @@ def make_api_call(
         currency: Valuta code
         language: Taal code
         proxy_url: Proxy URL (optioneel)
+        call_timing: Optionele dict; "setup" krijgt de tijd voor verbinding
+            opzetten en bootstrap (API key)
+        transform: Optionele functie per record (zie search_listings)
 
     Returns:
         List van listings
     """
-    results = search_all(
+    results = search_listings(
         check_in=check_in,
         check_out=check_out,
         ne_lat=ne_lat,
@@ -56,15 +424,16 @@ def make_api_call(
         sw_lat=sw_lat,
         sw_long=sw_long,
         zoom_value=zoom_value,
-        currency=currency,
-        language=language,
         price_min=price_min,
         price_max=price_max,
         amenities=amenities,
+        currency=currency,
+        language=language,
         proxy_url=proxy_url if proxy_url else "",
+        call_timing=call_timing,
+        transform=transform,
     )
 
-    # search_all returns a list of results
     return results if results else []
 
 
@@ -84,26 +453,48 @@ def make_api_call_with_retry(
     proxy_url: Optional[str],
     max_retries: int = 3,
     retry_delay: float = 1.0,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    call_timing: Optional[Dict[str, float]] = None,
+    transform: Optional[RecordTransform] = None,
 ) -> list:
     """
     API call met exponential backoff retry logic
 
+    Met een proxy pool gaat elke poging via de gezondste proxy met budget;
+    een rate limit zet die proxy in quarantaine en de volgende poging gaat
+    direct via een andere proxy.
+
+    Fouten worden geclassificeerd (src.core.errors): alleen rate limits en
+    tijdelijke netwerk/server fouten worden herhaald; een Retry-After hint
+    bepaalt dan de wachttijd.
+
     Args:
         (same as make_api_call)
         max_retries: Maximum aantal retry pogingen
         retry_delay: Initiële delay tussen retries in seconden
+        proxy_pool: Optionele ProxyPool (vervangt proxy_url)
+        circuit_breaker: Optionele CircuitBreaker; pauzeert calls zolang hij open staat
+        call_timing: Optionele dict; krijgt "started" (monotonic, na het wachten
+            op budget) en bij succes "latency" van de geslaagde poging
+        transform: Optionele functie per record (zie search_listings)
 
     Returns:
         List van listings
 
     Raises:
-        Exception: Als alle retries falen
+        ApiError: Als alle retries falen of de fout niet herhaalbaar is
     """
     last_error = None
+    classified = None
 
     for attempt in range(max_retries):
+        if circuit_breaker is not None:
+            circuit_breaker.wait()
+        proxy = proxy_pool.acquire() if proxy_pool is not None else proxy_url
+        call_start = _start_attempt(call_timing)
         try:
-            return make_api_call(
+            results = make_api_call(
                 check_in,
                 check_out,
                 ne_lat,
@@ -116,61 +507,191 @@ def make_api_call_with_retry(
                 amenities,
                 currency,
                 language,
-                proxy_url,
+                proxy,
+                call_timing=call_timing,
+                transform=transform,
             )
         except Exception as e:
             last_error = e
+            classified, wait_time = _attempt_failed(
+                e, proxy, call_start, attempt, max_retries, retry_delay, proxy_pool, circuit_breaker
+            )
+            if wait_time is None:
+                break
+            if wait_time > 0:
+                time.sleep(wait_time)
+            continue
 
-            # Compact error message (niet de hele HTML body printen)
-            error_str = str(e)
-            if len(error_str) > 150:
-                error_str = error_str[:150] + "..."
+        _attempt_succeeded(proxy, call_start, proxy_pool, circuit_breaker, call_timing)
+        return results
 
-            # Detecteer rate limiting (405, 429) en gebruik langere delays
-            is_rate_limit = (
-                "405" in error_str or "429" in error_str or "Not Allowed" in error_str
-            )
+    raise ApiError(
+        f"API call failed ({classified.category.value}): {classified.message}",
+        classified,
+    ) from last_error
+
+
+def fetch_calendar(
+    room_id: str,
+    month: int,
+    year: int,
+    months: int = CALENDAR_MAX_MONTHS,
+    currency: str = "EUR",
+    language: str = "en",
+    proxy_url: str = "",
+    call_timing: Optional[Dict[str, float]] = None,
+) -> list:
+    """
+    Beschikbaarheidskalender van één listing (vervangt pyairbnb.get_calendar)
+
+    Zelfde session en API key cache als search_listings, maar met een
+    willekeurige start maand en aantal maanden in één request.
+
+    Args:
+        room_id: Listing ID
+        month: Eerste maand (1-12)
+        year: Jaar van de eerste maand
+        months: Aantal maanden (hooguit CALENDAR_MAX_MONTHS)
+        currency: Valuta code
+        language: Taal code
+        proxy_url: Proxy URL (optioneel)
+        call_timing: Optionele dict; "setup" wordt verhoogd met de tijd voor
+            verbinding opzetten en het ophalen van de API key
 
-            if attempt < max_retries - 1:
-                # Langere delays voor rate limiting
-                wait_time = (
-                    retry_delay * (2**attempt)
-                    if not is_rate_limit
-                    else retry_delay * (3**attempt)
+    Returns:
+        List van dagen zoals de API ze geeft (o.a. "calendarDate",
+        "available", "minNights")
+
+    Raises:
+        SearchHttpError: Bij een onverwachte HTTP status
+        PersistedQueryError: Als Airbnb de query hash niet (meer) kent
+    """
+    proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else None
+    variables = {
+        "request": {
+            "count": min(months, CALENDAR_MAX_MONTHS),
+            "listingId": str(room_id),
+            "month": month,
+            "year": year,
+        }
+    }
+    extensions = {"persistedQuery": {"version": 1, "sha256Hash": CALENDAR_OPERATION_ID}}
+    query = urlencode(
+        {
+            "operationName": "PdpAvailabilityCalendar",
+            "locale": language,
+            "currency": currency,
+            "variables": json.dumps(variables),
+            "extensions": json.dumps(extensions),
+        }
+    )
+    setup = 0.0
+
+    api_key, bootstrap = _api_keys.get(proxy_url)
+    setup += bootstrap
+    try:
+        for refreshed in (False, True):
+            with _sessions.session() as session:
+                response = session.get(
+                    f"{CALENDAR_URL}?{query}",
+                    headers={**_SEARCH_HEADERS, "X-Airbnb-Api-Key": api_key},
+                    proxies=proxies,
+                    timeout=REQUEST_TIMEOUT,
                 )
+            setup += max(
+                response.infos.get(CurlInfo.APPCONNECT_TIME) or 0.0,
+                response.infos.get(CurlInfo.CONNECT_TIME) or 0.0,
+            )
+            if response.status_code in AUTH_FAILURE_STATUS and not refreshed:
+                _api_keys.invalidate(api_key)
+                api_key, bootstrap = _api_keys.get(proxy_url)
+                setup += bootstrap
+                continue
+            _check_persisted_query(response, "PdpAvailabilityCalendar", CALENDAR_OPERATION_ID)
+            if response.status_code != 200:
+                raise SearchHttpError(response)
+
+            calendar_months = airbnb_utils.get_nested_value(
+                response.json(), "data.merlin.pdpAvailabilityCalendar.calendarMonths", []
+            )
+            return [
+                day for calendar_month in calendar_months or [] for day in calendar_month.get("days", [])
+            ]
+    finally:
+        if call_timing is not None:
+            call_timing["setup"] = call_timing.get("setup", 0.0) + setup
+
+
+def fetch_calendar_with_retry(
+    room_id: str,
+    month: int,
+    year: int,
+    months: int = CALENDAR_MAX_MONTHS,
+    currency: str = "EUR",
+    language: str = "en",
+    proxy_url: Optional[str] = None,
+    max_retries: int = 3,
+    retry_delay: float = 1.0,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    call_timing: Optional[Dict[str, float]] = None,
+) -> list:
+    """
+    fetch_calendar met dezelfde retry, proxy en circuit breaker logica als
+    make_api_call_with_retry
+
+    Returns:
+        List van kalender dagen
+
+    Raises:
+        ApiError: Als alle retries falen of de fout niet herhaalbaar is
+    """
+    last_error = None
+    classified = None
 
-                if is_rate_limit:
-                    logger.warning(
-                        f"⚠️ Rate limit hit (attempt {attempt + 1}/{max_retries}). "
-                        f"Waiting {wait_time:.1f}s..."
-                    )
-                else:
-                    logger.warning(
-                        f"API call failed (attempt {attempt + 1}/{max_retries}): {error_str}. "
-                        f"Retrying in {wait_time:.1f}s..."
-                    )
+    for attempt in range(max_retries):
+        if circuit_breaker is not None:
+            circuit_breaker.wait()
+        proxy = proxy_pool.acquire() if proxy_pool is not None else proxy_url
+        call_start = _start_attempt(call_timing)
+        try:
+            days = fetch_calendar(
+                room_id,
+                month,
+                year,
+                months,
+                currency,
+                language,
+                proxy_url=proxy or "",
+                call_timing=call_timing,
+            )
+        except Exception as e:
+            last_error = e
+            classified, wait_time = _attempt_failed(
+                e, proxy, call_start, attempt, max_retries, retry_delay, proxy_pool, circuit_breaker
+            )
+            if wait_time is None:
+                break
+            if wait_time > 0:
                 time.sleep(wait_time)
-            else:
-                if is_rate_limit:
-                    logger.error(
-                        "❌ Rate limit: Too many requests. Reduce workers or increase delays."
-                    )
-                else:
-                    logger.error(
-                        f"API call failed after {max_retries} attempts: {error_str}"
-                    )
+            continue
 
-    raise Exception(f"API call failed after {max_retries} attempts") from last_error
+        _attempt_succeeded(proxy, call_start, proxy_pool, circuit_breaker, call_timing)
+        return days
 
+    raise ApiError(
+        f"Calendar call failed ({classified.category.value}): {classified.message}",
+        classified,
+    ) from last_error
 
-def make_parallel_api_calls(
+
+async def make_api_call_async(
     check_in: str,
     check_out: str,
     ne_lat: float,
     ne_long: float,
     sw_lat: float,
     sw_long: float,
-    num_repeat_calls: int,
     zoom_value: int,
     price_min: int,
     price_max: int,
@@ -178,27 +699,89 @@ def make_parallel_api_calls(
     currency: str,
     language: str,
     proxy_url: Optional[str],
-    delay_between_calls: float = 0.5,
-) -> tuple:
+    call_timing: Optional[Dict[str, float]] = None,
+    executor: Optional[Executor] = None,
+    transform: Optional[RecordTransform] = None,
+) -> list:
     """
-    Maak meerdere parallelle API calls
+    asyncio variant van make_api_call
+
+    De search requests (curl_cffi) blokkeren; de call draait daarom in
+    executor (None = de default executor van de event loop, zoals
+    asyncio.to_thread). Sessions komen uit de gedeelde pool (zie _SessionPool).
 
     Args:
-        delay_between_calls: Delay in seconden tussen API calls (default 0.5s)
+        (same as make_api_call)
+        executor: Thread pool voor de blokkerende request
 
     Returns:
-        Tuple van (all_raw_results, unique_count)
+        List van listings
     """
-    all_raw_results = []
-    unique_ids = set()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        executor,
+        functools.partial(
+            make_api_call,
+            check_in,
+            check_out,
+            ne_lat,
+            ne_long,
+            sw_lat,
+            sw_long,
+            zoom_value,
+            price_min,
+            price_max,
+            amenities,
+            currency,
+            language,
+            proxy_url,
+            call_timing,
+            transform,
+        ),
+    )
 
-    for i in range(num_repeat_calls):
+
+async def make_api_call_with_retry_async(
+    check_in: str,
+    check_out: str,
+    ne_lat: float,
+    ne_long: float,
+    sw_lat: float,
+    sw_long: float,
+    zoom_value: int,
+    price_min: int,
+    price_max: int,
+    amenities: list,
+    currency: str,
+    language: str,
+    proxy_url: Optional[str],
+    max_retries: int = 3,
+    retry_delay: float = 1.0,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    call_timing: Optional[Dict[str, float]] = None,
+    executor: Optional[Executor] = None,
+    transform: Optional[RecordTransform] = None,
+) -> list:
+    """
+    asyncio variant van make_api_call_with_retry
+
+    Wachten op de circuit breaker, op proxy budget en backoffs zijn
+    coroutines; alleen de request zelf bezet een thread van executor.
+
+    Raises:
+        ApiError: Als alle retries falen of de fout niet herhaalbaar is
+    """
+    last_error = None
+    classified = None
+
+    for attempt in range(max_retries):
+        if circuit_breaker is not None:
+            await circuit_breaker.wait_async()
+        proxy = await proxy_pool.acquire_async() if proxy_pool is not None else proxy_url
+        call_start = _start_attempt(call_timing)
         try:
-            # Add delay between repeat calls (but not before first call)
-            if i > 0 and delay_between_calls > 0:
-                time.sleep(delay_between_calls)
-            
-            res = make_api_call_with_retry(
+            results = await make_api_call_async(
                 check_in,
                 check_out,
                 ne_lat,
@@ -211,17 +794,499 @@ def make_parallel_api_calls(
                 amenities,
                 currency,
                 language,
-                proxy_url,
-            )
-            all_raw_results.extend(res)
-            unique_ids.update(
-                [
-                    r.get("room_id") or r.get("id")
-                    for r in res
-                    if r.get("room_id") or r.get("id")
-                ]
+                proxy,
+                call_timing=call_timing,
+                executor=executor,
+                transform=transform,
             )
+        except asyncio.CancelledError:
+            if proxy_pool is not None:
+                proxy_pool.release(proxy, time.time() - call_start)
+            raise
         except Exception as e:
-            logger.error(f"Failed to make API call: {e}")
+            last_error = e
+            classified, wait_time = _attempt_failed(
+                e, proxy, call_start, attempt, max_retries, retry_delay, proxy_pool, circuit_breaker
+            )
+            if wait_time is None:
+                break
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+            continue
+
+        _attempt_succeeded(proxy, call_start, proxy_pool, circuit_breaker, call_timing)
+        return results
+
+    raise ApiError(
+        f"API call failed ({classified.category.value}): {classified.message}",
+        classified,
+    ) from last_error
+
+
+def _background_task_done(task: "asyncio.Task"):
+    _background_tasks.discard(task)
+    if not task.cancelled():
+        task.exception()  # opgehaald: geen "exception was never retrieved" warning
+
+
+def _start_attempt(call_timing: Optional[Dict[str, float]]) -> float:
+    if call_timing is not None:
+        call_timing["started"] = time.monotonic()
+    return time.time()
+
+
+def _attempt_succeeded(
+    proxy: Optional[str],
+    call_start: float,
+    proxy_pool: Optional[ProxyPool],
+    circuit_breaker: Optional[CircuitBreaker],
+    call_timing: Optional[Dict[str, float]],
+):
+    if proxy_pool is not None:
+        proxy_pool.release(proxy, time.time() - call_start)
+    if call_timing is not None:
+        call_timing["latency"] = time.monotonic() - call_timing["started"]
+    if circuit_breaker is not None:
+        circuit_breaker.record_success()
+
+
+def _attempt_failed(
+    error: Exception,
+    proxy: Optional[str],
+    call_start: float,
+    attempt: int,
+    max_retries: int,
+    retry_delay: float,
+    proxy_pool: Optional[ProxyPool],
+    circuit_breaker: Optional[CircuitBreaker],
+) -> Tuple[ClassifiedError, Optional[float]]:
+    """
+    Classificeer en registreer een mislukte poging
+
+    Returns:
+        Tuple van (classificatie, wachttijd tot de volgende poging in
+        seconden; None = niet opnieuw proberen)
+    """
+    classified = classify_error(error)
+    if proxy_pool is not None:
+        proxy_pool.release(
+            proxy,
+            time.time() - call_start,
+            error=True,
+            rate_limited=classified.is_rate_limit,
+            retry_after=classified.retry_after,
+        )
+    if circuit_breaker is not None:
+        circuit_breaker.record_failure(classified)
+
+    if not classified.retryable:
+        # Bad request / onverwachte response: opnieuw proberen helpt niet
+        logger.error(
+            f"API call failed ({classified.category.value}), not retrying: "
+            f"{classified.message}"
+        )
+        return classified, None
+
+    if attempt < max_retries - 1:
+        if classified.is_rate_limit and proxy_pool is not None:
+            # Proxy zit in quarantaine; acquire() kiest een andere
+            logger.warning(
+                f"⚠️ Rate limit hit (attempt {attempt + 1}/{max_retries}), "
+                f"switching proxy..."
+            )
+            return classified, 0.0
+
+        # Retry-After hint, anders langere delays voor rate limiting
+        wait_time = classified.backoff(attempt, retry_delay)
+
+        if classified.is_rate_limit:
+            logger.warning(
+                f"⚠️ Rate limit hit (attempt {attempt + 1}/{max_retries}). "
+                f"Waiting {wait_time:.1f}s..."
+            )
+        else:
+            logger.warning(
+                f"API call failed (attempt {attempt + 1}/{max_retries}): "
+                f"{classified.message}. Retrying in {wait_time:.1f}s..."
+            )
+        return classified, wait_time
+
+    if max_retries > 1:
+        # (max_retries=1: de aanroeper plant zelf een retry in)
+        if classified.is_rate_limit:
+            logger.error("❌ Rate limit: Too many requests. Reduce workers or increase delays.")
+        else:
+            logger.error(f"API call failed after {max_retries} attempts: {classified.message}")
+    return classified, None
+
+
+class _RepeatCalls:
+    """
+    Stand van de herhaalde calls van één scan (zie make_repeat_calls)
+
+    Elke call is een slot met een primaire request en eventueel een hedge.
+    Resultaten worden bij binnenkomst op room_id ontdubbeld.
+    """
+
+    def __init__(self, num_calls: int, hedge_policy: Optional[HedgePolicy]):
+        self.num_calls = num_calls
+        self.hedge_policy = hedge_policy
+        self.timings = [{} for _ in range(num_calls)]
+        self.hedge_timings: Dict[int, Dict[str, float]] = {}
+        self.open_requests = [1] * num_calls
+        self.done_slots = set()
+        self.merged = {}  # room_id -> eerste record
+        self.anonymous = []  # records zonder id (worden later weggefilterd of gelogd)
+        self.errors: List[ApiError] = []
+        if hedge_policy is not None:
+            for _ in range(num_calls):
+                hedge_policy.record_primary()
+
+    @property
+    def finished(self) -> bool:
+        return len(self.done_slots) >= self.num_calls
+
+    def threshold(self) -> Optional[float]:
+        return self.hedge_policy.threshold() if self.hedge_policy is not None else None
+
+    def _hedgeable(self, i: int) -> bool:
+        return (
+            i not in self.done_slots
+            and i not in self.hedge_timings
+            and "started" in self.timings[i]
+        )
+
+    def wait_timeout(self, threshold: Optional[float]) -> Optional[float]:
+        """Seconden tot de eerste call over de hedge drempel gaat"""
+        if threshold is None:
+            return None
+        now = time.monotonic()
+        deadlines = [
+            self.timings[i]["started"] + threshold - now
+            for i in range(self.num_calls)
+            if self._hedgeable(i)
+        ]
+        # Nog niet gestarte calls (wachten op budget) periodiek opnieuw bekijken
+        return max(0.05, min(deadlines, default=0.5))
+
+    def request_done(self, i: int, is_hedge: bool, outcome):
+        """Verwerk een afgeronde request: lijst met listings of ApiError"""
+        self.open_requests[i] -= 1
+        if isinstance(outcome, ApiError):
+            if i not in self.done_slots and self.open_requests[i] == 0:
+                self.done_slots.add(i)
+                self.errors.append(outcome)
+                logger.error(f"Failed to make API call: {outcome}")
+            return
+
+        if self.hedge_policy is not None:
+            timing = self.hedge_timings[i] if is_hedge else self.timings[i]
+            self.hedge_policy.record_latency(timing["latency"])
+            if i not in self.done_slots:
+                self.hedge_policy.record_call(
+                    time.monotonic() - self.timings[i]["started"], hedge_won=is_hedge
+                )
+        self.done_slots.add(i)
+        for record in outcome:
+            key = record.get("room_id") or record.get("id")
+            if key is None:
+                self.anonymous.append(record)
+            else:
+                self.merged.setdefault(key, record)
+
+    def hedges_due(self, threshold: Optional[float]) -> List[int]:
+        """Slots die nu een hedge krijgen (binnen het hedge budget)"""
+        if threshold is None:
+            return []
+        now = time.monotonic()
+        due = []
+        for i in range(self.num_calls):
+            if not self._hedgeable(i) or now - self.timings[i]["started"] < threshold:
+                continue
+            if not self.hedge_policy.try_hedge():
+                break
+            self.hedge_timings[i] = {}
+            self.open_requests[i] += 1
+            due.append(i)
+            logger.debug(f"🪃 Hedge call {i + 1} after {now - self.timings[i]['started']:.1f}s")
+        return due
+
+    def setup_time(self) -> float:
+        """Verbinding opzetten + bootstrap, opgeteld over alle requests"""
+        return sum(
+            timing.get("setup", 0.0)
+            for timing in self.timings + list(self.hedge_timings.values())
+        )
+
+    def results(self) -> Tuple[list, List[ApiError]]:
+        return list(self.merged.values()) + self.anonymous, self.errors
+
+
+def make_repeat_calls(
+    check_in: str,
+    check_out: str,
+    ne_lat: float,
+    ne_long: float,
+    sw_lat: float,
+    sw_long: float,
+    num_calls: int,
+    zoom_value: int,
+    price_min: int,
+    price_max: int,
+    amenities: list,
+    currency: str,
+    language: str,
+    proxy_url: Optional[str],
+    delay_between_calls: float = 0.5,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    max_retries: int = 3,
+    hedge_policy: Optional[HedgePolicy] = None,
+    phase_timings: Optional[Dict[str, float]] = None,
+    transform: Optional[RecordTransform] = None,
+) -> Tuple[list, List[ApiError]]:
+    """
+    Maak num_calls herhaalde API calls tegelijk en verzamel resultaten en fouten
+
+    De calls lopen parallel; resultaten worden bij binnenkomst samengevoegd en
+    op room_id ontdubbeld, zodat een scan ongeveer zo lang duurt als de
+    traagste call. Met een proxy pool bepaalt het (met alle scans gedeelde)
+    budget van de pool het tempo; zonder pool starten de calls gespreid met
+    delay_between_calls ertussen.
+
+    Met een hedge_policy krijgt een call die langer loopt dan het geleerde
+    percentiel (bv. p90) een tweede, identieke request (binnen het hedge
+    budget). Het eerste antwoord rondt de call af; komt het andere antwoord
+    binnen terwijl de scan nog loopt, dan telt het ook mee voor de dekking.
+
+    Met max_retries=1 wacht deze functie nooit op een retry: mislukte calls
+    komen terug als fouten, zodat de aanroeper ze later opnieuw kan inplannen
+    (zie scraper_core.scrape_all).
+
+    Met phase_timings wordt "connection" verhoogd met de tijd die de
+    requests kwijt waren aan verbinding opzetten en bootstrap (API key).
+
+    Met transform wordt elk record verwerkt zodra zijn pagina binnen is (bv.
+    ontdubbelen over alle calls en projecteren naar een slim record, zie
+    scraper_core._ScanIngest); ruwe records worden dan niet verzameld.
+
+    Returns:
+        Tuple van (ontdubbelde raw results, fouten van de mislukte calls)
+    """
+    if num_calls <= 0:
+        return [], []
+
+    def _call(i: int, timing: Dict[str, float], stagger: bool = True) -> list:
+        if stagger and proxy_pool is None and i > 0 and delay_between_calls > 0:
+            time.sleep(i * delay_between_calls)
+        return make_api_call_with_retry(
+            check_in,
+            check_out,
+            ne_lat,
+            ne_long,
+            sw_lat,
+            sw_long,
+            zoom_value,
+            price_min,
+            price_max,
+            amenities,
+            currency,
+            language,
+            proxy_url,
+            max_retries=max_retries,
+            proxy_pool=proxy_pool,
+            circuit_breaker=circuit_breaker,
+            call_timing=timing,
+            transform=transform,
+        )
+
+    state = _RepeatCalls(num_calls, hedge_policy)
+    executor = ThreadPoolExecutor(max_workers=num_calls * (2 if hedge_policy else 1))
+    try:
+        pending = {
+            executor.submit(_call, i, state.timings[i]): (i, False) for i in range(num_calls)
+        }
+        while not state.finished and pending:
+            threshold = state.threshold()
+            done, _ = wait(
+                list(pending), timeout=state.wait_timeout(threshold), return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                i, is_hedge = pending.pop(future)
+                try:
+                    outcome = future.result()
+                except ApiError as e:
+                    outcome = e
+                state.request_done(i, is_hedge, outcome)
+
+            for i in state.hedges_due(threshold):
+                future = executor.submit(_call, i, state.hedge_timings[i], False)
+                pending[future] = (i, True)
+    finally:
+        # Niet wachten op verliezers van een hedge; ze lopen in de achtergrond af
+        executor.shutdown(wait=False)
+
+    if phase_timings is not None:
+        phase_timings["connection"] = phase_timings.get("connection", 0.0) + state.setup_time()
+    return state.results()
+
+
+async def make_repeat_calls_async(
+    check_in: str,
+    check_out: str,
+    ne_lat: float,
+    ne_long: float,
+    sw_lat: float,
+    sw_long: float,
+    num_calls: int,
+    zoom_value: int,
+    price_min: int,
+    price_max: int,
+    amenities: list,
+    currency: str,
+    language: str,
+    proxy_url: Optional[str],
+    delay_between_calls: float = 0.5,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    max_retries: int = 3,
+    hedge_policy: Optional[HedgePolicy] = None,
+    executor: Optional[Executor] = None,
+    phase_timings: Optional[Dict[str, float]] = None,
+    transform: Optional[RecordTransform] = None,
+) -> Tuple[list, List[ApiError]]:
+    """
+    asyncio variant van make_repeat_calls (zelfde resultaten, fouten en hedging)
+
+    Args:
+        (same as make_repeat_calls)
+        executor: Thread pool voor de blokkerende requests
+
+    Returns:
+        Tuple van (ontdubbelde raw results, fouten van de mislukte calls)
+    """
+    if num_calls <= 0:
+        return [], []
+
+    async def _call(i: int, timing: Dict[str, float], stagger: bool = True) -> list:
+        if stagger and proxy_pool is None and i > 0 and delay_between_calls > 0:
+            await asyncio.sleep(i * delay_between_calls)
+        return await make_api_call_with_retry_async(
+            check_in,
+            check_out,
+            ne_lat,
+            ne_long,
+            sw_lat,
+            sw_long,
+            zoom_value,
+            price_min,
+            price_max,
+            amenities,
+            currency,
+            language,
+            proxy_url,
+            max_retries=max_retries,
+            proxy_pool=proxy_pool,
+            circuit_breaker=circuit_breaker,
+            call_timing=timing,
+            executor=executor,
+            transform=transform,
+        )
+
+    state = _RepeatCalls(num_calls, hedge_policy)
+    pending = {
+        asyncio.create_task(_call(i, state.timings[i])): (i, False) for i in range(num_calls)
+    }
+    while not state.finished and pending:
+        threshold = state.threshold()
+        done, _ = await asyncio.wait(
+            pending, timeout=state.wait_timeout(threshold), return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            i, is_hedge = pending.pop(task)
+            try:
+                outcome = task.result()
+            except ApiError as e:
+                outcome = e
+            state.request_done(i, is_hedge, outcome)
+
+        for i in state.hedges_due(threshold):
+            task = asyncio.create_task(_call(i, state.hedge_timings[i], False))
+            pending[task] = (i, True)
+
+    # Verliezers van een hedge lopen af zonder dat de scan erop wacht
+    for task in pending:
+        _background_tasks.add(task)
+        task.add_done_callback(_background_task_done)
+
+    if phase_timings is not None:
+        phase_timings["connection"] = phase_timings.get("connection", 0.0) + state.setup_time()
+    return state.results()
+
+
+def make_parallel_api_calls(
+    check_in: str,
+    check_out: str,
+    ne_lat: float,
+    ne_long: float,
+    sw_lat: float,
+    sw_long: float,
+    num_repeat_calls: int,
+    zoom_value: int,
+    price_min: int,
+    price_max: int,
+    amenities: list,
+    currency: str,
+    language: str,
+    proxy_url: Optional[str],
+    delay_between_calls: float = 0.5,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    transform: Optional[RecordTransform] = None,
+) -> tuple:
+    """
+    Maak meerdere parallelle API calls (zie make_repeat_calls)
+
+    Args:
+        delay_between_calls: Delay in seconden tussen API calls (default 0.5s)
+        proxy_pool: Optionele ProxyPool; elke call wordt via de pool gerouteerd
+        circuit_breaker: Optionele CircuitBreaker (gedeeld door alle workers)
+        transform: Optionele functie per record (zie make_repeat_calls)
+
+    Returns:
+        Tuple van (all_raw_results, unique_count)
+
+    Raises:
+        ApiError: Als geen enkele call gelukt is
+    """
+    all_raw_results, errors = make_repeat_calls(
+        check_in,
+        check_out,
+        ne_lat,
+        ne_long,
+        sw_lat,
+        sw_long,
+        num_repeat_calls,
+        zoom_value,
+        price_min,
+        price_max,
+        amenities,
+        currency,
+        language,
+        proxy_url,
+        delay_between_calls,
+        proxy_pool=proxy_pool,
+        circuit_breaker=circuit_breaker,
+        transform=transform,
+    )
+
+    if errors and len(errors) == num_repeat_calls:
+        # Scan is mislukt (niet: leeg gebied); laat de aanroeper dat zien
+        raise errors[-1]
 
+    unique_ids = {
+        r.get("room_id") or r.get("id")
+        for r in all_raw_results
+        if r.get("room_id") or r.get("id")
+    }
     return all_raw_results, len(unique_ids)
@@ -0,0 +1,363 @@
+"""
+Gemeentegrenzen cache
+Vereenvoudigde grenzen per detailniveau als GeoParquet en een JSON index met
+gemeente metadata (geen GDAL nodig bij inlezen)
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+logger = logging.getLogger(__name__)
+
+GPKG_LAYER = "gemeentegebied"
+PROVINCE_LAYER = "provinciegebied"
+SOURCE_CRS = "EPSG:28992"
+TARGET_CRS = "EPSG:4326"
+
+# Simplificatie tolerantie per niveau, in meters (RD New, vóór reprojectie).
+# "full" is de originele geometrie (voor het ruimtelijk filter).
+BOUNDARY_LEVELS: Dict[str, float] = {
+    "full": 0.0,
+    "fine": 10.0,
+    "medium": 50.0,
+    "coarse": 250.0,
+}
+
+# Kleinste kaart zoom waarvoor een niveau gebruikt wordt (grof -> fijn)
+_LEVEL_MIN_ZOOM = [("coarse", 0), ("medium", 9), ("fine", 12)]
+
+MANIFEST_FILE = "boundaries.json"
+INDEX_FILE = "gemeenten_index.json"
+# Verhoog bij een nieuw veld in de index (2: provincie)
+INDEX_VERSION = 2
+
+_lock = threading.Lock()
+_loaded: Dict[Tuple[str, str, float], gpd.GeoDataFrame] = {}
+_index: Dict[str, Tuple[float, Dict[str, Dict[str, Any]]]] = {}
+
+
+def pick_boundary_level(zoom: float) -> str:
+    """
+    Kies het grens-detailniveau dat past bij een kaart zoom niveau
+
+    Args:
+        zoom: Leaflet zoom niveau van de kaart
+
+    Returns:
+        Naam van het niveau ("coarse", "medium" of "fine")
+    """
+    level = _LEVEL_MIN_ZOOM[0][0]
+    for name, min_zoom in _LEVEL_MIN_ZOOM:
+        if zoom >= min_zoom:
+            level = name
+    return level
+
+
+def get_cache_dir(gpkg_path: str) -> str:
+    """Directory met de afgeleide grensbestanden (naast de GeoPackage)"""
+    return os.path.join(os.path.dirname(os.path.abspath(gpkg_path)), "boundaries")
+
+
+def _level_path(cache_dir: str, level: str) -> str:
+    return os.path.join(cache_dir, f"gemeenten_{level}.parquet")
+
+
+def _source_mtime(gpkg_path: str) -> Optional[float]:
+    try:
+        return os.path.getmtime(gpkg_path)
+    except OSError:
+        return None
+
+
+def _read_json(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_manifest(cache_dir: str) -> Dict:
+    return _read_json(os.path.join(cache_dir, MANIFEST_FILE)) or {}
+
+
+def _write_json(path: str, data: Dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _simplify(gdf: gpd.GeoDataFrame, tolerance: float) -> gpd.GeoSeries:
+    """Vereenvoudig zonder gaten/overlap tussen aangrenzende gemeenten"""
+    if tolerance <= 0:
+        return gdf.geometry
+    # Coverage simplificatie vereenvoudigt gedeelde grenzen één keer, zodat
+    # buurgemeenten op elkaar blijven aansluiten
+    simplified = shapely.coverage_simplify(gdf.geometry.values, tolerance)
+    return gpd.GeoSeries(simplified, index=gdf.index, crs=gdf.crs)
+
+
+def prepare_boundaries(gpkg_path: str, cache_dir: Optional[str] = None) -> Dict:
+    """
+    Schrijf vereenvoudigde gemeentegrenzen per niveau als GeoParquet
+
+    Eenmalige voorbewerking (vereist GDAL voor het lezen van de GeoPackage).
+    Elk niveau bevat naam, code, bbox en centroid in EPSG:4326. Schrijft ook
+    de gemeente index (INDEX_FILE).
+
+    Args:
+        gpkg_path: Pad naar GeoPackage met laag "gemeentegebied"
+        cache_dir: Doel directory (standaard: assets/boundaries naast de GeoPackage)
+
+    Returns:
+        Manifest dict (bron mtime en bestandsgrootte per niveau)
+    """
+    cache_dir = cache_dir or get_cache_dir(gpkg_path)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    gdf = gpd.read_file(gpkg_path, layer=GPKG_LAYER)
+    if gdf.crs is None:
+        gdf = gdf.set_crs(SOURCE_CRS)
+    else:
+        gdf = gdf.to_crs(SOURCE_CRS)
+    gdf = gdf.sort_values("naam").reset_index(drop=True)
+
+    columns = ["naam"] + (["code"] if "code" in gdf.columns else [])
+    base = gdf[columns].copy()
+
+    manifest = {
+        "source": os.path.abspath(gpkg_path),
+        "source_mtime": _source_mtime(gpkg_path),
+        "levels": {},
+    }
+
+    for level, tolerance in BOUNDARY_LEVELS.items():
+        geometry = _simplify(gdf, tolerance).to_crs(TARGET_CRS)
+        out = gpd.GeoDataFrame(base.copy(), geometry=geometry.values, crs=TARGET_CRS)
+
+        bounds = out.geometry.bounds
+        out[["bbox_minx", "bbox_miny", "bbox_maxx", "bbox_maxy"]] = bounds.values
+        # Centroid in RD berekenen (metrisch) en daarna omzetten
+        centroids = gdf.geometry.centroid.to_crs(TARGET_CRS)
+        out["centroid_lat"] = centroids.y.values
+        out["centroid_lon"] = centroids.x.values
+
+        path = _level_path(cache_dir, level)
+        tmp_path = f"{path}.tmp"
+        out.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+
+        manifest["levels"][level] = {
+            "tolerance_m": tolerance,
+            "bytes": os.path.getsize(path),
+        }
+        logger.info(
+            f"Grenzen {level} ({tolerance:g} m): {os.path.getsize(path) / 1024:.0f} KB"
+        )
+
+    _write_json(
+        os.path.join(cache_dir, INDEX_FILE),
+        _build_index(gdf, columns, manifest, _read_provinces(gpkg_path)),
+    )
+    _write_json(os.path.join(cache_dir, MANIFEST_FILE), manifest)
+    return manifest
+
+
+def _read_provinces(gpkg_path: str) -> Optional[gpd.GeoDataFrame]:
+    """Provinciegrenzen (RD) uit de GeoPackage, None als de laag ontbreekt"""
+    try:
+        provinces = gpd.read_file(gpkg_path, layer=PROVINCE_LAYER)
+    except Exception as e:
+        logger.info(f"Geen provincie laag in {gpkg_path}: {e}")
+        return None
+    if provinces.crs is None:
+        return provinces.set_crs(SOURCE_CRS)
+    return provinces.to_crs(SOURCE_CRS)
+
+
+def _province_names(
+    gdf: gpd.GeoDataFrame, provinces: Optional[gpd.GeoDataFrame]
+) -> List[Optional[str]]:
+    """Provincie per gemeente (via een punt binnen de gemeente)"""
+    if provinces is None or provinces.empty:
+        return [None] * len(gdf)
+    points = gpd.GeoDataFrame(geometry=gdf.geometry.representative_point(), crs=gdf.crs)
+    joined = gpd.sjoin(points, provinces[["naam", "geometry"]], how="left", predicate="within")
+    joined = joined[~joined.index.duplicated()]
+    return [None if pd.isna(name) else name for name in joined["naam"].reindex(gdf.index)]
+
+
+def _build_index(
+    gdf: gpd.GeoDataFrame,
+    columns: List[str],
+    manifest: Dict,
+    provinces: Optional[gpd.GeoDataFrame] = None,
+) -> Dict[str, Any]:
+    """Gemeente metadata (naam, code, provincie, bbox, centroid, oppervlakte) uit RD geometrie"""
+    bounds = gdf.geometry.to_crs(TARGET_CRS).bounds
+    centroids = gdf.geometry.centroid.to_crs(TARGET_CRS)
+    province_names = _province_names(gdf, provinces)
+
+    gemeenten = []
+    for i, naam in enumerate(gdf["naam"]):
+        gemeenten.append(
+            {
+                "naam": naam,
+                "code": str(gdf["code"].iloc[i]) if "code" in columns else None,
+                "provincie": province_names[i],
+                "bbox": [round(float(v), 6) for v in bounds.iloc[i]],
+                "centroid": [
+                    round(float(centroids.y.iloc[i]), 6),
+                    round(float(centroids.x.iloc[i]), 6),
+                ],
+                "area_km2": round(float(gdf.geometry.iloc[i].area) / 1e6, 3),
+            }
+        )
+
+    return {
+        "version": INDEX_VERSION,
+        "source": manifest["source"],
+        "source_mtime": manifest["source_mtime"],
+        "gemeenten": gemeenten,
+    }
+
+
+def _is_stale(gpkg_path: str, cache_dir: str, level: str) -> bool:
+    """Check of het niveau ontbreekt of ouder is dan de GeoPackage"""
+    if not os.path.exists(_level_path(cache_dir, level)):
+        return True
+    source_mtime = _source_mtime(gpkg_path)
+    if source_mtime is None:
+        # Geen GeoPackage (bv. deployment met alleen de cache): cache gebruiken
+        return False
+    return _read_manifest(cache_dir).get("source_mtime") != source_mtime
+
+
+def load_boundaries(gpkg_path: str, level: str = "full") -> gpd.GeoDataFrame:
+    """
+    Laad gemeentegrenzen (EPSG:4326) op een detailniveau
+
+    Leest de GeoParquet cache (geen GDAL nodig) en bouwt die opnieuw op als
+    hij ontbreekt of de GeoPackage gewijzigd is. Resultaten worden per proces
+    gecached; behandel de GeoDataFrame als read-only.
+
+    Args:
+        gpkg_path: Pad naar de bron GeoPackage
+        level: Een van BOUNDARY_LEVELS
+
+    Returns:
+        GeoDataFrame met naam, (code), bbox_* en centroid_* kolommen
+    """
+    if level not in BOUNDARY_LEVELS:
+        raise ValueError(f"Onbekend grens niveau: {level}")
+
+    cache_dir = get_cache_dir(gpkg_path)
+    path = _level_path(cache_dir, level)
+
+    with _lock:
+        if _is_stale(gpkg_path, cache_dir, level):
+            logger.info(f"Grenzen cache (her)bouwen vanuit {gpkg_path}")
+            prepare_boundaries(gpkg_path, cache_dir)
+
+        key = (path, level, os.path.getmtime(path))
+        gdf = _loaded.get(key)
+        if gdf is None:
+            gdf = gpd.read_parquet(path)
+            # Oude versies van dit niveau vrijgeven
+            for old_key in [k for k in _loaded if k[:2] == key[:2]]:
+                del _loaded[old_key]
+            _loaded[key] = gdf
+    return gdf
+
+
+def get_gemeente_geometry(gpkg_path: str, gemeente: str, level: str = "full"):
+    """
+    Geometrie van één gemeente (EPSG:4326)
+
+    Args:
+        gpkg_path: Pad naar de bron GeoPackage
+        gemeente: Gemeente naam
+        level: Detailniveau
+
+    Returns:
+        Shapely geometrie, of None als de gemeente niet bestaat
+    """
+    gdf = load_boundaries(gpkg_path, level)
+    sel = gdf[gdf["naam"] == gemeente]
+    if sel.empty:
+        return None
+    return sel.geometry.union_all()
+
+
+def load_gemeente_index(gpkg_path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Laad de gemeente index (naam -> metadata)
+
+    Leest alleen een JSON bestand; wordt automatisch (her)bouwd als hij
+    ontbreekt of de GeoPackage mtime gewijzigd is.
+
+    Args:
+        gpkg_path: Pad naar de bron GeoPackage
+
+    Returns:
+        Dict van gemeente naam naar {"naam", "code", "provincie", "bbox" [minx,
+        miny, maxx, maxy], "centroid" [lat, lon], "area_km2"} (EPSG:4326)
+    """
+    cache_dir = get_cache_dir(gpkg_path)
+    path = os.path.join(cache_dir, INDEX_FILE)
+
+    with _lock:
+        source_mtime = _source_mtime(gpkg_path)
+        cached = _index.get(path)
+        if cached is not None and (source_mtime is None or cached[0] == source_mtime):
+            return cached[1]
+
+        data = _read_json(path)
+        if data is None or (
+            source_mtime is not None
+            and (
+                data.get("source_mtime") != source_mtime
+                or data.get("version") != INDEX_VERSION
+            )
+        ):
+            logger.info(f"Gemeente index (her)bouwen vanuit {gpkg_path}")
+            prepare_boundaries(gpkg_path, cache_dir)
+            data = _read_json(path) or {}
+
+        index = {g["naam"]: g for g in data.get("gemeenten", [])}
+        _index[path] = (data.get("source_mtime"), index)
+    return index
+
+
+def list_gemeenten(gpkg_path: str) -> List[str]:
+    """Gesorteerde lijst van gemeente namen (uit de index)"""
+    return sorted(load_gemeente_index(gpkg_path))
+
+
+def get_gemeente_bbox(
+    gpkg_path: str, gemeente: str
+) -> Optional[Tuple[float, float, float, float]]:
+    """
+    Bounding box van een gemeente uit de index
+
+    Args:
+        gpkg_path: Pad naar de bron GeoPackage
+        gemeente: Gemeente naam
+
+    Returns:
+        (minx, miny, maxx, maxy) in EPSG:4326, of None als de gemeente niet bestaat
+    """
+    info = load_gemeente_index(gpkg_path).get(gemeente)
+    if info is None:
+        return None
+    return tuple(info["bbox"])
@@ -0,0 +1,392 @@
+"""
+Kalender modus
+Beschikbaarheid per listing uit de Airbnb kalender in plaats van een datum grid
+
+De grid modus zoekt elke (check-in, nachten) combinatie op en leidt de
+beschikbaarheid af uit welke listings terugkomen: kosten groeien met
+dagen × nachten × gemeenten. De kalender modus ontdekt de listings met een
+paar zoekopdrachten verspreid over de periode (DISCOVERY_SCANS) en haalt
+daarna per listing de kalender op: één request per listing per 12 maanden,
+via dezelfde proxy pool, circuit breaker en retries als de search calls, en
+met een cache op schijf zodat een herhaalde of hervatte run niets opnieuw
+ophaalt.
+
+De kalender wordt omgezet naar gewone scan rows (één row per aaneengesloten
+reeks beschikbare nachten), zodat calculate_availability, de tijdlijn en het
+dashboard zonder aanpassing werken.
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import geopandas as gpd
+import pandas as pd
+
+from src.core.api_client import CALENDAR_MAX_MONTHS, fetch_calendar_with_retry
+from src.core.errors import ApiError, CircuitBreaker
+from src.core.proxy_pool import DIRECT, ProxyPool
+from src.core.scraper_core import scrape_all
+
+logger = logging.getLogger(__name__)
+
+# Zoekopdrachten (check-in datums) om de listings van een gemeente te vinden
+DISCOVERY_SCANS = 3
+
+# Listings per batch (voortgang en cache worden per batch bijgewerkt)
+CALENDAR_BATCH = 100
+
+# Kalenders uit de cache zijn zolang bruikbaar
+CALENDAR_CACHE_TTL = 12 * 3600
+CALENDAR_CACHE_DIR = "calendar_cache"
+
+# Scan velden van een row; de rest zijn listing velden uit de discovery
+_SCAN_FIELDS = ("scan_checkin", "scan_checkout", "scan_nights", "scan_id", "measurement_date")
+
+CalendarBlock = Tuple[int, int, int]
+
+
+class CalendarCache:
+    """Kalenders op schijf (één JSON bestand per listing) met een TTL"""
+
+    def __init__(self, cache_dir: str, ttl: float = CALENDAR_CACHE_TTL):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, room_id: str) -> str:
+        return os.path.join(self.cache_dir, f"{room_id}.json")
+
+    def get(self, room_id: str, first_day: date, last_day: date) -> Optional[Dict[str, bool]]:
+        """Beschikbaarheid per datum, of None als niet (vers genoeg) in de cache"""
+        try:
+            with open(self._path(room_id), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        if entry.get("first_day", "9999") > first_day.isoformat():
+            return None
+        if entry.get("last_day", "") < last_day.isoformat():
+            return None
+        return entry["days"]
+
+    def put(self, room_id: str, days: Dict[str, bool]):
+        """Sla een kalender op (atomisch: lezers zien nooit half werk)"""
+        if not days:
+            return
+        entry = {
+            "fetched_at": time.time(),
+            "first_day": min(days),
+            "last_day": max(days),
+            "days": days,
+        }
+        path = self._path(room_id)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+
+def calendar_blocks(period_start: str, period_end: str) -> List[CalendarBlock]:
+    """
+    Kalender requests die de periode dekken
+
+    Returns:
+        Lijst van (maand, jaar, aantal maanden), elk hooguit CALENDAR_MAX_MONTHS
+    """
+    start = date.fromisoformat(period_start)
+    end = date.fromisoformat(period_end)
+    total = (end.year - start.year) * 12 + end.month - start.month + 1
+    blocks = []
+    for offset in range(0, total, CALENDAR_MAX_MONTHS):
+        month_index = start.month - 1 + offset
+        months = min(CALENDAR_MAX_MONTHS, total - offset)
+        blocks.append((month_index % 12 + 1, start.year + month_index // 12, months))
+    return blocks
+
+
+def pick_discovery_combinations(
+    scan_combinations: Sequence[Tuple[str, str, int, int, int]],
+    discovery_scans: int = DISCOVERY_SCANS,
+) -> List[Tuple[str, str, int, int, int]]:
+    """Een paar scan combinaties, gelijk verspreid over de periode"""
+    combinations = sorted(scan_combinations, key=lambda combo: (combo[0], combo[2]))
+    if len(combinations) <= discovery_scans:
+        return list(combinations)
+    step = (len(combinations) - 1) / max(discovery_scans - 1, 1)
+    picked = sorted({round(n * step) for n in range(discovery_scans)})
+    return [combinations[i] for i in picked]
+
+
+def available_stays(
+    days: Dict[str, bool], period_start: str, period_end: str
+) -> List[Tuple[date, int]]:
+    """
+    Aaneengesloten reeksen beschikbare nachten binnen de periode
+
+    Returns:
+        Lijst van (eerste nacht, aantal nachten)
+    """
+    start = date.fromisoformat(period_start)
+    end = date.fromisoformat(period_end)
+    stays = []
+    stay_start, nights = None, 0
+    current = start
+    while current <= end:
+        if days.get(current.isoformat()):
+            if stay_start is None:
+                stay_start = current
+            nights += 1
+        elif stay_start is not None:
+            stays.append((stay_start, nights))
+            stay_start, nights = None, 0
+        current += timedelta(days=1)
+    if stay_start is not None:
+        stays.append((stay_start, nights))
+    return stays
+
+
+def calendar_to_rows(
+    df_listings: pd.DataFrame,
+    calendars: Dict[str, Dict[str, bool]],
+    period_start: str,
+    period_end: str,
+    measurement_date: str,
+) -> pd.DataFrame:
+    """
+    Zet kalenders om naar scan rows in het run schema
+
+    Elke reeks beschikbare nachten wordt één row (scan_checkin = eerste
+    nacht, scan_nights = lengte), zoals een grid scan die hem gevonden zou
+    hebben. Een listing zonder beschikbare nachten krijgt één row met
+    scan_nights 0, zodat hij met 0% beschikbaarheid in de resultaten staat.
+
+    Args:
+        df_listings: Discovery rows (listing velden; eerste row per room_id telt)
+        calendars: Beschikbaarheid per datum per room_id
+        period_start: Start datum (YYYY-MM-DD)
+        period_end: Eind datum (YYYY-MM-DD)
+        measurement_date: Meetmoment timestamp
+
+    Returns:
+        DataFrame met één row per beschikbare reeks
+    """
+    listing_columns = [c for c in df_listings.columns if c not in _SCAN_FIELDS]
+    listings = df_listings.drop_duplicates("room_id")[listing_columns].to_dict("records")
+
+    rows = []
+    for listing in listings:
+        days = calendars.get(str(listing["room_id"]))
+        if days is None:
+            continue
+        stays = available_stays(days, period_start, period_end)
+        for check_in, nights in stays or [(date.fromisoformat(period_start), 0)]:
+            rows.append(
+                {
+                    **listing,
+                    "scan_checkin": check_in.isoformat(),
+                    "scan_checkout": (check_in + timedelta(days=nights)).isoformat(),
+                    "scan_nights": nights,
+                    "scan_id": None,
+                    "measurement_date": measurement_date,
+                }
+            )
+    return pd.DataFrame(rows, columns=listing_columns + list(_SCAN_FIELDS))
+
+
+def fetch_calendars(
+    room_ids: Sequence[str],
+    period_start: str,
+    period_end: str,
+    currency: str,
+    language: str,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    cache: Optional[CalendarCache] = None,
+    max_workers: int = 5,
+    batch_size: int = CALENDAR_BATCH,
+    tracker=None,
+) -> Tuple[Dict[str, Dict[str, bool]], Dict[str, int]]:
+    """
+    Haal de kalenders van listings op (parallel, rate limited, gecached)
+
+    Args:
+        room_ids: Listings
+        period_start: Start datum (YYYY-MM-DD)
+        period_end: Eind datum (YYYY-MM-DD)
+        currency: Valuta code
+        language: Taal code
+        proxy_pool: Optionele ProxyPool; bepaalt het tempo van de calls
+        circuit_breaker: Optionele CircuitBreaker
+        cache: Optionele CalendarCache
+        max_workers: Parallelle requests
+        batch_size: Listings per batch (voortgang per batch)
+        tracker: Optionele RunTracker voor voortgang in run.log
+
+    Returns:
+        Tuple van (beschikbaarheid per datum per room_id, tellers met
+        "calls", "cached" en "failed"); mislukte listings ontbreken
+    """
+    blocks = calendar_blocks(period_start, period_end)
+    first_day = date.fromisoformat(period_start)
+    last_day = date.fromisoformat(period_end)
+    stats = {"calls": 0, "cached": 0, "failed": 0}
+
+    def _fetch(room_id: str) -> Tuple[Optional[Dict[str, bool]], int]:
+        if cache is not None:
+            days = cache.get(room_id, first_day, last_day)
+            if days is not None:
+                return days, 0
+        days = {}
+        calls = 0
+        for month, year, months in blocks:
+            calls += 1
+            try:
+                calendar = fetch_calendar_with_retry(
+                    room_id,
+                    month,
+                    year,
+                    months,
+                    currency,
+                    language,
+                    proxy_pool=proxy_pool,
+                    circuit_breaker=circuit_breaker,
+                )
+            except ApiError as e:
+                logger.warning(f"Calendar {room_id} failed: {e}")
+                return None, calls
+            for day in calendar:
+                if day.get("calendarDate"):
+                    days[day["calendarDate"]] = bool(day.get("available"))
+        if cache is not None:
+            cache.put(room_id, days)
+        return days, calls
+
+    calendars = {}
+    room_ids = [str(room_id) for room_id in dict.fromkeys(room_ids)]
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for batch_start in range(0, len(room_ids), batch_size):
+            batch = room_ids[batch_start : batch_start + batch_size]
+            for room_id, (days, calls) in zip(batch, executor.map(_fetch, batch)):
+                stats["calls"] += calls
+                if days is None:
+                    stats["failed"] += 1
+                    continue
+                if not calls:
+                    stats["cached"] += 1
+                calendars[room_id] = days
+
+            done = batch_start + len(batch)
+            message = (
+                f"📅 Kalenders {done:,}/{len(room_ids):,} │ {stats['calls']:,} calls │ "
+                f"{stats['cached']:,} uit cache │ {stats['failed']:,} mislukt"
+            )
+            if tracker is not None:
+                tracker.log(message)
+            else:
+                logger.info(message)
+
+    return calendars, stats
+
+
+def scrape_calendars(
+    period_start: str,
+    period_end: str,
+    discovery_scans: int = DISCOVERY_SCANS,
+    cache: Optional[CalendarCache] = None,
+    **scrape_kwargs: Any,
+) -> pd.DataFrame:
+    """
+    Kalender modus: listings ontdekken en per listing de kalender ophalen
+
+    Args:
+        period_start: Start datum van de periode (YYYY-MM-DD)
+        period_end: Eind datum van de periode (YYYY-MM-DD)
+        discovery_scans: Aantal scan combinaties voor de discovery
+        cache: Optionele CalendarCache
+        **scrape_kwargs: Argumenten van scrape_all (gemeenten,
+            scan_combinations, proxy_pool, tracker, ...); de discovery
+            gebruikt alleen discovery_scans van de scan_combinations
+
+    Returns:
+        DataFrame in het formaat van scrape_all; listings waarvan de kalender
+        niet op te halen was houden hun discovery rows
+    """
+    gemeenten = scrape_kwargs["gemeenten"]
+    scan_combinations = scrape_kwargs["scan_combinations"]
+    num_repeat_calls = scrape_kwargs["num_repeat_calls"]
+    currency, language = scrape_kwargs["currency"], scrape_kwargs["language"]
+    max_workers = scrape_kwargs.get("max_workers", 5)
+    tracker = scrape_kwargs.get("tracker")
+
+    # Discovery en kalenders delen één rate budget
+    proxy_pool = scrape_kwargs.get("proxy_pool")
+    if proxy_pool is None:
+        delay_between_calls = scrape_kwargs.get("delay_between_calls", 0.5)
+        proxy_pool = ProxyPool(
+            [DIRECT], rate_per_proxy=max(1, max_workers) / max(delay_between_calls, 0.1)
+        )
+
+    discovery = pick_discovery_combinations(scan_combinations, discovery_scans)
+    logger.info(
+        f"📅 Kalender modus: discovery met {len(discovery)} van {len(scan_combinations)} "
+        f"scan combinaties"
+    )
+    df_discovery = scrape_all(
+        **{**scrape_kwargs, "scan_combinations": discovery, "proxy_pool": proxy_pool}
+    )
+    if df_discovery.empty:
+        return df_discovery
+
+    def _on_circuit_change(state: str, cooldown: float):
+        if tracker is None:
+            return
+        if state == CircuitBreaker.OPEN:
+            tracker.log(f"⛔ Te veel fouten: kalender calls {cooldown:.0f}s gepauzeerd")
+        elif state == CircuitBreaker.GAVE_UP:
+            tracker.log("🛑 API blijft onbereikbaar: resterende kalenders falen direct")
+
+    room_ids = df_discovery["room_id"].astype(str).unique()
+    calendars, stats = fetch_calendars(
+        room_ids,
+        period_start,
+        period_end,
+        currency,
+        language,
+        proxy_pool=proxy_pool,
+        circuit_breaker=CircuitBreaker(on_change=_on_circuit_change),
+        cache=cache,
+        max_workers=max_workers,
+        tracker=tracker,
+    )
+
+    df_calendar = calendar_to_rows(
+        df_discovery, calendars, period_start, period_end, scrape_kwargs["measurement_date"]
+    )
+    # Zonder kalender: de discovery rows zijn de beste meting die er is
+    failed = df_discovery[~df_discovery["room_id"].astype(str).isin(calendars)]
+    df_all = pd.concat([df_calendar, failed], ignore_index=True)
+    if "geometry" in df_all.columns:
+        # calendar_to_rows geeft een gewoon DataFrame; houd het GeoDataFrame van scrape_all
+        df_all = gpd.GeoDataFrame(
+            df_all, geometry="geometry", crs=getattr(df_discovery, "crs", None) or "EPSG:4326"
+        )
+
+    discovery_calls = len(gemeenten) * len(discovery) * num_repeat_calls
+    grid_calls = len(gemeenten) * len(scan_combinations) * num_repeat_calls
+    message = (
+        f"📅 Kalender modus: {discovery_calls + stats['calls']:,} calls "
+        f"({discovery_calls:,} discovery + {stats['calls']:,} kalender, "
+        f"{stats['cached']:,} uit cache) vs ~{grid_calls:,} voor de grid │ "
+        f"{len(calendars):,}/{len(room_ids):,} kalenders"
+    )
+    if tracker is not None:
+        tracker.log(message)
+    logger.info(message)
+    return df_all
@@ -0,0 +1,339 @@
+"""
+Distributed scraping
+Verdeel de scans van een run over meerdere machines via een gedeelde work
+queue (src.core.work_queue)
+
+- publish_run: zet de taken van een run in de queue (coordinator)
+- run_worker: lease taken, scrape, schrijf resultaat en ack (elke node)
+- collect_run: volg de voortgang, voeg resultaten samen en exporteer (coordinator)
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.core import run_events
+from src.core import scraper_core
+from src.core.errors import CircuitBreaker, ErrorCategory, classify_error
+from src.core.proxy_pool import DEFAULT_RATE_PER_PROXY, ProxyPool, load_proxy_pool
+from src.core.run_pipeline import finalize_run, get_scan_combinations, load_config
+from src.core.run_tracker import RunTracker
+from src.core.work_queue import (
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_MAX_ATTEMPTS,
+    DONE,
+    LEASED,
+    PENDING,
+    WorkQueue,
+)
+
+logger = logging.getLogger(__name__)
+
+# Scan parameters uit config.json die workers nodig hebben
+_SCAN_PARAMS = (
+    "num_repeat_calls",
+    "zoom_value",
+    "price_min",
+    "price_max",
+    "currency",
+    "language",
+    "measurement_date",
+    "delay_between_scans",
+    "delay_between_calls",
+)
+
+
+def publish_run(run_dir: str, queue_dir: str) -> int:
+    """
+    Publiceer de scan taken van een run in de gedeelde queue
+
+    Idempotent: opnieuw publiceren voegt alleen ontbrekende taken toe.
+
+    Args:
+        run_dir: Run directory met config.json (zie run_pipeline.create_run)
+        queue_dir: Gedeelde queue directory
+
+    Returns:
+        Aantal nieuw toegevoegde taken
+    """
+    config = load_config(run_dir)
+    tasks = scraper_core.build_scan_tasks(
+        config["gemeenten"], get_scan_combinations(config)
+    )
+    params = {key: config.get(key) for key in _SCAN_PARAMS}
+
+    added = WorkQueue(queue_dir).publish(os.path.basename(run_dir), params, tasks)
+
+    tracker = RunTracker(run_dir)
+    if tracker.get_status().get("status") != "running":
+        tracker.start(total_scans=len(tasks))
+    tracker.log(f"📤 {added} taken gepubliceerd in {queue_dir}")
+    return added
+
+
+class _LeaseKeeper:
+    """Verlengt een lease periodiek zolang een scan loopt"""
+
+    def __init__(self, queue: WorkQueue, task: Dict[str, Any], lease_seconds: float):
+        self.queue = queue
+        self.task = task
+        self.lease_seconds = lease_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            if not self.queue.extend(
+                self.task["id"], self.task["lease_owner"], self.lease_seconds
+            ):
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_worker(
+    queue_dir: str,
+    gpkg_path: str,
+    worker_id: Optional[str] = None,
+    threads: int = 1,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    idle_exit: Optional[float] = None,
+    poll_interval: float = 5.0,
+    proxy_file: Optional[str] = None,
+    proxy_rate: float = DEFAULT_RATE_PER_PROXY,
+) -> Dict[str, int]:
+    """
+    Verwerk taken uit de gedeelde queue tot er geen werk meer is
+
+    Args:
+        queue_dir: Gedeelde queue directory
+        gpkg_path: Lokaal pad naar de gemeentegrenzen GeoPackage
+        worker_id: Naam van deze worker (default: hostnaam:pid)
+        threads: Aantal taken tegelijk op deze node
+        lease_seconds: Lease duur (wordt verlengd zolang een scan loopt)
+        max_attempts: Maximaal aantal pogingen per taak
+        idle_exit: Stop na zoveel seconden zonder werk (None = blijf wachten)
+        poll_interval: Wachttijd tussen polls als de queue leeg is
+        proxy_file: Proxy lijst van deze node (None = direct verbinden); de
+            threads delen één proxy pool
+        proxy_rate: Requests per seconde per proxy
+
+    Returns:
+        Dict met aantallen done/failed taken van deze worker
+    """
+    queue = WorkQueue(queue_dir)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    stats = {"done": 0, "failed": 0}
+    stats_lock = threading.Lock()
+    proxy_pool = (
+        load_proxy_pool(proxy_file, rate_per_proxy=proxy_rate) if proxy_file else None
+    )
+    # Eén breaker per node: pauzeert alle threads als deze node geblokkeerd wordt
+    circuit_breaker = CircuitBreaker()
+
+    def _loop(thread_no: int):
+        owner = f"{worker_id}:{thread_no}"
+        idle_since = time.monotonic()
+        while True:
+            task = queue.lease(owner, lease_seconds, max_attempts)
+            if task is None:
+                if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                    return
+                time.sleep(poll_interval)
+                continue
+            idle_since = time.monotonic()
+
+            ok = _process_task(
+                queue,
+                task,
+                gpkg_path,
+                lease_seconds,
+                max_attempts,
+                proxy_pool,
+                circuit_breaker,
+            )
+            with stats_lock:
+                stats["done" if ok else "failed"] += 1
+            if circuit_breaker.state == CircuitBreaker.GAVE_UP:
+                # Deze node komt niet meer bij de API; laat de taken aan andere nodes
+                logger.error(f"🛑 {owner}: API onbereikbaar vanaf deze node, stopt")
+                return
+
+            delay = task["params"].get("delay_between_scans") or 0
+            if delay > 0:
+                time.sleep(delay)
+
+    workers = [
+        threading.Thread(target=_loop, args=(i,), daemon=True) for i in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    logger.info(f"Worker {worker_id} klaar: {stats['done']} done, {stats['failed']} failed")
+    if proxy_pool is not None:
+        proxy_pool.log_stats()
+    return stats
+
+
+def _process_task(
+    queue: WorkQueue,
+    task: Dict[str, Any],
+    gpkg_path: str,
+    lease_seconds: float,
+    max_attempts: int,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+) -> bool:
+    """Voer één geleasde scan uit en ack/nack hem"""
+    payload = task["payload"]
+    params = task["params"]
+    label = f"{payload['gemeente']} {payload['checkin']} ({payload['nights']}n)"
+
+    try:
+        with _LeaseKeeper(queue, task, lease_seconds) as keeper:
+            df_run, timings = scraper_core._scrape_with_timing(
+                payload["gemeente"],
+                payload["checkin"],
+                payload["checkout"],
+                payload["nights"],
+                payload["guests"],
+                payload["scan_id"],
+                gpkg_path,
+                params["num_repeat_calls"],
+                params["zoom_value"],
+                params["price_min"],
+                params["price_max"],
+                [],
+                params["currency"],
+                params["language"],
+                "",
+                params["measurement_date"],
+                params.get("delay_between_calls") or 0.5,
+                proxy_pool,
+                circuit_breaker,
+            )
+        if keeper.lost:
+            logger.warning(f"Lease verloren voor {label}, resultaat niet opgeslagen")
+            return False
+
+        result_file = queue.write_result(task, df_run)
+        duration = sum(timings.get(phase, 0) for phase in scraper_core.SCAN_PHASES)
+        if not queue.ack(
+            task["id"], task["lease_owner"], result_file, len(df_run), round(duration, 2)
+        ):
+            logger.warning(f"Ack geweigerd voor {label} (lease verlopen)")
+            return False
+        logger.info(f"✅ {label}: {len(df_run)} records in {sum(timings.values()):.1f}s")
+        return True
+
+    except Exception as e:
+        classified = classify_error(e)
+        logger.error(f"❌ {label} ({classified.category.value}): {str(e)[:100]}")
+        # Niet herhaalbare fouten (bad request, parse) direct als failed markeren;
+        # een opgegeven breaker is van deze node, een andere node kan de taak nog doen
+        retryable = classified.retryable or classified.category == ErrorCategory.UNAVAILABLE
+        queue.nack(
+            task["id"],
+            task["lease_owner"],
+            str(e),
+            max_attempts if retryable else 0,
+        )
+        return False
+
+
+def collect_run(
+    run_dir: str,
+    queue_dir: str,
+    gpkg_path: str,
+    poll_interval: float = 5.0,
+) -> bool:
+    """
+    Volg een gepubliceerde run tot alle taken klaar zijn en exporteer het resultaat
+
+    Voortgang gaat als scan_done/scan_failed events naar de RunTracker, zodat
+    dashboard en tail_run.py de run live kunnen volgen.
+
+    Args:
+        run_dir: Run directory (zie publish_run)
+        queue_dir: Gedeelde queue directory
+        gpkg_path: Pad naar gemeentegrenzen GeoPackage
+        poll_interval: Seconden tussen voortgangscontroles
+
+    Returns:
+        True als de run voltooid is
+    """
+    queue = WorkQueue(queue_dir)
+    run_id = os.path.basename(run_dir)
+    tracker = RunTracker(run_dir)
+    start_time = time.time()
+    reported = set()
+
+    try:
+        while True:
+            for task in queue.finished_tasks(run_id):
+                if task["id"] in reported:
+                    continue
+                reported.add(task["id"])
+                payload = json.loads(task["payload"])
+                # Zelfde events als een lokale run (o.a. voor de run estimator)
+                tracker.emit(
+                    run_events.SCAN_STARTED,
+                    gemeente=task["gemeente"],
+                    checkin=payload["checkin"],
+                    nights=payload["nights"],
+                    scan_id=task["scan_id"],
+                )
+                if task["status"] == DONE:
+                    done_fields = {}
+                    if task.get("duration") is not None:
+                        done_fields["duration"] = task["duration"]
+                    tracker.emit(
+                        run_events.SCAN_DONE,
+                        gemeente=task["gemeente"],
+                        checkin=payload["checkin"],
+                        nights=payload["nights"],
+                        scan_id=task["scan_id"],
+                        records=task["records"],
+                        worker=task["lease_owner"],
+                        **done_fields,
+                    )
+                else:
+                    tracker.emit(
+                        run_events.SCAN_FAILED,
+                        gemeente=task["gemeente"],
+                        checkin=payload["checkin"],
+                        nights=payload["nights"],
+                        scan_id=task["scan_id"],
+                        error=(task["error"] or "")[:200],
+                    )
+
+            counts = queue.progress(run_id)
+            if counts[PENDING] + counts[LEASED] == 0:
+                break
+            time.sleep(poll_interval)
+
+        df_all = queue.load_results(run_id)
+        tracker.log(f"📥 {len(df_all):,} records samengevoegd uit {queue_dir}")
+        return finalize_run(
+            run_dir, df_all, gpkg_path, tracker, time.time() - start_time
+        )
+
+    except Exception as e:
+        tracker.fail(str(e))
+        logger.exception("Distributed run error")
+        return False
@@ -0,0 +1,381 @@
+"""
+Error Classification
+Maps exceptions from the Airbnb API (pyairbnb / curl_cffi) to typed
+categories, and a circuit breaker that pauses dispatch when calls keep failing
+
+Categories decide what a caller does with a failure:
+- RATE_LIMITED: back off (honour Retry-After), switch proxy
+- TRANSIENT: network/server trouble, retry with backoff
+- PERMANENT: bad request (4xx), retrying gives the same answer
+- PARSE: unexpected response/page structure, not retried
+- UNAVAILABLE: the circuit breaker gave up on the service, not retried
+"""
+
+import asyncio
+import json
+import logging
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ErrorCategory(Enum):
+    """Category of an API failure"""
+
+    RATE_LIMITED = "rate_limited"
+    TRANSIENT = "transient"
+    PERMANENT = "permanent"
+    PARSE = "parse"
+    UNAVAILABLE = "unavailable"
+
+
+RETRYABLE = (ErrorCategory.RATE_LIMITED, ErrorCategory.TRANSIENT)
+
+# Airbnb's edge answers throttled clients with "405 Not Allowed" as well as 429
+RATE_LIMIT_STATUS = (405, 429)
+TRANSIENT_STATUS = (408, 425, 500, 502, 503, 504)
+RATE_LIMIT_HINTS = ("not allowed", "too many requests", "rate limit")
+
+# Upper bound for a Retry-After hint (protects against absurd values)
+MAX_RETRY_AFTER = 600.0
+
+_STATUS_RE = re.compile(r"(?:status(?: code)?|HTTP(?:/\d(?:\.\d)?)?)\D{0,5}([1-5]\d\d)\b", re.I)
+
+
+class ClassifiedError:
+    """An exception with its category, HTTP status and Retry-After hint"""
+
+    def __init__(
+        self,
+        category: ErrorCategory,
+        message: str,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ):
+        self.category = category
+        self.message = message
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.category in RETRYABLE
+
+    @property
+    def is_rate_limit(self) -> bool:
+        return self.category == ErrorCategory.RATE_LIMITED
+
+    def backoff(self, attempt: int, base_delay: float) -> float:
+        """
+        Seconds to wait before retry number `attempt + 1`
+
+        A Retry-After hint wins; otherwise rate limits back off faster
+        (base * 3^attempt) than other transient errors (base * 2^attempt).
+        """
+        if self.retry_after is not None:
+            return self.retry_after
+        factor = 3 if self.is_rate_limit else 2
+        return base_delay * factor**attempt
+
+    def __repr__(self) -> str:
+        status = f" {self.status_code}" if self.status_code else ""
+        return f"<{self.category.value}{status}: {self.message}>"
+
+
+class ApiError(Exception):
+    """An API call that failed for good (after retries), with its classification"""
+
+    def __init__(self, message: str, classified: ClassifiedError):
+        super().__init__(message)
+        self.classified = classified
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    response = getattr(exc, "response", None)
+    code = getattr(response, "status_code", None)
+    if isinstance(code, int):
+        return code
+    # pyairbnb: Exception("Not corret status code: ", 429, " response body: ", ...)
+    for arg in exc.args:
+        if isinstance(arg, int) and 100 <= arg <= 599:
+            return arg
+    match = _STATUS_RE.search(str(exc)[:300])
+    return int(match.group(1)) if match else None
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Retry-After header value (seconds or HTTP date) as seconds from now"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        return parse_retry_after(headers.get("Retry-After"))
+    except Exception:
+        return None
+
+
+def _is_network_error(exc: BaseException) -> bool:
+    try:
+        from curl_cffi.requests import exceptions as curl_exceptions
+    except ImportError:
+        curl_exceptions = None
+
+    if curl_exceptions is not None and isinstance(
+        exc,
+        (
+            curl_exceptions.Timeout,
+            curl_exceptions.ConnectionError,
+            curl_exceptions.ProxyError,
+            curl_exceptions.SSLError,
+            curl_exceptions.ChunkedEncodingError,
+            curl_exceptions.IncompleteRead,
+        ),
+    ):
+        return True
+    return isinstance(exc, (TimeoutError, ConnectionError))
+
+
+def classify_error(exc: BaseException) -> ClassifiedError:
+    """
+    Classify an exception raised by an API call
+
+    Args:
+        exc: Exception from a search request (or an ApiError wrapping one)
+
+    Returns:
+        ClassifiedError with category, HTTP status (if known) and Retry-After
+    """
+    if isinstance(exc, ApiError):
+        return exc.classified
+
+    message = str(exc)
+    if len(message) > 150:
+        message = message[:150] + "..."
+    status = _status_code(exc)
+    retry_after = _retry_after(exc)
+
+    if status in RATE_LIMIT_STATUS or any(
+        hint in message.lower() for hint in RATE_LIMIT_HINTS
+    ):
+        category = ErrorCategory.RATE_LIMITED
+    elif status is not None and (status in TRANSIENT_STATUS or status >= 500):
+        category = ErrorCategory.TRANSIENT
+    elif status is not None and 400 <= status < 500:
+        category = ErrorCategory.PERMANENT
+    elif _is_network_error(exc):
+        category = ErrorCategory.TRANSIENT
+    elif isinstance(exc, (json.JSONDecodeError, KeyError, IndexError, AttributeError)):
+        category = ErrorCategory.PARSE
+    elif isinstance(exc, RuntimeError) and "unable to" in message.lower():
+        # pyairbnb could not find the API key / operation id in the page
+        category = ErrorCategory.PARSE
+    elif isinstance(exc, (TypeError, ValueError)):
+        category = ErrorCategory.PERMANENT
+    else:
+        # Unknown: treat as transient so behaviour matches a plain retry
+        category = ErrorCategory.TRANSIENT
+
+    return ClassifiedError(category, message, status, retry_after)
+
+
+class CircuitBreaker:
+    """
+    Pauses all API dispatch when the recent failure rate is too high
+
+    closed: calls pass; outcomes are kept for the last `window` seconds.
+    open: when at least `min_calls` recent calls failed at >= `threshold`
+        rate (rate limits and transient errors only), every caller waits in
+        wait() for the cool-down (at least any Retry-After hint).
+    half-open: after the cool-down one probe call may pass; success closes
+        the circuit, failure reopens it with a doubled cool-down.
+    gave up: after `max_reopens` failed probes in a row the service is
+        considered down; wait() raises a non-retryable ApiError
+        (UNAVAILABLE) at once, so scans fail and the run can finish.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    GAVE_UP = "gave_up"
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        min_calls: int = 10,
+        window: float = 60.0,
+        cooldown: float = 30.0,
+        max_cooldown: float = 300.0,
+        max_reopens: Optional[int] = 4,
+        on_change: Optional[Callable[[str, float], None]] = None,
+    ):
+        """
+        Args:
+            threshold: Failure rate (0-1) that opens the circuit
+            min_calls: Minimum calls in the window before it can open
+            window: Seconds of history used for the failure rate
+            cooldown: Initial open duration in seconds
+            max_cooldown: Upper bound of the (doubling) open duration
+            max_reopens: Failed half-open probes in a row after which the
+                breaker gives up (None = never; default ~7.5 minutes open)
+            on_change: Optional callback(state, cooldown) on state changes
+        """
+        self.threshold = threshold
+        self.min_calls = min_calls
+        self.window = window
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_reopens = max_reopens
+        self.on_change = on_change
+
+        self.state = self.CLOSED
+        self.opened_count = 0
+        self._cooldown = cooldown
+        self._open_until = 0.0
+        self._reopens = 0
+        self._gave_up: Optional[ClassifiedError] = None
+        self._probe_in_flight = False
+        self._outcomes = deque()  # (timestamp, failed)
+        self._cond = threading.Condition()
+
+    def _prune(self, now: float):
+        while self._outcomes and self._outcomes[0][0] < now - self.window:
+            self._outcomes.popleft()
+
+    def _set_state(self, state: str):
+        if state == self.state:
+            return
+        self.state = state
+        if state == self.OPEN:
+            logger.warning(f"⛔ Circuit breaker open: dispatch paused for {self._cooldown:.0f}s")
+        elif state == self.CLOSED:
+            logger.info("✅ Circuit breaker closed: dispatch resumed")
+        elif state == self.GAVE_UP:
+            logger.error(f"🛑 Circuit breaker gave up: {self._gave_up.message}")
+        if self.on_change is not None:
+            try:
+                self.on_change(state, self._cooldown)
+            except Exception:
+                logger.exception("Circuit breaker callback failed")
+
+    def _open(self, now: float, retry_after: Optional[float]):
+        self._cooldown = max(self._cooldown, retry_after or 0.0)
+        self._open_until = now + self._cooldown
+        self._outcomes.clear()
+        self.opened_count += 1
+        self._set_state(self.OPEN)
+
+    def _give_up(self, error: ClassifiedError):
+        self._gave_up = ClassifiedError(
+            ErrorCategory.UNAVAILABLE,
+            f"circuit breaker gave up after {self._reopens} failed probes "
+            f"(last error: {error.message})",
+            error.status_code,
+        )
+        self._outcomes.clear()
+        self._set_state(self.GAVE_UP)
+
+    def wait(self):
+        """
+        Block while the circuit is open (or a half-open probe is running)
+
+        Raises:
+            ApiError: If the breaker gave up (UNAVAILABLE, not retryable)
+        """
+        with self._cond:
+            while True:
+                delay = self._try_pass(time.monotonic())
+                if delay == 0.0:
+                    return
+                self._cond.wait(delay)
+
+    async def wait_async(self):
+        """asyncio variant of wait(): sleeps instead of blocking a thread (raises like wait)"""
+        while True:
+            with self._cond:
+                delay = self._try_pass(time.monotonic())
+            if delay == 0.0:
+                return
+            await asyncio.sleep(min(delay, 1.0))
+
+    def _try_pass(self, now: float) -> float:
+        """0.0 if a call may pass now, else seconds to wait (caller holds the lock)"""
+        if self.state == self.CLOSED:
+            return 0.0
+        if self.state == self.GAVE_UP:
+            raise ApiError(f"API unavailable: {self._gave_up.message}", self._gave_up)
+        if self.state == self.OPEN:
+            if now < self._open_until:
+                return self._open_until - now
+            self._set_state(self.HALF_OPEN)
+        if not self._probe_in_flight:
+            self._probe_in_flight = True
+            return 0.0
+        return 1.0
+
+    def record_success(self):
+        """Report a successful call"""
+        with self._cond:
+            now = time.monotonic()
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                self._cooldown = self.base_cooldown
+                self._reopens = 0
+                self._set_state(self.CLOSED)
+            self._outcomes.append((now, False))
+            self._prune(now)
+            self._cond.notify_all()
+
+    def record_failure(self, error: ClassifiedError):
+        """Report a failed call; only retryable categories count as failures"""
+        with self._cond:
+            now = time.monotonic()
+            if not error.retryable:
+                # Our own bad request says nothing about the service
+                if self.state == self.HALF_OPEN:
+                    self._probe_in_flight = False
+                self._cond.notify_all()
+                return
+
+            if self.state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                self._reopens += 1
+                if self.max_reopens is not None and self._reopens >= self.max_reopens:
+                    self._give_up(error)
+                else:
+                    self._cooldown = min(self.max_cooldown, self._cooldown * 2)
+                    self._open(now, error.retry_after)
+            elif self.state == self.CLOSED:
+                self._outcomes.append((now, True))
+                self._prune(now)
+                failures = sum(1 for _, failed in self._outcomes if failed)
+                if (
+                    len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.threshold
+                ):
+                    self._open(now, error.retry_after)
+            self._cond.notify_all()
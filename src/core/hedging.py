@@ -0,0 +1,130 @@
+"""
+Request Hedging
+Cuts tail latency of API calls by firing a duplicate request when a call is
+outstanding longer than a learned latency percentile
+
+The threshold is a percentile (e.g. p90) of recent request latencies. A
+hedge budget caps the number of duplicate requests at a fraction of the
+primary calls, so total API volume stays bounded. Whichever request of a
+pair answers first completes the call; the other still adds coverage if it
+arrives while the scan is running.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEDGE_PERCENTILE = 90.0
+DEFAULT_HEDGE_BUDGET = 0.1
+
+# Latencies used for the threshold, and samples needed before hedging starts
+LATENCY_WINDOW = 200
+MIN_SAMPLES = 20
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (None for an empty list)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+class HedgePolicy:
+    """Shared hedging state: latency window, threshold and hedge budget"""
+
+    def __init__(
+        self,
+        hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+        budget: float = DEFAULT_HEDGE_BUDGET,
+        window: int = LATENCY_WINDOW,
+        min_samples: int = MIN_SAMPLES,
+    ):
+        """
+        Args:
+            hedge_percentile: Latency percentile after which a call is hedged
+            budget: Maximum hedges as a fraction of primary calls (0.1 = 10%);
+                0 only measures latencies
+            window: Number of recent request latencies used for the threshold
+            min_samples: Latencies needed before the first hedge
+        """
+        self.hedge_percentile = hedge_percentile
+        self.budget = budget
+        self.min_samples = min_samples
+
+        self._recent = deque(maxlen=window)
+        self._raw: List[float] = []  # every request (what calls cost without hedging)
+        self._effective: List[float] = []  # per call, first answer of a hedged pair
+        self.primary_calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def threshold(self) -> Optional[float]:
+        """Seconds after which an outstanding call is hedged (None = not yet)"""
+        with self._lock:
+            if self.budget <= 0 or len(self._recent) < self.min_samples:
+                return None
+            return percentile(list(self._recent), self.hedge_percentile)
+
+    def record_primary(self):
+        """Count a primary call (the base for the hedge budget)"""
+        with self._lock:
+            self.primary_calls += 1
+
+    def try_hedge(self) -> bool:
+        """Reserve a hedge if the budget allows one more"""
+        with self._lock:
+            if self.hedges + 1 > self.budget * max(self.primary_calls, 1):
+                return False
+            self.hedges += 1
+            return True
+
+    def record_latency(self, seconds: float):
+        """Latency of one request (primary or hedge)"""
+        with self._lock:
+            self._recent.append(seconds)
+            self._raw.append(seconds)
+
+    def record_call(self, seconds: float, hedge_won: bool = False):
+        """Effective latency of a call: until its first successful answer"""
+        with self._lock:
+            self._effective.append(seconds)
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hedge counts and raw vs effective latency percentiles"""
+        with self._lock:
+            raw = list(self._raw)
+            effective = list(self._effective)
+            stats = {
+                "primary_calls": self.primary_calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "extra_pct": self.hedges / max(self.primary_calls, 1) * 100,
+            }
+        for name, values in (("raw", raw), ("effective", effective)):
+            for pct in (50, 90, 99):
+                stats[f"{name}_p{pct}"] = percentile(values, pct)
+        return stats
+
+    def log_stats(self):
+        """Write hedge counts and latency percentiles to the log"""
+        stats = self.stats()
+
+        def _fmt(name: str) -> str:
+            values = [stats[f"{name}_p{pct}"] for pct in (50, 90, 99)]
+            return " / ".join(f"{v:.2f}s" if v is not None else "-" for v in values)
+
+        logger.info("🪃 HEDGED REQUESTS")
+        logger.info(
+            f"Hedges:               {stats['hedges']} "
+            f"({stats['extra_pct']:.1f}% extra calls, {stats['hedge_wins']} won)"
+        )
+        logger.info(f"Call latency p50/p90/p99 without hedging: {_fmt('raw')}")
+        logger.info(f"Call latency p50/p90/p99 with hedging:    {_fmt('effective')}")
@@ -0,0 +1,232 @@
+"""
+Job Queue
+Persistent SQLite queue of scrape jobs, shared by the dashboard (submit,
+cancel, observe) and the job supervisor (claim, run, finish)
+"""
+
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILE = "jobs.sqlite"
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_dir TEXT NOT NULL,
+    gpkg_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    resume INTEGER DEFAULT 0,
+    cancel_requested INTEGER DEFAULT 0,
+    pid INTEGER,
+    exit_code INTEGER,
+    error TEXT,
+    submitted_at TEXT,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_run_dir ON jobs (run_dir, id DESC);
+CREATE TABLE IF NOT EXISTS supervisor (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    pid INTEGER,
+    heartbeat REAL
+);
+"""
+
+
+class JobQueue:
+    """SQLite (WAL) job queue in a data directory"""
+
+    def __init__(self, data_dir: str = "data"):
+        """
+        Open (and create if needed) the job queue for a data directory
+
+        Args:
+            data_dir: Base data directory containing run_* folders
+        """
+        self.data_dir = data_dir
+        self.db_path = os.path.join(data_dir, QUEUE_FILE)
+
+        os.makedirs(data_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived connection (safe to use from any thread/process)"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def submit(self, run_dir: str, gpkg_path: str, resume: bool = False) -> int:
+        """
+        Queue a run for execution
+
+        Args:
+            run_dir: Run directory (must contain config.json)
+            gpkg_path: GeoPackage with gemeente boundaries
+            resume: Continue from the run's last checkpoint
+
+        Returns:
+            Job id
+        """
+        active = self.get_job(run_dir)
+        if active and active["status"] in ACTIVE_STATES:
+            logger.info(f"Run already queued/running as job {active['id']}: {run_dir}")
+            return active["id"]
+
+        with self._connect() as conn:
+            cur = conn.execute(
+                "INSERT INTO jobs (run_dir, gpkg_path, status, resume, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    os.path.abspath(run_dir),
+                    os.path.abspath(gpkg_path),
+                    QUEUED,
+                    int(resume),
+                    datetime.now().isoformat(),
+                ),
+            )
+            return cur.lastrowid
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """
+        Atomically move the oldest queued job to running
+
+        Returns:
+            The claimed job, or None if the queue is empty
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND cancel_requested = 0 "
+                "ORDER BY id LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                (RUNNING, datetime.now().isoformat(), row["id"]),
+            )
+            conn.execute("COMMIT")
+            return {**dict(row), "status": RUNNING}
+        finally:
+            conn.close()
+
+    def set_pid(self, job_id: int, pid: int) -> None:
+        """Record the worker process of a running job"""
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET pid = ? WHERE id = ?", (pid, job_id))
+
+    def finish(
+        self,
+        job_id: int,
+        status: str,
+        exit_code: Optional[int] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Mark a job as finished
+
+        Args:
+            job_id: Job id
+            status: COMPLETED, FAILED or CANCELLED
+            exit_code: Worker process exit code
+            error: Error message (for failed jobs)
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, exit_code = ?, error = ?, "
+                "finished_at = ? WHERE id = ?",
+                (status, exit_code, error, datetime.now().isoformat(), job_id),
+            )
+
+    def request_cancel(self, run_dir: str) -> bool:
+        """
+        Ask the supervisor to cancel a run's active job
+
+        Queued jobs are cancelled immediately; running jobs are stopped by the
+        supervisor on its next poll.
+
+        Args:
+            run_dir: Run directory
+
+        Returns:
+            True if there was an active job to cancel
+        """
+        with self._connect() as conn:
+            run_dir = os.path.abspath(run_dir)
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? "
+                "WHERE run_dir = ? AND status = ?",
+                (CANCELLED, datetime.now().isoformat(), run_dir, QUEUED),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE run_dir = ? AND status = ?",
+                (run_dir, RUNNING),
+            )
+            return conn.total_changes > 0
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Job by id (or None)"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_job(self, run_dir: str) -> Optional[Dict[str, Any]]:
+        """Latest job of a run (or None)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE run_dir = ? ORDER BY id DESC LIMIT 1",
+                (os.path.abspath(run_dir),),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def list_jobs(self, statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        List jobs, newest first
+
+        Args:
+            statuses: Only return jobs with these states (None = all)
+        """
+        query = "SELECT * FROM jobs"
+        params: List[Any] = []
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' for _ in statuses)})"
+            params.extend(statuses)
+        query += " ORDER BY id DESC"
+        with self._connect() as conn:
+            return [dict(row) for row in conn.execute(query, params)]
+
+    def heartbeat(self, pid: int) -> None:
+        """Register the supervisor as alive"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO supervisor (id, pid, heartbeat) VALUES (1, ?, ?)",
+                (pid, datetime.now().timestamp()),
+            )
+
+    def supervisor_pid(self, max_age: float = 15.0) -> Optional[int]:
+        """Pid of the supervisor if it sent a heartbeat in the last max_age seconds"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT pid, heartbeat FROM supervisor WHERE id = 1").fetchone()
+        if row and datetime.now().timestamp() - row["heartbeat"] < max_age:
+            return row["pid"]
+        return None
@@ -0,0 +1,473 @@
+"""
+Job Runner
+Supervisor that executes queued scrape jobs (see src.core.job_queue), each
+in its own worker process, with a cap on concurrent runs
+
+    python -m src.core.job_runner supervise --data-dir outputs/data
+    python -m src.core.job_runner worker <run_dir> --gpkg <gpkg> [--resume]
+    python -m src.core.job_runner probe <probe_dir> --gpkg <gpkg>
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from src.core import job_queue
+from src.core.job_queue import JobQueue
+from src.core.run_tracker import RunStatus, RunTracker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENT_RUNS = 2
+
+# Seconds a worker gets to stop after SIGTERM before it is killed
+CANCEL_GRACE_PERIOD = 10.0
+
+# Heartbeat interval of the supervisor; it is considered dead after 3 misses
+HEARTBEAT_INTERVAL = 5.0
+
+# Estimate probes (see start_probe) live under <data_dir>/probes
+PROBES_DIR = "probes"
+PROBE_FILE = "probe.json"
+
+PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+def _worker_command(job: Dict) -> list:
+    cmd = [
+        sys.executable,
+        "-m",
+        "src.core.job_runner",
+        "worker",
+        job["run_dir"],
+        "--gpkg",
+        job["gpkg_path"],
+    ]
+    if job["resume"]:
+        cmd.append("--resume")
+    return cmd
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobSupervisor:
+    """Runs queued jobs as worker processes, at most max_concurrent at a time"""
+
+    def __init__(
+        self,
+        data_dir: str,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_RUNS,
+        poll_interval: float = 1.0,
+        idle_exit: Optional[float] = None,
+    ):
+        """
+        Args:
+            data_dir: Base data directory (holds the job queue)
+            max_concurrent: Maximum number of runs executing at the same time
+            poll_interval: Seconds between queue polls
+            idle_exit: Stop after this many seconds without jobs (None = never)
+        """
+        self.queue = JobQueue(data_dir)
+        self.max_concurrent = max(1, max_concurrent)
+        self.poll_interval = poll_interval
+        self.idle_exit = idle_exit
+        self._workers: Dict[int, subprocess.Popen] = {}
+        self._orphans: Dict[int, int] = {}  # job id -> pid (from a previous supervisor)
+        self._cancel_sent: Dict[int, float] = {}
+        self._last_heartbeat = 0.0
+
+    def run(self):
+        """Supervise until idle_exit elapses (or forever)"""
+        other = self.queue.supervisor_pid(max_age=3 * HEARTBEAT_INTERVAL)
+        if other not in (None, os.getpid()) and _pid_alive(other):
+            logger.info(f"Another job supervisor is running (pid {other}), exiting")
+            return
+
+        self._adopt_running_jobs()
+        idle_since = time.monotonic()
+        logger.info(f"Job supervisor started (max {self.max_concurrent} concurrent runs)")
+
+        while True:
+            self.poll()
+            if self._workers or self._orphans:
+                idle_since = time.monotonic()
+            elif self.idle_exit is not None and time.monotonic() - idle_since > self.idle_exit:
+                logger.info("Job supervisor idle, stopping")
+                return
+            time.sleep(self.poll_interval)
+
+    def poll(self):
+        """One supervision round: heartbeat, reap, cancel, start"""
+        now = time.monotonic()
+        if now - self._last_heartbeat >= HEARTBEAT_INTERVAL:
+            self.queue.heartbeat(os.getpid())
+            self._last_heartbeat = now
+
+        self._reap()
+        self._handle_cancels()
+
+        while len(self._workers) + len(self._orphans) < self.max_concurrent:
+            job = self.queue.claim_next()
+            if job is None:
+                break
+            self._start(job)
+
+    def _start(self, job: Dict):
+        """Start the worker process of a claimed job"""
+        log_path = os.path.join(job["run_dir"], "worker.log")
+        try:
+            with open(log_path, "a", encoding="utf-8") as log_file:
+                process = subprocess.Popen(
+                    _worker_command(job),
+                    cwd=PROJECT_ROOT,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True,
+                )
+        except Exception as e:
+            logger.error(f"Could not start worker for {job['run_dir']}: {e}")
+            self.queue.finish(job["id"], job_queue.FAILED, error=str(e))
+            RunTracker(job["run_dir"]).fail(f"Worker start failed: {e}")
+            return
+
+        self.queue.set_pid(job["id"], process.pid)
+        self._workers[job["id"]] = process
+        logger.info(f"▶️ Job {job['id']} started (pid {process.pid}): {job['run_dir']}")
+
+    def _reap(self):
+        """Finish jobs whose worker process has exited"""
+        for job_id, process in list(self._workers.items()):
+            exit_code = process.poll()
+            if exit_code is not None:
+                del self._workers[job_id]
+                self._finish(job_id, exit_code)
+
+        for job_id, pid in list(self._orphans.items()):
+            if not _pid_alive(pid):
+                del self._orphans[job_id]
+                self._finish(job_id, None)
+
+    def _finish(self, job_id: int, exit_code: Optional[int]):
+        """Record the outcome of a job and make sure the run status agrees"""
+        self._cancel_sent.pop(job_id, None)
+        job = self.queue.get(job_id)
+        if job is None or job["status"] != job_queue.RUNNING:
+            return
+
+        tracker = RunTracker(job["run_dir"])
+        run_status = tracker.get_status().get("status")
+
+        if job["cancel_requested"]:
+            if run_status not in (RunStatus.COMPLETED.value, RunStatus.CANCELLED.value):
+                tracker.cancel()
+            self.queue.finish(job_id, job_queue.CANCELLED, exit_code)
+        elif run_status == RunStatus.COMPLETED.value:
+            self.queue.finish(job_id, job_queue.COMPLETED, exit_code)
+        else:
+            error = f"Worker exited with code {exit_code}"
+            if run_status in (RunStatus.RUNNING.value, RunStatus.PENDING.value):
+                # Worker died without reporting (crash, OOM, kill)
+                tracker.fail(error)
+            self.queue.finish(job_id, job_queue.FAILED, exit_code, error)
+        logger.info(f"⏹️ Job {job_id} finished (exit code {exit_code}): {job['run_dir']}")
+
+    def _handle_cancels(self):
+        """Stop workers of jobs with a pending cancel request"""
+        for job in self.queue.list_jobs([job_queue.RUNNING]):
+            if not job["cancel_requested"]:
+                continue
+            job_id = job["id"]
+            process = self._workers.get(job_id)
+            pid = process.pid if process else self._orphans.get(job_id)
+            if pid is None:
+                continue
+
+            sent = self._cancel_sent.get(job_id)
+            if sent is None:
+                self._signal(pid, signal.SIGTERM)
+                self._cancel_sent[job_id] = time.monotonic()
+            elif time.monotonic() - sent > CANCEL_GRACE_PERIOD:
+                self._signal(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+
+    @staticmethod
+    def _signal(pid: int, sig: int):
+        try:
+            os.kill(pid, sig)
+        except OSError:
+            pass
+
+    def _adopt_running_jobs(self):
+        """Take over jobs left running by a previous supervisor"""
+        for job in self.queue.list_jobs([job_queue.RUNNING]):
+            if _pid_alive(job["pid"]):
+                self._orphans[job["id"]] = job["pid"]
+            else:
+                self._finish(job["id"], None)
+
+
+def ensure_supervisor(
+    data_dir: str, max_concurrent: int = DEFAULT_MAX_CONCURRENT_RUNS
+) -> bool:
+    """
+    Start a background supervisor for a data directory if none is alive
+
+    The supervisor runs detached from the caller (e.g. the Streamlit server)
+    and stops by itself after a few idle minutes.
+
+    Args:
+        data_dir: Base data directory
+        max_concurrent: Maximum number of concurrent runs
+
+    Returns:
+        True if a new supervisor was started
+    """
+    queue = JobQueue(data_dir)
+    if queue.supervisor_pid(max_age=3 * HEARTBEAT_INTERVAL) is not None:
+        return False
+
+    log_path = os.path.join(data_dir, "supervisor.log")
+    with open(log_path, "a", encoding="utf-8") as log_file:
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "src.core.job_runner",
+                "supervise",
+                "--data-dir",
+                os.path.abspath(data_dir),
+                "--max-concurrent",
+                str(max_concurrent),
+                "--idle-exit",
+                "300",
+            ],
+            cwd=PROJECT_ROOT,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    # Register immediately so concurrent callers do not start a second one
+    queue.heartbeat(process.pid)
+    return True
+
+
+def submit_run(
+    data_dir: str,
+    run_dir: str,
+    gpkg_path: str,
+    resume: bool = False,
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT_RUNS,
+) -> int:
+    """
+    Queue a run and make sure a supervisor is there to execute it
+
+    Args:
+        data_dir: Base data directory
+        run_dir: Run directory (see src.core.run_pipeline.create_run)
+        gpkg_path: GeoPackage with gemeente boundaries
+        resume: Continue from the run's last checkpoint
+        max_concurrent: Concurrency cap passed to a newly started supervisor
+
+    Returns:
+        Job id
+    """
+    job_id = JobQueue(data_dir).submit(run_dir, gpkg_path, resume=resume)
+    if resume:
+        RunTracker(run_dir).log("⏳ Run in wachtrij om te hervatten")
+    ensure_supervisor(data_dir, max_concurrent)
+    return job_id
+
+
+def cancel_run(data_dir: str, run_dir: str) -> bool:
+    """
+    Cancel a queued or running run
+
+    A queued run is cancelled immediately; a running one is stopped by the
+    supervisor (the run status changes once its worker has exited).
+
+    Args:
+        data_dir: Base data directory
+        run_dir: Run directory
+
+    Returns:
+        True if the run had an active job
+    """
+    queue = JobQueue(data_dir)
+    job = queue.get_job(run_dir)
+    if not queue.request_cancel(run_dir):
+        return False
+    if job and job["status"] == job_queue.QUEUED:
+        RunTracker(run_dir).cancel()
+    return True
+
+
+def start_probe(data_dir: str, config: Dict, gpkg_path: str) -> Tuple[str, int]:
+    """
+    Start an estimate probe (a few real scans) in a detached process
+
+    The probe costs API calls and takes a while, so it never runs in the
+    caller (e.g. the Streamlit server); poll probe_result for the outcome.
+
+    Args:
+        data_dir: Base data directory
+        config: Run config to calibrate the estimate for
+        gpkg_path: GeoPackage with gemeente boundaries
+
+    Returns:
+        (probe_dir, pid) of the probe process
+    """
+    probe_dir = os.path.join(
+        os.path.abspath(data_dir),
+        PROBES_DIR,
+        f"probe_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}",
+    )
+    os.makedirs(probe_dir, exist_ok=True)
+    with open(os.path.join(probe_dir, "config.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2, default=str)
+
+    log_path = os.path.join(probe_dir, "probe.log")
+    with open(log_path, "a", encoding="utf-8") as log_file:
+        process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "src.core.job_runner",
+                "probe",
+                probe_dir,
+                "--gpkg",
+                os.path.abspath(gpkg_path),
+            ],
+            cwd=PROJECT_ROOT,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    return probe_dir, process.pid
+
+
+def probe_result(probe_dir: str, pid: Optional[int] = None) -> Dict:
+    """
+    Outcome of a probe started with start_probe
+
+    Args:
+        probe_dir: Probe directory returned by start_probe
+        pid: Probe process id (to detect a probe that died without a result)
+
+    Returns:
+        Dict with status ("running", "done" or "failed"), sample
+        (RunSample when done) and error
+    """
+    from src.core.run_estimator import RunSample
+
+    path = os.path.join(probe_dir, PROBE_FILE)
+    if not os.path.exists(path):
+        if _pid_alive(pid):
+            return {"status": "running", "sample": None, "error": None}
+        return {
+            "status": "failed",
+            "sample": None,
+            "error": f"Probe process exited without a result (see {probe_dir}/probe.log)",
+        }
+
+    with open(path, "r", encoding="utf-8") as f:
+        result = json.load(f)
+    if result.get("error"):
+        return {"status": "failed", "sample": None, "error": result["error"]}
+    if not result.get("sample"):
+        return {"status": "failed", "sample": None, "error": "No probe scan succeeded"}
+    return {
+        "status": "done",
+        "sample": RunSample.from_dict(result["sample"]),
+        "error": None,
+    }
+
+
+def _run_probe(probe_dir: str, gpkg_path: str) -> int:
+    """Probe process entry point: run the probe scans and store the sample"""
+    from src.core.run_pipeline import run_probe
+
+    with open(os.path.join(probe_dir, "config.json"), "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    result = {"sample": None, "error": None}
+    try:
+        sample = run_probe(config, gpkg_path)
+        result["sample"] = sample.to_dict() if sample else None
+    except Exception as e:
+        logger.exception("Probe failed")
+        result["error"] = str(e)
+
+    # Write atomically so probe_result never reads a partial file
+    path = os.path.join(probe_dir, PROBE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(result, f, default=str)
+    os.replace(path + ".tmp", path)
+    return 0 if result["error"] is None else 1
+
+
+def _run_worker(run_dir: str, gpkg_path: str, resume: bool) -> int:
+    """Worker process entry point: execute one run"""
+    from src.core.run_pipeline import execute_run
+
+    # A cancel terminates this process; the supervisor records the
+    # cancellation in the run status afterwards
+    return 0 if execute_run(run_dir, gpkg_path, resume=resume) else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape job supervisor / worker")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    supervise = sub.add_parser("supervise", help="Run queued jobs")
+    supervise.add_argument("--data-dir", default="outputs/data")
+    supervise.add_argument(
+        "--max-concurrent", type=int, default=DEFAULT_MAX_CONCURRENT_RUNS
+    )
+    supervise.add_argument(
+        "--idle-exit", type=float, default=None, help="Stop after N idle seconds"
+    )
+
+    worker = sub.add_parser("worker", help="Execute one run (started by the supervisor)")
+    worker.add_argument("run_dir")
+    worker.add_argument("--gpkg", required=True)
+    worker.add_argument("--resume", action="store_true")
+
+    probe = sub.add_parser("probe", help="Run estimate probe scans (see start_probe)")
+    probe.add_argument("probe_dir")
+    probe.add_argument("--gpkg", required=True)
+
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
+    if args.command == "supervise":
+        JobSupervisor(
+            args.data_dir, args.max_concurrent, idle_exit=args.idle_exit
+        ).run()
+    elif args.command == "probe":
+        sys.exit(_run_probe(args.probe_dir, args.gpkg))
+    else:
+        sys.exit(_run_worker(args.run_dir, args.gpkg, args.resume))
+
+
+if __name__ == "__main__":
+    main()
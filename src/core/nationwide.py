@@ -0,0 +1,257 @@
+"""
+Landelijke scan modus
+Dekt heel Nederland met een tegel grid in plaats van één query per gemeente
+
+Alle ~340 gemeenten scannen betekent 340 bbox queries per datum die aan de
+randen sterk overlappen, elk met een eigen grensfilter. De landelijke modus
+legt een quadtree van tegels over het land: een tegel wordt gesplitst zolang
+er meer listings in liggen dan één query teruggeeft (TILE_CAPACITY), dus
+drukke steden krijgen kleine tegels en het platteland grote. De dichtheid
+komt uit een eerdere run of uit een goedkope probe (probe_density).
+
+Elke tegel is een ScanArea (src.core.shared_areas): listings krijgen gemeente
+en provincie via één STRtree join, en elke listing hoort bij precies één
+tegel (halfopen bbox), zodat er over het hele land per room_id en scan
+ontdubbeld wordt.
+"""
+
+import logging
+import math
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.api_client import make_api_call_with_retry
+from src.core.boundaries import load_gemeente_index
+from src.core.errors import ApiError, CircuitBreaker
+from src.core.proxy_pool import ProxyPool
+from src.core.shared_areas import KM_PER_DEGREE, Bbox, GemeenteJoin, ScanArea
+from src.utils import extract_coordinates
+
+logger = logging.getLogger(__name__)
+
+# Listings die één zoekopdracht (alle pagina's) hooguit teruggeeft; in een
+# tegel met meer listings gaat dekking verloren
+TILE_CAPACITY = 250
+
+# Kleinste tegel (zijde in km) en tegelgrootte zonder bekende dichtheid
+MIN_TILE_KM = 2.0
+DEFAULT_TILE_KM = 20.0
+
+# Marge rond het land zodat geen listing op de buitenrand van de tegels valt
+ROOT_MARGIN = 1e-6
+
+
+class Tile(ScanArea):
+    """Quadtree tegel (niveau z, kolom x, rij y) als scan gebied"""
+
+    def __init__(self, z: int, x: int, y: int, bbox: Bbox, gemeenten: Sequence[str]):
+        super().__init__(gemeenten, bbox)
+        self.z, self.x, self.y = z, x, y
+        self.name = f"tegel {z}/{x}/{y}"
+
+    def owns(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """Punten binnen de halfopen bbox (een punt hoort bij één tegel)"""
+        return _in_bbox(self.bbox, lons, lats)
+
+    def children(self) -> List[Tuple[int, int, int, Bbox]]:
+        """De vier sub-tegels (z, x, y, bbox)"""
+        return _children(self.z, self.x, self.y, self.bbox)
+
+
+def tile_size_km(bbox: Bbox) -> float:
+    """Langste zijde van een tegel in km"""
+    minx, miny, maxx, maxy = bbox
+    mid_lat = math.radians((miny + maxy) / 2)
+    return max((maxx - minx) * KM_PER_DEGREE * math.cos(mid_lat), (maxy - miny) * KM_PER_DEGREE)
+
+
+def _in_bbox(bbox: Bbox, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    minx, miny, maxx, maxy = bbox
+    return (lons >= minx) & (lons < maxx) & (lats >= miny) & (lats < maxy)
+
+
+def _children(z: int, x: int, y: int, bbox: Bbox) -> List[Tuple[int, int, int, Bbox]]:
+    minx, miny, maxx, maxy = bbox
+    midx, midy = (minx + maxx) / 2, (miny + maxy) / 2
+    return [
+        (z + 1, 2 * x, 2 * y, (minx, miny, midx, midy)),
+        (z + 1, 2 * x + 1, 2 * y, (midx, miny, maxx, midy)),
+        (z + 1, 2 * x, 2 * y + 1, (minx, midy, midx, maxy)),
+        (z + 1, 2 * x + 1, 2 * y + 1, (midx, midy, maxx, maxy)),
+    ]
+
+
+def _root_bbox(gpkg_path: str, gemeenten: Sequence[str]) -> Bbox:
+    """Bbox van alle gemeenten, met een kleine marge"""
+    index = load_gemeente_index(gpkg_path)
+    boxes = np.array([index[g]["bbox"] for g in gemeenten])
+    return (
+        boxes[:, 0].min() - ROOT_MARGIN,
+        boxes[:, 1].min() - ROOT_MARGIN,
+        boxes[:, 2].max() + ROOT_MARGIN,
+        boxes[:, 3].max() + ROOT_MARGIN,
+    )
+
+
+def _known_gemeenten(gpkg_path: str, gemeenten: Optional[Sequence[str]]) -> List[str]:
+    index = load_gemeente_index(gpkg_path)
+    if gemeenten is None:
+        return sorted(index)
+    unknown = [g for g in gemeenten if g not in index]
+    if unknown:
+        logger.warning(f"Gemeenten niet in de grenzen index (overgeslagen): {unknown}")
+    return [g for g in gemeenten if g in index]
+
+
+def plan_tiles(
+    gpkg_path: str,
+    gemeenten: Optional[Sequence[str]] = None,
+    density: Optional[pd.DataFrame] = None,
+    capacity: int = TILE_CAPACITY,
+    min_tile_km: float = MIN_TILE_KM,
+    tile_km: float = DEFAULT_TILE_KM,
+    join: Optional[GemeenteJoin] = None,
+) -> List[Tile]:
+    """
+    Quadtree tegels over de gemeenten, gesplitst naar listing dichtheid
+
+    Args:
+        gpkg_path: Pad naar gemeentegrenzen GeoPackage
+        gemeenten: Te dekken gemeenten (None = alle gemeenten)
+        density: DataFrame met latitude/longitude van bekende listings (een
+            eerdere run of probe_density); een tegel met meer dan capacity
+            listings wordt gesplitst. None = vaste tegels van tile_km
+        capacity: Maximum aantal listings per tegel
+        min_tile_km: Kleinste tegel (zijde in km)
+        tile_km: Tegelgrootte zonder density
+        join: Bestaande GemeenteJoin over dezelfde gemeenten
+
+    Returns:
+        Tegels die minstens één gemeente raken (zee en buitenland vallen af)
+    """
+    names = _known_gemeenten(gpkg_path, gemeenten)
+    join = join or GemeenteJoin(gpkg_path, names)
+    root = _root_bbox(gpkg_path, names)
+
+    if density is not None:
+        lons = density["longitude"].to_numpy(dtype=float)
+        lats = density["latitude"].to_numpy(dtype=float)
+        root_points = np.arange(len(lons))
+    else:
+        lons = lats = root_points = None
+
+    tiles = []
+    stack = [(0, 0, 0, root, root_points)]
+    while stack:
+        z, x, y, bbox, points = stack.pop()
+        tile_gemeenten = join.intersecting(bbox)
+        if not tile_gemeenten:
+            continue
+        tile = Tile(z, x, y, bbox, tile_gemeenten)
+        size = tile_size_km(bbox)
+        if points is not None:
+            split = len(points) > capacity
+        else:
+            split = size > tile_km
+        if not split or size / 2 < min_tile_km:
+            tiles.append(tile)
+            continue
+        for child in tile.children():
+            child_points = None
+            if points is not None:
+                child_points = points[_in_bbox(child[3], lons[points], lats[points])]
+            stack.append((*child, child_points))
+
+    tiles.sort(key=lambda t: (t.z, t.y, t.x))
+    sizes = [tile_size_km(t.bbox) for t in tiles]
+    logger.info(
+        f"🗺️ {len(tiles)} tegels voor {len(names)} gemeenten "
+        f"({min(sizes, default=0):.1f}-{max(sizes, default=0):.1f} km)"
+    )
+    return tiles
+
+
+def _probe_coordinates(rec: dict) -> Optional[dict]:
+    """Transform voor de probe: alleen id en coördinaten bewaren"""
+    lat, lon = extract_coordinates(rec)
+    if not lat or not lon:
+        return None
+    return {"room_id": rec.get("room_id") or rec.get("id"), "latitude": lat, "longitude": lon}
+
+
+def probe_density(
+    gpkg_path: str,
+    check_in: str,
+    check_out: str,
+    zoom_value: int,
+    currency: str,
+    language: str,
+    gemeenten: Optional[Sequence[str]] = None,
+    capacity: int = TILE_CAPACITY,
+    min_tile_km: float = MIN_TILE_KM,
+    tile_km: float = DEFAULT_TILE_KM,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    max_workers: int = 2,
+) -> pd.DataFrame:
+    """
+    Meet de listing dichtheid met een goedkope adaptieve probe
+
+    Eén search per tegel van tile_km (één datum); een tegel die vol
+    terugkomt (≥ capacity listings) wordt in vier gesplitst en opnieuw
+    bevraagd, tot min_tile_km. Het resultaat is de density voor plan_tiles.
+
+    Returns:
+        DataFrame met room_id, latitude en longitude (ontdubbeld)
+    """
+    names = _known_gemeenten(gpkg_path, gemeenten)
+    join = GemeenteJoin(gpkg_path, names)
+    level = plan_tiles(gpkg_path, names, tile_km=tile_km, join=join)
+
+    def _probe(tile: Tile) -> list:
+        minx, miny, maxx, maxy = tile.bbox
+        try:
+            return make_api_call_with_retry(
+                check_in,
+                check_out,
+                maxy,
+                maxx,
+                miny,
+                minx,
+                zoom_value,
+                0,
+                0,
+                [],
+                currency,
+                language,
+                "",
+                proxy_pool=proxy_pool,
+                circuit_breaker=circuit_breaker,
+                transform=_probe_coordinates,
+            )
+        except ApiError as e:
+            logger.warning(f"Probe {tile.name} failed: {e}")
+            return []
+
+    found = {}
+    calls = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        while level:
+            results = list(executor.map(_probe, level))
+            calls += len(level)
+            next_level = []
+            for tile, listings in zip(level, results):
+                for listing in listings:
+                    found.setdefault(listing["room_id"], listing)
+                if len(listings) >= capacity and tile_size_km(tile.bbox) / 2 >= min_tile_km:
+                    for child in tile.children():
+                        child_gemeenten = join.intersecting(child[3])
+                        if child_gemeenten:
+                            next_level.append(Tile(*child, child_gemeenten))
+            level = next_level
+
+    logger.info(f"🔎 Density probe: {calls} calls, {len(found):,} listings")
+    return pd.DataFrame(list(found.values()), columns=["room_id", "latitude", "longitude"])
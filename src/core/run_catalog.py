@@ -0,0 +1,295 @@
+"""
+Run Catalog
+Indexed SQLite catalog of all runs (status, config summary, counts, artifacts)
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.data.run_store import DATA_FILE, find_excel_files, read_manifest
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE = "run_catalog.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_name TEXT PRIMARY KEY,
+    run_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT,
+    started_at TEXT,
+    completed_at TEXT,
+    error TEXT,
+    gemeenten TEXT,
+    period_start TEXT,
+    period_end TEXT,
+    nights_list TEXT,
+    guests_list TEXT,
+    measurement_interval INTEGER,
+    total_scans INTEGER DEFAULT 0,
+    completed_scans INTEGER DEFAULT 0,
+    failed_scans INTEGER DEFAULT 0,
+    listings INTEGER,
+    records INTEGER,
+    excel_file TEXT,
+    data_file TEXT,
+    map_file TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_runs_status ON runs (status, created_at DESC);
+"""
+
+_PROGRESS_COLUMNS = ("total_scans", "completed_scans", "failed_scans")
+
+_catalogs: Dict[str, "RunCatalog"] = {}
+_catalogs_lock = threading.Lock()
+
+
+class RunCatalog:
+    """SQLite (WAL) index over the run directories in a data directory"""
+
+    def __init__(self, data_dir: str = "data"):
+        """
+        Open (and create if needed) the catalog for a data directory
+
+        Args:
+            data_dir: Base data directory containing run_* folders
+        """
+        self.data_dir = data_dir
+        self.db_path = os.path.join(data_dir, CATALOG_FILE)
+        self.is_new = not os.path.exists(self.db_path)
+
+        os.makedirs(data_dir, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived connection (safe to use from any thread)"""
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def upsert_run(self, run_dir: str) -> Optional[Dict[str, Any]]:
+        """
+        (Re)index one run from its files on disk
+
+        Args:
+            run_dir: Run directory
+
+        Returns:
+            The indexed row, or None if the directory does not exist
+        """
+        if not os.path.isdir(run_dir):
+            self.remove_run(run_dir)
+            return None
+
+        row = _read_run_files(run_dir)
+        columns = list(row.keys())
+        placeholders = ", ".join("?" for _ in columns)
+        updates = ", ".join(f"{c} = excluded.{c}" for c in columns if c != "run_name")
+
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO runs ({', '.join(columns)}) VALUES ({placeholders}) "
+                f"ON CONFLICT(run_name) DO UPDATE SET {updates}",
+                [row[c] for c in columns],
+            )
+        return row
+
+    def update_status(self, run_dir: str, status_data: Dict[str, Any]) -> None:
+        """
+        Update status and progress of an indexed run (indexes it if unknown)
+
+        Args:
+            run_dir: Run directory
+            status_data: Status document as written by RunTracker
+        """
+        progress = status_data.get("progress", {})
+        values = {
+            "status": status_data.get("status", "unknown"),
+            "created_at": status_data.get("created_at"),
+            "started_at": status_data.get("started_at"),
+            "completed_at": status_data.get("completed_at"),
+            "error": status_data.get("error"),
+            **{c: progress.get(c, 0) for c in _PROGRESS_COLUMNS},
+            "updated_at": datetime.now().isoformat(),
+        }
+        if progress.get("total_listings"):
+            values["listings"] = progress["total_listings"]
+
+        assignments = ", ".join(f"{c} = ?" for c in values)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE runs SET {assignments} WHERE run_name = ?",
+                [*values.values(), _run_name(run_dir)],
+            )
+            updated = cursor.rowcount
+
+        if not updated:
+            self.upsert_run(run_dir)
+
+    def remove_run(self, run_dir: str) -> None:
+        """Remove a run from the catalog"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM runs WHERE run_name = ?", [_run_name(run_dir)])
+
+    def list_runs(self, statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        List runs, newest first, in a single indexed query
+
+        Args:
+            statuses: Optional list of statuses to include
+
+        Returns:
+            List of run dictionaries
+        """
+        query = "SELECT * FROM runs"
+        params: List[Any] = []
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' for _ in statuses)})"
+            params.extend(statuses)
+        query += " ORDER BY created_at DESC"
+
+        with self._connect() as conn:
+            return [_row_to_run(row) for row in conn.execute(query, params)]
+
+    def get_run(self, run_path: str) -> Optional[Dict[str, Any]]:
+        """Get one run by its directory"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM runs WHERE run_name = ?", [_run_name(run_path)]
+            ).fetchone()
+        return _row_to_run(row) if row else None
+
+    def reconcile(self) -> Dict[str, int]:
+        """
+        Re-sync the catalog with the run directories on disk
+
+        Picks up runs that were added, edited or deleted by hand.
+
+        Returns:
+            Dict with counts of indexed and removed runs
+        """
+        on_disk = set()
+        if os.path.isdir(self.data_dir):
+            for name in os.listdir(self.data_dir):
+                run_path = os.path.join(self.data_dir, name)
+                if name.startswith("run_") and os.path.isdir(run_path):
+                    on_disk.add(name)
+                    self.upsert_run(run_path)
+
+        with self._connect() as conn:
+            indexed = {row[0] for row in conn.execute("SELECT run_name FROM runs")}
+            stale = indexed - on_disk
+            conn.executemany(
+                "DELETE FROM runs WHERE run_name = ?", [[name] for name in stale]
+            )
+
+        return {"indexed": len(on_disk), "removed": len(stale)}
+
+
+def get_catalog(data_dir: str = "data") -> RunCatalog:
+    """
+    Get the (process-wide) catalog for a data directory
+
+    A freshly created catalog is filled from the run directories on disk.
+
+    Args:
+        data_dir: Base data directory
+
+    Returns:
+        RunCatalog instance
+    """
+    key = os.path.abspath(data_dir)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None or not os.path.exists(catalog.db_path):
+            catalog = RunCatalog(data_dir)
+            if catalog.is_new:
+                result = catalog.reconcile()
+                logger.info(f"📇 Run catalog aangemaakt: {result['indexed']} runs")
+            _catalogs[key] = catalog
+    return catalog
+
+
+def _run_name(run_dir: str) -> str:
+    return os.path.basename(os.path.normpath(run_dir))
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_run_files(run_dir: str) -> Dict[str, Any]:
+    """Collect everything the catalog stores about a run from its files"""
+    run_name = _run_name(run_dir)
+    excel_files = find_excel_files(run_dir)
+    manifest = read_manifest(run_dir) or {}
+    config = _read_json(os.path.join(run_dir, "config.json")) or {}
+    status = _read_json(os.path.join(run_dir, "run_status.json"))
+
+    if status is None:
+        # Legacy run without status tracking - completed if it has output files
+        parts = run_name.split("_")
+        status = {
+            "status": "completed" if excel_files or manifest else "legacy",
+            "created_at": f"{parts[-2]} {parts[-1]}" if len(parts) >= 3 else "",
+        }
+
+    progress = status.get("progress", {})
+    listings = manifest.get("listings")
+    if listings is None and progress.get("total_listings"):
+        listings = progress["total_listings"]
+
+    data_path = os.path.join(run_dir, DATA_FILE)
+    map_path = os.path.join(run_dir, "map.html")
+
+    return {
+        "run_name": run_name,
+        "run_path": run_dir,
+        "status": status.get("status", "unknown"),
+        "created_at": status.get("created_at") or "",
+        "started_at": status.get("started_at"),
+        "completed_at": status.get("completed_at"),
+        "error": status.get("error"),
+        "gemeenten": json.dumps(config.get("gemeenten", []), ensure_ascii=False),
+        "period_start": config.get("period_start"),
+        "period_end": config.get("period_end"),
+        "nights_list": json.dumps(config.get("nights_list")),
+        "guests_list": json.dumps(config.get("guests_list")),
+        "measurement_interval": config.get("measurement_interval"),
+        **{c: progress.get(c, 0) for c in _PROGRESS_COLUMNS},
+        "listings": listings,
+        "records": manifest.get("records"),
+        "excel_file": excel_files[0] if excel_files else None,
+        "data_file": DATA_FILE if os.path.exists(data_path) else None,
+        "map_file": "map.html" if os.path.exists(map_path) else None,
+        "updated_at": datetime.now().isoformat(),
+    }
+
+
+def _row_to_run(row: sqlite3.Row) -> Dict[str, Any]:
+    """Convert a catalog row to the run dict shape used by get_all_runs"""
+    run = dict(row)
+    run["gemeenten"] = json.loads(run["gemeenten"] or "[]")
+    run["nights_list"] = json.loads(run["nights_list"] or "null")
+    run["guests_list"] = json.loads(run["guests_list"] or "null")
+    run["progress"] = {
+        **{c: run.pop(c) or 0 for c in _PROGRESS_COLUMNS},
+        "total_listings": run["listings"] or 0,
+    }
+    return run
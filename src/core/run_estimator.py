@@ -0,0 +1,522 @@
+"""
+Run estimator
+Schat calls, duur en rate limits van een run vóór de start, geleerd uit eerdere runs
+
+Elke run schrijft een scan_done event met de duur van de scan en een
+rate_limit event per 429 (src.core.run_events). De estimator leest die
+events van eerdere runs (load_history) en leert daaruit:
+
+- de latency verdeling per call (scan duur / herhalingen, p50 en p90)
+- hoeveel van de ideale parallelle doorvoer een run haalt (efficiency)
+- rate limits per call als functie van de workers per exit IP
+- het aantal listings per gemeente (voor de kalender modus)
+
+Zonder historie gelden de standaardwaarden. Een probe (probe_timings) doet
+een paar echte scans met de voorgestelde instellingen; de gemeten latency
+en rate limits vervangen dan die van de historie.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core import run_events
+from src.core.proxy_pool import DEFAULT_BASE_COOLDOWN, DEFAULT_RATE_PER_PROXY, load_proxies
+from src.core.run_catalog import get_catalog
+from src.core.scraper_core import scrape_all
+from src.data.run_store import DATA_FILE, has_run_dataset
+
+logger = logging.getLogger(__name__)
+
+# Standaardwaarden zonder historie (seconden per API call, incl. paginering)
+DEFAULT_CALL_SECONDS = 2.0
+DEFAULT_CALL_SECONDS_P90 = 4.0
+DEFAULT_EFFICIENCY = 0.8
+DEFAULT_LISTINGS_PER_GEMEENTE = 150
+
+# Aantal eerdere runs waaruit geleerd wordt (nieuwste eerst)
+MAX_HISTORY_RUNS = 50
+
+# Scans in een probe
+PROBE_SCANS = 3
+
+# Een rate limit op één IP legt een worker zo lang stil (backoff)
+RATE_LIMIT_PENALTY = DEFAULT_BASE_COOLDOWN
+
+
+def _parse_ts(ts: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(ts) if ts else None
+    except ValueError:
+        return None
+
+
+def _call_rate(config: Dict[str, Any], workers: int, proxies: int) -> float:
+    """Calls per seconde die de token buckets van de run toelaten"""
+    if config.get("proxy_file"):
+        return proxies * (config.get("proxy_rate") or DEFAULT_RATE_PER_PROXY)
+    return workers / max(config.get("delay_between_calls", 0.5), 0.1)
+
+
+def _proxy_count(config: Dict[str, Any]) -> int:
+    """Aantal exit IPs van een run config (1 zonder proxy lijst)"""
+    proxy_file = config.get("proxy_file")
+    if proxy_file and os.path.exists(proxy_file):
+        return max(1, len(set(load_proxies(proxy_file))))
+    return 1
+
+
+def _ideal_seconds(
+    scan_seconds: float,
+    scans: int,
+    calls: int,
+    rate_limits: float,
+    workers: int,
+    proxies: int,
+    delay_between_scans: float,
+    call_rate: float,
+) -> float:
+    """
+    Duur bij perfecte parallellisatie
+
+    De traagste van: het werk verdeeld over de workers, één scan start per
+    delay_between_scans, en de calls binnen het rate budget. Een rate limit
+    op één IP kost een worker RATE_LIMIT_PENALTY seconden; met meerdere
+    proxies neemt een andere proxy het over.
+    """
+    workers = max(1, workers)
+    seconds = max(
+        scan_seconds / workers,
+        scans * delay_between_scans,
+        calls / call_rate if call_rate > 0 else 0.0,
+    )
+    if proxies <= 1:
+        seconds += rate_limits * RATE_LIMIT_PENALTY / workers
+    return seconds
+
+
+class RunSample:
+    """Timings van één eerdere run (of probe)"""
+
+    def __init__(
+        self,
+        scan_durations: Sequence[float],
+        num_repeat_calls: int,
+        workers: int,
+        proxies: int = 1,
+        failed_scans: int = 0,
+        rate_limits: int = 0,
+        wall_seconds: Optional[float] = None,
+        config: Optional[Dict[str, Any]] = None,
+        listings_per_gemeente: Optional[Dict[str, int]] = None,
+        source: str = "",
+    ):
+        """
+        Args:
+            scan_durations: Duur van elke geslaagde scan (seconden)
+            num_repeat_calls: API calls per scan
+            workers: Parallelle workers van de run
+            proxies: Aantal exit IPs
+            failed_scans: Definitief mislukte scans
+            rate_limits: Aantal rate limit events
+            wall_seconds: Duur van eerste tot laatste scan (None = onbekend)
+            config: Run config (delays en proxy rate)
+            listings_per_gemeente: Unieke listings per gemeente
+            source: Run directory of "probe"
+        """
+        self.scan_durations = np.asarray(scan_durations, dtype=float)
+        self.num_repeat_calls = max(1, num_repeat_calls)
+        self.workers = max(1, workers)
+        self.proxies = max(1, proxies)
+        self.failed_scans = failed_scans
+        self.rate_limits = rate_limits
+        self.wall_seconds = wall_seconds
+        self.config = config or {}
+        self.listings_per_gemeente = listings_per_gemeente or {}
+        self.source = source
+
+    @property
+    def scans(self) -> int:
+        return len(self.scan_durations) + self.failed_scans
+
+    @property
+    def calls(self) -> int:
+        return self.scans * self.num_repeat_calls
+
+    @property
+    def call_latencies(self) -> np.ndarray:
+        """Seconden per call, per geslaagde scan"""
+        return self.scan_durations / self.num_repeat_calls
+
+    @property
+    def intensity(self) -> float:
+        """Workers per exit IP"""
+        return self.workers / self.proxies
+
+    @property
+    def rate_limit_rate(self) -> float:
+        """Rate limits per call"""
+        return self.rate_limits / max(self.calls, 1)
+
+    @property
+    def efficiency(self) -> Optional[float]:
+        """Deel van de ideale doorvoer dat de run haalde (None zonder wall tijd)"""
+        if not self.wall_seconds or not len(self.scan_durations):
+            return None
+        ideal = _ideal_seconds(
+            float(self.scan_durations.sum()),
+            self.scans,
+            self.calls,
+            self.rate_limits,
+            self.workers,
+            self.proxies,
+            self.config.get("delay_between_scans", 1.0),
+            _call_rate(self.config, self.workers, self.proxies),
+        )
+        return float(np.clip(ideal / self.wall_seconds, 0.05, 1.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serialiseerbare vorm (bv. voor een probe in een apart proces)"""
+        return {
+            "scan_durations": self.scan_durations.tolist(),
+            "num_repeat_calls": self.num_repeat_calls,
+            "workers": self.workers,
+            "proxies": self.proxies,
+            "failed_scans": self.failed_scans,
+            "rate_limits": self.rate_limits,
+            "wall_seconds": self.wall_seconds,
+            "config": self.config,
+            "listings_per_gemeente": self.listings_per_gemeente,
+            "source": self.source,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RunSample":
+        """Tegenhanger van to_dict"""
+        return cls(**data)
+
+    @classmethod
+    def from_events(
+        cls,
+        events: List[Dict[str, Any]],
+        config: Dict[str, Any],
+        listings_per_gemeente: Optional[Dict[str, int]] = None,
+        source: str = "",
+    ) -> Optional["RunSample"]:
+        """
+        Sample uit de events van een run (None zonder geslaagde scans)
+
+        Alleen de laatste poging telt: na een hervatting begint de wall tijd
+        opnieuw bij het run_started event.
+        """
+        for i in range(len(events) - 1, -1, -1):
+            if events[i].get("type") == run_events.RUN_STARTED:
+                events = events[i:]
+                break
+
+        durations = []
+        failed = rate_limits = 0
+        first = last = None
+        for event in events:
+            event_type = event.get("type")
+            if event_type == run_events.SCAN_STARTED and first is None:
+                first = _parse_ts(event.get("ts"))
+            elif event_type in (run_events.SCAN_DONE, run_events.SCAN_FAILED):
+                last = _parse_ts(event.get("ts")) or last
+                if event_type == run_events.SCAN_DONE:
+                    # Zonder duur (bv. oude distributed runs) geen latency meting
+                    if event.get("duration") is not None:
+                        durations.append(float(event["duration"]))
+                else:
+                    failed += 1
+            elif event_type == run_events.RATE_LIMIT:
+                rate_limits += 1
+
+        if not durations:
+            return None
+        wall = (last - first).total_seconds() if first and last and last > first else None
+        return cls(
+            durations,
+            config.get("num_repeat_calls", 1),
+            config.get("max_workers", 1),
+            proxies=_proxy_count(config),
+            failed_scans=failed,
+            rate_limits=rate_limits,
+            wall_seconds=wall,
+            config=config,
+            listings_per_gemeente=listings_per_gemeente,
+            source=source,
+        )
+
+    @classmethod
+    def from_run_dir(cls, run_dir: str) -> Optional["RunSample"]:
+        """Sample uit events.jsonl, config.json en (indien aanwezig) data.parquet"""
+        try:
+            with open(os.path.join(run_dir, "config.json"), "r") as f:
+                config = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        events, _ = run_events.RunEventLog(run_dir).read_since(0)
+        listings = None
+        if has_run_dataset(run_dir):
+            try:
+                df = pd.read_parquet(
+                    os.path.join(run_dir, DATA_FILE), columns=["gemeente", "room_id"]
+                )
+                listings = df.groupby("gemeente")["room_id"].nunique().astype(int).to_dict()
+            except (OSError, ValueError, KeyError):
+                listings = None
+        return cls.from_events(events, config, listings, source=run_dir)
+
+
+def load_history(
+    data_dir: str,
+    limit: int = MAX_HISTORY_RUNS,
+    loader: Callable[[str], Optional[RunSample]] = RunSample.from_run_dir,
+) -> List[RunSample]:
+    """
+    Timings van de nieuwste voltooide en mislukte runs in de data directory
+
+    Args:
+        data_dir: Basis data directory
+        limit: Maximum aantal runs
+        loader: Leest één run directory (bv. via een cache)
+
+    Returns:
+        Lijst van RunSamples (runs zonder scan events vallen af)
+    """
+    if not os.path.exists(data_dir):
+        return []
+    samples = []
+    for run in get_catalog(data_dir).list_runs(statuses=["completed", "failed"]):
+        sample = loader(run["run_path"])
+        if sample is not None:
+            samples.append(sample)
+        if len(samples) >= limit:
+            break
+    return samples
+
+
+class _EventRecorder:
+    """Tracker vervanger voor de probe: houdt de events in het geheugen"""
+
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+
+    def emit(self, event_type: str, **fields) -> Dict[str, Any]:
+        event = {"ts": datetime.now().isoformat(), "type": event_type, **fields}
+        self.events.append(event)
+        return event
+
+    def update(self, **fields) -> Dict[str, Any]:
+        return self.emit(run_events.PROGRESS, **fields)
+
+    def log(self, message: str):
+        logger.info(message)
+
+
+def probe_timings(
+    gemeenten: Sequence[str],
+    scan_combinations: Sequence[Tuple[str, str, int, int, int]],
+    config: Dict[str, Any],
+    sample_scans: int = PROBE_SCANS,
+    **scrape_kwargs,
+) -> Optional[RunSample]:
+    """
+    Kalibreer met een paar echte scans
+
+    Kiest sample_scans combinaties verspreid over de periode en gemeenten
+    en draait ze met scrape_all en de instellingen van de voorgestelde run.
+
+    Args:
+        gemeenten: Gemeenten van de run
+        scan_combinations: Scan combinaties van de run
+        config: Voorgestelde run config (workers, herhalingen, proxies)
+        sample_scans: Aantal scans in de probe
+        **scrape_kwargs: Overige argumenten voor scrape_all (gpkg_path, zoom_value, ...)
+
+    Returns:
+        RunSample van de probe (None als geen scan slaagde)
+    """
+    if not gemeenten or not scan_combinations:
+        return None
+    picks = np.linspace(0, len(scan_combinations) - 1, min(sample_scans, len(scan_combinations)))
+    recorder = _EventRecorder()
+    recorder.emit(run_events.RUN_STARTED)
+    for i, index in enumerate(picks.round().astype(int)):
+        gemeente = gemeenten[i % len(gemeenten)]
+        scrape_all(
+            gemeenten=[gemeente],
+            scan_combinations=[scan_combinations[index]],
+            num_repeat_calls=config["num_repeat_calls"],
+            show_progress=False,
+            tracker=recorder,
+            retry_rounds=0,
+            **scrape_kwargs,
+        )
+    # De probe draait scans één voor één; de wall tijd zegt niets over parallel werk
+    sample = RunSample.from_events(recorder.events, config, source="probe")
+    if sample is not None:
+        sample.wall_seconds = None
+        logger.info(
+            f"🔬 Probe: {sample.scans} scans, "
+            f"{np.median(sample.call_latencies):.1f}s per call, {sample.rate_limits} rate limits"
+        )
+    return sample
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 120:
+        return f"{seconds:.0f}s"
+    if seconds < 2 * 3600:
+        return f"{seconds / 60:.0f}m"
+    return f"{seconds / 3600:.1f}u"
+
+
+class RunEstimate:
+    """Verwachte omvang en duur van een run"""
+
+    def __init__(
+        self,
+        scans: int,
+        calls: int,
+        seconds: float,
+        seconds_high: float,
+        rate_limit_hits: float,
+        listings: Optional[int],
+        history_runs: int,
+        probed: bool,
+    ):
+        self.scans = scans
+        self.calls = calls
+        self.seconds = seconds
+        self.seconds_high = seconds_high
+        self.rate_limit_hits = rate_limit_hits
+        self.listings = listings
+        self.history_runs = history_runs
+        self.probed = probed
+
+    def summary(self) -> str:
+        """Eén regel voor run.log en dashboard"""
+        if self.history_runs or self.probed:
+            basis = f"{self.history_runs} eerdere runs" + (" + probe" if self.probed else "")
+        else:
+            basis = "standaardwaarden, nog geen eerdere runs"
+        listings = f" │ ~{self.listings:,} listings" if self.listings else ""
+        return (
+            f"⏱️ Schatting: {self.scans:,} scans, {self.calls:,} calls │ "
+            f"~{_format_duration(self.seconds)} (p90 {_format_duration(self.seconds_high)}) │ "
+            f"~{self.rate_limit_hits:.0f} rate limits{listings} │ {basis}"
+        )
+
+
+class RunEstimator:
+    """Voorspelt calls, duur en rate limits uit RunSamples"""
+
+    def __init__(self, samples: Sequence[RunSample], probe: Optional[RunSample] = None):
+        """
+        Args:
+            samples: Eerdere runs (load_history)
+            probe: Optionele probe (probe_timings); vervangt de latency en
+                rate limit metingen van de historie
+        """
+        self.samples = list(samples)
+        self.probe = probe
+
+        timing = [probe] if probe is not None else self.samples
+        latencies = np.concatenate([s.call_latencies for s in timing]) if timing else []
+        if len(latencies):
+            self.call_seconds = float(np.percentile(latencies, 50))
+            self.call_seconds_high = float(np.percentile(latencies, 90))
+        else:
+            self.call_seconds = DEFAULT_CALL_SECONDS
+            self.call_seconds_high = DEFAULT_CALL_SECONDS_P90
+
+        efficiencies = [s.efficiency for s in self.samples if s.efficiency is not None]
+        self.efficiency = float(np.median(efficiencies)) if efficiencies else DEFAULT_EFFICIENCY
+
+        # Rate limits per call per intensiteit (gemiddeld per intensiteit)
+        points: Dict[float, List[float]] = {}
+        for sample in timing:
+            points.setdefault(sample.intensity, []).append(sample.rate_limit_rate)
+        self._intensities = np.array(sorted(points))
+        self._rate_limit_rates = np.array([np.mean(points[x]) for x in self._intensities])
+
+        counts: Dict[str, List[int]] = {}
+        for sample in self.samples:
+            for gemeente, count in sample.listings_per_gemeente.items():
+                counts.setdefault(gemeente, []).append(count)
+        self.listings_per_gemeente = {g: int(np.median(c)) for g, c in counts.items()}
+
+    def rate_limit_rate(self, intensity: float) -> float:
+        """
+        Verwachte rate limits per call bij een aantal workers per exit IP
+
+        Lineair tussen de gemeten intensiteiten; daarbuiten geldt de
+        dichtstbijzijnde meting (zonder metingen 0).
+        """
+        if not len(self._intensities):
+            return 0.0
+        return float(np.interp(intensity, self._intensities, self._rate_limit_rates))
+
+    def listings(self, gemeenten: Sequence[str]) -> int:
+        """Verwachte unieke listings over gemeenten (mediaan van eerdere runs)"""
+        return sum(
+            self.listings_per_gemeente.get(g, DEFAULT_LISTINGS_PER_GEMEENTE) for g in gemeenten
+        )
+
+    def estimate(
+        self,
+        config: Dict[str, Any],
+        scans: int,
+        extra_calls: int = 0,
+        workers: Optional[int] = None,
+        listings: Optional[int] = None,
+    ) -> RunEstimate:
+        """
+        Schat een voorgestelde run
+
+        Args:
+            config: Run config (num_repeat_calls, max_workers, delays, proxy_file)
+            scans: Aantal search scans
+            extra_calls: Losse calls naast de scans (bv. kalenders)
+            workers: Aantal workers (None = max_workers uit de config)
+            listings: Verwachte listings (alleen voor de samenvatting)
+
+        Returns:
+            RunEstimate
+        """
+        workers = max(1, workers or config.get("max_workers", 1))
+        proxies = _proxy_count(config)
+        calls = scans * config["num_repeat_calls"] + extra_calls
+        rate_limits = calls * self.rate_limit_rate(workers / proxies)
+
+        def _seconds(call_seconds: float) -> float:
+            ideal = _ideal_seconds(
+                calls * call_seconds,
+                scans,
+                calls,
+                rate_limits,
+                workers,
+                proxies,
+                config.get("delay_between_scans", 1.0),
+                _call_rate(config, workers, proxies),
+            )
+            return ideal / self.efficiency
+
+        return RunEstimate(
+            scans=scans,
+            calls=calls,
+            seconds=_seconds(self.call_seconds),
+            seconds_high=_seconds(self.call_seconds_high),
+            rate_limit_hits=rate_limits,
+            listings=listings,
+            history_runs=len(self.samples),
+            probed=self.probe is not None,
+        )
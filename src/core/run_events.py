@@ -0,0 +1,278 @@
+"""
+Run Event Stream
+Append-only JSONL event log per run; the run status is a fold over the events
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+EVENTS_FILE = "events.jsonl"
+
+# Event types emitted by the tracker and the scrape engine
+RUN_STARTED = "run_started"
+RUN_COMPLETED = "run_completed"
+RUN_FAILED = "run_failed"
+RUN_CANCELLED = "run_cancelled"
+SCAN_STARTED = "scan_started"
+SCAN_DONE = "scan_done"
+SCAN_FAILED = "scan_failed"
+RATE_LIMIT = "rate_limit"
+CHECKPOINT = "checkpoint"
+PROGRESS = "progress"
+
+
+def empty_status(created_at: Optional[str] = None) -> Dict[str, Any]:
+    """Status document of a run before any event"""
+    return {
+        "status": "pending",
+        "created_at": created_at or datetime.now().isoformat(),
+        "started_at": None,
+        "completed_at": None,
+        "progress": {
+            "total_scans": 0,
+            "completed_scans": 0,
+            "failed_scans": 0,
+            "total_listings": 0,
+            "active_scans": 0,
+            "rate_limits": 0,
+        },
+        "last_checkpoint": None,
+        "error": None,
+    }
+
+
+def apply_event(status: Dict[str, Any], event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fold one event into a status document (in place)
+
+    Args:
+        status: Status document (see empty_status)
+        event: Event dict with at least "type" and "ts"
+
+    Returns:
+        The updated status document
+    """
+    progress = status.setdefault("progress", {})
+    for key in empty_status()["progress"]:
+        progress.setdefault(key, 0)
+
+    event_type = event.get("type")
+    ts = event.get("ts")
+
+    if event_type == RUN_STARTED:
+        status["status"] = "running"
+        status["started_at"] = ts
+        status["completed_at"] = None
+        status["error"] = None
+        progress["total_scans"] = event.get("total_scans", progress["total_scans"])
+        # A (re)start begins from the counters it reports (0 for a fresh run)
+        progress["active_scans"] = 0
+        for key in ("completed_scans", "failed_scans", "total_listings"):
+            if key in event:
+                progress[key] = event[key]
+    elif event_type == SCAN_STARTED:
+        progress["active_scans"] += 1
+    elif event_type == SCAN_DONE:
+        progress["active_scans"] = max(0, progress["active_scans"] - 1)
+        progress["completed_scans"] += 1
+        if "total_listings" in event:
+            progress["total_listings"] = event["total_listings"]
+    elif event_type == SCAN_FAILED:
+        progress["active_scans"] = max(0, progress["active_scans"] - 1)
+        progress["failed_scans"] += 1
+    elif event_type == RATE_LIMIT:
+        progress["rate_limits"] += 1
+    elif event_type == CHECKPOINT:
+        status["last_checkpoint"] = {
+            k: v for k, v in event.items() if k not in ("type", "ts")
+        }
+    elif event_type == PROGRESS:
+        # Progress counters go into "progress", other fields are top-level
+        for key, value in event.items():
+            if key in ("type", "ts") or value is None:
+                continue
+            if key in progress:
+                progress[key] = value
+            else:
+                status[key] = value
+    elif event_type == RUN_COMPLETED:
+        status["status"] = "completed"
+        status["completed_at"] = ts
+        progress["active_scans"] = 0
+        if "total_listings" in event:
+            progress["total_listings"] = event["total_listings"]
+    elif event_type == RUN_FAILED:
+        status["status"] = "failed"
+        status["completed_at"] = ts
+        status["error"] = event.get("error")
+        progress["active_scans"] = 0
+    elif event_type == RUN_CANCELLED:
+        status["status"] = "cancelled"
+        status["completed_at"] = ts
+        progress["active_scans"] = 0
+
+    return status
+
+
+class RunEventLog:
+    """Append-only event log (events.jsonl) of one run"""
+
+    def __init__(self, run_dir: str):
+        """
+        Args:
+            run_dir: Run directory
+        """
+        self.run_dir = run_dir
+        self.path = os.path.join(run_dir, EVENTS_FILE)
+        self._lock = threading.Lock()
+
+    def emit(self, event_type: str, **fields) -> Dict[str, Any]:
+        """
+        Append one event
+
+        Args:
+            event_type: Event type (e.g. SCAN_DONE)
+            **fields: JSON-serializable event payload
+
+        Returns:
+            The written event
+        """
+        event = {"ts": datetime.now().isoformat(), "type": event_type, **fields}
+        line = json.dumps(event, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            # Single write of a complete line; readers ignore a partial last line
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+        return event
+
+    def read_since(self, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read complete events written after a byte offset
+
+        Args:
+            offset: Byte offset returned by a previous call (0 = from start)
+
+        Returns:
+            Tuple of (events, new_offset)
+        """
+        if not os.path.exists(self.path):
+            return [], offset
+
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+
+        # Only consume up to the last newline (a writer may be mid-line)
+        end = data.rfind(b"\n") + 1
+        events = []
+        for raw in data[:end].splitlines():
+            if raw.strip():
+                try:
+                    events.append(json.loads(raw))
+                except ValueError:
+                    continue
+        return events, offset + end
+
+    def follow(
+        self, offset: int = 0, idle_sleep: float = 0.5, stop_on_finish: bool = True
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield events from an offset onwards, waiting for new ones (like tail -f)
+
+        Args:
+            offset: Byte offset to start from
+            idle_sleep: Wait time when no new data is available
+            stop_on_finish: Stop after a run_completed/failed/cancelled event
+
+        Yields:
+            Event dicts (with "_offset": byte offset after the event batch)
+        """
+        while True:
+            events, offset = self.read_since(offset)
+            for event in events:
+                event["_offset"] = offset
+                yield event
+                if stop_on_finish and event.get("type") in (
+                    RUN_COMPLETED,
+                    RUN_FAILED,
+                    RUN_CANCELLED,
+                ):
+                    return
+            if not events:
+                time.sleep(idle_sleep)
+
+
+class RunStatusView:
+    """Incrementally maintained status derived from a run's event stream"""
+
+    def __init__(self, run_dir: str, base: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            run_dir: Run directory
+            base: Initial status document (e.g. from run_status.json)
+        """
+        self.events = RunEventLog(run_dir)
+        self.offset = 0
+        self._base = copy.deepcopy(base) if base else empty_status()
+        self._status = copy.deepcopy(self._base)
+        self._lock = threading.Lock()
+
+    def refresh(self) -> Dict[str, Any]:
+        """Fold in events appended since the last refresh and return the status"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.events.path)
+            except OSError:
+                size = 0
+            if size < self.offset:
+                # File was truncated/replaced: rebuild from scratch
+                self._status = copy.deepcopy(self._base)
+                self.offset = 0
+            events, offset = self.events.read_since(self.offset)
+            for event in events:
+                apply_event(self._status, event)
+            self.offset = offset
+            return copy.deepcopy(self._status)
+
+
+_views: Dict[str, RunStatusView] = {}
+_views_lock = threading.Lock()
+
+
+def get_status_view(run_dir: str, base: Optional[Dict[str, Any]] = None) -> RunStatusView:
+    """
+    Get the (process-wide) status view of a run
+
+    Repeated calls reuse the view, so each refresh only reads new events.
+
+    Args:
+        run_dir: Run directory
+        base: Initial status document, used when the view is created
+
+    Returns:
+        RunStatusView
+    """
+    key = os.path.abspath(run_dir)
+    with _views_lock:
+        view = _views.get(key)
+        if view is None:
+            view = RunStatusView(run_dir, base)
+            _views[key] = view
+    return view
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    """One-line human readable rendering of an event (for CLI tail)"""
+    ts = str(event.get("ts", ""))[11:19]
+    event_type = event.get("type", "?")
+    details = " ".join(
+        f"{k}={v}"
+        for k, v in event.items()
+        if k not in ("ts", "type", "_offset") and v is not None
+    )
+    return f"[{ts}] {event_type:<14} {details}"
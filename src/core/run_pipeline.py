@@ -0,0 +1,717 @@
+"""
+Run Pipeline
+Aanmaken en uitvoeren van een complete scrape run (scrapen, exporteren,
+visualisaties), los van het dashboard zodat een job worker hem in een eigen
+proces kan draaien
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from src.core import run_events
+from src.core.boundaries import load_boundaries, pick_boundary_level
+from src.core.calendar_mode import (
+    CALENDAR_CACHE_DIR,
+    DISCOVERY_SCANS,
+    CalendarCache,
+    calendar_blocks,
+    pick_discovery_combinations,
+    scrape_calendars,
+)
+from src.core.hedging import DEFAULT_HEDGE_PERCENTILE, HedgePolicy
+from src.core.proxy_pool import DEFAULT_RATE_PER_PROXY, ProxyPool, load_proxy_pool
+from src.core.run_catalog import get_catalog
+from src.core.run_estimator import (
+    RunEstimate,
+    RunEstimator,
+    RunSample,
+    load_history,
+    probe_timings,
+)
+from src.core.run_tracker import RunTracker
+from src.core.scan_planner import (
+    DEFAULT_COVERAGE_GOAL,
+    DEFAULT_MAX_TILE_NIGHTS,
+    ScanPlan,
+    StayModel,
+    plan_scans,
+    run_scan_plan,
+)
+from src.core.nationwide import TILE_CAPACITY, plan_tiles, probe_density
+from src.core.shared_areas import ScanArea, plan_shared_areas
+from src.core.scraper_core import (
+    DEFAULT_RETRY_ROUNDS,
+    generate_scan_combinations,
+    scrape_all,
+    scrape_all_async,
+)
+from src.data.data_processor import calculate_availability, prepare_export_data
+from src.data.exporter import export_to_excel
+from src.data.raw_archive import RAW_ARCHIVE_FILE, RawArchive
+from src.data.run_store import load_run_dataset, write_partitioned_dataset, write_run_dataset
+from src.visualization.graph_creator import create_availability_timeline_graph
+from src.visualization.map_creator import DEFAULT_ZOOM, create_map
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = "config.json"
+MISSING_SCANS_FILE = "missing_scans.json"
+DENSITY_FILE = "tile_density.parquet"
+
+
+def create_run(data_dir: str, config: Dict[str, Any]) -> str:
+    """
+    Maak een nieuwe run directory met config.json en registreer hem in de catalog
+
+    Args:
+        data_dir: Basis data directory
+        config: Run configuratie (gemeenten, periode, nachten, gasten, ...)
+
+    Returns:
+        Pad naar de run directory
+    """
+    gemeenten = config["gemeenten"]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if config.get("nationwide"):
+        gemeente_name = "Nederland"
+    else:
+        gemeente_name = (
+            "_".join(gemeenten) if len(gemeenten) <= 3 else f"{gemeenten[0]}_etc"
+        )
+    output_dir = os.path.join(data_dir, f"run_{gemeente_name}_{timestamp}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    config = dict(config)
+    config.setdefault("measurement_date", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    for key in ("nights_list", "guests_list"):
+        # Veiligheidscheck: altijd lijsten
+        if isinstance(config.get(key), int):
+            config[key] = [config[key]]
+
+    with open(os.path.join(output_dir, CONFIG_FILE), "w") as f:
+        json.dump(config, f, indent=2)
+
+    # Tracker maakt run_status.json (status "pending") aan
+    RunTracker(output_dir)
+    get_catalog(data_dir).upsert_run(output_dir)
+    return output_dir
+
+
+def load_config(run_dir: str) -> Dict[str, Any]:
+    """Lees config.json van een run"""
+    with open(os.path.join(run_dir, CONFIG_FILE), "r") as f:
+        return json.load(f)
+
+
+def get_scan_combinations(config: Dict[str, Any]) -> list:
+    """Scan combinaties (checkin, checkout, nachten, gasten, scan_id) van een run config"""
+    scan_combinations, _ = generate_scan_combinations(
+        config["period_start"],
+        config["period_end"],
+        config["nights_list"],
+        config["guests_list"],
+        config["measurement_interval"],
+        config.get("days_of_week"),
+        config.get("weeks_interval", 1),
+        config.get("monthly_interval", False),
+    )
+    return scan_combinations
+
+
+def get_proxy_pool(config: Dict[str, Any]) -> Optional[ProxyPool]:
+    """
+    Proxy pool van een run config (None als er geen proxy_file is ingesteld)
+
+    Config keys: proxy_file (één proxy per regel, zie src.core.proxy_pool) en
+    proxy_rate (requests per seconde per proxy).
+    """
+    proxy_file = config.get("proxy_file")
+    if not proxy_file:
+        return None
+    return load_proxy_pool(
+        proxy_file, rate_per_proxy=config.get("proxy_rate") or DEFAULT_RATE_PER_PROXY
+    )
+
+
+def get_hedge_policy(config: Dict[str, Any]) -> Optional[HedgePolicy]:
+    """
+    Hedge policy van een run config (None als hedging uit staat)
+
+    Config keys: hedge_budget (max. extra calls als fractie, bv. 0.1 = 10%) en
+    hedge_percentile (latency percentiel waarna een call gehedged wordt).
+    """
+    budget = config.get("hedge_budget") or 0.0
+    if budget <= 0:
+        return None
+    return HedgePolicy(
+        hedge_percentile=config.get("hedge_percentile") or DEFAULT_HEDGE_PERCENTILE,
+        budget=budget,
+    )
+
+
+def load_resume_state(run_dir: str) -> Tuple[Optional[pd.DataFrame], Set[Tuple[str, int]]]:
+    """
+    Bepaal waar een afgebroken run verder kan gaan
+
+    Alleen scans die vóór het laatste checkpoint klaar waren tellen als
+    gedaan: hun resultaten staan in dat checkpoint. Latere scans worden
+    opnieuw uitgevoerd.
+
+    Args:
+        run_dir: Run directory
+
+    Returns:
+        Tuple van (checkpoint data of None, set van (gemeente, scan_id) die al gedaan zijn)
+    """
+    events, _ = run_events.RunEventLog(run_dir).read_since(0)
+
+    done: Set[Tuple[str, int]] = set()
+    pending: Set[Tuple[str, int]] = set()
+    checkpoint_scans = None
+    for event in events:
+        event_type = event.get("type")
+        if event_type == run_events.RUN_STARTED:
+            # Niet gecheckpointe scans van een vorige poging zijn verloren
+            pending = set()
+        elif event_type == run_events.SCAN_DONE:
+            pending.add((event.get("gemeente"), event.get("scan_id")))
+        elif event_type == run_events.CHECKPOINT:
+            done |= pending
+            pending = set()
+            checkpoint_scans = event.get("scans")
+
+    if checkpoint_scans is None:
+        return None, set()
+
+    checkpoint_file = os.path.join(
+        run_dir, f"checkpoint_batch_{checkpoint_scans}.parquet"
+    )
+    if not os.path.exists(checkpoint_file):
+        logger.warning(f"Checkpoint ontbreekt, run start opnieuw: {checkpoint_file}")
+        return None, set()
+
+    return pd.read_parquet(checkpoint_file), done
+
+
+def load_missing_scans(run_dir: str) -> List[Dict[str, Any]]:
+    """
+    Scans van een run die definitief mislukt zijn (ontbrekende grid cellen)
+
+    Een scan_failed event telt tot een latere scan_done (bv. na hervatten)
+    dezelfde (gemeente, scan_id) alsnog invult.
+
+    Returns:
+        Lijst van dicts met gemeente, checkin, nights, scan_id, category, error
+        (en gemeenten: de gemeenten van een gedeeld scan gebied of tegel)
+    """
+    events, _ = run_events.RunEventLog(run_dir).read_since(0)
+
+    missing: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for event in events:
+        key = (event.get("gemeente"), event.get("scan_id"))
+        if event.get("type") == run_events.SCAN_FAILED:
+            missing[key] = {
+                "gemeente": event.get("gemeente"),
+                "checkin": event.get("checkin"),
+                "nights": event.get("nights"),
+                "scan_id": event.get("scan_id"),
+                "category": event.get("category"),
+                "error": event.get("error"),
+            }
+            if event.get("gemeenten"):
+                missing[key]["gemeenten"] = event["gemeenten"]
+        elif event.get("type") == run_events.SCAN_DONE:
+            missing.pop(key, None)
+    return list(missing.values())
+
+
+def get_raw_archive(run_dir: str, config: Dict[str, Any]) -> Optional[RawArchive]:
+    """
+    Archief voor de ruwe API records van een run (None als archive_raw uit staat)
+
+    Config key: archive_raw; de records komen in run_dir/raw_api.jsonl.gz.
+    """
+    if not config.get("archive_raw"):
+        return None
+    return RawArchive(os.path.join(run_dir, RAW_ARCHIVE_FILE))
+
+
+def get_scan_areas(
+    config: Dict[str, Any],
+    gpkg_path: str,
+    scan_combinations: list,
+    proxy_pool: Optional[ProxyPool] = None,
+    run_dir: Optional[str] = None,
+) -> Optional[List[ScanArea]]:
+    """
+    Scan gebieden van een run (None = één scan per gemeente)
+
+    Config keys:
+        nationwide: Landelijke modus, tegels naar listing dichtheid (zie
+            src.core.nationwide). De dichtheid komt uit density_run (een
+            eerdere run directory) of anders uit een probe op de eerste datum
+        tile_capacity: Maximum aantal listings per tegel
+        shared_bboxes: Multi-gemeente modus, buurgemeenten delen een bbox
+
+    Met run_dir wordt de dichtheid van de probe in de run opgeslagen
+    (DENSITY_FILE): een hervatte run krijgt zo dezelfde tegels, zonder
+    nieuwe probe calls.
+    """
+    if config.get("nationwide"):
+        capacity = config.get("tile_capacity", TILE_CAPACITY)
+        density = None
+        density_run = config.get("density_run")
+        density_file = os.path.join(run_dir, DENSITY_FILE) if run_dir else None
+        if density_run:
+            dataset = load_run_dataset(density_run)
+            if dataset is not None:
+                density = dataset[0].drop_duplicates("room_id")
+        if density is None and density_file and os.path.exists(density_file):
+            density = pd.read_parquet(density_file)
+            logger.info(f"🗺️ Tegels uit opgeslagen dichtheid: {density_file}")
+        elif density is None:
+            check_in, check_out = scan_combinations[0][:2]
+            density = probe_density(
+                gpkg_path,
+                check_in,
+                check_out,
+                config["zoom_value"],
+                config["currency"],
+                config["language"],
+                gemeenten=config["gemeenten"],
+                capacity=capacity,
+                proxy_pool=proxy_pool,
+            )
+            if density_file:
+                density.to_parquet(density_file, index=False)
+        return plan_tiles(gpkg_path, config["gemeenten"], density, capacity=capacity)
+    if config.get("shared_bboxes"):
+        return plan_shared_areas(gpkg_path, config["gemeenten"])
+    return None
+
+
+def get_scan_plan(
+    config: Dict[str, Any], scan_units: int, scan_combinations: list
+) -> Optional[ScanPlan]:
+    """
+    Scan plan bij een dekkingsdoel en API budget (None als plan_scans uit staat)
+
+    Config keys: plan_scans, coverage_goal (0-1), api_budget (calls),
+    max_tile_nights en reference_run (eerdere run directory voor het
+    StayModel; zonder referentie geldt de prior). nights_list wordt in deze
+    modus niet gebruikt.
+    """
+    if not config.get("plan_scans"):
+        return None
+    model = None
+    reference_run = config.get("reference_run")
+    if reference_run:
+        dataset = load_run_dataset(reference_run)
+        if dataset is not None:
+            model = StayModel.from_run(dataset[0])
+    return plan_scans(
+        config["period_start"],
+        config["period_end"],
+        scan_units,
+        len(config["guests_list"]),
+        config["num_repeat_calls"],
+        coverage_goal=config.get("coverage_goal", DEFAULT_COVERAGE_GOAL),
+        api_budget=config.get("api_budget"),
+        max_tile_nights=config.get("max_tile_nights", DEFAULT_MAX_TILE_NIGHTS),
+        model=model,
+        grid_scans=len(scan_combinations),
+    )
+
+
+def count_scans(
+    config: Dict[str, Any], scan_combinations: list, scan_plan: Optional[ScanPlan] = None
+) -> int:
+    """
+    Search scans per scan gebied bij de start van een run
+
+    Kalender modus: alleen de discovery scans; scan plan: de tegels (de
+    verfijningen komen er tijdens de run bij).
+    """
+    if scan_plan is not None:
+        return len(scan_plan.windows) * len(config["guests_list"])
+    if config.get("engine") == "calendar":
+        return len(
+            pick_discovery_combinations(
+                scan_combinations, config.get("discovery_scans", DISCOVERY_SCANS)
+            )
+        )
+    return len(scan_combinations)
+
+
+def estimate_run(
+    config: Dict[str, Any],
+    data_dir: str,
+    gpkg_path: Optional[str] = None,
+    scan_units: Optional[int] = None,
+    scan_combinations: Optional[list] = None,
+    scan_plan: Optional[ScanPlan] = None,
+    workers: Optional[int] = None,
+    probe: Optional[RunSample] = None,
+    history: Optional[List[RunSample]] = None,
+) -> RunEstimate:
+    """
+    Schat calls, duur en rate limits van een run config vóór de start
+
+    Geleerd uit de eerdere runs in data_dir (zie src.core.run_estimator).
+
+    Args:
+        config: Run config (zoals create_run hem opslaat)
+        data_dir: Basis data directory met eerdere runs
+        gpkg_path: Pad naar gemeentegrenzen GeoPackage (nodig voor het aantal
+            gedeelde gebieden of tegels)
+        scan_units: Aantal scan gebieden (None = afleiden uit de config)
+        scan_combinations: Scan combinaties (None = uit de config)
+        scan_plan: Scan plan (None = uit de config)
+        workers: Aantal workers (None = max_workers uit de config)
+        probe: Meting van run_probe; vervangt latency en rate limits van de historie
+        history: Eerdere runs (None = load_history(data_dir))
+
+    Returns:
+        RunEstimate
+    """
+    gemeenten = config["gemeenten"]
+    if scan_combinations is None:
+        scan_combinations = get_scan_combinations(config)
+    if scan_units is None:
+        scan_units = len(gemeenten)
+        if gpkg_path and config.get("nationwide"):
+            # Zonder density_run vaste tegels (de echte run doet eerst een probe)
+            density = None
+            if config.get("density_run"):
+                dataset = load_run_dataset(config["density_run"])
+                density = dataset[0].drop_duplicates("room_id") if dataset else None
+            scan_units = len(
+                plan_tiles(
+                    gpkg_path,
+                    gemeenten,
+                    density,
+                    capacity=config.get("tile_capacity", TILE_CAPACITY),
+                )
+            )
+        elif gpkg_path and config.get("shared_bboxes"):
+            scan_units = len(plan_shared_areas(gpkg_path, gemeenten))
+    if scan_plan is None:
+        scan_plan = get_scan_plan(config, scan_units, scan_combinations)
+
+    if history is None:
+        history = load_history(data_dir)
+    estimator = RunEstimator(history, probe=probe)
+
+    known = [g for g in gemeenten if g in estimator.listings_per_gemeente]
+    listings = estimator.listings(gemeenten) if known else None
+    if scan_plan is not None:
+        # Het plan rekent met de volledige verfijning (bovengrens)
+        scans = scan_plan.expected_calls // max(1, config["num_repeat_calls"])
+    else:
+        scans = count_scans(config, scan_combinations) * scan_units
+    extra_calls = 0
+    if scan_plan is None and config.get("engine") == "calendar":
+        # Eén kalender request per listing per blok (zonder cache hits)
+        listings = estimator.listings(gemeenten)
+        extra_calls = listings * len(
+            calendar_blocks(config["period_start"], config["period_end"])
+        )
+    return estimator.estimate(
+        config, scans, extra_calls=extra_calls, workers=workers, listings=listings
+    )
+
+
+def run_probe(config: Dict[str, Any], gpkg_path: str) -> Optional[RunSample]:
+    """
+    Kalibreer de schatting met een paar echte scans (kost API calls)
+
+    Draait probe_timings met de instellingen van de run config; bedoeld voor
+    een apart proces (zie src.core.job_runner.start_probe).
+
+    Returns:
+        RunSample van de probe (None als geen scan slaagde)
+    """
+    return probe_timings(
+        config["gemeenten"],
+        get_scan_combinations(config),
+        config,
+        gpkg_path=gpkg_path,
+        zoom_value=config["zoom_value"],
+        price_min=config["price_min"],
+        price_max=config["price_max"],
+        amenities=[],
+        currency=config["currency"],
+        language=config["language"],
+        proxy_url="",
+        measurement_date=config.get("measurement_date")
+        or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        max_workers=config["max_workers"],
+        delay_between_scans=config.get("delay_between_scans", 1.0),
+        delay_between_calls=config.get("delay_between_calls", 0.5),
+        proxy_pool=get_proxy_pool(config),
+    )
+
+
+def get_calendar_cache(run_dir: str, config: Dict[str, Any]) -> CalendarCache:
+    """
+    Kalender cache voor de kalender modus
+
+    Config key: calendar_cache_dir; standaard gedeeld door alle runs in de
+    data directory (data_dir/calendar_cache).
+    """
+    cache_dir = config.get("calendar_cache_dir") or os.path.join(
+        os.path.dirname(os.path.abspath(run_dir)), CALENDAR_CACHE_DIR
+    )
+    return CalendarCache(cache_dir)
+
+
+def execute_run(run_dir: str, gpkg_path: str, resume: bool = False) -> bool:
+    """
+    Voer een run uit: scrapen, exporteren en visualisaties maken
+
+    Voortgang en resultaat lopen via de RunTracker (events.jsonl, run.log).
+
+    Args:
+        run_dir: Run directory met config.json (zie create_run)
+        gpkg_path: Pad naar gemeentegrenzen GeoPackage
+        resume: Ga verder vanaf het laatste checkpoint
+
+    Returns:
+        True als de run voltooid is
+    """
+    tracker = RunTracker(run_dir)
+
+    try:
+        config = load_config(run_dir)
+        gemeenten = config["gemeenten"]
+        scan_combinations = get_scan_combinations(config)
+
+        proxy_pool = get_proxy_pool(config)
+        if proxy_pool is not None:
+            tracker.log(f"🌐 {len(proxy_pool)} proxies uit {config['proxy_file']}")
+
+        # Landelijke / multi-gemeente modus: één scan per tegel of gedeeld gebied
+        scan_areas = get_scan_areas(
+            config, gpkg_path, scan_combinations, proxy_pool, run_dir=run_dir
+        )
+        scan_units = scan_areas if scan_areas is not None else gemeenten
+        discovery_scans = config.get("discovery_scans", DISCOVERY_SCANS)
+        scan_plan = get_scan_plan(config, len(scan_units), scan_combinations)
+        total_scans = count_scans(config, scan_combinations, scan_plan) * len(scan_units)
+
+        initial_data, done = (None, set())
+        if resume:
+            initial_data, done = load_resume_state(run_dir)
+        initial_listings = (
+            int(initial_data["room_id"].nunique()) if initial_data is not None else 0
+        )
+
+        tracker.start(
+            total_scans=total_scans,
+            completed_scans=len(done),
+            total_listings=initial_listings,
+        )
+
+        if scan_plan is not None:
+            tracker.log(scan_plan.summary())
+        if not done:
+            # Alleen informatief: een fout in de historie mag de run niet stoppen
+            try:
+                tracker.log(
+                    estimate_run(
+                        config,
+                        os.path.dirname(os.path.abspath(run_dir)),
+                        scan_units=len(scan_units),
+                        scan_combinations=scan_combinations,
+                        scan_plan=scan_plan,
+                    ).summary()
+                )
+            except Exception as e:
+                logger.warning(f"Geen schatting voor deze run: {e}")
+
+        # Initiële progress bar
+        tracker.log(
+            f"⚡ 🔴 {len(done)}/{total_scans} │ 🏠 {initial_listings:,} listings │ ⏱️ 0.0m / ~0m"
+        )
+
+        raw_archive = get_raw_archive(run_dir, config)
+        start_time = time.time()
+
+        # Voortgang wordt door scrape_all via tracker events gerapporteerd
+        scrape_kwargs = dict(
+            gemeenten=gemeenten,
+            scan_combinations=scan_combinations,
+            gpkg_path=gpkg_path,
+            num_repeat_calls=config["num_repeat_calls"],
+            zoom_value=config["zoom_value"],
+            price_min=config["price_min"],
+            price_max=config["price_max"],
+            amenities=[],
+            currency=config["currency"],
+            language=config["language"],
+            proxy_url="",
+            measurement_date=config["measurement_date"],
+            show_progress=False,
+            max_workers=config["max_workers"],
+            checkpoint_dir=run_dir,
+            delay_between_scans=config.get("delay_between_scans", 1.0),
+            delay_between_calls=config.get("delay_between_calls", 0.5),
+            tracker=tracker,
+            skip_tasks=done,
+            initial_data=initial_data,
+            proxy_pool=proxy_pool,
+            retry_rounds=config.get("retry_rounds", DEFAULT_RETRY_ROUNDS),
+            hedge_policy=get_hedge_policy(config),
+            scan_areas=scan_areas,
+            raw_archive=raw_archive,
+        )
+        try:
+            if scan_plan is not None:
+                df_all = run_scan_plan(scan_plan, config["guests_list"], **scrape_kwargs)
+            elif config.get("engine") == "calendar":
+                df_all = scrape_calendars(
+                    config["period_start"],
+                    config["period_end"],
+                    discovery_scans=discovery_scans,
+                    cache=get_calendar_cache(run_dir, config),
+                    **scrape_kwargs,
+                )
+            elif config.get("engine") == "async":
+                df_all = asyncio.run(scrape_all_async(**scrape_kwargs))
+            else:
+                df_all = scrape_all(**scrape_kwargs)
+        finally:
+            if raw_archive is not None:
+                raw_archive.close()
+
+        return finalize_run(
+            run_dir, df_all, gpkg_path, tracker, time.time() - start_time
+        )
+
+    except Exception as e:
+        tracker.fail(str(e))
+        logger.exception("Scraping error")
+
+        print("\n" + "=" * 80)
+        print(f"❌ RUN FAILED: {os.path.basename(run_dir)}")
+        print("=" * 80)
+        print(f"Error: {str(e)[:200]}")
+        print(f"📁 Output: {run_dir}")
+        print("=" * 80 + "\n")
+        return False
+
+
+def finalize_run(
+    run_dir: str,
+    df_all: pd.DataFrame,
+    gpkg_path: str,
+    tracker: RunTracker,
+    elapsed_time: float,
+) -> bool:
+    """
+    Verwerk de scrape resultaten van een run: export, dataset, kaart en grafiek
+
+    Gedeeld door execute_run en de distributed coordinator.
+
+    Args:
+        run_dir: Run directory met config.json
+        df_all: Alle scrape resultaten
+        gpkg_path: Pad naar gemeentegrenzen GeoPackage
+        tracker: RunTracker van de run
+        elapsed_time: Scrape duur in seconden (voor de samenvatting)
+
+    Returns:
+        True als de run voltooid is
+    """
+    config = load_config(run_dir)
+    gemeenten = config["gemeenten"]
+    period_start = config["period_start"]
+    period_end = config["period_end"]
+    total_scans = tracker.get_status().get("progress", {}).get("total_scans", 0)
+
+    if df_all.empty:
+        tracker.fail("Geen resultaten gevonden")
+        return False
+
+    total_listings = df_all["room_id"].nunique()
+
+    # Laatste progress bar update
+    tracker.log(
+        f"⚡ 🟢 {total_scans}/{total_scans} (100%) │ "
+        f"🏠 {total_listings:,} listings │ ⏱️ {elapsed_time / 60:.1f}m"
+    )
+    tracker.update(total_listings=int(total_listings))
+
+    # Ontbrekende cellen rapporteren en markeren in de beschikbaarheid
+    missing_scans = load_missing_scans(run_dir)
+    with open(os.path.join(run_dir, MISSING_SCANS_FILE), "w") as f:
+        json.dump(missing_scans, f, indent=2)
+    if missing_scans:
+        tracker.log(
+            f"🕳️ {len(missing_scans)} scans ontbreken definitief (zie {MISSING_SCANS_FILE}):"
+        )
+        for cell in missing_scans[:20]:
+            tracker.log(f"   • {cell['gemeente']} {cell['checkin']} ({cell['nights']}n)")
+
+    # Data verwerken
+    df_availability = calculate_availability(
+        df_all, period_start, period_end, missing_scans=missing_scans
+    )
+    df_map = df_all.drop_duplicates("room_id").merge(
+        df_availability[["room_id", "days_available", "availability_rate", "total_days"]],
+        on="room_id",
+        how="left",
+    )
+
+    df_export = prepare_export_data(df_all)
+    nationwide = bool(config.get("nationwide"))
+    if nationwide:
+        # Landelijke run: geen Excel (rijlimiet) en geen kaart, wel parquet per gemeente
+        write_run_dataset(run_dir, df_export, df_availability)
+        partitioned = write_partitioned_dataset(run_dir, df_export)
+        tracker.log(f"🗂️ Data per gemeente: {partitioned}")
+    else:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        excel_filename = f"airbnb_scrape_{'_'.join(gemeenten)}_{timestamp}.xlsx"
+        excel_path = os.path.join(run_dir, excel_filename)
+        export_to_excel(df_export, excel_path, df_availability, df_all)
+        write_run_dataset(run_dir, df_export, df_availability, source=excel_path)
+
+    # Visualisaties (niet kritisch - run faalt niet als deze mislukken)
+    if not nationwide:
+        try:
+            gdf_gemeenten = load_boundaries(gpkg_path, pick_boundary_level(DEFAULT_ZOOM))
+            create_map(df_map, gdf_gemeenten, gemeenten, run_dir)
+        except Exception as e:
+            tracker.log(f"⚠️ Map creation failed: {str(e)[:100]}")
+
+    try:
+        create_availability_timeline_graph(df_all, period_start, period_end, run_dir)
+    except Exception as e:
+        tracker.log(f"⚠️ Timeline graph creation failed: {str(e)[:100]}")
+
+    # Pas voltooien NADAT de data opgeslagen is
+    tracker.complete(total_listings=total_listings)
+    tracker.log(
+        f"✅ Voltooid │ {len(df_all):,} records │ {total_listings:,} listings │ "
+        f"€{df_all['price'].mean():.0f} avg │ {df_availability['availability_rate'].mean():.0f}% beschikbaar"
+    )
+
+    print("\n" + "=" * 80)
+    print(f"✅ RUN COMPLETED: {os.path.basename(run_dir)}")
+    print("=" * 80)
+    print(f"📊 Records: {len(df_all):,}")
+    print(f"🏠 Unique Listings: {total_listings:,}")
+    print(f"💰 Avg Price: €{df_all['price'].mean():.2f}")
+    print(f"📈 Avg Availability: {df_availability['availability_rate'].mean():.1f}%")
+    print(f"⏱️  Duration: {elapsed_time / 60:.1f}m")
+    print(f"📁 Output: {run_dir}")
+    print("=" * 80 + "\n")
+    return True
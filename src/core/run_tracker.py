@@ -4,12 +4,19 @@ Tracks scraping runs, their status, and logs
 """
 
 import json
+import logging
 import os
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from enum import Enum
 import threading
 
+from src.core import run_events
+from src.core.run_catalog import get_catalog
+
+logger = logging.getLogger(__name__)
+
 
 class RunStatus(Enum):
     """Run status enum"""
@@ -22,202 +29,400 @@ class RunStatus(Enum):
 
 
 class RunTracker:
-    """Tracks status and progress of scraping runs"""
+    """Tracks status and progress of scraping runs
+
+    Every state change is appended to the run's event stream (events.jsonl,
+    see src.core.run_events); the status is derived from those events and
+    kept in memory. run_status.json (and the run catalog) is a snapshot:
+    state transitions flush it immediately, other updates are coalesced to
+    at most one flush per flush interval. Snapshots are written atomically
+    (temp file + os.replace), so readers never see a half-written file.
+    """
+
+    # Events that flush the snapshot immediately instead of debounced
+    _TRANSITION_EVENTS = {
+        run_events.RUN_STARTED,
+        run_events.RUN_COMPLETED,
+        run_events.RUN_FAILED,
+        run_events.RUN_CANCELLED,
+    }
+
+    # Minimum time between two debounced snapshot flushes (seconds)
+    FLUSH_INTERVAL = 2.0
 
-    def __init__(self, run_dir: str):
+    # run.log is rotated to run.log.1 .. run.log.<LOG_BACKUPS> at this size
+    LOG_MAX_BYTES = 5 * 1024 * 1024
+    LOG_BACKUPS = 3
+
+    def __init__(self, run_dir: str, flush_interval: Optional[float] = None):
         """
         Initialize run tracker
 
         Args:
             run_dir: Directory where run data will be stored
+            flush_interval: Debounce interval for snapshot writes in seconds
+                (default: FLUSH_INTERVAL)
         """
         self.run_dir = run_dir
+        self.data_dir = os.path.dirname(os.path.normpath(run_dir)) or "."
         self.status_file = os.path.join(run_dir, "run_status.json")
         self.log_file = os.path.join(run_dir, "run.log")
+        self.events = run_events.RunEventLog(run_dir)
+        self.flush_interval = (
+            self.FLUSH_INTERVAL if flush_interval is None else flush_interval
+        )
         self._lock = threading.Lock()
+        self._flush_lock = threading.RLock()
+        self._dirty = False
+        self._last_flush = 0.0
+        self._flush_timer: Optional[threading.Timer] = None
 
         # Ensure directory exists
         os.makedirs(run_dir, exist_ok=True)
 
         # Initialize status if not exists
         if not os.path.exists(self.status_file):
-            self._save_status(
-                {
-                    "status": RunStatus.PENDING.value,
-                    "created_at": datetime.now().isoformat(),
-                    "started_at": None,
-                    "completed_at": None,
-                    "progress": {
-                        "total_scans": 0,
-                        "completed_scans": 0,
-                        "failed_scans": 0,
-                        "total_listings": 0,
-                    },
-                    "error": None,
-                }
-            )
+            self._save_status(run_events.empty_status())
+
+        self._created_at = self._load_status().get("created_at")
 
     def _save_status(self, status_data: Dict[str, Any]):
-        """Save status to JSON file"""
-        with self._lock:
-            with open(self.status_file, "w") as f:
+        """Atomically write the status snapshot and mirror it to the catalog"""
+        with self._flush_lock:
+            tmp_file = f"{self.status_file}.tmp"
+            with open(tmp_file, "w") as f:
                 json.dump(status_data, f, indent=2)
+            os.replace(tmp_file, self.status_file)
+            self._update_catalog(status_data)
+
+    def _update_catalog(self, status_data: Dict[str, Any], reindex: bool = False):
+        """Mirror status and progress into the run catalog"""
+        try:
+            catalog = get_catalog(self.data_dir)
+            if reindex:
+                # Config/output files changed - re-read summary and artifacts
+                catalog.upsert_run(self.run_dir)
+            else:
+                catalog.update_status(self.run_dir, status_data)
+        except Exception as e:
+            logger.warning(f"⚠️ Run catalog update failed for {self.run_dir}: {e}")
 
     def _load_status(self) -> Dict[str, Any]:
-        """Load status from JSON file"""
+        """Load status snapshot from JSON file"""
+        try:
+            with open(self.status_file, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def flush(self) -> Dict[str, Any]:
+        """
+        Write the current status snapshot now
+
+        Returns:
+            The flushed status
+        """
         with self._lock:
-            if os.path.exists(self.status_file):
-                with open(self.status_file, "r") as f:
-                    return json.load(f)
-        return {}
-
-    def start(self, total_scans: int = 0):
-        """Mark run as started"""
-        status = self._load_status()
-        status["status"] = RunStatus.RUNNING.value
-        status["started_at"] = datetime.now().isoformat()
-        status["progress"]["total_scans"] = total_scans
-        self._save_status(status)
-        self.log("🚀 Run started")
+            self._dirty = False
+            self._last_flush = time.monotonic()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        with self._flush_lock:
+            # Derive under the flush lock so an older status never overwrites a newer one
+            status = self.get_status()
+            self._save_status(status)
+        return status
+
+    def _request_flush(self, immediate: bool = False):
+        """Flush now (transition or interval elapsed) or schedule a trailing flush"""
+        with self._lock:
+            self._dirty = True
+            wait = self.flush_interval - (time.monotonic() - self._last_flush)
+            if not immediate and wait > 0:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(wait, self._flush_pending)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+        self.flush()
+
+    def _flush_pending(self):
+        """Timer callback: flush coalesced updates if any are left"""
+        with self._lock:
+            self._flush_timer = None
+            if not self._dirty:
+                return
+        self.flush()
+
+    def emit(self, event_type: str, **fields) -> Dict[str, Any]:
+        """
+        Append an event to the run's event stream
+
+        Args:
+            event_type: Event type (see src.core.run_events)
+            **fields: Event payload
+
+        Returns:
+            The derived status after the event
+        """
+        self.events.emit(event_type, **fields)
+        self._request_flush(immediate=event_type in self._TRANSITION_EVENTS)
+
+        status = self.get_status()
+        if event_type in (run_events.SCAN_DONE, run_events.SCAN_FAILED):
+            self._log_progress(status)
+        return status
+
+    def update(self, **fields) -> Dict[str, Any]:
+        """
+        Thread-safe status update
+
+        Progress counters (e.g. completed_scans, total_listings) are set in
+        "progress", other fields at the top level of the status. The change
+        is recorded as a progress event; the snapshot is flushed debounced.
+
+        Args:
+            **fields: Status fields to set (None values are ignored)
+
+        Returns:
+            The derived status after the update
+        """
+        return self.emit(run_events.PROGRESS, **fields)
+
+    def _log_progress(self, status: Dict[str, Any]):
+        """Append a one-line progress summary to the log"""
+        progress = status["progress"]
+        total = progress["total_scans"]
+        done = progress["completed_scans"] + progress["failed_scans"]
+        if not total:
+            return
+
+        elapsed = 0.0
+        if status.get("started_at"):
+            started = datetime.fromisoformat(status["started_at"])
+            elapsed = (datetime.now() - started).total_seconds()
+        remaining = elapsed / done * (total - done) if done else 0
+
+        progress_pct = done / total * 100
+        if progress_pct >= 75:
+            status_emoji = "🟢"
+        elif progress_pct >= 25:
+            status_emoji = "🟡"
+        else:
+            status_emoji = "🔴"
+
+        self.log(
+            f"⚡ {status_emoji} {done}/{total} ({progress_pct:.0f}%) │ "
+            f"🏠 {progress['total_listings']:,} listings │ "
+            f"⏱️ {elapsed / 60:.1f}m / ~{remaining / 60:.0f}m"
+        )
+
+    def start(self, total_scans: int = 0, completed_scans: int = 0, total_listings: int = 0):
+        """
+        Mark run as started
+
+        Args:
+            total_scans: Total number of scans in the run
+            completed_scans: Scans already done (when resuming)
+            total_listings: Listings already found (when resuming)
+        """
+        self.emit(
+            run_events.RUN_STARTED,
+            total_scans=total_scans,
+            completed_scans=completed_scans,
+            failed_scans=0,
+            total_listings=total_listings,
+            resumed=completed_scans > 0,
+        )
+        self._update_catalog({}, reindex=True)
+        if completed_scans:
+            self.log(f"🚀 Run resumed ({completed_scans}/{total_scans} scans already done)")
+        else:
+            self.log("🚀 Run started")
 
     def complete(self, total_listings: int = 0):
         """Mark run as completed"""
-        status = self._load_status()
-        status["status"] = RunStatus.COMPLETED.value
-        status["completed_at"] = datetime.now().isoformat()
-        status["progress"]["total_listings"] = total_listings
-        self._save_status(status)
+        self.emit(run_events.RUN_COMPLETED, total_listings=total_listings)
+        self._update_catalog({}, reindex=True)
         self.log(f"✅ Run completed successfully - {total_listings} listings found")
 
     def fail(self, error: str):
         """Mark run as failed"""
-        status = self._load_status()
-        status["status"] = RunStatus.FAILED.value
-        status["completed_at"] = datetime.now().isoformat()
-        status["error"] = error
-        self._save_status(status)
+        self.emit(run_events.RUN_FAILED, error=error)
         self.log(f"❌ Run failed: {error}")
 
     def cancel(self):
         """Mark run as cancelled"""
-        status = self._load_status()
-        status["status"] = RunStatus.CANCELLED.value
-        status["completed_at"] = datetime.now().isoformat()
-        self._save_status(status)
+        self.emit(run_events.RUN_CANCELLED)
         self.log("⚠️ Run cancelled")
 
     def update_progress(self, completed_scans: int = None, failed_scans: int = None):
         """Update progress counters"""
-        status = self._load_status()
-        if completed_scans is not None:
-            status["progress"]["completed_scans"] = completed_scans
-        if failed_scans is not None:
-            status["progress"]["failed_scans"] = failed_scans
-        self._save_status(status)
+        self.update(completed_scans=completed_scans, failed_scans=failed_scans)
 
     def log(self, message: str):
-        """Append message to log file"""
+        """Append message to log file (rotated at LOG_MAX_BYTES)"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         log_line = f"[{timestamp}] {message}\n"
 
         with self._lock:
+            try:
+                if os.path.getsize(self.log_file) >= self.LOG_MAX_BYTES:
+                    self._rotate_logs()
+            except OSError:
+                pass
             with open(self.log_file, "a", encoding="utf-8") as f:
                 f.write(log_line)
 
+    def _rotate_logs(self):
+        """Shift run.log -> run.log.1 -> ... and drop the oldest backup"""
+        for i in range(self.LOG_BACKUPS - 1, 0, -1):
+            src = f"{self.log_file}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.log_file}.{i + 1}")
+        if self.LOG_BACKUPS > 0:
+            os.replace(self.log_file, f"{self.log_file}.1")
+        else:
+            os.remove(self.log_file)
+
     def get_status(self) -> Dict[str, Any]:
-        """Get current status"""
-        return self._load_status()
+        """Get current status (derived from the event stream)"""
+        if not os.path.exists(self.events.path):
+            # Legacy run without event stream
+            return self._load_status()
+        view = run_events.get_status_view(
+            self.run_dir, base=run_events.empty_status(self._created_at)
+        )
+        return view.refresh()
+
+    def _log_files(self) -> List[str]:
+        """Existing log files, oldest rotated backup first"""
+        files = [f"{self.log_file}.{i}" for i in range(self.LOG_BACKUPS, 0, -1)]
+        files.append(self.log_file)
+        return [path for path in files if os.path.exists(path)]
 
     def get_logs(self, tail: Optional[int] = None) -> str:
         """
         Get log content
 
         Args:
-            tail: If specified, return only last N lines
+            tail: If specified, return only last N lines (read from the end
+                of the file, independent of the log size)
 
         Returns:
             Log content as string
         """
-        if not os.path.exists(self.log_file):
-            return ""
+        if tail:
+            return "".join(self.tail_logs(tail)[0])
 
-        with open(self.log_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+        parts = []
+        for path in self._log_files():
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                parts.append(f.read())
+        return "".join(parts)
+
+    def tail_logs(self, n: int) -> Tuple[List[str], int]:
+        """
+        Last N log lines, read backwards in blocks
+
+        Args:
+            n: Number of lines
+
+        Returns:
+            Tuple of (lines, offset); pass the offset to read_since() to
+            continue with new lines only
+        """
+        offset = _file_size(self.log_file)
+        lines: List[str] = []
+        for path in reversed(self._log_files()):
+            lines = _tail_lines(path, n - len(lines)) + lines
+            if len(lines) >= n:
+                break
+        return lines, offset
+
+    def read_since(self, offset: int = 0) -> Tuple[List[str], int]:
+        """
+        Read log lines written after a byte offset
 
-        if tail and len(lines) > tail:
-            lines = lines[-tail:]
+        Args:
+            offset: Offset returned by tail_logs() or a previous call
 
-        return "".join(lines)
+        Returns:
+            Tuple of (new complete lines, new_offset)
+        """
+        lines: List[str] = []
+        size = _file_size(self.log_file)
+        if offset > size:
+            # Log was rotated since the last call: finish the previous file first
+            rotated = f"{self.log_file}.1"
+            if os.path.exists(rotated):
+                lines, _ = _read_lines_from(rotated, offset)
+            offset = 0
+
+        new_lines, offset = _read_lines_from(self.log_file, offset)
+        return lines + new_lines, offset
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _tail_lines(path: str, n: int, block_size: int = 8192) -> List[str]:
+    """Last n lines of a file, reading blocks from the end"""
+    if n <= 0:
+        return []
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        # One extra newline: the last line ends with one
+        while pos > 0 and data.count(b"\n") <= n:
+            read = min(block_size, pos)
+            pos -= read
+            f.seek(pos)
+            data = f.read(read) + data
+    lines = data.decode("utf-8", errors="replace").splitlines(keepends=True)
+    return lines[-n:]
+
+
+def _read_lines_from(path: str, offset: int) -> Tuple[List[str], int]:
+    """Complete lines after a byte offset, and the offset after the last one"""
+    if not os.path.exists(path):
+        return [], offset
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    # Stop at the last newline (a writer may be mid-line)
+    end = data.rfind(b"\n") + 1
+    lines = data[:end].decode("utf-8", errors="replace").splitlines(keepends=True)
+    return lines, offset + end
 
 
 def get_all_runs(data_dir: str = "data") -> list[Dict[str, Any]]:
     """
     Get all runs with their status
 
+    Served from the run catalog (one indexed query); the catalog is built
+    from the run directories on first use. Active runs get their live
+    status from the event stream (incremental read of new events only).
+
     Args:
         data_dir: Base data directory
 
     Returns:
-        List of run info dictionaries
+        List of run info dictionaries (newest first)
     """
-    runs = []
-
     if not os.path.exists(data_dir):
-        return runs
-
-    for run_name in os.listdir(data_dir):
-        run_path = os.path.join(data_dir, run_name)
-
-        if not os.path.isdir(run_path) or not run_name.startswith("run_"):
-            continue
-
-        status_file = os.path.join(run_path, "run_status.json")
-
-        if os.path.exists(status_file):
-            try:
-                with open(status_file, "r") as f:
-                    status = json.load(f)
-
-                runs.append({"run_name": run_name, "run_path": run_path, **status})
-            except Exception:
-                # If can't read status, mark as unknown
-                runs.append(
-                    {"run_name": run_name, "run_path": run_path, "status": "unknown"}
-                )
-        else:
-            # Legacy run without status tracking - mark as completed
-            # Try to infer if it's actually completed by checking for output files
-            excel_files = []
-            try:
-                excel_files = [
-                    f
-                    for f in os.listdir(run_path)
-                    if f.endswith(".xlsx") and not f.startswith("~$")
-                ]
-            except:
-                pass
-
-            if excel_files:
-                # Has data files, so it's completed
-                runs.append(
-                    {
-                        "run_name": run_name,
-                        "run_path": run_path,
-                        "status": "completed",
-                        "created_at": run_name.split("_")[-2]
-                        + " "
-                        + run_name.split("_")[-1]
-                        if "_" in run_name
-                        else "",
-                    }
-                )
-            else:
-                # No data files, mark as legacy/unknown
-                runs.append(
-                    {"run_name": run_name, "run_path": run_path, "status": "legacy"}
-                )
-
-    # Sort by created_at (newest first)
-    runs.sort(key=lambda x: x.get("created_at", ""), reverse=True)
-
+        return []
+
+    runs = get_catalog(data_dir).list_runs()
+    for run in runs:
+        if run["status"] in (RunStatus.RUNNING.value, RunStatus.PENDING.value):
+            events_file = os.path.join(run["run_path"], run_events.EVENTS_FILE)
+            if os.path.exists(events_file):
+                run.update(RunTracker(run["run_path"]).get_status())
     return runs
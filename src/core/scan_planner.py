@@ -0,0 +1,418 @@
+"""
+Scan planner
+Kiest de (check-in, nachten) queries van een run bij een dekkingsdoel en een API budget
+
+generate_scan_combinations vraagt elke nachten waarde op voor elke datum. Een
+listing die terugkomt voor een verblijf van 7 nachten vanaf dag D is (op
+minimum verblijf regels na) beschikbaar op elke nacht D..D+6, en
+calculate_availability telt de nachten al zo op. De planner legt daarom
+lange verblijven (tegels) over de periode en verfijnt alleen waar die
+weinig opleveren: een venster waarin de lange query minder dan het
+dekkingsdoel van de bekende listings vindt, wordt in twee kortere
+vensters gesplitst, tot 1 nacht of tot het budget op is.
+
+Vooraf rekent plan_scans met een StayModel (uit een eerdere run, bij
+voorkeur een kalender run, of een onafhankelijke nachten prior) de
+verwachte dekking en het maximum aantal calls uit; run_scan_plan voert het
+plan niveau voor niveau uit met scrape_all.
+"""
+
+import logging
+import math
+from datetime import date, timedelta
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.core.scraper_core import scrape_all
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COVERAGE_GOAL = 0.9
+DEFAULT_MAX_TILE_NIGHTS = 7
+
+# Prior: kans dat een listing een willekeurige nacht beschikbaar is
+DEFAULT_NIGHT_AVAILABILITY = 0.5
+
+# scan_id = niveau * LEVEL_STRIDE + venster * gasten varianten + gasten index + 1
+LEVEL_STRIDE = 1_000_000
+
+
+class ScanWindow:
+    """Eén verblijf (check-in, nachten) op niveau level van de plan boom"""
+
+    def __init__(self, check_in: date, nights: int, level: int = 0, index: int = 0):
+        self.check_in = check_in
+        self.nights = nights
+        self.level = level
+        self.index = index
+
+    def __repr__(self) -> str:
+        return f"ScanWindow({self.check_in.isoformat()}, {self.nights}n)"
+
+    @property
+    def check_out(self) -> date:
+        return self.check_in + timedelta(days=self.nights)
+
+    def children(self) -> List["ScanWindow"]:
+        """Twee kortere vensters die samen deze nachten dekken (leeg bij 1 nacht)"""
+        if self.nights <= 1:
+            return []
+        first = math.ceil(self.nights / 2)
+        return [
+            ScanWindow(self.check_in, first, self.level + 1, 2 * self.index),
+            ScanWindow(
+                self.check_in + timedelta(days=first),
+                self.nights - first,
+                self.level + 1,
+                2 * self.index + 1,
+            ),
+        ]
+
+    def scan_ids(self, guests_count: int) -> List[int]:
+        """Vaste scan_id per gasten variant (zelfde plan = zelfde ids, ook bij hervatten)"""
+        base = self.level * LEVEL_STRIDE + self.index * guests_count + 1
+        return [base + n for n in range(guests_count)]
+
+
+def tile_period(period_start: str, period_end: str, tile_nights: int) -> List[ScanWindow]:
+    """Tegels van tile_nights nachten over start..eind (laatste tegel korter)"""
+    start = date.fromisoformat(period_start)
+    total_nights = (date.fromisoformat(period_end) - start).days + 1
+    return [
+        ScanWindow(start + timedelta(days=offset), min(tile_nights, total_nights - offset), 0, n)
+        for n, offset in enumerate(range(0, total_nights, tile_nights))
+    ]
+
+
+class StayModel:
+    """
+    Welk deel van de listings een query van n nachten vindt
+
+    Met een referentie run (from_run) speelt het model de verfijning na op
+    de echte beschikbaarheid per listing en nacht. Zonder referentie geldt
+    een onafhankelijke prior: een nacht wordt gevonden met kans p^(n-1).
+    Boekingen zijn in werkelijkheid geclusterd, dus de prior schat de
+    dekking van lange verblijven eerder te laag dan te hoog.
+    """
+
+    def __init__(
+        self,
+        night_availability: float = DEFAULT_NIGHT_AVAILABILITY,
+        available: Optional[np.ndarray] = None,
+    ):
+        """
+        Args:
+            night_availability: Prior kans dat een listing een nacht beschikbaar is
+            available: Optionele matrix listings × nachten (True = beschikbaar)
+        """
+        self.night_availability = night_availability
+        self.available = available
+
+    def coverage(self, nights: int) -> float:
+        """Prior: deel van de beschikbare nachten dat een query van n nachten vindt"""
+        return self.night_availability ** max(nights - 1, 0)
+
+    @classmethod
+    def from_run(cls, df_all: pd.DataFrame) -> "StayModel":
+        """
+        Leer het model uit de beschikbaarheid van een eerdere run
+
+        Beste referentie: een kalender run of een grid met 1 nacht per dag;
+        nachten die de referentie niet gemeten heeft tellen als bezet.
+
+        Args:
+            df_all: Scan rows van de referentie run
+        """
+        check_ins = pd.to_datetime(df_all["scan_checkin"], errors="coerce")
+        nights = pd.to_numeric(df_all["scan_nights"], errors="coerce").fillna(0).astype(int)
+        valid = check_ins.notna().to_numpy() & (nights > 0).to_numpy()
+        if not valid.any():
+            return cls()
+
+        offsets = (check_ins[valid] - check_ins[valid].min()).dt.days.to_numpy()
+        nights = nights[valid].to_numpy()
+        rooms, room_index = np.unique(df_all["room_id"].astype(str)[valid], return_inverse=True)
+        available = np.zeros((len(rooms), int((offsets + nights).max())), dtype=bool)
+        for room, offset, n in zip(room_index, offsets, nights):
+            available[room, offset : offset + n] = True
+        return cls(float(available.mean()), available)
+
+
+class ScanPlan:
+    """Gekozen tegel lengte en diepte met verwachte dekking en calls"""
+
+    def __init__(
+        self,
+        tile_nights: int,
+        depth: int,
+        windows: List[ScanWindow],
+        level_sizes: List[int],
+        expected_coverage: float,
+        expected_calls: int,
+        grid_calls: Optional[int],
+        api_budget: Optional[int],
+        coverage_goal: float,
+    ):
+        self.tile_nights = tile_nights
+        self.depth = depth
+        self.windows = windows
+        self.level_sizes = level_sizes
+        self.expected_coverage = expected_coverage
+        self.expected_calls = expected_calls
+        self.grid_calls = grid_calls
+        self.api_budget = api_budget
+        self.coverage_goal = coverage_goal
+
+    @property
+    def within_budget(self) -> bool:
+        return self.api_budget is None or self.expected_calls <= self.api_budget
+
+    def summary(self) -> str:
+        """Eén regel voor run.log en dashboard"""
+        grid = f" vs {self.grid_calls:,} voor de grid" if self.grid_calls else ""
+        budget = f" (budget {self.api_budget:,})" if self.api_budget else ""
+        warning = " ⚠️ doel niet haalbaar binnen budget" if (
+            self.expected_coverage < self.coverage_goal or not self.within_budget
+        ) else ""
+        return (
+            f"🧮 Scan plan: tegels van {self.tile_nights} nachten, {self.depth} verfijningen │ "
+            f"verwachte dekking {self.expected_coverage:.0%} (doel {self.coverage_goal:.0%}) │ "
+            f"~{self.expected_calls:,} calls{budget}{grid}{warning}"
+        )
+
+
+def _drill(
+    fractions: List[Tuple[float, ScanWindow]],
+    coverage_goal: float,
+    calls_left: Optional[int],
+    calls_per_window: int,
+) -> Tuple[List[ScanWindow], List[ScanWindow]]:
+    """
+    Kies de vensters om te verfijnen (gedeeld door planning en uitvoering)
+
+    Args:
+        fractions: (deel van de bekende listings gevonden, venster) per venster
+        coverage_goal: Vensters onder dit deel worden gesplitst
+        calls_left: Resterend budget (None = onbeperkt); de armste vensters gaan voor
+        calls_per_window: Calls van één venster
+
+    Returns:
+        Tuple van (gesplitste vensters, nieuwe vensters)
+    """
+    poor = [
+        (fraction, window)
+        for fraction, window in fractions
+        if window.nights > 1 and fraction < coverage_goal
+    ]
+    poor.sort(key=lambda item: (item[0], item[1].level, item[1].index))
+    if calls_left is not None:
+        poor = poor[: max(0, calls_left) // (2 * calls_per_window)]
+    drilled = [window for _, window in poor]
+    return drilled, [child for window in drilled for child in window.children()]
+
+
+def _simulate(
+    tiles: List[ScanWindow],
+    model: StayModel,
+    coverage_goal: float,
+    api_budget: Optional[int],
+    calls_per_window: int,
+) -> Tuple[List[int], float, int]:
+    """
+    Speel run_scan_plan na op het model
+
+    Returns:
+        Tuple van (vensters per niveau, verwachte dekking, calls)
+    """
+    start = tiles[0].check_in
+    total_nights = sum(tile.nights for tile in tiles)
+    if model.available is not None:
+        columns = np.arange(total_nights) % model.available.shape[1]
+        available = model.available[:, columns]
+        available = available[available.any(axis=1)]
+        covered = np.zeros_like(available)
+        known = np.zeros(len(available), dtype=bool)
+
+    level_sizes = []
+    calls = 0
+    prior_found = 0.0
+    windows = tiles
+    while windows:
+        level_sizes.append(len(windows))
+        calls += len(windows) * calls_per_window
+        fractions = []
+        if model.available is None:
+            for window in windows:
+                fractions.append((model.coverage(window.nights), window))
+        else:
+            found = []
+            for window in windows:
+                offset = (window.check_in - start).days
+                rows = available[:, offset : offset + window.nights].all(axis=1)
+                covered[rows, offset : offset + window.nights] = True
+                known |= rows
+                found.append((int(rows.sum()), window))
+            fractions = [(count / max(known.sum(), 1), window) for count, window in found]
+
+        calls_left = api_budget - calls if api_budget is not None else None
+        drilled, children = _drill(fractions, coverage_goal, calls_left, calls_per_window)
+        # Prior: nachten van niet verfijnde vensters worden met kans coverage(n) gevonden
+        prior_found += sum(
+            window.nights * model.coverage(window.nights)
+            for window in windows
+            if all(window is not other for other in drilled)
+        )
+        windows = children
+
+    if model.available is not None:
+        coverage = covered.sum() / max(available.sum(), 1)
+    else:
+        coverage = prior_found / max(total_nights, 1)
+    return level_sizes, coverage, calls
+
+
+def plan_scans(
+    period_start: str,
+    period_end: str,
+    scan_units: int,
+    guests_count: int,
+    num_repeat_calls: int,
+    coverage_goal: float = DEFAULT_COVERAGE_GOAL,
+    api_budget: Optional[int] = None,
+    max_tile_nights: int = DEFAULT_MAX_TILE_NIGHTS,
+    model: Optional[StayModel] = None,
+    grid_scans: Optional[int] = None,
+) -> ScanPlan:
+    """
+    Kies de goedkoopste tegel lengte en diepte die het dekkingsdoel haalt
+
+    Args:
+        period_start: Start datum (YYYY-MM-DD)
+        period_end: Eind datum (YYYY-MM-DD)
+        scan_units: Gemeenten of scan gebieden van de run
+        guests_count: Aantal gasten varianten
+        num_repeat_calls: API calls per scan
+        coverage_goal: Gewenst deel van de beschikbare nachten (0-1)
+        api_budget: Maximum aantal API calls (None = onbeperkt)
+        max_tile_nights: Langste tegel
+        model: StayModel (None = prior)
+        grid_scans: Scan combinaties van de gewone grid (alleen ter vergelijking)
+
+    Returns:
+        ScanPlan; haalt geen plan het doel binnen budget, dan het plan met de
+        hoogste dekking binnen budget (of anders het goedkoopste)
+    """
+    model = model or StayModel()
+    calls_per_window = scan_units * guests_count * num_repeat_calls
+
+    candidates = []
+    for tile_nights in range(1, max_tile_nights + 1):
+        tiles = tile_period(period_start, period_end, tile_nights)
+        level_sizes, coverage, calls = _simulate(
+            tiles, model, coverage_goal, api_budget, calls_per_window
+        )
+        candidates.append((tile_nights, tiles, level_sizes, coverage, calls))
+
+    def _fits(candidate) -> bool:
+        return api_budget is None or candidate[4] <= api_budget
+
+    feasible = [c for c in candidates if _fits(c) and c[3] >= coverage_goal]
+    if feasible:
+        best = min(feasible, key=lambda c: (c[4], -c[3]))
+    elif any(_fits(c) for c in candidates):
+        best = max((c for c in candidates if _fits(c)), key=lambda c: (c[3], -c[4]))
+    else:
+        best = min(candidates, key=lambda c: c[4])
+
+    tile_nights, tiles, level_sizes, coverage, calls = best
+    grid_calls = grid_scans * scan_units * num_repeat_calls if grid_scans else None
+    return ScanPlan(
+        tile_nights,
+        len(level_sizes) - 1,
+        tiles,
+        level_sizes,
+        coverage,
+        calls,
+        grid_calls,
+        api_budget,
+        coverage_goal,
+    )
+
+
+def _window_combinations(
+    windows: Sequence[ScanWindow], guests_list: Sequence[int]
+) -> List[tuple]:
+    return [
+        (w.check_in.isoformat(), w.check_out.isoformat(), w.nights, guests, scan_id)
+        for w in windows
+        for guests, scan_id in zip(guests_list, w.scan_ids(len(guests_list)))
+    ]
+
+
+def run_scan_plan(
+    plan: ScanPlan,
+    guests_list: Sequence[int],
+    **scrape_kwargs: Any,
+) -> pd.DataFrame:
+    """
+    Voer een scan plan uit: tegels, daarna verfijnen waar de tegels weinig vinden
+
+    Een venster wordt gesplitst als zijn query minder dan plan.coverage_goal
+    van alle tot dan toe gevonden listings oplevert; met een budget gaan de
+    armste vensters voor.
+
+    Args:
+        plan: ScanPlan van plan_scans
+        guests_list: Gasten varianten
+        **scrape_kwargs: Argumenten van scrape_all (scan_combinations wordt
+            vervangen door de vensters van het plan)
+
+    Returns:
+        DataFrame in het formaat van scrape_all
+    """
+    tracker = scrape_kwargs.get("tracker")
+    units = scrape_kwargs.get("scan_areas") or scrape_kwargs["gemeenten"]
+    calls_per_window = len(units) * len(guests_list) * scrape_kwargs["num_repeat_calls"]
+
+    windows = plan.windows
+    scrape_kwargs.pop("scan_combinations", None)
+    df_all = scrape_kwargs.pop("initial_data", None)
+    calls_used = 0
+    scans_total = len(windows) * len(guests_list) * len(units)
+    while windows:
+        df_all = scrape_all(
+            **scrape_kwargs,
+            scan_combinations=_window_combinations(windows, guests_list),
+            initial_data=df_all,
+        )
+        calls_used += len(windows) * calls_per_window
+        if df_all.empty:
+            break
+
+        # Per venster: welk deel van de bekende listings vond de query
+        known = df_all["room_id"].nunique()
+        found = df_all.groupby("scan_id")["room_id"].unique()
+        fractions = []
+        for window in windows:
+            ids = [scan_id for scan_id in window.scan_ids(len(guests_list)) if scan_id in found]
+            rooms = set().union(*(found[scan_id] for scan_id in ids)) if ids else set()
+            fractions.append((len(rooms) / known, window))
+        calls_left = plan.api_budget - calls_used if plan.api_budget is not None else None
+        drilled, windows = _drill(fractions, plan.coverage_goal, calls_left, calls_per_window)
+        if not windows:
+            break
+
+        scans_total += len(windows) * len(guests_list) * len(units)
+        message = (
+            f"🧮 Verfijnen: {len(drilled)} vensters → {len(windows)} kortere queries │ "
+            f"{calls_used:,} calls gebruikt"
+        )
+        if tracker is not None:
+            tracker.update(total_scans=scans_total)
+            tracker.log(message)
+        logger.info(message)
+
+    logger.info(f"🧮 Scan plan klaar: {calls_used:,} calls (verwacht {plan.expected_calls:,})")
+    return df_all if df_all is not None else pd.DataFrame()
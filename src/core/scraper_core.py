@@ -3,11 +3,15 @@
 Core Airbnb scraping functions
 """
 
+import asyncio
+import heapq
 import logging
+import threading
 import time
+from collections import deque
 from datetime import date, timedelta
-from typing import List, Tuple, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Set, Tuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 import pandas as pd
 import geopandas as gpd
@@ -24,10 +28,34 @@ from src.utils import (
     extract_coordinates,
     generate_listing_url,
 )
-from src.core.api_client import make_parallel_api_calls
+from src.core.api_client import (
+    make_parallel_api_calls,
+    make_repeat_calls,
+    make_repeat_calls_async,
+    session_stats,
+)
+from src.core.errors import CircuitBreaker, classify_error
+from src.core.hedging import HedgePolicy
+from src.core.proxy_pool import DIRECT, ProxyPool
+from src.core import run_events
+from src.core.boundaries import get_gemeente_bbox, get_gemeente_geometry
+from src.core.shared_areas import GemeenteJoin, ScanArea, assign_gemeenten, plan_shared_areas
+from src.data.raw_archive import RawArchive
 
 logger = logging.getLogger(__name__)
 
+# Pogingen per scan in scrape_all; een mislukte poging wordt na een backoff
+# (RETRY_DELAY * 2^n, 3^n bij rate limits, of Retry-After) opnieuw ingepland
+MAX_SCAN_ATTEMPTS = 3
+RETRY_DELAY = 1.0
+
+# Extra rondes aan het eind van een run voor scans die toch mislukten
+DEFAULT_RETRY_ROUNDS = 2
+
+# Fases die samen de duur van een scan vormen; "connection" (verbinding
+# opzetten + API key bootstrap) is een deel van api_calls
+SCAN_PHASES = ("api_calls", "processing", "spatial_filter")
+
 
 def generate_scan_combinations(
     period_start: str,
@@ -190,6 +218,79 @@ def generate_scan_combinations(
     return combinations, valid_nights
 
 
+def parse_listing(rec: dict) -> Optional[dict]:
+    """
+    Projecteer een ruw API record naar de velden die de pipeline gebruikt
+
+    Args:
+        rec: Ruw API record
+
+    Returns:
+        Slim record (room_id t/m longitude) of None zonder coördinaten
+    """
+    lat, lon = extract_coordinates(rec)
+    if not lat or not lon:
+        return None
+
+    price = extract_price(rec)
+    rating, reviews_count = extract_rating(rec)
+    bedrooms, beds = extract_beds_info(rec)
+    max_guests = extract_guest_capacity(rec)
+    room_id = rec.get("room_id")
+    listing_url = generate_listing_url(room_id)
+
+    # Detecteer type en map naar Airbnb standaard
+    detected_type = extract_room_type(rec)
+    airbnb_property_type = get_mapped_property_type(detected_type)
+    airbnb_room_type = detected_type  # Behoud originele detected type
+
+    return {
+        "room_id": room_id,
+        "listing_url": listing_url,
+        "listing_title": rec.get("title", "") or rec.get("name", ""),
+        "room_type_detected": detected_type,
+        "room_type_airbnb": airbnb_room_type,
+        "property_type_airbnb": airbnb_property_type,
+        "bedrooms": bedrooms,
+        "beds": beds,
+        "max_guests": max_guests,
+        "price": price,
+        "rating": rating,
+        "reviews_count": reviews_count,
+        "latitude": lat,
+        "longitude": lon,
+    }
+
+
+def listings_to_rows(
+    listings: List[dict],
+    gemeente: str,
+    check_in: str,
+    check_out: str,
+    nights: int,
+    scan_id: int,
+    measurement_date: str,
+) -> List[dict]:
+    """
+    Maak rows van slim records (zie parse_listing) met de scan velden erbij
+
+    Returns:
+        Lijst van gestructureerde data dictionaries
+    """
+    return [
+        {
+            "gemeente": gemeente,
+            **listing,
+            "scan_checkin": check_in,
+            "scan_checkout": check_out,
+            "scan_nights": nights,
+            "scan_id": scan_id,
+            "measurement_date": measurement_date,
+        }
+        for listing in listings
+    ]
+
+
 def process_raw_results(
     raw_results: List[dict],
     gemeente: str,
@@ -214,51 +315,72 @@ def process_raw_results(
     Returns:
         Lijst van gestructureerde data dictionaries
     """
-    rows = []
-
-    for rec in raw_results:
-        lat, lon = extract_coordinates(rec)
-        if not lat or not lon:
-            continue
-
-        price = extract_price(rec)
-        rating, reviews_count = extract_rating(rec)
-        bedrooms, beds = extract_beds_info(rec)
-        max_guests = extract_guest_capacity(rec)
-        room_id = rec.get("room_id")
-        listing_url = generate_listing_url(room_id)
+    listings = [listing for listing in map(parse_listing, raw_results) if listing is not None]
+    return listings_to_rows(
+        listings, gemeente, check_in, check_out, nights, scan_id, measurement_date
+    )
 
-        # Detecteer type en map naar Airbnb standaard
-        detected_type = extract_room_type(rec)
-        airbnb_property_type = get_mapped_property_type(detected_type)
-        airbnb_room_type = detected_type  # Behoud originele detected type
 
-        rows.append(
-            {
-                "gemeente": gemeente,
-                "room_id": room_id,
-                "listing_url": listing_url,
-                "listing_title": rec.get("title", "") or rec.get("name", ""),
-                "room_type_detected": detected_type,
-                "room_type_airbnb": airbnb_room_type,
-                "property_type_airbnb": airbnb_property_type,
-                "bedrooms": bedrooms,
-                "beds": beds,
-                "max_guests": max_guests,
-                "price": price,
-                "rating": rating,
-                "reviews_count": reviews_count,
-                "latitude": lat,
-                "longitude": lon,
-                "scan_checkin": check_in,
-                "scan_checkout": check_out,
-                "scan_nights": nights,
-                "scan_id": scan_id,
-                "measurement_date": measurement_date,
-            }
-        )
+class _ScanIngest:
+    """
+    Ontdubbelt de records van een scan bij binnenkomst (transform voor
+    make_repeat_calls)
+
+    Alleen het eerste record per room_id wordt geparsed tot een slim record
+    (parse_listing); duplicaten uit de andere repeat calls worden direct
+    weggegooid en het ruwe record gaat hooguit naar het archief. Blijft
+    bestaan over de pogingen van een scan, dus ook records van een call die
+    halverwege faalt tellen mee.
+    """
 
-    return rows
+    def __init__(
+        self,
+        raw_archive: Optional[RawArchive] = None,
+        scan: Optional[Dict[str, Any]] = None,
+    ):
+        self.raw_archive = raw_archive
+        self.scan = scan or {}
+        self.received = 0
+        self._listings: Dict[Any, Optional[dict]] = {}  # room_id -> slim record
+        self._anonymous: List[dict] = []  # records zonder id
+        self._lock = threading.Lock()
+
+    def __call__(self, rec: dict) -> Optional[dict]:
+        key = rec.get("room_id") or rec.get("id")
+        with self._lock:
+            self.received += 1
+            if key is not None:
+                if key in self._listings:
+                    return None
+                self._listings[key] = None  # gereserveerd; parsen buiten de lock
+
+        if self.raw_archive is not None:
+            self.raw_archive.write(rec, self.scan)
+        listing = parse_listing(rec)
+        with self._lock:
+            if listing is None:
+                # Reservering vrijgeven: een latere kopie (met coördinaten) mag hem vullen
+                if key is not None and self._listings.get(key, False) is None:
+                    del self._listings[key]
+            elif key is None:
+                self._anonymous.append(listing)
+            else:
+                self._listings[key] = listing
+        return listing
+
+    @property
+    def unique(self) -> int:
+        """Aantal unieke records (ontdubbeld op room_id)"""
+        with self._lock:
+            parsed = sum(1 for listing in self._listings.values() if listing is not None)
+            return parsed + len(self._anonymous)
+
+    def listings(self) -> List[dict]:
+        """Slim records van de scan tot nu toe"""
+        with self._lock:
+            return [
+                listing for listing in self._listings.values() if listing is not None
+            ] + self._anonymous
 
 
 def apply_spatial_filter(
@@ -275,15 +397,10 @@ def apply_spatial_filter(
     Returns:
         GeoDataFrame met gefilterde listings
     """
-    # Laad gemeentegrenzen
-    gdf_all = (
-        gpd.read_file(gpkg_path, layer="gemeentegebied")
-        .set_crs("EPSG:28992")
-        .to_crs("EPSG:4326")
-    )
-    sel = gdf_all[gdf_all["naam"] == gemeente]
+    # Laad gemeentegrens (volledige resolutie, uit de GeoParquet cache)
+    boundary = get_gemeente_geometry(gpkg_path, gemeente)
 
-    if sel.empty:
+    if boundary is None:
         logger.error(f"No boundary found for gemeente: {gemeente}")
         return pd.DataFrame()
 
@@ -295,7 +412,7 @@ def apply_spatial_filter(
     )
 
     # Filter op gemeentegrenzen
-    inside = gdf_pts[gdf_pts.within(sel.geometry.union_all())].copy()
+    inside = gdf_pts[gdf_pts.within(boundary)].copy()
 
     filtered_count = len(df) - len(inside)
     if filtered_count > 0:
@@ -348,22 +465,18 @@ def scrape_gemeente(
     """
     logger.info(f"Scraping {gemeente}: {check_in}→{check_out} ({nights}n)")
 
-    # Laad gemeentegrenzen voor bounding box
-    gdf_all = (
-        gpd.read_file(gpkg_path, layer="gemeentegebied")
-        .set_crs("EPSG:28992")
-        .to_crs("EPSG:4326")
-    )
-    sel = gdf_all[gdf_all["naam"] == gemeente]
+    # Bounding box uit de gemeente index
+    bbox = get_gemeente_bbox(gpkg_path, gemeente)
 
-    if sel.empty:
+    if bbox is None:
         logger.error(f"No boundary found for gemeente: {gemeente}")
         return pd.DataFrame()
 
-    minx, miny, maxx, maxy = sel.total_bounds
+    minx, miny, maxx, maxy = bbox
 
-    # Maak parallelle API calls
-    all_raw_results, unique_count = make_parallel_api_calls(
+    # Maak parallelle API calls; records worden bij binnenkomst ontdubbeld
+    ingest = _ScanIngest()
+    make_parallel_api_calls(
         check_in,
         check_out,
         maxy,
@@ -379,17 +492,20 @@ def scrape_gemeente(
         language,
         proxy_url,
         delay_between_calls=0.5,
+        transform=ingest,
     )
 
-    if not all_raw_results:
+    if not ingest.received:
         logger.warning(f"No results for {gemeente}")
         return pd.DataFrame()
 
-    logger.info(f"{gemeente}: {unique_count} unique listings")
+    logger.info(
+        f"{gemeente}: {ingest.unique} unique listings ({ingest.received} records received)"
+    )
 
     # Verwerk resultaten
-    rows = process_raw_results(
-        all_raw_results,
+    rows = listings_to_rows(
+        ingest.listings(),
         gemeente,
         check_in,
         check_out,
@@ -414,6 +530,31 @@ def scrape_gemeente(
     return inside
 
 
+def build_scan_tasks(
+    gemeenten: List[str],
+    scan_combinations: List[Tuple[str, str, int, int, int]],
+    skip_tasks: Optional[Set[Tuple[str, int]]] = None,
+) -> List[Tuple[str, str, str, int, int, int]]:
+    """
+    Bouw de takenlijst van een run: één scan per gemeente per combinatie
+
+    Args:
+        gemeenten: Lijst van gemeente namen
+        scan_combinations: Lijst van (checkin, checkout, nachten, gasten, scan_id)
+        skip_tasks: (gemeente, scan_id) paren die overgeslagen worden
+
+    Returns:
+        Lijst van (gemeente, checkin, checkout, nachten, gasten, scan_id)
+    """
+    tasks = []
+    for ci, co, nights, guests, scan_id in scan_combinations:
+        for gemeente in gemeenten:
+            if skip_tasks and (gemeente, scan_id) in skip_tasks:
+                continue
+            tasks.append((gemeente, ci, co, nights, guests, scan_id))
+    return tasks
+
+
 def scrape_all(
     gemeenten: List[str],
     scan_combinations: List[Tuple[str, str, int, int, int]],
@@ -433,6 +574,15 @@ def scrape_all(
     delay_between_scans: float = 1.0,
     delay_between_calls: float = 0.5,
     tracker=None,
+    skip_tasks: Optional[Set[Tuple[str, int]]] = None,
+    initial_data: Optional[pd.DataFrame] = None,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    retry_rounds: int = DEFAULT_RETRY_ROUNDS,
+    hedge_policy: Optional[HedgePolicy] = None,
+    shared_bboxes: bool = False,
+    scan_areas: Optional[List[ScanArea]] = None,
+    raw_archive: Optional[RawArchive] = None,
 ) -> pd.DataFrame:
     """
     Scrape alle gemeenten en scan combinaties met parallelisatie en timing
@@ -455,383 +605,1237 @@ def scrape_all(
         checkpoint_dir: Directory voor tussentijds opslaan (None = disabled)
         delay_between_scans: Delay tussen scans in seconden (default 1.0s)
         delay_between_calls: Delay tussen API repeat calls in seconden (default 0.5s)
+        tracker: Optionele RunTracker; ontvangt scan_started/scan_done/
+            scan_failed/rate_limit/checkpoint events
+        skip_tasks: (gemeente, scan_id) paren die al gedaan zijn (hervatten)
+        initial_data: Resultaten van eerder gedane scans (uit een checkpoint);
+            worden meegenomen in checkpoints en het eindresultaat
+        proxy_pool: Optionele ProxyPool; API calls worden over de proxies
+            verdeeld (proxy_url wordt dan genegeerd). Default: één directe
+            verbinding met een gedeeld call budget
+        circuit_breaker: Optionele CircuitBreaker; default één per run die alle
+            workers pauzeert als te veel calls falen
+        retry_rounds: Aantal extra rondes na de hoofdronde voor scans die
+            mislukt zijn, elk met minder workers en langere delays. Scans die
+            dan nog ontbreken staan in df.attrs["missing_scans"]
+        hedge_policy: Optionele HedgePolicy; calls die langer lopen dan het
+            geleerde percentiel krijgen een tweede request (binnen het hedge
+            budget). Default: geen hedging, alleen latency meten
+        shared_bboxes: Multi-gemeente modus: gemeenten met overlappende
+            bboxes delen één query per datum (zie src.core.shared_areas) en
+            listings krijgen hun gemeente via één ruimtelijke join. Scans,
+            events en ontbrekende cellen staan dan op naam van het scan
+            gebied (bv. "Amsterdam + Amstelveen")
+        scan_areas: Vooraf geplande scan gebieden, bv. de tegels van de
+            landelijke modus (src.core.nationwide.plan_tiles); vervangt
+            shared_bboxes. Resultaten worden over alle gebieden per room_id
+            en scan ontdubbeld
+        raw_archive: Optionele RawArchive voor de ruwe API records. Records
+            worden bij binnenkomst op room_id ontdubbeld en teruggebracht tot
+            de gebruikte velden; zonder archief wordt de ruwe payload direct
+            weggegooid
 
     Returns:
         DataFrame met alle scrape resultaten
     """
-    start_time = time.time()
-    all_runs = []
-    total_scans = len(scan_combinations) * len(gemeenten)
-    total_records = 0
-    unique_listings = set()
-
-    # Timing statistics
-    timing_stats = {
-        "api_calls": 0.0,
-        "processing": 0.0,
-        "spatial_filter": 0.0,
-        "checkpoints": 0.0,
-    }
-
-    logger.info(
-        f"Starting parallel scrape: {total_scans} total scans with {max_workers} workers"
+    circuit_breaker, hedge_policy, proxy_pool, own_pool = _engine_defaults(
+        tracker,
+        circuit_breaker,
+        hedge_policy,
+        proxy_pool,
+        max_workers,
+        delay_between_calls,
+        num_repeat_calls,
     )
 
-    # Print nice scanning header
-    if show_progress:
-        print("\n" + "═" * 80)
-        print("  🚀 AIRBNB SCANNER GESTART")
-        print("═" * 80)
-        print(f"  📊 Totaal scans:      {total_scans}")
-        print(f"  🏘️  Gemeenten:         {', '.join(gemeenten)}")
-        print(f"  👷 Workers:           {max_workers}")
-        print(f"  ⏱️  Scan delay:        {delay_between_scans}s")
-        print(f"  🔄 API repeat calls:  {num_repeat_calls}")
-        print("═" * 80 + "\n")
-
-    # Create progress bar
-    pbar = tqdm(
-        total=total_scans,
-        desc="⚡ Scanning",
-        disable=not show_progress,
-        unit="scan",
-        bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}] {postfix}",
+    jobs = _build_scan_jobs(
+        gemeenten, scan_combinations, gpkg_path, skip_tasks, shared_bboxes, scan_areas, raw_archive
+    )
+    progress = _ScrapeProgress(
+        len(jobs), tracker, show_progress, checkpoint_dir, initial_data, proxy_pool
+    )
+    progress.dedupe_scans = shared_bboxes or scan_areas is not None
+    progress.print_header(
+        gemeenten,
+        max_workers,
+        delay_between_scans,
+        num_repeat_calls,
+        None if own_pool else len(proxy_pool),
     )
 
-    # Build task list
-    tasks = []
-    for ci, co, nights, guests, scan_id in scan_combinations:
-        for gemeente in gemeenten:
-            tasks.append((gemeente, ci, co, nights, guests, scan_id))
-
-    # Parallel execution
-    completed_scans = 0
-    failed_scans = 0
-    rate_limit_hits = 0  # Track rate limiting
-
-    # Detailed timing per gemeente and phase
-    gemeente_timings = {}  # Track time per gemeente
-    phase_timings = {
-        "api_individual": [],  # Individual API call times
-        "processing_individual": [],  # Individual processing times
-        "spatial_individual": [],  # Individual spatial filter times
-    }
-
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks with delay between submissions
-        future_to_task = {}
-        for idx, (gemeente, ci, co, nights, guests, scan_id) in enumerate(tasks):
-            # Add delay between task submissions (but not before first task)
-            if idx > 0 and delay_between_scans > 0:
-                time.sleep(delay_between_scans)
-
-            future = executor.submit(
-                _scrape_with_timing,
-                gemeente,
-                ci,
-                co,
-                nights,
-                guests,
-                scan_id,
-                gpkg_path,
-                num_repeat_calls,
-                zoom_value,
-                price_min,
-                price_max,
-                amenities,
-                currency,
-                language,
-                proxy_url,
-                measurement_date,
-                delay_between_calls,
+    # Hoofdronde, daarna retry_rounds rondes voor scans die na alle pogingen
+    # nog mislukt waren (met minder workers en langere delays)
+    round_jobs = jobs
+    for round_no in range(retry_rounds + 1):
+        final_round = round_no == retry_rounds
+        if round_no > 0:
+            if not progress.deferred:
+                break
+            round_jobs = progress.take_deferred()
+        round_workers, round_scan_delay, round_call_delay = _round_settings(
+            round_no, max_workers, delay_between_scans, delay_between_calls
+        )
+        if round_no > 0:
+            if own_pool:
+                proxy_pool.set_rate(_direct_call_rate(round_workers, round_call_delay))
+            progress.start_round(
+                round_no, retry_rounds, len(round_jobs), round_workers, round_scan_delay
             )
-            future_to_task[future] = (gemeente, ci, co, nights, scan_id)
-
-        # Process completed tasks
-        for future in as_completed(future_to_task):
-            gemeente_name, ci, co, nights, scan_id = future_to_task[future]
-            try:
-                df_run, timings = future.result()
-                all_runs.append(df_run)
-                completed_scans += 1
-
-                # Update tracker after each scan if provided
-                if tracker is not None:
-                    # Get current unique listings count
-                    df_combined = pd.concat(all_runs, ignore_index=True)
-                    unique_listings = (
-                        df_combined["room_id"].nunique() if not df_combined.empty else 0
+
+        with ThreadPoolExecutor(max_workers=round_workers) as executor:
+            # Dispatcher: nooit meer dan round_workers scans tegelijk; mislukte
+            # pogingen wachten in een delay heap in plaats van in een worker
+            ready = deque(round_jobs)
+            delayed = []  # heap van (deadline, volgnummer, job)
+            in_flight = {}
+            next_submit_at = 0.0
+            retry_seq = 0
+
+            while ready or delayed or in_flight:
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    ready.appendleft(heapq.heappop(delayed)[2])
+
+                # Vul vrije workers (scan delay zonder de dispatcher te blokkeren)
+                while ready and len(in_flight) < round_workers and now >= next_submit_at:
+                    job = ready.popleft()
+                    future = executor.submit(
+                        _run_scan,
+                        tracker,
+                        job,
+                        job["attempt"] >= MAX_SCAN_ATTEMPTS - 1,
+                        gpkg_path,
+                        num_repeat_calls,
+                        zoom_value,
+                        price_min,
+                        price_max,
+                        amenities,
+                        currency,
+                        language,
+                        proxy_url,
+                        measurement_date,
+                        round_call_delay,
+                        proxy_pool,
+                        circuit_breaker,
+                        hedge_policy,
                     )
-                    tracker.update_progress(completed_scans=completed_scans)
-                    # Also update total_listings in status
-                    status = tracker._load_status()
-                    status["progress"]["total_listings"] = unique_listings
-                    tracker._save_status(status)
-
-                # Aggregate timings
-                for key in timings:
-                    if key in timing_stats:
-                        timing_stats[key] += timings[key]
-
-                # Track per-gemeente timing
-                if gemeente_name not in gemeente_timings:
-                    gemeente_timings[gemeente_name] = {
-                        "total": 0.0,
-                        "api": 0.0,
-                        "processing": 0.0,
-                        "spatial": 0.0,
-                        "scans": 0,
-                    }
-                gemeente_timings[gemeente_name]["total"] += sum(timings.values())
-                gemeente_timings[gemeente_name]["api"] += timings.get("api_calls", 0)
-                gemeente_timings[gemeente_name]["processing"] += timings.get(
-                    "processing", 0
-                )
-                gemeente_timings[gemeente_name]["spatial"] += timings.get(
-                    "spatial_filter", 0
-                )
-                gemeente_timings[gemeente_name]["scans"] += 1
+                    in_flight[future] = job
+                    next_submit_at = now + round_scan_delay
+
+                # Wacht tot een scan klaar is, een retry due is of er weer gestart mag worden
+                wake_times = []
+                if delayed:
+                    wake_times.append(delayed[0][0])
+                if ready and len(in_flight) < round_workers:
+                    wake_times.append(next_submit_at)
+                timeout = max(0.0, min(wake_times) - now) if wake_times else None
+                if not in_flight:
+                    time.sleep(timeout or 0.0)
+                    continue
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    job = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                        if result is None:
+                            # Herhaalbare fout: opnieuw inplannen na backoff
+                            retry_seq += 1
+                            heapq.heappush(
+                                delayed,
+                                (time.monotonic() + progress.retry_backoff(job), retry_seq, job),
+                            )
+                            continue
+                        progress.scan_done(job, *result)
+                    except Exception as e:
+                        progress.scan_failed(job, e, final_round)
 
-                # Track individual phase times
-                phase_timings["api_individual"].append(timings.get("api_calls", 0))
-                phase_timings["processing_individual"].append(
-                    timings.get("processing", 0)
-                )
-                phase_timings["spatial_individual"].append(
-                    timings.get("spatial_filter", 0)
-                )
+    return progress.finish(max_workers, circuit_breaker, hedge_policy)
 
-                # Update statistics
-                new_listings = 0
-                if not df_run.empty:
-                    records_in_run = len(df_run)
-                    total_records += records_in_run
-                    before_count = len(unique_listings)
-                    unique_listings.update(df_run["room_id"].unique())
-                    new_listings = len(unique_listings) - before_count
-                else:
-                    records_in_run = 0
 
-                # Calculate rates
-                elapsed = time.time() - start_time
-                avg_time_per_scan = elapsed / (pbar.n + 1)
+async def scrape_all_async(
+    gemeenten: List[str],
+    scan_combinations: List[Tuple[str, str, int, int, int]],
+    gpkg_path: str,
+    num_repeat_calls: int,
+    zoom_value: int,
+    price_min: int,
+    price_max: int,
+    amenities: List[str],
+    currency: str,
+    language: str,
+    proxy_url: str,
+    measurement_date: str,
+    show_progress: bool = True,
+    max_workers: int = 5,
+    checkpoint_dir: Optional[str] = None,
+    delay_between_scans: float = 1.0,
+    delay_between_calls: float = 0.5,
+    tracker=None,
+    skip_tasks: Optional[Set[Tuple[str, int]]] = None,
+    initial_data: Optional[pd.DataFrame] = None,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    retry_rounds: int = DEFAULT_RETRY_ROUNDS,
+    hedge_policy: Optional[HedgePolicy] = None,
+    shared_bboxes: bool = False,
+    scan_areas: Optional[List[ScanArea]] = None,
+    raw_archive: Optional[RawArchive] = None,
+    max_in_flight: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    asyncio variant van scrape_all (zelfde argumenten, DataFrame en timing)
+
+    Scans zijn coroutines in plaats van threads: wachten op call budget, de
+    circuit breaker, backoffs en scan delays kost geen thread meer. Alleen de
+    blokkerende HTTP request zelf (search_listings) en de verwerking van een scan
+    draaien in een thread pool van max_in_flight threads. Zo kunnen veel
+    scans (max_workers) tegelijk lopen over veel proxies.
 
-                # This scan timing
-                this_scan_time = sum(timings.values())
+    Gebruik vanuit synchrone code:
+        df = asyncio.run(scrape_all_async(...))
 
-                # Success rate
-                success_rate = (
-                    (completed_scans / (completed_scans + failed_scans) * 100)
-                    if (completed_scans + failed_scans) > 0
-                    else 100
-                )
+    Args:
+        (zie scrape_all)
+        max_in_flight: Maximum aantal gelijktijdige HTTP requests (threads);
+            default max_workers * num_repeat_calls
 
-                # Update progress bar with detailed stats
-                # Status emoji based on success rate
-                if success_rate >= 95:
-                    status_emoji = "🟢"
-                elif success_rate >= 80:
-                    status_emoji = "🟡"
-                else:
-                    status_emoji = "🔴"
+    Returns:
+        DataFrame met alle scrape resultaten
+    """
+    circuit_breaker, hedge_policy, proxy_pool, own_pool = _engine_defaults(
+        tracker,
+        circuit_breaker,
+        hedge_policy,
+        proxy_pool,
+        max_workers,
+        delay_between_calls,
+        num_repeat_calls,
+    )
 
-                # New listings indicator
-                new_indicator = f"✨+{new_listings}" if new_listings > 0 else ""
+    jobs = _build_scan_jobs(
+        gemeenten, scan_combinations, gpkg_path, skip_tasks, shared_bboxes, scan_areas, raw_archive
+    )
+    progress = _ScrapeProgress(
+        len(jobs), tracker, show_progress, checkpoint_dir, initial_data, proxy_pool
+    )
+    progress.dedupe_scans = shared_bboxes or scan_areas is not None
+    progress.print_header(
+        gemeenten,
+        max_workers,
+        delay_between_scans,
+        num_repeat_calls,
+        None if own_pool else len(proxy_pool),
+    )
 
-                pbar.set_description(
-                    f"⚡ {status_emoji} {gemeente_name[:10]:10s} │ {ci} ({nights}n)"
-                )
-                pbar.set_postfix_str(
-                    f"✅{completed_scans} ❌{failed_scans} │ "
-                    f"🏠{len(unique_listings):,} {new_indicator} │ "
-                    f"📊{total_records:,} │ "
-                    f"⏱️{this_scan_time:.1f}s (Ø{avg_time_per_scan:.1f}s)"
+    if max_in_flight is None:
+        max_in_flight = max_workers * max(1, num_repeat_calls)
+    # Hedges kunnen het aantal requests van een scan verdubbelen
+    io_executor = ThreadPoolExecutor(
+        max_workers=max(1, max_in_flight), thread_name_prefix="airbnb-io"
+    )
+    try:
+        round_jobs = jobs
+        for round_no in range(retry_rounds + 1):
+            final_round = round_no == retry_rounds
+            if round_no > 0:
+                if not progress.deferred:
+                    break
+                round_jobs = progress.take_deferred()
+            round_workers, round_scan_delay, round_call_delay = _round_settings(
+                round_no, max_workers, delay_between_scans, delay_between_calls
+            )
+            if round_no > 0:
+                if own_pool:
+                    proxy_pool.set_rate(_direct_call_rate(round_workers, round_call_delay))
+                progress.start_round(
+                    round_no, retry_rounds, len(round_jobs), round_workers, round_scan_delay
                 )
 
-                # Checkpoint save every 10 tasks
-                if checkpoint_dir and len(all_runs) % 10 == 0:
-                    checkpoint_start = time.time()
-                    _save_checkpoint(all_runs, checkpoint_dir, len(all_runs))
-                    timing_stats["checkpoints"] += time.time() - checkpoint_start
-                    pbar.write(
-                        f"  💾 Checkpoint #{len(all_runs) // 10} → {len(unique_listings):,} listings opgeslagen"
+            # Zelfde dispatcher als scrape_all, met tasks en een delay heap
+            ready = deque(round_jobs)
+            delayed = []  # heap van (deadline, volgnummer, job)
+            in_flight = {}
+            next_submit_at = 0.0
+            retry_seq = 0
+
+            while ready or delayed or in_flight:
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    ready.appendleft(heapq.heappop(delayed)[2])
+
+                while ready and len(in_flight) < round_workers and now >= next_submit_at:
+                    job = ready.popleft()
+                    task = asyncio.create_task(
+                        _run_scan_async(
+                            tracker,
+                            job,
+                            job["attempt"] >= MAX_SCAN_ATTEMPTS - 1,
+                            gpkg_path,
+                            num_repeat_calls,
+                            zoom_value,
+                            price_min,
+                            price_max,
+                            amenities,
+                            currency,
+                            language,
+                            proxy_url,
+                            measurement_date,
+                            round_call_delay,
+                            proxy_pool,
+                            circuit_breaker,
+                            hedge_policy,
+                            io_executor,
+                        )
                     )
+                    in_flight[task] = job
+                    next_submit_at = now + round_scan_delay
+
+                wake_times = []
+                if delayed:
+                    wake_times.append(delayed[0][0])
+                if ready and len(in_flight) < round_workers:
+                    wake_times.append(next_submit_at)
+                timeout = max(0.0, min(wake_times) - now) if wake_times else None
+                if not in_flight:
+                    await asyncio.sleep(timeout or 0.0)
+                    continue
+                done, _ = await asyncio.wait(
+                    in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
 
-            except Exception as e:
-                failed_scans += 1
-                error_msg = str(e)
+                for task in done:
+                    job = in_flight.pop(task)
+                    try:
+                        result = task.result()
+                        if result is None:
+                            retry_seq += 1
+                            heapq.heappush(
+                                delayed,
+                                (time.monotonic() + progress.retry_backoff(job), retry_seq, job),
+                            )
+                            continue
+                        progress.scan_done(job, *result)
+                    except Exception as e:
+                        progress.scan_failed(job, e, final_round)
+    finally:
+        # Verliezers van hedges niet afwachten
+        io_executor.shutdown(wait=False)
+
+    return progress.finish(max_workers, circuit_breaker, hedge_policy)
+
+
+def _engine_defaults(
+    tracker,
+    circuit_breaker: Optional[CircuitBreaker],
+    hedge_policy: Optional[HedgePolicy],
+    proxy_pool: Optional[ProxyPool],
+    max_workers: int,
+    delay_between_calls: float,
+    num_repeat_calls: int,
+) -> Tuple[CircuitBreaker, HedgePolicy, ProxyPool, bool]:
+    """
+    Vul de standaard circuit breaker, hedge policy en proxy pool van een run in
 
-                # Detect rate limiting
-                is_rate_limit = (
-                    "405" in error_msg
-                    or "429" in error_msg
-                    or "Not Allowed" in error_msg
-                    or "Rate limit" in error_msg
-                )
-                if is_rate_limit:
-                    rate_limit_hits += 1
-                    pbar.write(
-                        f"  🚫 RATE LIMIT │ {gemeente_name} {ci} │ Verlaag workers!"
-                    )
-                    # Auto-adjust: als we te veel rate limits krijgen, voeg delay toe
-                    if rate_limit_hits > 3:
-                        time.sleep(2.0)  # Extra pauze
-                        pbar.write("  ⏸️  Extra pauze (2s) na meerdere rate limits...")
-                else:
-                    logger.error(
-                        f"Error in task {gemeente_name} {ci}: {error_msg[:100]}"
-                    )
-                    pbar.write(f"  ❌ FOUT │ {gemeente_name} {ci} │ {error_msg[:50]}")
+    Returns:
+        Tuple van (circuit_breaker, hedge_policy, proxy_pool, own_pool)
+    """
+    if circuit_breaker is None:
+
+        def _on_circuit_change(state: str, cooldown: float):
+            if tracker is None:
+                return
+            if state == CircuitBreaker.OPEN:
+                tracker.log(f"⛔ Te veel fouten: alle calls {cooldown:.0f}s gepauzeerd")
+            elif state == CircuitBreaker.CLOSED:
+                tracker.log("✅ Calls hervat")
+            elif state == CircuitBreaker.GAVE_UP:
+                tracker.log("🛑 API blijft onbereikbaar: resterende scans falen direct")
+
+        circuit_breaker = CircuitBreaker(on_change=_on_circuit_change)
+
+    if hedge_policy is None:
+        # Budget 0: geen hedges, wel latency percentielen in de samenvatting
+        hedge_policy = HedgePolicy(budget=0.0)
+
+    # Zonder proxies delen alle directe calls één budget, met hetzelfde tempo
+    # als max_workers scans met delay_between_calls tussen hun calls
+    own_pool = proxy_pool is None
+    if own_pool:
+        proxy_pool = ProxyPool(
+            [DIRECT],
+            rate_per_proxy=_direct_call_rate(max_workers, delay_between_calls),
+            burst=max(1, num_repeat_calls),
+        )
+    return circuit_breaker, hedge_policy, proxy_pool, own_pool
+
+
+def _round_settings(
+    round_no: int, max_workers: int, delay_between_scans: float, delay_between_calls: float
+) -> Tuple[int, float, float]:
+    """Workers, scan delay en call delay van een ronde (retry rondes rustiger)"""
+    if round_no == 0:
+        return max_workers, delay_between_scans, delay_between_calls
+    return (
+        max(1, max_workers // 2**round_no),
+        max(delay_between_scans, 1.0) * 2**round_no,
+        max(delay_between_calls, 0.5) * 2**round_no,
+    )
 
-            pbar.update(1)
 
-    pbar.close()
+class _ScrapeProgress:
+    """
+    Boekhouding van een scrape run: resultaten, tellers, timing, progress bar,
+    tracker events, checkpoints en de samenvatting (gedeeld door scrape_all
+    en scrape_all_async)
+    """
 
-    # Print nice completion header
-    if show_progress:
-        print("\n" + "═" * 80)
-        print("  ✅ SCANNING VOLTOOID!")
-        print("═" * 80)
+    def __init__(
+        self,
+        total_scans: int,
+        tracker,
+        show_progress: bool,
+        checkpoint_dir: Optional[str],
+        initial_data: Optional[pd.DataFrame],
+        proxy_pool: ProxyPool,
+    ):
+        self.start_time = time.time()
+        self.total_scans = total_scans
+        self.tracker = tracker
+        self.show_progress = show_progress
+        self.checkpoint_dir = checkpoint_dir
+        self.proxy_pool = proxy_pool
+
+        self.all_runs = []
+        self.total_records = 0
+        self.unique_listings = set()
+        if initial_data is not None and not initial_data.empty:
+            self.all_runs.append(initial_data)
+            self.total_records = len(initial_data)
+            self.unique_listings.update(initial_data["room_id"].unique())
+
+        # Timing statistics
+        self.timing_stats = {
+            "api_calls": 0.0,
+            "processing": 0.0,
+            "spatial_filter": 0.0,
+            "checkpoints": 0.0,
+            "connection": 0.0,
+        }
+
+        # Sessions en requests van de pool bij de start (de pool leeft per proces)
+        self.sessions_at_start = session_stats()
+
+        self.records_received = 0  # ruwe records van alle calls
+        self.records_unique = 0  # na ontdubbelen bij binnenkomst
+
+        # Scan gebieden kunnen dezelfde listing opleveren (grens, verschoven coördinaten)
+        self.dedupe_scans = False
+
+        self.completed_scans = 0
+        self.failed_scans = 0
+        self.rate_limit_hits = 0  # Track rate limiting
+        self.retries_scheduled = 0
+        self.deferred = []
+        self.missing_scans = []
+
+        # Detailed timing per gemeente and phase
+        self.gemeente_timings = {}  # Track time per gemeente
+        self.phase_timings = {
+            "api_individual": [],  # Individual API call times
+            "processing_individual": [],  # Individual processing times
+            "spatial_individual": [],  # Individual spatial filter times
+        }
+        self.pbar = None
+
+    def print_header(
+        self,
+        gemeenten: List[str],
+        max_workers: int,
+        delay_between_scans: float,
+        num_repeat_calls: int,
+        num_proxies: Optional[int],
+    ):
+        """Log de start, print de scan header en maak de progress bar"""
+        logger.info(
+            f"Starting parallel scrape: {self.total_scans} total scans with {max_workers} workers"
+        )
 
-    # Combineer alle runs
-    combine_start = time.time()
-    df_all = pd.concat(all_runs, ignore_index=True) if all_runs else pd.DataFrame()
-    combine_time = time.time() - combine_start
+        # Print nice scanning header
+        if self.show_progress:
+            print("\n" + "═" * 80)
+            print("  🚀 AIRBNB SCANNER GESTART")
+            print("═" * 80)
+            print(f"  📊 Totaal scans:      {self.total_scans}")
+            print(f"  🏘️  Gemeenten:         {', '.join(gemeenten)}")
+            print(f"  👷 Workers:           {max_workers}")
+            print(f"  ⏱️  Scan delay:        {delay_between_scans}s")
+            print(f"  🔄 API repeat calls:  {num_repeat_calls}")
+            if num_proxies is not None:
+                print(f"  🌐 Proxies:           {num_proxies}")
+            print("═" * 80 + "\n")
+
+        # Create progress bar
+        self.pbar = tqdm(
+            total=self.total_scans,
+            desc="⚡ Scanning",
+            disable=not self.show_progress,
+            unit="scan",
+            bar_format="{desc}: {percentage:3.0f}%|{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}] {postfix}",
+        )
 
-    # Total time
-    total_time = time.time() - start_time
+    def take_deferred(self) -> List[Dict[str, Any]]:
+        """Uitgestelde scans voor de volgende ronde (met verse pogingen)"""
+        jobs, self.deferred = self.deferred, []
+        for job in jobs:
+            job.update(attempt=0, error=None)
+        return jobs
+
+    def start_round(
+        self, round_no: int, retry_rounds: int, num_jobs: int, workers: int, scan_delay: float
+    ):
+        """Meld het begin van een retry ronde"""
+        round_msg = (
+            f"🔁 Retry ronde {round_no}/{retry_rounds}: {num_jobs} mislukte scans "
+            f"({workers} workers, {scan_delay:.1f}s scan delay)"
+        )
+        self.pbar.write(f"  {round_msg}")
+        logger.info(round_msg)
+        if self.tracker is not None:
+            self.tracker.log(round_msg)
+
+    def retry_backoff(self, job: Dict[str, Any]) -> float:
+        """Registreer een herhaalbare fout en geef de backoff tot de volgende poging"""
+        gemeente_name, ci = job["task"][0], job["task"][1]
+        classified = job["error"].classified
+        if classified.is_rate_limit:
+            self.rate_limit_hits += 1
+            if self.tracker is not None:
+                self.tracker.emit(
+                    run_events.RATE_LIMIT,
+                    gemeente=gemeente_name,
+                    checkin=ci,
+                    hits=self.rate_limit_hits,
+                )
+        if classified.is_rate_limit and len(self.proxy_pool) > 1:
+            backoff = 0.0  # proxy in quarantaine, andere proxy neemt over
+        else:
+            backoff = classified.backoff(job["attempt"] - 1, RETRY_DELAY)
+        self.retries_scheduled += 1
+        self.pbar.write(
+            f"  🔁 RETRY │ {gemeente_name} {ci} │ "
+            f"{classified.category.value}, over {backoff:.1f}s"
+        )
+        return backoff
+
+    def scan_done(self, job: Dict[str, Any], df_run: pd.DataFrame, timings: Dict[str, float]):
+        """Verwerk een geslaagde scan"""
+        gemeente_name, ci, co, nights, guests, scan_id = job["task"]
+        self.all_runs.append(df_run)
+        self.completed_scans += 1
+        self.records_received += job["ingest"].received
+        self.records_unique += job["ingest"].unique
+
+        # Aggregate timings
+        for key in timings:
+            if key in self.timing_stats:
+                self.timing_stats[key] += timings[key]
+
+        # Track per-gemeente timing
+        if gemeente_name not in self.gemeente_timings:
+            self.gemeente_timings[gemeente_name] = {
+                "total": 0.0,
+                "api": 0.0,
+                "processing": 0.0,
+                "spatial": 0.0,
+                "scans": 0,
+            }
+        gemeente_timing = self.gemeente_timings[gemeente_name]
+        this_scan_time = sum(timings.get(phase, 0) for phase in SCAN_PHASES)
+        gemeente_timing["total"] += this_scan_time
+        gemeente_timing["api"] += timings.get("api_calls", 0)
+        gemeente_timing["processing"] += timings.get("processing", 0)
+        gemeente_timing["spatial"] += timings.get("spatial_filter", 0)
+        gemeente_timing["scans"] += 1
+
+        # Track individual phase times
+        self.phase_timings["api_individual"].append(timings.get("api_calls", 0))
+        self.phase_timings["processing_individual"].append(timings.get("processing", 0))
+        self.phase_timings["spatial_individual"].append(timings.get("spatial_filter", 0))
+
+        # Update statistics
+        new_listings = 0
+        if not df_run.empty:
+            records_in_run = len(df_run)
+            self.total_records += records_in_run
+            before_count = len(self.unique_listings)
+            self.unique_listings.update(df_run["room_id"].unique())
+            new_listings = len(self.unique_listings) - before_count
+        else:
+            records_in_run = 0
+
+        if self.tracker is not None:
+            self.tracker.emit(
+                run_events.SCAN_DONE,
+                gemeente=gemeente_name,
+                checkin=ci,
+                nights=nights,
+                scan_id=scan_id,
+                records=records_in_run,
+                new_listings=new_listings,
+                total_listings=len(self.unique_listings),
+                duration=round(this_scan_time, 2),
+            )
+
+        # Calculate rates
+        elapsed = time.time() - self.start_time
+        avg_time_per_scan = elapsed / (self.pbar.n + 1)
 
-    # Print quick summary
-    if show_progress:
-        unique_count = df_all["room_id"].nunique() if not df_all.empty else 0
-        success_rate = (completed_scans / total_scans * 100) if total_scans > 0 else 0
+        # Success rate
+        attempted = self.completed_scans + self.failed_scans
+        success_rate = (self.completed_scans / attempted * 100) if attempted > 0 else 100
 
-        # Success rate emoji
+        # Update progress bar with detailed stats
+        # Status emoji based on success rate
         if success_rate >= 95:
-            rate_emoji = "🟢"
+            status_emoji = "🟢"
         elif success_rate >= 80:
-            rate_emoji = "🟡"
+            status_emoji = "🟡"
         else:
-            rate_emoji = "🔴"
+            status_emoji = "🔴"
 
-        print(f"  ⏱️  Totale tijd:       {total_time:.1f}s ({total_time / 60:.1f}m)")
-        print(
-            f"  {rate_emoji} Succes rate:      {completed_scans}/{total_scans} ({success_rate:.1f}%)"
+        # New listings indicator
+        new_indicator = f"✨+{new_listings}" if new_listings > 0 else ""
+
+        self.pbar.set_description(
+            f"⚡ {status_emoji} {gemeente_name[:10]:10s} │ {ci} ({nights}n)"
         )
-        print(f"  🏠 Unieke listings:   {unique_count:,}")
-        print(f"  📊 Totaal records:    {len(df_all):,}")
-        print(
-            f"  ⚡ Gem. per scan:     {total_time / completed_scans:.1f}s"
-            if completed_scans > 0
-            else ""
+        self.pbar.set_postfix_str(
+            f"✅{self.completed_scans} ❌{self.failed_scans} │ "
+            f"🏠{len(self.unique_listings):,} {new_indicator} │ "
+            f"📊{self.total_records:,} │ "
+            f"⏱️{this_scan_time:.1f}s (Ø{avg_time_per_scan:.1f}s)"
         )
 
-        if failed_scans > 0:
-            print(f"  ⚠️  Gefaald:           {failed_scans}")
-        if rate_limit_hits > 0:
-            print(f"  🚫 Rate limits:       {rate_limit_hits}")
+        # Checkpoint save every 10 tasks
+        if self.checkpoint_dir and len(self.all_runs) % 10 == 0:
+            checkpoint_start = time.time()
+            _save_checkpoint(self.all_runs, self.checkpoint_dir, len(self.all_runs))
+            self.timing_stats["checkpoints"] += time.time() - checkpoint_start
+            if self.tracker is not None:
+                self.tracker.emit(
+                    run_events.CHECKPOINT,
+                    number=len(self.all_runs) // 10,
+                    scans=len(self.all_runs),
+                    listings=len(self.unique_listings),
+                )
+            self.pbar.write(
+                f"  💾 Checkpoint #{len(self.all_runs) // 10} → {len(self.unique_listings):,} listings opgeslagen"
+            )
 
-        print("═" * 80 + "\n")
+        self.pbar.update(1)
 
-    # Print detailed timing summary
-    logger.info("=" * 80)
-    logger.info("⏱️  DETAILED TIMING BREAKDOWN")
-    logger.info("=" * 80)
-    logger.info(f"Total time:           {total_time:.2f}s ({total_time / 60:.1f}m)")
-    logger.info(
-        f"Successful scans:     {completed_scans}/{total_scans} ({completed_scans / total_scans * 100:.1f}%)"
-    )
-    logger.info(f"Failed scans:         {failed_scans}")
-    if rate_limit_hits > 0:
-        logger.warning(
-            f"⚠️ Rate limit hits:   {rate_limit_hits} (reduce workers from {max_workers} to {max(1, max_workers - 2)})"
+    def scan_failed(self, job: Dict[str, Any], error: Exception, final_round: bool):
+        """Verwerk een mislukte scan: uitstellen naar een retry ronde of opgeven"""
+        gemeente_name, ci, co, nights, guests, scan_id = job["task"]
+        error_msg = str(error)
+        classified = classify_error(error)
+        is_rate_limit = classified.is_rate_limit
+
+        if classified.retryable and not final_round:
+            # Na de hoofdronde nog eens proberen, rustiger
+            self.deferred.append(job)
+            self.pbar.write(
+                f"  ⏭️  UITGESTELD │ {gemeente_name} {ci} │ {classified.category.value}"
+            )
+            return
+
+        self.failed_scans += 1
+        # Scan gebied (gedeeld of tegel): de cel ontbreekt voor elke gemeente erin
+        members = {"gemeenten": list(job["area"].gemeenten)} if job.get("area") else {}
+        self.missing_scans.append(
+            {
+                "gemeente": gemeente_name,
+                "checkin": ci,
+                "checkout": co,
+                "nights": nights,
+                "scan_id": scan_id,
+                "category": classified.category.value,
+                "error": error_msg[:200],
+                **members,
+            }
         )
-    logger.info("")
+        if self.tracker is not None:
+            if is_rate_limit:
+                self.tracker.emit(
+                    run_events.RATE_LIMIT,
+                    gemeente=gemeente_name,
+                    checkin=ci,
+                    hits=self.rate_limit_hits + 1,
+                )
+            self.tracker.emit(
+                run_events.SCAN_FAILED,
+                gemeente=gemeente_name,
+                checkin=ci,
+                nights=nights,
+                scan_id=scan_id,
+                error=error_msg[:200],
+                rate_limit=is_rate_limit,
+                category=classified.category.value,
+                **members,
+            )
 
-    # Overall phase breakdown
-    logger.info("📊 PHASE BREAKDOWN (Total)")
-    logger.info(
-        f"API calls:            {timing_stats['api_calls']:.2f}s ({timing_stats['api_calls'] / total_time * 100:.1f}%)"
-    )
-    logger.info(
-        f"Processing:           {timing_stats['processing']:.2f}s ({timing_stats['processing'] / total_time * 100:.1f}%)"
-    )
-    logger.info(
-        f"Spatial filtering:    {timing_stats['spatial_filter']:.2f}s ({timing_stats['spatial_filter'] / total_time * 100:.1f}%)"
-    )
-    logger.info(
-        f"Checkpoints:          {timing_stats['checkpoints']:.2f}s ({timing_stats['checkpoints'] / total_time * 100:.1f}%)"
-    )
-    logger.info(
-        f"DataFrame combine:    {combine_time:.2f}s ({combine_time / total_time * 100:.1f}%)"
-    )
-    logger.info("")
+        if is_rate_limit:
+            self.rate_limit_hits += 1
+            self.pbar.write(f"  🚫 RATE LIMIT │ {gemeente_name} {ci} │ Verlaag workers!")
+        else:
+            logger.error(f"Error in task {gemeente_name} {ci}: {error_msg[:100]}")
+            self.pbar.write(f"  ❌ FOUT │ {gemeente_name} {ci} │ {error_msg[:50]}")
+
+        self.pbar.update(1)
+
+    def finish(
+        self, max_workers: int, circuit_breaker: CircuitBreaker, hedge_policy: HedgePolicy
+    ) -> pd.DataFrame:
+        """Combineer de resultaten en print/log de samenvatting"""
+        self.pbar.close()
+
+        # Print nice completion header
+        if self.show_progress:
+            print("\n" + "═" * 80)
+            print("  ✅ SCANNING VOLTOOID!")
+            print("═" * 80)
+
+        # Combineer alle runs
+        combine_start = time.time()
+        df_all = pd.concat(self.all_runs, ignore_index=True) if self.all_runs else pd.DataFrame()
+        if self.dedupe_scans and not df_all.empty:
+            df_all = df_all.drop_duplicates(["room_id", "scan_id"], ignore_index=True)
+        df_all.attrs["missing_scans"] = self.missing_scans
+        combine_time = time.time() - combine_start
+
+        # Total time
+        total_time = time.time() - self.start_time
+
+        # Print quick summary
+        if self.show_progress:
+            unique_count = df_all["room_id"].nunique() if not df_all.empty else 0
+            success_rate = (
+                (self.completed_scans / self.total_scans * 100) if self.total_scans > 0 else 0
+            )
+
+            # Success rate emoji
+            if success_rate >= 95:
+                rate_emoji = "🟢"
+            elif success_rate >= 80:
+                rate_emoji = "🟡"
+            else:
+                rate_emoji = "🔴"
+
+            print(f"  ⏱️  Totale tijd:       {total_time:.1f}s ({total_time / 60:.1f}m)")
+            print(
+                f"  {rate_emoji} Succes rate:      {self.completed_scans}/{self.total_scans} ({success_rate:.1f}%)"
+            )
+            print(f"  🏠 Unieke listings:   {unique_count:,}")
+            print(f"  📊 Totaal records:    {len(df_all):,}")
+            print(
+                f"  ⚡ Gem. per scan:     {total_time / self.completed_scans:.1f}s"
+                if self.completed_scans > 0
+                else ""
+            )
 
-    # Per-scan averages
-    if completed_scans > 0:
-        logger.info("📈 PER-SCAN AVERAGES")
-        logger.info(f"Avg total per scan:   {total_time / completed_scans:.2f}s")
+            if self.failed_scans > 0:
+                print(f"  ⚠️  Gefaald:           {self.failed_scans}")
+            if self.rate_limit_hits > 0:
+                print(f"  🚫 Rate limits:       {self.rate_limit_hits}")
+            hedge_stats = hedge_policy.stats()
+            if hedge_stats["hedges"] > 0:
+                print(
+                    f"  🪃 Hedges:            {hedge_stats['hedges']} "
+                    f"(+{hedge_stats['extra_pct']:.1f}% calls), p90 "
+                    f"{hedge_stats['raw_p90']:.1f}s → {hedge_stats['effective_p90']:.1f}s"
+                )
+            if self.missing_scans:
+                print(f"  🕳️  Ontbrekende cellen: {len(self.missing_scans)}")
+                for cell in self.missing_scans[:20]:
+                    print(f"     • {cell['gemeente']} {cell['checkin']} ({cell['nights']}n)")
+                if len(self.missing_scans) > 20:
+                    print(f"     ... en {len(self.missing_scans) - 20} meer")
+
+            print("═" * 80 + "\n")
+
+        # Print detailed timing summary
+        logger.info("=" * 80)
+        logger.info("⏱️  DETAILED TIMING BREAKDOWN")
+        logger.info("=" * 80)
+        logger.info(f"Total time:           {total_time:.2f}s ({total_time / 60:.1f}m)")
+        logger.info(
+            f"Successful scans:     {self.completed_scans}/{self.total_scans} ({self.completed_scans / max(self.total_scans, 1) * 100:.1f}%)"
+        )
+        logger.info(f"Failed scans:         {self.failed_scans}")
+        if self.retries_scheduled > 0:
+            logger.info(f"Retries scheduled:    {self.retries_scheduled}")
+        if self.missing_scans:
+            logger.warning(f"🕳️ Missing cells:      {len(self.missing_scans)} (gemeente, date, nights)")
+            for cell in self.missing_scans:
+                logger.warning(
+                    f"   {cell['gemeente']:<20} {cell['checkin']} {cell['nights']:>3}n  "
+                    f"[{cell['category']}]"
+                )
+        if circuit_breaker.opened_count > 0:
+            logger.warning(
+                f"⛔ Circuit breaker:    {circuit_breaker.opened_count}x open (dispatch paused)"
+            )
+        if self.rate_limit_hits > 0:
+            logger.warning(
+                f"⚠️ Rate limit hits:   {self.rate_limit_hits} (reduce workers from {max_workers} to {max(1, max_workers - 2)})"
+            )
+        logger.info("")
+
+        # Overall phase breakdown
+        logger.info("📊 PHASE BREAKDOWN (Total)")
+        logger.info(
+            f"API calls:            {self.timing_stats['api_calls']:.2f}s ({self.timing_stats['api_calls'] / total_time * 100:.1f}%)"
+        )
+        logger.info(
+            f"  └ connect/bootstrap: {self.timing_stats['connection']:.2f}s "
+            f"(TCP/TLS setup + API key, summed over parallel calls)"
+        )
+        sessions = session_stats()
+        requests = sessions["requests"] - self.sessions_at_start["requests"]
+        if requests > 0:
+            logger.info(
+                f"  └ sessions:          "
+                f"{sessions['sessions'] - self.sessions_at_start['sessions']} new for "
+                f"{requests:,} requests (keep-alive pool)"
+            )
+        if self.records_unique > 0:
+            logger.info(
+                f"  └ ingest dedup:      {self.records_received:,} records → "
+                f"{self.records_unique:,} unique "
+                f"({self.records_received / self.records_unique:.1f}x, parsed once per listing)"
+            )
+        logger.info(
+            f"Processing:           {self.timing_stats['processing']:.2f}s ({self.timing_stats['processing'] / total_time * 100:.1f}%)"
+        )
         logger.info(
-            f"Avg API time:         {timing_stats['api_calls'] / completed_scans:.2f}s"
+            f"Spatial filtering:    {self.timing_stats['spatial_filter']:.2f}s ({self.timing_stats['spatial_filter'] / total_time * 100:.1f}%)"
         )
         logger.info(
-            f"Avg processing:       {timing_stats['processing'] / completed_scans:.2f}s"
+            f"Checkpoints:          {self.timing_stats['checkpoints']:.2f}s ({self.timing_stats['checkpoints'] / total_time * 100:.1f}%)"
         )
         logger.info(
-            f"Avg spatial filter:   {timing_stats['spatial_filter'] / completed_scans:.2f}s"
+            f"DataFrame combine:    {combine_time:.2f}s ({combine_time / total_time * 100:.1f}%)"
         )
         logger.info("")
 
-        # Min/Max/Median for phases
-        import statistics
-
-        logger.info("📉 PHASE STATISTICS (min/median/max)")
-
-        if phase_timings["api_individual"]:
-            api_times = phase_timings["api_individual"]
+        # Per-scan averages
+        if self.completed_scans > 0:
+            logger.info("📈 PER-SCAN AVERAGES")
+            logger.info(f"Avg total per scan:   {total_time / self.completed_scans:.2f}s")
             logger.info(
-                f"API calls:            {min(api_times):.2f}s / {statistics.median(api_times):.2f}s / {max(api_times):.2f}s"
+                f"Avg API time:         {self.timing_stats['api_calls'] / self.completed_scans:.2f}s"
+            )
+            logger.info(
+                f"Avg processing:       {self.timing_stats['processing'] / self.completed_scans:.2f}s"
             )
-
-        if phase_timings["processing_individual"]:
-            proc_times = phase_timings["processing_individual"]
             logger.info(
-                f"Processing:           {min(proc_times):.2f}s / {statistics.median(proc_times):.2f}s / {max(proc_times):.2f}s"
+                f"Avg spatial filter:   {self.timing_stats['spatial_filter'] / self.completed_scans:.2f}s"
             )
+            logger.info("")
 
-        if phase_timings["spatial_individual"]:
-            spatial_times = phase_timings["spatial_individual"]
+            # Min/Max/Median for phases
+            import statistics
+
+            logger.info("📉 PHASE STATISTICS (min/median/max)")
+
+            if self.phase_timings["api_individual"]:
+                api_times = self.phase_timings["api_individual"]
+                logger.info(
+                    f"API calls:            {min(api_times):.2f}s / {statistics.median(api_times):.2f}s / {max(api_times):.2f}s"
+                )
+
+            if self.phase_timings["processing_individual"]:
+                proc_times = self.phase_timings["processing_individual"]
+                logger.info(
+                    f"Processing:           {min(proc_times):.2f}s / {statistics.median(proc_times):.2f}s / {max(proc_times):.2f}s"
+                )
+
+            if self.phase_timings["spatial_individual"]:
+                spatial_times = self.phase_timings["spatial_individual"]
+                logger.info(
+                    f"Spatial filtering:    {min(spatial_times):.2f}s / {statistics.median(spatial_times):.2f}s / {max(spatial_times):.2f}s"
+                )
+            logger.info("")
+
+        # Per-gemeente breakdown
+        if self.gemeente_timings:
+            logger.info("🏘️  PER-GEMEENTE TIMING")
             logger.info(
-                f"Spatial filtering:    {min(spatial_times):.2f}s / {statistics.median(spatial_times):.2f}s / {max(spatial_times):.2f}s"
+                f"{'Gemeente':<20} {'Scans':>6} {'Total':>8} {'API':>8} {'Process':>8} {'Spatial':>8} {'Avg/scan':>9}"
             )
-        logger.info("")
+            logger.info("-" * 80)
+            for gemeente, times in sorted(
+                self.gemeente_timings.items(), key=lambda x: x[1]["total"], reverse=True
+            ):
+                avg_per_scan = times["total"] / times["scans"] if times["scans"] > 0 else 0
+                logger.info(
+                    f"{gemeente:<20} {times['scans']:>6} "
+                    f"{times['total']:>7.1f}s {times['api']:>7.1f}s "
+                    f"{times['processing']:>7.1f}s {times['spatial']:>7.1f}s "
+                    f"{avg_per_scan:>8.2f}s"
+                )
+            logger.info("")
+
+        # Per-proxy breakdown
+        self.proxy_pool.log_stats()
+
+        # Call latency percentielen, zonder en met hedging
+        hedge_policy.log_stats()
+
+        logger.info("=" * 80)
 
-    # Per-gemeente breakdown
-    if gemeente_timings:
-        logger.info("🏘️  PER-GEMEENTE TIMING")
         logger.info(
-            f"{'Gemeente':<20} {'Scans':>6} {'Total':>8} {'API':>8} {'Process':>8} {'Spatial':>8} {'Avg/scan':>9}"
+            f"Scraping complete: {len(df_all)} total records, "
+            f"{df_all['room_id'].nunique() if not df_all.empty else 0} unique listings"
         )
-        logger.info("-" * 80)
-        for gemeente, times in sorted(
-            gemeente_timings.items(), key=lambda x: x[1]["total"], reverse=True
-        ):
-            avg_per_scan = times["total"] / times["scans"] if times["scans"] > 0 else 0
-            logger.info(
-                f"{gemeente:<20} {times['scans']:>6} "
-                f"{times['total']:>7.1f}s {times['api']:>7.1f}s "
-                f"{times['processing']:>7.1f}s {times['spatial']:>7.1f}s "
-                f"{avg_per_scan:>8.2f}s"
-            )
 
-    logger.info("=" * 80)
+        return df_all
 
-    logger.info(
-        f"Scraping complete: {len(df_all)} total records, "
-        f"{df_all['room_id'].nunique() if not df_all.empty else 0} unique listings"
+
+def _direct_call_rate(workers: int, delay_between_calls: float) -> float:
+    """Calls per seconde voor het gedeelde budget van directe calls"""
+    return workers / max(delay_between_calls, 0.1)
+
+
+def _build_scan_jobs(
+    gemeenten: List[str],
+    scan_combinations: List[Tuple[str, str, int, int, int]],
+    gpkg_path: str,
+    skip_tasks: Optional[Set[Tuple[str, int]]],
+    shared_bboxes: bool,
+    scan_areas: Optional[List[ScanArea]],
+    raw_archive: Optional[RawArchive],
+) -> List[Dict[str, Any]]:
+    """Scans van een run: per gemeente, of per scan gebied (scan_areas/shared_bboxes)"""
+    if scan_areas is None and not shared_bboxes:
+        tasks = build_scan_tasks(gemeenten, scan_combinations, skip_tasks)
+        return [_new_scan_job(task, raw_archive) for task in tasks]
+
+    if scan_areas is None:
+        scan_areas = plan_shared_areas(gpkg_path, gemeenten)
+    areas = {area.name: area for area in scan_areas}
+    join = GemeenteJoin(gpkg_path, sorted({g for area in scan_areas for g in area.gemeenten}))
+    tasks = build_scan_tasks(list(areas), scan_combinations, skip_tasks)
+    return [_new_scan_job(task, raw_archive, areas[task[0]], join) for task in tasks]
+
+
+def _new_scan_job(
+    task: Tuple[str, str, str, int, int, int],
+    raw_archive: Optional[RawArchive] = None,
+    area: Optional[ScanArea] = None,
+    join: Optional[GemeenteJoin] = None,
+) -> Dict[str, Any]:
+    """Dispatcher state van één scan (zie scrape_all)"""
+    gemeente, check_in, check_out, nights, guests, scan_id = task
+    scan = {"gemeente": gemeente, "checkin": check_in, "checkout": check_out, "scan_id": scan_id}
+    return {
+        "task": task,
+        "attempt": 0,
+        "calls_done": 0,
+        "ingest": _ScanIngest(raw_archive, scan),
+        "api_time": 0.0,
+        "phases": {"connection": 0.0},
+        "error": None,
+        "started": False,
+        "area": area,
+        "join": join,
+    }
+
+
+def _scan_bbox(job: Dict[str, Any], gpkg_path: str) -> Optional[Tuple[float, float, float, float]]:
+    """Bbox van een scan: van het gedeelde scan gebied, anders van de gemeente"""
+    if job["area"] is not None:
+        return job["area"].bbox
+    return get_gemeente_bbox(gpkg_path, job["task"][0])
+
+
+def _run_scan(
+    tracker,
+    job: Dict[str, Any],
+    final: bool,
+    gpkg_path: str,
+    num_repeat_calls: int,
+    zoom_value: int,
+    price_min: int,
+    price_max: int,
+    amenities: List[str],
+    currency: str,
+    language: str,
+    proxy_url: str,
+    measurement_date: str,
+    delay_between_calls: float,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    hedge_policy: Optional[HedgePolicy] = None,
+):
+    """
+    Voer één poging van een scan uit in een worker
+
+    Doet alleen de API calls die nog ontbreken, elk met één poging: er wordt
+    in de worker nooit op een retry gewacht. Bij een herhaalbare fout geeft
+    de poging None terug en plant de dispatcher de scan na een backoff
+    opnieuw in; de laatste poging (final) verwerkt wat er binnen is.
+
+    Returns:
+        None (opnieuw inplannen) of tuple van (DataFrame, timing_dict)
+
+    Raises:
+        ApiError: Als geen enkele call van de scan gelukt is
+    """
+    gemeente, check_in, check_out = job["task"][:3]
+    _begin_scan_attempt(tracker, job)
+
+    api_start = time.time()
+    bbox = _scan_bbox(job, gpkg_path)
+    if bbox is None:
+        logger.error(f"No boundary found for gemeente: {gemeente}")
+        return pd.DataFrame(), _empty_scan_timings()
+
+    minx, miny, maxx, maxy = bbox
+    calls_needed = num_repeat_calls - job["calls_done"]
+    _, errors = make_repeat_calls(
+        check_in,
+        check_out,
+        maxy,
+        maxx,
+        miny,
+        minx,
+        calls_needed,
+        zoom_value,
+        price_min,
+        price_max,
+        amenities,
+        currency,
+        language,
+        proxy_url,
+        delay_between_calls,
+        proxy_pool=proxy_pool,
+        circuit_breaker=circuit_breaker,
+        max_retries=1,
+        hedge_policy=hedge_policy,
+        phase_timings=job["phases"],
+        transform=job["ingest"],
+    )
+    return _finish_scan_attempt(
+        job,
+        errors,
+        calls_needed,
+        api_start,
+        final,
+        gpkg_path,
+        measurement_date,
+    )
+
+
+async def _run_scan_async(
+    tracker,
+    job: Dict[str, Any],
+    final: bool,
+    gpkg_path: str,
+    num_repeat_calls: int,
+    zoom_value: int,
+    price_min: int,
+    price_max: int,
+    amenities: List[str],
+    currency: str,
+    language: str,
+    proxy_url: str,
+    measurement_date: str,
+    delay_between_calls: float,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
+    hedge_policy: Optional[HedgePolicy] = None,
+    io_executor: Optional[ThreadPoolExecutor] = None,
+):
+    """
+    asyncio variant van _run_scan: de calls zijn coroutines, de verwerking
+    (pandas/geopandas) draait in io_executor zodat de event loop vrij blijft
+    """
+    gemeente, check_in, check_out = job["task"][:3]
+    _begin_scan_attempt(tracker, job)
+    loop = asyncio.get_running_loop()
+
+    api_start = time.time()
+    bbox = await loop.run_in_executor(io_executor, _scan_bbox, job, gpkg_path)
+    if bbox is None:
+        logger.error(f"No boundary found for gemeente: {gemeente}")
+        return pd.DataFrame(), _empty_scan_timings()
+
+    minx, miny, maxx, maxy = bbox
+    calls_needed = num_repeat_calls - job["calls_done"]
+    _, errors = await make_repeat_calls_async(
+        check_in,
+        check_out,
+        maxy,
+        maxx,
+        miny,
+        minx,
+        calls_needed,
+        zoom_value,
+        price_min,
+        price_max,
+        amenities,
+        currency,
+        language,
+        proxy_url,
+        delay_between_calls,
+        proxy_pool=proxy_pool,
+        circuit_breaker=circuit_breaker,
+        max_retries=1,
+        hedge_policy=hedge_policy,
+        executor=io_executor,
+        phase_timings=job["phases"],
+        transform=job["ingest"],
     )
+    return await loop.run_in_executor(
+        io_executor,
+        _finish_scan_attempt,
+        job,
+        errors,
+        calls_needed,
+        api_start,
+        final,
+        gpkg_path,
+        measurement_date,
+    )
+
+
+def _empty_scan_timings() -> Dict[str, float]:
+    return {
+        "api_calls": 0.0,
+        "processing": 0.0,
+        "spatial_filter": 0.0,
+    }
 
-    return df_all
+
+def _begin_scan_attempt(tracker, job: Dict[str, Any]):
+    """Tel een poging van een scan; de eerste poging krijgt een scan_started event"""
+    gemeente, check_in, check_out, nights, guests, scan_id = job["task"]
+    if tracker is not None and not job["started"]:
+        tracker.emit(
+            run_events.SCAN_STARTED,
+            gemeente=gemeente,
+            checkin=check_in,
+            checkout=check_out,
+            nights=nights,
+            guests=guests,
+            scan_id=scan_id,
+        )
+    job["started"] = True
+    job["attempt"] += 1
+
+
+def _finish_scan_attempt(
+    job: Dict[str, Any],
+    errors: list,
+    calls_needed: int,
+    api_start: float,
+    final: bool,
+    gpkg_path: str,
+    measurement_date: str,
+):
+    """
+    Verwerk de calls van een poging (zie _run_scan)
+
+    Returns:
+        None (opnieuw inplannen) of tuple van (DataFrame, timing_dict)
+
+    Raises:
+        ApiError: Als geen enkele call van de scan gelukt is
+    """
+    gemeente, check_in, check_out, nights, guests, scan_id = job["task"]
+    timings = _empty_scan_timings()
+
+    job["api_time"] += time.time() - api_start
+    job["calls_done"] += calls_needed - len(errors)
+    timings["api_calls"] = job["api_time"]
+    timings["connection"] = job["phases"]["connection"]
+
+    if errors:
+        retryable = [e for e in errors if e.classified.retryable]
+        job["error"] = retryable[-1] if retryable else errors[-1]
+        if retryable and not final:
+            return None
+        if job["calls_done"] == 0:
+            raise job["error"]
+
+    listings = job["ingest"].listings()
+    if not listings:
+        return pd.DataFrame(), timings
+
+    inside = _process_scan_results(
+        listings,
+        gemeente,
+        check_in,
+        check_out,
+        nights,
+        scan_id,
+        measurement_date,
+        gpkg_path,
+        timings,
+        area=job["area"],
+        join=job["join"],
+    )
+    return inside, timings
+
+
+def _process_scan_results(
+    listings: List[dict],
+    gemeente: str,
+    check_in: str,
+    check_out: str,
+    nights: int,
+    scan_id: int,
+    measurement_date: str,
+    gpkg_path: str,
+    timings: Dict[str, float],
+    area: Optional[ScanArea] = None,
+    join: Optional[GemeenteJoin] = None,
+) -> pd.DataFrame:
+    """
+    Verwerk de slim records van een scan (rows, dedup, ruimtelijk filter)
+
+    De records zijn al bij binnenkomst ontdubbeld en geparsed (_ScanIngest);
+    drop_duplicates blijft als vangnet. Voor een gedeeld scan gebied (area)
+    vervangt de ruimtelijke join met join het filter op één gemeente.
+    """
+    process_start = time.time()
+    rows = listings_to_rows(
+        listings,
+        gemeente,
+        check_in,
+        check_out,
+        nights,
+        scan_id,
+        measurement_date,
+    )
+
+    if not rows:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(rows)
+    df_dedup = df.drop_duplicates("room_id")
+    timings["processing"] = time.time() - process_start
+
+    # Spatial filter
+    spatial_start = time.time()
+    if area is not None:
+        inside = assign_gemeenten(df_dedup, area, join)
+    else:
+        inside = apply_spatial_filter(df_dedup, gemeente, gpkg_path)
+    timings["spatial_filter"] = time.time() - spatial_start
+    return inside
 
 
 def _scrape_with_timing(
@@ -852,12 +1856,16 @@ def _scrape_with_timing(
     proxy_url: str,
     measurement_date: str,
     delay_between_calls: float = 0.5,
+    proxy_pool: Optional[ProxyPool] = None,
+    circuit_breaker: Optional[CircuitBreaker] = None,
 ) -> tuple:
     """
     Scrape with timing measurements
 
     Args:
         delay_between_calls: Delay tussen API repeat calls in seconden
+        proxy_pool: Optionele ProxyPool voor de API calls
+        circuit_breaker: Optionele CircuitBreaker voor de API calls
 
     Returns:
         Tuple of (DataFrame, timing_dict)
@@ -870,22 +1878,18 @@ def _scrape_with_timing(
 
     api_start = time.time()
 
-    # Load gemeente boundaries for bounding box
-    gdf_all = (
-        gpd.read_file(gpkg_path, layer="gemeentegebied")
-        .set_crs("EPSG:28992")
-        .to_crs("EPSG:4326")
-    )
-    sel = gdf_all[gdf_all["naam"] == gemeente]
+    # Bounding box from the gemeente index
+    bbox = get_gemeente_bbox(gpkg_path, gemeente)
 
-    if sel.empty:
+    if bbox is None:
         logger.error(f"No boundary found for gemeente: {gemeente}")
         return pd.DataFrame(), timings
 
-    minx, miny, maxx, maxy = sel.total_bounds
+    minx, miny, maxx, maxy = bbox
 
-    # Make parallel API calls
-    all_raw_results, unique_count = make_parallel_api_calls(
+    # Make parallel API calls (records are deduplicated as they arrive)
+    ingest = _ScanIngest()
+    make_parallel_api_calls(
         check_in,
         check_out,
         maxy,
@@ -901,37 +1905,28 @@ def _scrape_with_timing(
         language,
         proxy_url,
         delay_between_calls,
+        proxy_pool=proxy_pool,
+        circuit_breaker=circuit_breaker,
+        transform=ingest,
     )
 
     timings["api_calls"] = time.time() - api_start
 
-    if not all_raw_results:
+    listings = ingest.listings()
+    if not listings:
         return pd.DataFrame(), timings
 
-    # Process results
-    process_start = time.time()
-    rows = process_raw_results(
-        all_raw_results,
+    inside = _process_scan_results(
+        listings,
         gemeente,
         check_in,
         check_out,
         nights,
         scan_id,
         measurement_date,
+        gpkg_path,
+        timings,
     )
-
-    if not rows:
-        return pd.DataFrame(), timings
-
-    df = pd.DataFrame(rows)
-    df_dedup = df.drop_duplicates("room_id")
-    timings["processing"] = time.time() - process_start
-
-    # Spatial filter
-    spatial_start = time.time()
-    inside = apply_spatial_filter(df_dedup, gemeente, gpkg_path)
-    timings["spatial_filter"] = time.time() - spatial_start
-
     return inside, timings
 
 
@@ -0,0 +1,219 @@
+"""
+Gedeelde scan gebieden
+Aangrenzende gemeenten van een run delen hun API calls
+
+Normaal krijgt elke gemeente haar eigen bbox query per datum en wordt alles
+buiten die ene grens weggegooid, ook listings in een buurgemeente die in
+dezelfde run zit. In de multi-gemeente modus worden gemeenten met
+overlappende bounding boxes samengevoegd tot één scan gebied (ScanArea) met
+één bbox query per datum. Elke listing krijgt daarna haar gemeente via één
+ruimtelijke join (STRtree) over de grenzen van alle gemeenten van de run.
+"""
+
+import logging
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from src.core.boundaries import load_boundaries, load_gemeente_index
+
+logger = logging.getLogger(__name__)
+
+Bbox = Tuple[float, float, float, float]
+
+# Grootste gedeelde bbox: de search API geeft per query een beperkt aantal
+# listings terug, een te grote bbox verliest dus dekking
+DEFAULT_MAX_AREA_KM2 = 1000.0
+
+# Een gedeelde bbox mag hooguit zoveel groter zijn dan de losse bboxes samen
+# (de hoek tussen twee buurgemeenten wordt meegescand)
+MAX_AREA_GROWTH = 1.25
+
+KM_PER_DEGREE = 111.32
+
+
+class ScanArea:
+    """Eén bbox query die een of meer gemeenten van een run dekt"""
+
+    def __init__(self, gemeenten: Sequence[str], bbox: Optional[Bbox]):
+        self.gemeenten = tuple(gemeenten)
+        self.bbox = bbox
+        self.name = " + ".join(self.gemeenten)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+    def owns(self, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """Punten waarvoor deze scan verantwoordelijk is (hier: allemaal)"""
+        return np.ones(len(lons), dtype=bool)
+
+
+def bbox_area_km2(bbox: Bbox) -> float:
+    """Benaderde oppervlakte van een bbox (EPSG:4326) in km²"""
+    minx, miny, maxx, maxy = bbox
+    mid_lat = math.radians((miny + maxy) / 2)
+    return (maxx - minx) * KM_PER_DEGREE * math.cos(mid_lat) * (maxy - miny) * KM_PER_DEGREE
+
+
+def _union(a: Bbox, b: Bbox) -> Bbox:
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+def _overlaps(a: Bbox, b: Bbox) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def plan_shared_areas(
+    gpkg_path: str,
+    gemeenten: List[str],
+    max_area_km2: float = DEFAULT_MAX_AREA_KM2,
+) -> List[ScanArea]:
+    """
+    Groepeer de gemeenten van een run in scan gebieden met een gedeelde bbox
+
+    Twee groepen worden samengevoegd als hun bboxes overlappen, de gedeelde
+    bbox hooguit MAX_AREA_GROWTH keer de losse bboxes samen is en binnen
+    max_area_km2 blijft. Elke samenvoeging scheelt één query per datum; de
+    samenvoeging met de kleinste groei gaat steeds eerst.
+
+    Args:
+        gpkg_path: Pad naar gemeentegrenzen GeoPackage
+        gemeenten: Gemeenten van de run
+        max_area_km2: Maximale oppervlakte van een gedeelde bbox
+
+    Returns:
+        Lijst van ScanArea's (volgorde van de eerste gemeente in gemeenten);
+        onbekende gemeenten krijgen een eigen gebied zonder bbox
+    """
+    index = load_gemeente_index(gpkg_path)
+    groups: Dict[int, Tuple[List[str], Bbox]] = {}
+    unknown = []
+    for gemeente in dict.fromkeys(gemeenten):
+        info = index.get(gemeente)
+        if info is None:
+            unknown.append(ScanArea([gemeente], None))
+        else:
+            groups[len(groups)] = ([gemeente], tuple(info["bbox"]))
+
+    def _growth(i: int, j: int) -> Optional[float]:
+        """Gedeelde bbox / losse bboxes (None = niet samenvoegen)"""
+        bbox_i, bbox_j = groups[i][1], groups[j][1]
+        if not _overlaps(bbox_i, bbox_j):
+            return None
+        merged = bbox_area_km2(_union(bbox_i, bbox_j))
+        growth = merged / max(bbox_area_km2(bbox_i) + bbox_area_km2(bbox_j), 1e-9)
+        if merged > max_area_km2 or growth > MAX_AREA_GROWTH:
+            return None
+        return growth
+
+    candidates = {}
+    keys = list(groups)
+    for n, i in enumerate(keys):
+        for j in keys[n + 1 :]:
+            growth = _growth(i, j)
+            if growth is not None:
+                candidates[(i, j)] = growth
+
+    next_key = len(groups)
+    while candidates:
+        i, j = min(candidates, key=candidates.get)
+        names_i, bbox_i = groups.pop(i)
+        names_j, bbox_j = groups.pop(j)
+        groups[next_key] = (names_i + names_j, _union(bbox_i, bbox_j))
+        candidates = {
+            pair: growth for pair, growth in candidates.items() if i not in pair and j not in pair
+        }
+        for other in groups:
+            if other != next_key:
+                growth = _growth(other, next_key)
+                if growth is not None:
+                    candidates[(other, next_key)] = growth
+        next_key += 1
+
+    order = {gemeente: n for n, gemeente in enumerate(gemeenten)}
+    areas = [
+        ScanArea(sorted(names, key=order.get), bbox) for names, bbox in groups.values()
+    ] + unknown
+    areas.sort(key=lambda area: order[area.gemeenten[0]])
+
+    shared = [area for area in areas if len(area.gemeenten) > 1]
+    logger.info(
+        f"🧩 {len(gemeenten)} gemeenten → {len(areas)} scan gebieden "
+        f"({len(shared)} gedeeld)"
+    )
+    for area in shared:
+        logger.debug(f"   {area.name}: {bbox_area_km2(area.bbox):.0f} km²")
+    return areas
+
+
+class GemeenteJoin:
+    """STRtree over de (volledige) grenzen van de gemeenten van een run"""
+
+    def __init__(self, gpkg_path: str, gemeenten: Sequence[str]):
+        boundaries = load_boundaries(gpkg_path, "full")
+        selected = boundaries[boundaries["naam"].isin(list(gemeenten))]
+        self.names = selected["naam"].to_numpy(dtype=object)
+        self._tree = shapely.STRtree(selected.geometry.values)
+        index = load_gemeente_index(gpkg_path)
+        self.provinces = {
+            name: index.get(name, {}).get("provincie") for name in self.names
+        }
+
+    def intersecting(self, bbox: Bbox) -> List[str]:
+        """Gemeenten die een bbox raken"""
+        hits = self._tree.query(shapely.box(*bbox), predicate="intersects")
+        return sorted(self.names[hits])
+
+    def assign(self, points: np.ndarray) -> np.ndarray:
+        """
+        Gemeente per punt in één query
+
+        Args:
+            points: Array van shapely Points (EPSG:4326)
+
+        Returns:
+            Array met de gemeente naam per punt (None = buiten alle gemeenten)
+        """
+        point_idx, tree_idx = self._tree.query(points, predicate="within")
+        names = np.full(len(points), None, dtype=object)
+        # Punten op een gedeelde grens kunnen twee keer matchen: eerste telt
+        point_idx, first = np.unique(point_idx, return_index=True)
+        names[point_idx] = self.names[tree_idx[first]]
+        return names
+
+
+def assign_gemeenten(
+    df: pd.DataFrame, area: ScanArea, join: GemeenteJoin
+) -> gpd.GeoDataFrame:
+    """
+    Ken de listings van een gedeelde scan toe aan hun gemeente
+
+    Vervangt apply_spatial_filter voor een ScanArea: listings buiten de
+    gemeenten van het gebied (of buiten het deel waar de scan voor
+    verantwoordelijk is, zie ScanArea.owns) vallen af; een andere scan van
+    de run dekt ze. De rest krijgt de juiste "gemeente" en "provincie".
+
+    Returns:
+        GeoDataFrame met de listings binnen het gebied
+    """
+    lons, lats = df["longitude"].to_numpy(), df["latitude"].to_numpy()
+    points = shapely.points(lons, lats)
+    names = join.assign(points)
+    mask = pd.Series(names).isin(area.gemeenten).to_numpy() & area.owns(lons, lats)
+
+    inside = gpd.GeoDataFrame(df[mask], geometry=points[mask], crs="EPSG:4326")
+    inside["gemeente"] = names[mask]
+    inside.insert(
+        inside.columns.get_loc("gemeente") + 1,
+        "provincie",
+        [join.provinces.get(name) for name in names[mask]],
+    )
+
+    filtered_count = len(df) - len(inside)
+    if filtered_count > 0:
+        logger.debug(f"Filtered out {filtered_count} listings outside {area.name}")
+    return inside
@@ -0,0 +1,329 @@
+"""
+Work Queue
+Shared, lease-based queue of scan tasks for multi-node scraping
+
+The queue is a SQLite database plus a result directory on a disk shared by
+all nodes (e.g. an NFS/SMB mount). Workers lease one task at a time; a
+lease that is not acked or extended before it expires makes the task
+available again, so work of a lost worker is retried elsewhere.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILE = "work_queue.sqlite"
+RESULTS_DIR = "results"
+
+# Task states
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_LEASE_SECONDS = 300.0
+DEFAULT_MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    params TEXT NOT NULL,
+    created_at TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    gemeente TEXT NOT NULL,
+    scan_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result_file TEXT,
+    records INTEGER,
+    duration REAL,
+    error TEXT,
+    updated_at TEXT,
+    UNIQUE (run_id, gemeente, scan_id)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status, id);
+CREATE INDEX IF NOT EXISTS idx_tasks_run ON tasks (run_id, status);
+"""
+
+
+class WorkQueue:
+    """SQLite work queue with leases, on a directory shared by all nodes"""
+
+    def __init__(self, queue_dir: str):
+        """
+        Open (and create if needed) the work queue in a shared directory
+
+        Args:
+            queue_dir: Shared directory for the queue database and results
+        """
+        self.queue_dir = queue_dir
+        self.db_path = os.path.join(queue_dir, QUEUE_FILE)
+
+        os.makedirs(os.path.join(queue_dir, RESULTS_DIR), exist_ok=True)
+        with self._connect() as conn:
+            # No WAL: its shared-memory index does not work on network filesystems
+            conn.execute("PRAGMA journal_mode=DELETE")
+            conn.executescript(_SCHEMA)
+            # Queues from before the duration column
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(tasks)")}
+            if "duration" not in columns:
+                conn.execute("ALTER TABLE tasks ADD COLUMN duration REAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a short-lived connection (safe to use from any thread/process)"""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def publish(
+        self,
+        run_id: str,
+        params: Dict[str, Any],
+        tasks: Sequence[Tuple[str, str, str, int, int, int]],
+    ) -> int:
+        """
+        Publish the scan tasks of a run (idempotent)
+
+        Args:
+            run_id: Run identifier (the run directory name)
+            params: Scan parameters shared by all tasks (zoom, prices, ...)
+            tasks: (gemeente, checkin, checkout, nights, guests, scan_id) tuples,
+                see scraper_core.build_scan_tasks
+
+        Returns:
+            Number of newly added tasks
+        """
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (run_id, params, created_at) VALUES (?, ?, ?)",
+                (run_id, json.dumps(params), now),
+            )
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks "
+                "(run_id, gemeente, scan_id, payload, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        run_id,
+                        gemeente,
+                        scan_id,
+                        json.dumps(
+                            {
+                                "gemeente": gemeente,
+                                "checkin": ci,
+                                "checkout": co,
+                                "nights": nights,
+                                "guests": guests,
+                                "scan_id": scan_id,
+                            }
+                        ),
+                        PENDING,
+                        now,
+                    )
+                    for gemeente, ci, co, nights, guests, scan_id in tasks
+                ],
+            )
+            return conn.total_changes - before
+
+    def lease(
+        self,
+        worker_id: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Lease the next available task (pending, or leased with an expired lease)
+
+        Args:
+            worker_id: Identifier of the leasing worker (e.g. host:pid:thread)
+            lease_seconds: Lease duration; extend() it for long scans
+            max_attempts: Tasks whose lease expired this many times are failed
+
+        Returns:
+            Task dict with "payload" and the run "params", or None if no work
+        """
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Expired leases that used up their attempts: give up
+            conn.execute(
+                "UPDATE tasks SET status = ?, error = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (
+                    FAILED,
+                    "Lease expired too often",
+                    datetime.now().isoformat(),
+                    LEASED,
+                    now,
+                    max_attempts,
+                ),
+            )
+            row = conn.execute(
+                "SELECT t.*, r.params FROM tasks t JOIN runs r ON r.run_id = t.run_id "
+                "WHERE t.status = ? OR (t.status = ? AND t.lease_expires < ?) "
+                "ORDER BY t.id LIMIT 1",
+                (PENDING, LEASED, now),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+
+            if row["status"] == LEASED:
+                logger.warning(
+                    f"Lease of task {row['id']} ({row['lease_owner']}) expired, re-leasing"
+                )
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (LEASED, worker_id, now + lease_seconds, datetime.now().isoformat(), row["id"]),
+            )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        task = dict(row)
+        task["payload"] = json.loads(task["payload"])
+        task["params"] = json.loads(task["params"])
+        task.update(status=LEASED, lease_owner=worker_id, attempts=task["attempts"] + 1)
+        return task
+
+    def extend(self, task_id: int, worker_id: str, lease_seconds: float) -> bool:
+        """
+        Extend a lease held by this worker
+
+        Returns:
+            False if the lease was lost (expired and taken by another worker)
+        """
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE tasks SET lease_expires = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (time.time() + lease_seconds, task_id, LEASED, worker_id),
+            )
+            return cur.rowcount > 0
+
+    def ack(
+        self,
+        task_id: int,
+        worker_id: str,
+        result_file: str,
+        records: int,
+        duration: Optional[float] = None,
+    ) -> bool:
+        """
+        Mark a leased task as done
+
+        Args:
+            duration: Scan time in seconds (for run timings)
+
+        Returns:
+            False if the lease was lost; the result is then ignored
+        """
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE tasks SET status = ?, result_file = ?, records = ?, duration = ?, "
+                "error = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (
+                    DONE,
+                    result_file,
+                    records,
+                    duration,
+                    datetime.now().isoformat(),
+                    task_id,
+                    LEASED,
+                    worker_id,
+                ),
+            )
+            return cur.rowcount > 0
+
+    def nack(
+        self,
+        task_id: int,
+        worker_id: str,
+        error: str,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ) -> None:
+        """Release a failed task: retried until max_attempts, then failed"""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "error = ?, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = ? AND lease_owner = ?",
+                (
+                    max_attempts,
+                    FAILED,
+                    PENDING,
+                    error[:500],
+                    datetime.now().isoformat(),
+                    task_id,
+                    LEASED,
+                    worker_id,
+                ),
+            )
+
+    def result_path(self, run_id: str, task_id: int) -> str:
+        """Path of a task's result file in the shared result store"""
+        return os.path.join(self.queue_dir, RESULTS_DIR, run_id, f"task_{task_id}.parquet")
+
+    def write_result(self, task: Dict[str, Any], df: pd.DataFrame) -> str:
+        """
+        Atomically store the result of a task in the shared result store
+
+        Returns:
+            Path of the result file
+        """
+        path = self.result_path(task["run_id"], task["id"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Unique temp name: a re-leased task may be written by two workers
+        tmp_path = f"{path}.{task['lease_owner']}.tmp".replace(":", "_")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return path
+
+    def progress(self, run_id: str) -> Dict[str, int]:
+        """Task counts per state for a run"""
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        with self._connect() as conn:
+            for row in conn.execute(
+                "SELECT status, COUNT(*) AS n FROM tasks WHERE run_id = ? GROUP BY status",
+                (run_id,),
+            ):
+                counts[row["status"]] = row["n"]
+        return counts
+
+    def finished_tasks(self, run_id: str) -> List[Dict[str, Any]]:
+        """Done and failed tasks of a run"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM tasks WHERE run_id = ? AND status IN (?, ?) ORDER BY id",
+                (run_id, DONE, FAILED),
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def load_results(self, run_id: str) -> pd.DataFrame:
+        """Merge the result files of all done tasks of a run"""
+        frames = []
+        for task in self.finished_tasks(run_id):
+            if task["status"] == DONE and task["result_file"] and os.path.exists(task["result_file"]):
+                df = pd.read_parquet(task["result_file"])
+                if not df.empty:
+                    frames.append(df)
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -5,6 +5,7 @@ from src.data.data_processor import (
     print_summary_stats,
 )
 from src.data.exporter import auto_export_results
+from src.data.run_store import load_run_dataset, write_run_dataset
 
 __all__ = [
     "calculate_availability",
@@ -12,4 +13,6 @@ __all__ = [
     "prepare_export_data",
     "print_summary_stats",
     "auto_export_results",
+    "load_run_dataset",
+    "write_run_dataset",
 ]
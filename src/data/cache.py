@@ -0,0 +1,166 @@
+"""
+Bestand-gebaseerde cache met geheugenbudget
+
+Waarden worden opgeslagen onder (pad, mtime, soort): een gewijzigd bestand
+levert automatisch een nieuwe sleutel op, zonder dat DataFrames gehasht hoeven
+te worden. Bij overschrijding van het budget worden de minst recent gebruikte
+waarden verwijderd (LRU). De cache is thread-safe en kan dus tussen
+dashboard-sessies gedeeld worden.
+"""
+
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CacheKey = Tuple[str, float, Hashable]
+
+
+def path_mtime(path: str) -> float:
+    """
+    Bepaal de wijzigingstijd van een bestand of directory
+
+    Voor een directory is dit de meest recente mtime van de directory zelf en
+    de bestanden direct daarin (een run wordt dus als geheel ververst).
+
+    Args:
+        path: Pad naar bestand of directory
+
+    Returns:
+        mtime in seconden (0.0 als het pad niet bestaat)
+    """
+    try:
+        mtime = os.path.getmtime(path)
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        mtime = max(mtime, entry.stat().st_mtime)
+        return mtime
+    except OSError:
+        return 0.0
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Schat het geheugengebruik van een gecachte waarde in bytes
+
+    Args:
+        value: DataFrame, Series, container of willekeurig object
+
+    Returns:
+        Geschat aantal bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class FileCache:
+    """LRU cache voor bestand-afgeleide waarden met een globaal bytebudget"""
+
+    def __init__(self, max_bytes: int):
+        """
+        Args:
+            max_bytes: Maximaal geheugengebruik van alle waarden samen
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, path: str, kind: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        Haal een waarde uit de cache of laad hem met `loader`
+
+        Args:
+            path: Bronbestand of -directory (bepaalt de mtime in de sleutel)
+            kind: Soort afgeleide waarde (bv. "run_dataset")
+            loader: Functie zonder argumenten die de waarde laadt
+
+        Returns:
+            De (gecachte) waarde. Behandel deze als read-only: hij wordt
+            gedeeld tussen sessies.
+        """
+        key = (os.path.abspath(path), path_mtime(path), kind)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Laden buiten de lock zodat andere sessies niet blokkeren
+        value = loader()
+        size = estimate_size(value)
+
+        with self._lock:
+            # Verouderde versies (oude mtime) van dezelfde bron opruimen
+            for old_key in [k for k in self._entries if k[0] == key[0] and k[2] == kind]:
+                self._drop(old_key)
+
+            if size > self.max_bytes:
+                logger.warning(
+                    f"Waarde {kind} voor {path} ({size / 1024**2:.0f} MB) "
+                    "past niet in het cache budget, niet gecached"
+                )
+                return value
+
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+        return value
+
+    def _drop(self, key: CacheKey) -> None:
+        _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        """Leeg de cache (statistieken blijven behouden)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Cache statistieken
+
+        Returns:
+            Dict met hits, misses, hit_rate, evictions, entries, bytes, max_bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups * 100 if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
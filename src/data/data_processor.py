@@ -5,7 +5,7 @@ Data processing and analysis functionality
 
 import logging
 from datetime import date, timedelta
-from typing import List
+from typing import Dict, List, Optional
 
 import pandas as pd
 
@@ -13,12 +13,32 @@ logger = logging.getLogger(__name__)
 
 
 def calculate_availability(
-    df_all: pd.DataFrame, period_start: str, period_end: str
+    df_all: pd.DataFrame,
+    period_start: str,
+    period_end: str,
+    missing_scans: Optional[List[Dict]] = None,
 ) -> pd.DataFrame:
     start_date = date.fromisoformat(period_start)
     end_date = date.fromisoformat(period_end)
     total_days = (end_date - start_date).days + 1
 
+    # Scans die definitief mislukt zijn: per gemeente het aantal en de dagen
+    # die ze gemeten zouden hebben (daar is "niet beschikbaar" niet zeker).
+    # Een cel van een gedeeld scan gebied of tegel telt voor al zijn gemeenten.
+    missing_counts: Dict[str, int] = {}
+    missing_days: Dict[str, set] = {}
+    for cell in missing_scans or []:
+        if not cell.get("checkin") or not cell.get("nights"):
+            continue
+        check_in = date.fromisoformat(str(cell["checkin"])[:10])
+        cell_days = {
+            check_in + timedelta(days=day_offset) for day_offset in range(int(cell["nights"]))
+        }
+        cell_days = {day for day in cell_days if start_date <= day <= end_date}
+        for gemeente in cell.get("gemeenten") or [cell.get("gemeente")]:
+            missing_counts[gemeente] = missing_counts.get(gemeente, 0) + 1
+            missing_days.setdefault(gemeente, set()).update(cell_days)
+
     df_calc = df_all.copy()
     df_calc["check_in_date"] = pd.to_datetime(df_calc["scan_checkin"]).dt.date
 
@@ -40,17 +60,20 @@ def calculate_availability(
         availability_rate = (days_available / total_days * 100) if total_days > 0 else 0
 
         first_row = room_data.iloc[0]
-        availability_rows.append(
-            {
-                "room_id": room_id,
-                "listing_title": first_row["listing_title"],
-                "property_type_airbnb": first_row["property_type_airbnb"],
-                "gemeente": first_row["gemeente"],
-                "days_available": days_available,
-                "total_days": total_days,
-                "availability_rate": round(availability_rate, 1),
-            }
-        )
+        row = {
+            "room_id": room_id,
+            "listing_title": first_row["listing_title"],
+            "property_type_airbnb": first_row["property_type_airbnb"],
+            "gemeente": first_row["gemeente"],
+            "days_available": days_available,
+            "total_days": total_days,
+            "availability_rate": round(availability_rate, 1),
+        }
+        if missing_scans is not None:
+            gemeente = first_row["gemeente"]
+            row["missing_scans"] = missing_counts.get(gemeente, 0)
+            row["days_unknown"] = len(missing_days.get(gemeente, set()) - available_days)
+        availability_rows.append(row)
 
     availability_data = pd.DataFrame(availability_rows).sort_values(
         "days_available", ascending=False
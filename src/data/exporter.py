@@ -16,10 +16,22 @@ from src.data.data_processor import (
     calculate_availability_timeline,
     prepare_export_data,
 )
+from src.data.run_store import write_run_dataset
 
 logger = logging.getLogger(__name__)
 
 
+def _update_run_catalog(data_dir: str, output_dir: str) -> None:
+    """Registreer (of ververs) de run in de run catalog"""
+    # Lokale import: src.core.run_catalog importeert zelf uit src.data
+    from src.core.run_catalog import get_catalog
+
+    try:
+        get_catalog(data_dir).upsert_run(output_dir)
+    except Exception as e:
+        logger.warning(f"Run catalog update mislukt voor {output_dir}: {e}")
+
+
 def auto_export_results(
     df_all: pd.DataFrame,
     period_start: str,
@@ -93,6 +105,10 @@ def auto_export_results(
 
         avail_timeline_pivot.to_excel(writer, sheet_name="Beschikbaarheid over tijd")
 
+    # Kolom-opslag naast de Excel export (snel laden in het dashboard)
+    write_run_dataset(output_dir, df_export, availability_data, source=filename)
+    _update_run_catalog(data_dir, output_dir)
+
     logger.info(f"Export complete: {filename}")
 
     # Print export summary
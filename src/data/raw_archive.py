@@ -0,0 +1,64 @@
+"""
+Optioneel archief van ruwe API records
+
+Een scan bewaart alleen de velden die de pipeline gebruikt (zie
+scraper_core.parse_listing); het volledige record wordt daarna weggegooid.
+Wie de ruwe payload toch wil bewaren (debuggen, later extra velden
+afleiden) kan een RawArchive meegeven: elk uniek record van een scan wordt
+dan als één JSON regel in een gzip bestand geschreven. Het archief is
+thread-safe; alle calls van een run schrijven naar hetzelfde bestand.
+"""
+
+import gzip
+import json
+import logging
+import threading
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+RAW_ARCHIVE_FILE = "raw_api.jsonl.gz"
+
+
+class RawArchive:
+    """Thread-safe gzip JSONL writer voor ruwe API records"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Pad naar het archief; een bestaand archief wordt aangevuld
+                (een hervatte run schrijft een nieuw gzip member)
+        """
+        self.path = path
+        self.records = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "at", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any], scan: Dict[str, Any]):
+        """
+        Schrijf één ruw record
+
+        Args:
+            record: Record zoals de API het teruggaf
+            scan: Context van de scan (gemeente, checkin, checkout, scan_id)
+        """
+        line = json.dumps({"scan": scan, "record": record}, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self.records += 1
+
+    def close(self):
+        """Sluit het archief (volgende writes worden genegeerd)"""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        logger.info(f"🗄️ Raw archive: {self.records:,} records → {self.path}")
+
+    def __enter__(self) -> "RawArchive":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Columnar run storage (parquet) with a normalized schema
+
+Elke run directory krijgt naast de Excel export een snelle kolom-opslag:
+
+    run_<naam>/
+    ├── data.parquet          # Alle scrape records (genormaliseerd schema)
+    ├── availability.parquet  # Beschikbaarheid per listing
+    ├── manifest.json         # Formaat versie, tellingen en bronbestand
+    └── by_gemeente/          # Alleen landelijke runs: data per gemeente
+
+Het dashboard leest alleen deze bestanden; Excel wordt alleen nog gelezen
+voor runs die (nog) niet gemigreerd zijn.
+"""
+
+import json
+import logging
+import os
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+RUN_FORMAT_VERSION = 1
+
+DATA_FILE = "data.parquet"
+AVAILABILITY_FILE = "availability.parquet"
+MANIFEST_FILE = "manifest.json"
+PARTITIONED_DIR = "by_gemeente"
+
+# Sheet namen zoals ze in de loop der tijd in exports zijn gebruikt
+DATA_SHEET_NAMES = ["Alle Data", "All Data", "All_Data"]
+AVAILABILITY_SHEET_NAMES = ["Beschikbaarheid", "Availability Summary", "Availability"]
+
+# Genormaliseerd schema voor alle records (volgorde = kolomvolgorde in parquet)
+DATA_COLUMNS = {
+    "gemeente": "string",
+    "provincie": "string",
+    "room_id": "string",
+    "listing_url": "string",
+    "listing_title": "string",
+    "room_type_detected": "string",
+    "room_type_airbnb": "string",
+    "property_type_airbnb": "string",
+    "bedrooms": "Int64",
+    "beds": "Int64",
+    "max_guests": "Int64",
+    "price": "float64",
+    "rating": "float64",
+    "reviews_count": "Int64",
+    "latitude": "float64",
+    "longitude": "float64",
+    "scan_checkin": "string",
+    "scan_checkout": "string",
+    "scan_nights": "Int64",
+    "scan_id": "Int64",
+    "measurement_date": "string",
+}
+
+AVAILABILITY_COLUMNS = {
+    "room_id": "string",
+    "listing_title": "string",
+    "gemeente": "string",
+    "property_type_airbnb": "string",
+    "days_available": "Int64",
+    "total_days": "Int64",
+    "availability_rate": "float64",
+}
+
+# Kolomnamen uit oudere exports (scripts/bnb_scraper.py) → huidig schema
+LEGACY_AVAILABILITY_COLUMNS = {
+    "times_available": "days_available",
+    "total_scans": "total_days",
+}
+
+
+def _normalize_frame(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """Breng een DataFrame naar het opgegeven schema (ontbrekende kolommen = NA)"""
+    df = df.copy()
+
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            df[column] = pd.NA
+
+        if column == "room_id":
+            # Excel leest IDs als int of float ("123.0"); altijd als tekst opslaan
+            df[column] = df[column].map(_normalize_room_id).astype("string")
+        elif column in ("scan_checkin", "scan_checkout"):
+            dates = pd.to_datetime(df[column], errors="coerce")
+            df[column] = dates.dt.strftime("%Y-%m-%d").astype("string")
+        elif dtype == "Int64":
+            df[column] = pd.to_numeric(df[column], errors="coerce").round().astype("Int64")
+        elif dtype == "float64":
+            df[column] = pd.to_numeric(df[column], errors="coerce").astype("float64")
+        else:
+            df[column] = df[column].astype("string")
+
+    # Onbekende extra kolommen (bijv. scan_guests) blijven achteraan behouden
+    extra_columns = [c for c in df.columns if c not in schema]
+    return df[list(schema) + extra_columns]
+
+
+def _normalize_room_id(value) -> Optional[str]:
+    """Normaliseer een room_id naar tekst zonder float suffix"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    text = str(value).strip()
+    if text.endswith(".0") and text[:-2].isdigit():
+        return text[:-2]
+    return text or None
+
+
+def normalize_run_data(df_all: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliseer scrape records naar het run schema
+
+    Args:
+        df_all: DataFrame met scrape records (nieuw of legacy formaat)
+
+    Returns:
+        DataFrame met kolommen en dtypes volgens DATA_COLUMNS
+    """
+    return _normalize_frame(df_all, DATA_COLUMNS)
+
+
+def normalize_availability(df_availability: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliseer beschikbaarheid data naar het run schema
+
+    Args:
+        df_availability: DataFrame met beschikbaarheid per listing
+
+    Returns:
+        DataFrame met kolommen en dtypes volgens AVAILABILITY_COLUMNS
+    """
+    df = df_availability.rename(
+        columns={
+            old: new
+            for old, new in LEGACY_AVAILABILITY_COLUMNS.items()
+            if new not in df_availability.columns
+        }
+    )
+    return _normalize_frame(df, AVAILABILITY_COLUMNS)
+
+
+def find_excel_files(run_dir: str) -> List[str]:
+    """Vind Excel exports in een run directory (zonder Office lock files)"""
+    try:
+        return sorted(
+            f
+            for f in os.listdir(run_dir)
+            if f.endswith(".xlsx") and not f.startswith("~$")
+        )
+    except OSError:
+        return []
+
+
+def _pick_sheet(sheet_names: List[str], candidates: List[str]) -> Optional[str]:
+    """Kies de eerste bekende sheet naam die in het workbook voorkomt"""
+    for name in candidates:
+        if name in sheet_names:
+            return name
+    return None
+
+
+def read_excel_run(excel_path: str) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+    """
+    Lees een (legacy) Excel export met alle bekende sheet namen
+
+    Args:
+        excel_path: Pad naar het .xlsx bestand
+
+    Returns:
+        Tuple van (df_all, df_availability of None als de sheet ontbreekt)
+    """
+    with pd.ExcelFile(excel_path) as xl:
+        data_sheet = _pick_sheet(xl.sheet_names, DATA_SHEET_NAMES)
+        df_all = xl.parse(data_sheet if data_sheet is not None else 0)
+
+        avail_sheet = _pick_sheet(xl.sheet_names, AVAILABILITY_SHEET_NAMES)
+        df_availability = xl.parse(avail_sheet) if avail_sheet is not None else None
+
+    return df_all, df_availability
+
+
+def _compute_availability(df_all: pd.DataFrame, config: Dict) -> pd.DataFrame:
+    """Bereken beschikbaarheid als een export geen beschikbaarheid sheet heeft"""
+    from src.data.data_processor import calculate_availability
+
+    period_start = config.get("period_start") or df_all["scan_checkin"].min()
+    period_end = config.get("period_end") or df_all["scan_checkout"].max()
+    return calculate_availability(df_all, str(period_start)[:10], str(period_end)[:10])
+
+
+def _atomic_write_parquet(df: pd.DataFrame, path: str) -> None:
+    """Schrijf parquet via een tijdelijk bestand zodat lezers nooit half werk zien"""
+    tmp_path = f"{path}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _atomic_write_json(data: Dict, path: str) -> None:
+    """Schrijf JSON via een tijdelijk bestand + os.replace"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def write_run_dataset(
+    run_dir: str,
+    df_all: pd.DataFrame,
+    df_availability: pd.DataFrame,
+    source: Optional[str] = None,
+) -> Dict:
+    """
+    Schrijf run data in het kolom-formaat met manifest
+
+    Args:
+        run_dir: Run directory
+        df_all: Alle scrape records
+        df_availability: Beschikbaarheid per listing
+        source: Optioneel pad naar het bronbestand (bijv. de Excel export)
+
+    Returns:
+        Het geschreven manifest
+    """
+    os.makedirs(run_dir, exist_ok=True)
+
+    data = normalize_run_data(df_all)
+    availability = normalize_availability(df_availability)
+
+    _atomic_write_parquet(data, os.path.join(run_dir, DATA_FILE))
+    _atomic_write_parquet(availability, os.path.join(run_dir, AVAILABILITY_FILE))
+
+    manifest = {
+        "format_version": RUN_FORMAT_VERSION,
+        "written_at": datetime.now().isoformat(),
+        "records": int(len(data)),
+        "listings": int(data["room_id"].nunique()),
+        "data_file": DATA_FILE,
+        "availability_file": AVAILABILITY_FILE,
+        "source": None,
+    }
+    if source and os.path.exists(source):
+        stat = os.stat(source)
+        manifest["source"] = {
+            "file": os.path.basename(source),
+            "mtime": stat.st_mtime,
+            "size": stat.st_size,
+        }
+
+    # Manifest als laatste: zijn aanwezigheid markeert een complete dataset
+    _atomic_write_json(manifest, os.path.join(run_dir, MANIFEST_FILE))
+    return manifest
+
+
+def write_partitioned_dataset(run_dir: str, df_all: pd.DataFrame) -> str:
+    """
+    Schrijf de run data als parquet dataset gepartitioneerd per gemeente
+
+    Voor landelijke runs: één map per gemeente (by_gemeente/gemeente=<naam>/),
+    zodat een gemeente gelezen kan worden zonder het hele land te laden.
+
+    Returns:
+        Pad naar de dataset directory
+    """
+    data = normalize_run_data(df_all)
+    # Geometrie is af te leiden uit latitude/longitude; pyarrow partitioneert geen GeoDataFrame
+    data = pd.DataFrame(data[data["gemeente"].notna()]).drop(columns="geometry", errors="ignore")
+    path = os.path.join(run_dir, PARTITIONED_DIR)
+    tmp_path = f"{path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    data.to_parquet(tmp_path, index=False, partition_cols=["gemeente"])
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_manifest(run_dir: str) -> Optional[Dict]:
+    """Lees manifest.json van een run (None als niet aanwezig of onleesbaar)"""
+    manifest_path = os.path.join(run_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def has_run_dataset(run_dir: str) -> bool:
+    """Check of een run een complete kolom-dataset heeft"""
+    manifest = read_manifest(run_dir)
+    return (
+        manifest is not None
+        and manifest.get("format_version") == RUN_FORMAT_VERSION
+        and os.path.exists(os.path.join(run_dir, DATA_FILE))
+    )
+
+
+def load_run_dataset(
+    run_dir: str, config: Optional[Dict] = None
+) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Laad de data van een run, bij voorkeur uit parquet
+
+    Valt terug op de Excel export voor runs die nog niet gemigreerd zijn.
+
+    Args:
+        run_dir: Run directory
+        config: Optionele run config (voor periode bij ontbrekende beschikbaarheid)
+
+    Returns:
+        Tuple van (df_all, df_availability) of None als er geen data is
+    """
+    if has_run_dataset(run_dir):
+        df_all = pd.read_parquet(os.path.join(run_dir, DATA_FILE))
+        availability_path = os.path.join(run_dir, AVAILABILITY_FILE)
+        if os.path.exists(availability_path):
+            df_availability = pd.read_parquet(availability_path)
+        else:
+            df_availability = normalize_availability(
+                _compute_availability(df_all, config or {})
+            )
+        return df_all, df_availability
+
+    excel_files = find_excel_files(run_dir)
+    if not excel_files:
+        return None
+
+    logger.info(f"No columnar dataset for {run_dir}, reading Excel export")
+    df_all, df_availability = read_excel_run(os.path.join(run_dir, excel_files[0]))
+    df_all = normalize_run_data(df_all)
+    if df_availability is None:
+        df_availability = _compute_availability(df_all, config or {})
+    return df_all, normalize_availability(df_availability)
+
+
+def _infer_created_at(run_name: str) -> Optional[str]:
+    """Leid created_at af uit een run naam (run_<gemeente>_YYYYMMDD_HHMMSS)"""
+    parts = run_name.split("_")
+    if len(parts) < 3:
+        return None
+    try:
+        return datetime.strptime(f"{parts[-2]}_{parts[-1]}", "%Y%m%d_%H%M%S").isoformat()
+    except ValueError:
+        return None
+
+
+def migrate_run(run_dir: str, force: bool = False) -> Dict:
+    """
+    Converteer de Excel export van één run naar het kolom-formaat
+
+    Idempotent: een run waarvan de dataset al bij de huidige Excel hoort wordt
+    overgeslagen. Schrijft ook een ontbrekende run_status.json.
+
+    Args:
+        run_dir: Run directory
+        force: Altijd opnieuw converteren
+
+    Returns:
+        Dict met run naam, resultaat ("migrated", "skipped", "empty", "failed")
+        en optioneel een bericht
+    """
+    run_name = os.path.basename(os.path.normpath(run_dir))
+    result = {"run_name": run_name, "result": "skipped", "message": ""}
+
+    try:
+        excel_files = find_excel_files(run_dir)
+        manifest = read_manifest(run_dir)
+        excel_path = os.path.join(run_dir, excel_files[0]) if excel_files else None
+
+        up_to_date = has_run_dataset(run_dir) and (
+            excel_path is None
+            or (
+                (manifest.get("source") or {}).get("file") == excel_files[0]
+                and (manifest.get("source") or {}).get("mtime")
+                == os.stat(excel_path).st_mtime
+            )
+        )
+
+        if excel_path is None and not up_to_date:
+            result["result"] = "empty"
+            result["message"] = "geen Excel export gevonden"
+        elif up_to_date and not force:
+            result["message"] = "dataset is al actueel"
+        else:
+            config = {}
+            config_path = os.path.join(run_dir, "config.json")
+            if os.path.exists(config_path):
+                with open(config_path, "r", encoding="utf-8") as f:
+                    config = json.load(f)
+
+            df_all, df_availability = read_excel_run(excel_path)
+            if "room_id" not in df_all.columns:
+                raise ValueError(f"Geen room_id kolom in {excel_files[0]}")
+            if df_availability is None:
+                df_availability = _compute_availability(df_all, config)
+
+            manifest = write_run_dataset(run_dir, df_all, df_availability, excel_path)
+            result["result"] = "migrated"
+            result["message"] = (
+                f"{manifest['records']:,} records, {manifest['listings']:,} listings"
+            )
+
+        _ensure_status_file(run_dir, run_name, has_data=result["result"] != "empty")
+    except Exception as e:
+        result["result"] = "failed"
+        result["message"] = str(e)[:200]
+
+    return result
+
+
+def _ensure_status_file(run_dir: str, run_name: str, has_data: bool) -> None:
+    """Schrijf run_status.json voor legacy runs die er nog geen hebben"""
+    status_file = os.path.join(run_dir, "run_status.json")
+    if os.path.exists(status_file):
+        return
+
+    manifest = read_manifest(run_dir) or {}
+    created_at = _infer_created_at(run_name) or datetime.fromtimestamp(
+        os.path.getmtime(run_dir)
+    ).isoformat()
+
+    _atomic_write_json(
+        {
+            "status": "completed" if has_data else "legacy",
+            "created_at": created_at,
+            "started_at": None,
+            "completed_at": created_at if has_data else None,
+            "progress": {
+                "total_scans": 0,
+                "completed_scans": 0,
+                "failed_scans": 0,
+                "total_listings": manifest.get("listings", 0),
+            },
+            "error": None,
+            "migrated": True,
+        },
+        status_file,
+    )
@@ -4,6 +4,7 @@
 Map visualization functionality
 """
 
+import json
 import logging
 import os
 from typing import List, Optional
@@ -11,6 +12,7 @@ from typing import List, Optional
 import folium
 import geopandas as gpd
 import pandas as pd
+from folium.plugins import FastMarkerCluster
 
 logger = logging.getLogger(__name__)
 
@@ -25,15 +27,63 @@ PROPERTY_COLORS = {
     "Unknown": "#95a5a6",  # Grijs (fallback)
 }
 
+# Start zoom van de kaart (bepaalt ook welk grens-detailniveau past)
+DEFAULT_ZOOM = 11
+
+# Boven dit aantal listings schakelt render_mode="auto" over op de clustermodus
+FAST_RENDER_THRESHOLD = 2000
+
+# Kolomvolgorde van de compacte records in de clustermodus (zie _MAP_JS)
+_RECORD_FIELDS = [
+    "latitude",
+    "longitude",
+    "color",
+    "listing_title",
+    "property_type_airbnb",
+    "price",
+    "rating",
+    "availability_rate",
+    "days_available",
+    "total_days",
+    "listing_url",
+]
+
 
 def create_map(
     df_map: pd.DataFrame,
     gdf_gemeenten: gpd.GeoDataFrame,
     gemeenten: List[str],
     output_dir: Optional[str] = None,
+    render_mode: str = "auto",
 ) -> folium.Map:
+    """
+    Maak een interactieve kaart van de listings met gemeentegrenzen
+
+    Args:
+        df_map: DataFrame met één rij per listing
+        gdf_gemeenten: GeoDataFrame met gemeentegrenzen (EPSG:4326), bij
+            voorkeur het vereenvoudigde niveau voor DEFAULT_ZOOM (zie
+            src.core.boundaries.pick_boundary_level)
+        gemeenten: Namen van de gemeenten die getoond worden
+        output_dir: Optionele directory om map.html in op te slaan
+        render_mode: "markers" (één marker per listing met ingebouwde popup),
+            "cluster" (één compacte datalaag met client-side clustering en
+            popups die pas bij openen gebouwd worden) of "auto" (cluster boven
+            FAST_RENDER_THRESHOLD listings)
+
+    Returns:
+        folium.Map
+    """
+    if render_mode == "auto":
+        render_mode = "cluster" if len(df_map) > FAST_RENDER_THRESHOLD else "markers"
+    if render_mode not in ("markers", "cluster"):
+        raise ValueError(f"Onbekende render_mode: {render_mode}")
+
     # Filter gemeentegrenzen
-    gdf_sel = gdf_gemeenten[gdf_gemeenten["naam"].isin(gemeenten)]
+    # (alleen naam + geometrie, extra kolommen zouden in de GeoJSON belanden)
+    gdf_sel = gdf_gemeenten.loc[
+        gdf_gemeenten["naam"].isin(gemeenten), ["naam", gdf_gemeenten.geometry.name]
+    ]
 
     # Bepaal center
     center_lat = df_map["latitude"].mean()
@@ -42,11 +92,12 @@ def create_map(
     # Maak kaart met moderne styling
     m = folium.Map(
         location=[center_lat, center_lon],
-        zoom_start=11,
+        zoom_start=DEFAULT_ZOOM,
         tiles="CartoDB positron",  # Modern, clean look
         zoom_control=True,
         scrollWheelZoom=True,
         dragging=True,
+        prefer_canvas=render_mode == "cluster",
     )
 
     # Voeg gemeentegrenzen toe
@@ -66,22 +117,25 @@ def create_map(
         ),
     ).add_to(m)
 
-    for idx in df_map.index:
-        row = df_map.loc[idx]
-        prop_type = row.get("property_type_airbnb", "Unknown")
-        color = PROPERTY_COLORS.get(prop_type, "#95a5a6")
-
-        folium.CircleMarker(
-            location=[row["latitude"], row["longitude"]],
-            radius=7,
-            popup=folium.Popup(_create_popup_html(row, color), max_width=350),
-            tooltip=folium.Tooltip(_create_tooltip_html(row, color)),
-            color="white",
-            fill=True,
-            fillColor=color,
-            fillOpacity=0.9,
-            weight=2.5,
-        ).add_to(m)
+    if render_mode == "cluster":
+        _add_listing_cluster(m, df_map)
+    else:
+        for idx in df_map.index:
+            row = df_map.loc[idx]
+            prop_type = row.get("property_type_airbnb", "Unknown")
+            color = PROPERTY_COLORS.get(prop_type, "#95a5a6")
+
+            folium.CircleMarker(
+                location=[row["latitude"], row["longitude"]],
+                radius=7,
+                popup=folium.Popup(_create_popup_html(row, color), max_width=350),
+                tooltip=folium.Tooltip(_create_tooltip_html(row, color)),
+                color="white",
+                fill=True,
+                fillColor=color,
+                fillOpacity=0.9,
+                weight=2.5,
+            ).add_to(m)
 
     # Voeg legende toe (alleen voor types die in data voorkomen)
     present_types = df_map["property_type_airbnb"].unique().tolist()
@@ -94,6 +148,123 @@ def create_map(
     return m
 
 
+def _listing_records(df_map: pd.DataFrame) -> list:
+    """Zet listings om naar compacte records (lijsten in _RECORD_FIELDS volgorde)"""
+    df = df_map.reindex(columns=_RECORD_FIELDS[:2] + _RECORD_FIELDS[3:])
+    df = df.dropna(subset=["latitude", "longitude"])
+
+    color = (
+        df["property_type_airbnb"]
+        .map(PROPERTY_COLORS)
+        .fillna(PROPERTY_COLORS["Unknown"])
+    )
+    records = pd.DataFrame(
+        {
+            "latitude": df["latitude"].astype(float).round(6),
+            "longitude": df["longitude"].astype(float).round(6),
+            "color": color,
+            "listing_title": df["listing_title"].fillna("").astype(str).str[:50],
+            "property_type_airbnb": df["property_type_airbnb"].fillna("Unknown"),
+            "price": pd.to_numeric(df["price"], errors="coerce").round(0),
+            "rating": pd.to_numeric(df["rating"], errors="coerce").round(2),
+            "availability_rate": pd.to_numeric(
+                df["availability_rate"], errors="coerce"
+            ).round(0),
+            "days_available": pd.to_numeric(df["days_available"], errors="coerce"),
+            "total_days": pd.to_numeric(df["total_days"], errors="coerce"),
+            "listing_url": df["listing_url"].fillna(""),
+        }
+    ).astype(object)
+
+    # NaN -> null in JSON
+    return records.where(records.notna(), None).values.tolist()
+
+
+def _add_listing_cluster(m: folium.Map, df_map: pd.DataFrame) -> None:
+    """Voeg listings toe als één datalaag met clustering en lazy popups"""
+    m.get_root().header.add_child(folium.Element(f"<script>{_MAP_JS}</script>"))
+
+    FastMarkerCluster(
+        _listing_records(df_map),
+        callback="rigoListingMarker",
+        name="Listings",
+        chunkedLoading=True,
+        disableClusteringAtZoom=16,
+        spiderfyOnMaxZoom=False,
+    ).add_to(m)
+
+
+# Client-side marker/popup opbouw voor de clustermodus. Spiegelt
+# _create_popup_html/_create_tooltip_html, maar rendert pas bij openen.
+_MAP_JS = (
+    """
+var RIGO_FIELDS = """
+    + json.dumps(_RECORD_FIELDS)
+    + """;
+
+function rigoEscape(value) {
+    return String(value == null ? "" : value).replace(/[&<>"']/g, function (c) {
+        return {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#39;"}[c];
+    });
+}
+
+function rigoRecord(row) {
+    var r = {};
+    for (var i = 0; i < RIGO_FIELDS.length; i++) { r[RIGO_FIELDS[i]] = row[i]; }
+    return r;
+}
+
+function rigoPopupHtml(row) {
+    var r = rigoRecord(row);
+    var color = r.color;
+    var totalDays = r.total_days == null ? 30 : Math.round(r.total_days);
+    var availableDays = r.days_available == null ? 0 : Math.round(r.days_available);
+    var calendar;
+    if (totalDays <= 60 && totalDays > 0) {
+        calendar = '<div style="display: grid; grid-template-columns: repeat(7, 1fr); gap: 4px; margin: 15px 0;">';
+        for (var day = 0; day < totalDays; day++) {
+            var bg = day < availableDays ? color : "#e0e0e0";
+            calendar += '<div style="width: 24px; height: 24px; background: ' + bg + '; border-radius: 4px; display: flex; align-items: center; justify-content: center; font-size: 10px; color: white; font-weight: bold;" title="Dag ' + (day + 1) + '">' + (day + 1) + '</div>';
+        }
+        calendar += '</div>';
+    } else {
+        calendar = '<div style="margin: 15px 0; text-align: center; padding: 20px; background: #f8f9fa; border-radius: 8px;"><div style="font-size: 24px; font-weight: bold; color: ' + color + ';">' + availableDays + ' / ' + totalDays + '</div><div style="font-size: 12px; color: #666; margin-top: 5px;">days available</div></div>';
+    }
+    var legend = function (bg, label) {
+        return '<span><span style="display: inline-block; width: 10px; height: 10px; background: ' + bg + '; border-radius: 2px; margin-right: 4px;"></span>' + label + '</span>';
+    };
+    return '<div style="font-family: Arial, sans-serif; min-width: 280px; max-width: 320px;">'
+        + '<div style="background: linear-gradient(135deg, ' + color + ' 0%, ' + color + 'cc 100%); color: white; padding: 10px; margin: -10px -10px 8px -10px; border-radius: 4px 4px 0 0;">'
+        + '<div style="font-size: 14px; font-weight: bold; margin-bottom: 3px;">' + rigoEscape(r.listing_title) + '</div>'
+        + '<div style="font-size: 11px; opacity: 0.9;">' + rigoEscape(r.property_type_airbnb) + ' | EUR ' + (r.price == null ? "-" : r.price)
+        + '/nacht' + (r.rating == null ? "" : ' | Rating: ' + r.rating) + '</div></div>'
+        + '<div style="padding: 10px; background: white; border-radius: 0 0 4px 4px;">'
+        + '<div style="font-weight: bold; color: ' + color + '; font-size: 16px; margin-bottom: 10px; text-align: center;">' + (r.availability_rate == null ? "-" : r.availability_rate) + '% Beschikbaar</div>'
+        + calendar
+        + '<div style="font-size: 10px; color: #666; margin-top: 8px; display: flex; justify-content: center; gap: 12px;">' + legend(color, "Beschikbaar") + legend("#e0e0e0", "Bezet") + '</div>'
+        + '<div style="margin-top: 10px; text-align: center;"><a href="' + rigoEscape(r.listing_url) + '" target="_blank" style="display: inline-block; background-color: ' + color + '; color: white; padding: 6px 14px; text-decoration: none; border-radius: 4px; font-weight: bold; font-size: 11px;">Bekijk op Airbnb &rarr;</a></div>'
+        + '</div></div>';
+}
+
+function rigoTooltipHtml(row) {
+    var r = rigoRecord(row);
+    return '<div style="font-family: Arial; font-size: 12px;"><b style="color: ' + r.color + ';">' + rigoEscape(String(r.listing_title).slice(0, 45)) + '</b><br>'
+        + '<span style="color: #666;">' + rigoEscape(r.property_type_airbnb) + '</span> | <b>EUR ' + (r.price == null ? "-" : r.price) + '</b><br>'
+        + 'Beschikbaar: <b style="color: ' + r.color + ';">' + (r.availability_rate == null ? "-" : r.availability_rate) + '%</b></div>';
+}
+
+function rigoListingMarker(row) {
+    var marker = L.circleMarker(new L.LatLng(row[0], row[1]), {
+        radius: 7, color: "white", fill: true, fillColor: row[2], fillOpacity: 0.9, weight: 2.5
+    });
+    marker.bindPopup(function () { return rigoPopupHtml(row); }, {maxWidth: 350});
+    marker.bindTooltip(function () { return rigoTooltipHtml(row); });
+    return marker;
+}
+"""
+)
+
+
 def _create_popup_html(row: pd.Series, color: str) -> str:
     """Genereer HTML voor popup met kalender als hoofdfocus"""
     # Maak een simpele kalender grid
@@ -7,6 +7,7 @@ import os
 import sys
 import logging
 import json
+from collections import deque
 from datetime import datetime, date, timedelta
 from typing import List
 from pathlib import Path
@@ -29,12 +30,30 @@ import folium
 from streamlit_folium import st_folium
 
 # Import scraper modules
-from src.core.scraper_core import scrape_all, generate_scan_combinations
+from src.core.scraper_core import generate_scan_combinations
+from src.core.boundaries import (
+    list_gemeenten,
+    load_boundaries,
+    load_gemeente_index,
+    pick_boundary_level,
+)
+from src.core.job_runner import (
+    DEFAULT_MAX_CONCURRENT_RUNS,
+    cancel_run,
+    probe_result,
+    start_probe,
+    submit_run,
+)
+from src.core.job_queue import JobQueue
+from src.core.run_catalog import get_catalog
+from src.core.run_estimator import PROBE_SCANS, RunSample, load_history
+from src.core.run_pipeline import create_run, estimate_run
 from src.core.run_tracker import RunTracker
-from src.data.data_processor import calculate_availability, prepare_export_data
-from src.data.exporter import export_to_excel
-from src.visualization.map_creator import create_map
-from src.visualization.graph_creator import create_availability_timeline_graph
+from src.core.scan_planner import plan_scans
+from src.data.cache import FileCache, path_mtime
+from src.data.data_processor import calculate_availability
+from src.data.run_store import load_run_dataset
+from src.visualization.map_creator import DEFAULT_ZOOM, create_map
 
 # Configure logging
 logging.basicConfig(
@@ -70,6 +89,9 @@ st.markdown(
 GPKG_PATH = str(GPKG_PATH_ABS)
 DATA_DIR = str(DATA_DIR_ABS)
 LOGIN_PASSWORD = "Ruijterkade"
+MAP_BOUNDARY_LEVEL = pick_boundary_level(DEFAULT_ZOOM)
+CACHE_MAX_MB = 1024  # Geheugenbudget van de gedeelde data cache (alle sessies)
+MAX_CONCURRENT_RUNS = DEFAULT_MAX_CONCURRENT_RUNS  # Runs die tegelijk scrapen (elk eigen proces)
 
 
 # Authentication
@@ -231,51 +253,104 @@ def init_session_state():
         st.session_state.current_results = None
 
 
+@st.cache_resource
+def get_data_cache() -> FileCache:
+    """Data cache shared by all sessions (LRU, keyed by file path + mtime)"""
+    return FileCache(max_bytes=CACHE_MAX_MB * 1024 * 1024)
+
+
+def load_gemeente_boundaries(level: str = "full") -> gpd.GeoDataFrame:
+    """Load gemeente boundaries (EPSG:4326) through the shared cache
+
+    Args:
+        level: Simplification level (see src.core.boundaries.BOUNDARY_LEVELS)
+
+    The returned GeoDataFrame is shared between sessions - do not modify it in place.
+    """
+    return get_data_cache().get_or_load(
+        GPKG_PATH,
+        f"gemeentegebied_{level}",
+        lambda: load_boundaries(GPKG_PATH, level),
+    )
+
+
+def load_run_history():
+    """Timings of earlier runs for the run estimator (parsed once per run via the cache)"""
+    return load_history(
+        DATA_DIR,
+        loader=lambda run_path: get_data_cache().get_or_load(
+            run_path, "run_sample", lambda: RunSample.from_run_dir(run_path)
+        ),
+    )
+
+
+def load_cached_run_dataset(run_path: str, config: dict):
+    """Load a run dataset through the shared cache (see load_run_dataset)"""
+    return get_data_cache().get_or_load(
+        run_path, "run_dataset", lambda: load_run_dataset(run_path, config)
+    )
+
+
+def get_live_logs(tracker: RunTracker, tail: int = 100) -> str:
+    """Last `tail` log lines of a run; reruns only read lines added since the last one"""
+    tails = st.session_state.setdefault("log_tails", {})
+    key = (tracker.log_file, tail)
+    entry = tails.get(key)
+    if entry is None:
+        lines, offset = tracker.tail_logs(tail)
+        entry = {"lines": deque(lines, maxlen=tail), "offset": offset}
+        tails[key] = entry
+    else:
+        new_lines, entry["offset"] = tracker.read_since(entry["offset"])
+        entry["lines"].extend(new_lines)
+    return "".join(entry["lines"])
+
+
 def load_gemeenten_list() -> List[str]:
-    """Load available gemeenten from GeoPackage"""
+    """Load available gemeenten from the gemeente index (no GeoPackage read)"""
     try:
-        if not os.path.exists(GPKG_PATH):
-            return []
-        gdf = gpd.read_file(GPKG_PATH, layer="gemeentegebied")
-        return sorted(gdf["naam"].unique().tolist())
+        return list_gemeenten(GPKG_PATH)
     except Exception as e:
         logger.error(f"Error loading gemeenten: {e}")
         return []
 
 
 def get_historical_runs() -> List[dict]:
-    """Get list of historical runs from data directory"""
+    """Get list of historical runs from the run catalog"""
     runs: List[dict] = []
 
     if not os.path.exists(DATA_DIR):
         return runs
 
-    # Get all run directories
-    for item in os.listdir(DATA_DIR):
-        item_path = os.path.join(DATA_DIR, item)
-        if os.path.isdir(item_path) and item.startswith("run_"):
-            # Extract metadata from directory name
-            parts = item.replace("run_", "").split("_")
-            if len(parts) >= 2:
-                gemeente = parts[0]
-                timestamp = "_".join(parts[1:])
-
-                # Parse timestamp
-                try:
-                    dt = datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
-                    timestamp_display = dt.strftime("%d-%m-%Y %H:%M")
-                except:
-                    timestamp_display = timestamp
-
-                runs.append(
-                    {
-                        "gemeente": gemeente,
-                        "timestamp": timestamp,
-                        "timestamp_display": timestamp_display,
-                        "path": item_path,
-                        "name": item,
-                    }
-                )
+    for run in get_catalog(DATA_DIR).list_runs():
+        # Extract metadata from directory name
+        parts = run["run_name"].replace("run_", "").split("_")
+        if len(parts) < 2:
+            continue
+        gemeente = parts[0]
+        timestamp = "_".join(parts[1:])
+
+        # Parse timestamp
+        try:
+            dt = datetime.strptime(timestamp, "%Y%m%d_%H%M%S")
+            timestamp_display = dt.strftime("%d-%m-%Y %H:%M")
+        except:
+            timestamp_display = timestamp
+
+        runs.append(
+            {
+                "gemeente": gemeente,
+                "gemeenten": run["gemeenten"] or [gemeente],
+                "timestamp": timestamp,
+                "timestamp_display": timestamp_display,
+                "path": run["run_path"],
+                "name": run["run_name"],
+                "period_start": run["period_start"],
+                "period_end": run["period_end"],
+                "measurement_interval": run["measurement_interval"],
+                "listings": run["listings"],
+            }
+        )
 
     # Sort by timestamp descending
     runs.sort(key=lambda x: x["timestamp"], reverse=True)
@@ -285,69 +360,24 @@ def get_historical_runs() -> List[dict]:
 def load_run_data(run_path: str):
     """Load data from a historical run"""
     try:
-        # Find Excel file
-        excel_files = [
-            f
-            for f in os.listdir(run_path)
-            if f.endswith(".xlsx") and not f.startswith("~$")
-        ]
+        # Load config
+        config_path = os.path.join(run_path, "config.json")
+        config = {}
+        if os.path.exists(config_path):
+            with open(config_path, "r") as f:
+                config = json.load(f)
 
-        if not excel_files:
+        # Columnar run dataset (falls back to Excel for unmigrated runs)
+        dataset = load_cached_run_dataset(run_path, config)
+        if dataset is None:
             return None
+        df_all, df_availability = dataset
 
-        excel_path = os.path.join(run_path, excel_files[0])
-
-        # Load data - try different sheet names (old and new formats)
-        # New format: "All Data", "Availability Summary"
-        # Old format: "Alle Data", "Beschikbaarheid"
-        try:
-            df_all = pd.read_excel(excel_path, sheet_name="All Data")
-        except:
-            try:
-                df_all = pd.read_excel(excel_path, sheet_name="Alle Data")
-            except:
-                # Try first sheet
-                df_all = pd.read_excel(excel_path, sheet_name=0)
-
-        try:
-            df_availability = pd.read_excel(
-                excel_path, sheet_name="Availability Summary"
-            )
-        except:
-            try:
-                df_availability = pd.read_excel(
-                    excel_path, sheet_name="Beschikbaarheid"
-                )
-            except:
-                # If availability sheet doesn't exist, calculate it
-                # Get period from data
-                if (
-                    "scan_checkin" in df_all.columns
-                    and "scan_checkout" in df_all.columns
-                ):
-                    period_start = df_all["scan_checkin"].min()
-                    period_end = df_all["scan_checkout"].max()
-                    df_availability = calculate_availability(
-                        df_all, str(period_start)[:10], str(period_end)[:10]
-                    )
-                else:
-                    # Fallback: create minimal availability data
-                    df_availability = pd.DataFrame(
-                        {
-                            "room_id": df_all["room_id"].unique(),
-                            "days_available": 1,
-                            "total_days": 1,
-                            "availability_rate": 100.0,
-                        }
-                    )
-
-        # Ensure required columns exist
-        if "availability_rate" not in df_availability.columns:
-            df_availability["availability_rate"] = 100.0
-        if "days_available" not in df_availability.columns:
-            df_availability["days_available"] = 1
-        if "total_days" not in df_availability.columns:
-            df_availability["total_days"] = 1
+        # Ensure required columns exist (assign copies - the dataset is shared)
+        defaults = {"availability_rate": 100.0, "days_available": 1, "total_days": 1}
+        missing = {k: v for k, v in defaults.items() if k not in df_availability}
+        if missing:
+            df_availability = df_availability.assign(**missing)
 
         # Create df_map
         df_map = df_all.drop_duplicates("room_id").merge(
@@ -363,13 +393,6 @@ def load_run_data(run_path: str):
             {"availability_rate": 100.0, "days_available": 1, "total_days": 1}
         )
 
-        # Load config
-        config_path = os.path.join(run_path, "config.json")
-        config = {}
-        if os.path.exists(config_path):
-            with open(config_path, "r") as f:
-                config = json.load(f)
-
         return {
             "df_all": df_all,
             "df_availability": df_availability,
@@ -392,9 +415,9 @@ def create_gemeente_selection_map(selected_gemeenten=None):
     try:
         # Only load selected gemeenten, not all 342+
         if selected_gemeenten:
-            # Load only the selected gemeenten from GeoPackage
-            gdf = gpd.read_file(GPKG_PATH, layer="gemeentegebied")
-            gdf = gdf[gdf["naam"].isin(selected_gemeenten)]
+            # Only the selected gemeenten, simplified for the zoom level below
+            gdf = load_gemeente_boundaries(pick_boundary_level(10))
+            gdf = gdf.loc[gdf["naam"].isin(selected_gemeenten), ["naam", "geometry"]]
 
             if gdf.empty:
                 logger.warning(f"No gemeenten found for: {selected_gemeenten}")
@@ -402,7 +425,6 @@ def create_gemeente_selection_map(selected_gemeenten=None):
                 center_lat, center_lon = 52.1326, 5.2913
                 zoom = 7
             else:
-                gdf = gdf.set_crs("EPSG:28992").to_crs("EPSG:4326")
                 # Calculate center based on selected gemeenten
                 bounds = gdf.total_bounds
                 center_lat = (bounds[1] + bounds[3]) / 2
@@ -445,8 +467,13 @@ def create_gemeente_selection_map(selected_gemeenten=None):
 
 
 @st.cache_data(ttl=3600)  # Cache for 1 hour
-def create_interactive_timeline(df_all: pd.DataFrame, config: dict):
-    """Create interactive Plotly timeline graph"""
+def create_interactive_timeline(_df_all: pd.DataFrame, config: dict, cache_key: tuple):
+    """Create interactive Plotly timeline graph
+
+    `_df_all` is not hashed by Streamlit; `cache_key` (run path + mtime)
+    identifies the data instead.
+    """
+    df_all = _df_all
     from datetime import date, timedelta
     import plotly.graph_objects as go
 
@@ -675,57 +702,15 @@ def page_resultaten():
         if st.button("🔄", width="stretch"):
             st.rerun()
 
-    # Build table data
+    # Build table data (everything comes from the run catalog row)
     table_data = []
     for run in runs_with_status:
-        # Get config for gemeente info
-        config_path = os.path.join(run["run_path"], "config.json")
-        gemeenten_str = "Onbekend"
+        gemeenten = run.get("gemeenten") or []
+        gemeenten_str = ", ".join(gemeenten) if gemeenten else "Onbekend"
         period = "-"
-        nachten = "-"
-        gasten = "-"
-        listings_count = "-"
-
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, "r") as f:
-                    config = json.load(f)
-                gemeenten = config.get("gemeenten", [])
-                gemeenten_str = ", ".join(gemeenten) if gemeenten else "Onbekend"
-                period_start = config.get("period_start", "")
-                period_end = config.get("period_end", "")
-                if period_start and period_end:
-                    period = f"{period_start} - {period_end}"
-                nachten = str(config.get("nights_list", "-"))
-                gasten = str(config.get("guests_list", "-"))
-            except:
-                pass
-
-        # Try to get listings count
-        if run.get("status") in ["completed", "legacy"]:
-            try:
-                excel_files = [
-                    f
-                    for f in os.listdir(run["run_path"])
-                    if f.endswith(".xlsx") and not f.startswith("~$")
-                ]
-                if excel_files:
-                    excel_path = os.path.join(run["run_path"], excel_files[0])
-                    # Try both Dutch and English sheet names
-                    try:
-                        df = pd.read_excel(
-                            excel_path, sheet_name="Alle Data", usecols=["room_id"]
-                        )
-                    except ValueError:
-                        df = pd.read_excel(
-                            excel_path, sheet_name="All_Data", usecols=["room_id"]
-                        )
-                    listings_count = int(df["room_id"].nunique())
-            except Exception:
-                # Silent fail but keep as dash
-                pass
-        elif "progress" in run and run["progress"].get("total_listings", 0) > 0:
-            listings_count = int(run["progress"]["total_listings"])
+        if run.get("period_start") and run.get("period_end"):
+            period = f"{run['period_start']} - {run['period_end']}"
+        listings_count = run["listings"] if run.get("listings") else "-"
 
         # Get timestamp
         timestamp = run.get("created_at", "")[:16] if run.get("created_at") else "-"
@@ -949,12 +934,14 @@ def display_run_detail_page(run_path):
         "completed": "✅",
         "failed": "❌",
         "pending": "⏳",
+        "cancelled": "⏹️",
     }
     status_text = {
         "running": "Bezig",
         "completed": "Voltooid",
         "failed": "Mislukt",
         "pending": "Wachtend",
+        "cancelled": "Geannuleerd",
     }
 
     # Title with gemeente prominently and run info below
@@ -962,6 +949,9 @@ def display_run_detail_page(run_path):
     with col_title:
         st.title(f"{status_map.get(status, '❓')} {gemeente}")
         st.caption(f"Status: {status_text.get(status, 'Onbekend')}")
+        job = JobQueue(DATA_DIR).get_job(run_path)
+        if job and job["status"] == "queued":
+            st.caption("⏳ In wachtrij voor de job runner")
         st.caption(f"📁 {run_name}")
         if run_date_str:
             st.caption(f"📅 {run_date_str}")
@@ -985,9 +975,8 @@ def display_run_detail_page(run_path):
             if config:
                 # Cancel current run if it's running
                 if status in ["running", "pending"]:
-                    tracker = RunTracker(run_path)
-                    tracker.cancel()
-                    tracker.log("⚠️ Run geannuleerd voor restart")
+                    cancel_run(DATA_DIR, run_path)
+                    RunTracker(run_path).log("⚠️ Run geannuleerd voor restart")
 
                 # Start new run with same config
                 st.session_state.restart_run_config = config
@@ -1004,6 +993,28 @@ def display_run_detail_page(run_path):
             # Show confirmation dialog
             st.session_state.confirm_delete_run = run_path
 
+    with col_action3:
+        # Runs execute in a worker process of the job runner
+        if status in ["running", "pending"]:
+            if st.button("⏹️ Stop Run", help="Annuleer deze run"):
+                cancel_run(DATA_DIR, run_path)
+                st.info("Run wordt gestopt...")
+                time.sleep(1)
+                st.rerun()
+        elif status in ["failed", "cancelled"] and config:
+            if st.button(
+                "▶️ Hervat Run",
+                help="Ga verder vanaf het laatste checkpoint van deze run",
+            ):
+                submit_run(
+                    DATA_DIR,
+                    run_path,
+                    GPKG_PATH,
+                    resume=True,
+                    max_concurrent=MAX_CONCURRENT_RUNS,
+                )
+                st.rerun()
+
     # Show delete confirmation dialog if requested
     if st.session_state.get("confirm_delete_run") == run_path:
         st.warning(f"⚠️ Weet je zeker dat je run **{run_name}** wilt verwijderen?")
@@ -1015,6 +1026,7 @@ def display_run_detail_page(run_path):
 
                 try:
                     shutil.rmtree(run_path)
+                    get_catalog(DATA_DIR).remove_run(run_path)
                     st.success(f"Run {run_name} verwijderd")
                     st.session_state.confirm_delete_run = None
                     st.session_state.viewing_run_detail = None
@@ -1199,24 +1211,24 @@ def display_run_detail_page(run_path):
         if status == "running":
             auto_refresh = st.checkbox("🔄 Auto-refresh (elke 3s)", value=False)
 
-        # Show logs
+        # Show logs (incremental tail, cost independent of log size)
         tracker = RunTracker(run_path)
-        logs = tracker.get_logs(tail=100)
+        logs = get_live_logs(tracker, tail=100)
 
         if logs:
             st.code(logs, language=None, line_numbers=False)
 
             col_dl, col_analyze = st.columns(2)
             with col_dl:
-                # Download button
-                full_logs = tracker.get_logs()
-                st.download_button(
-                    label="⬇️ Download Logs",
-                    data=full_logs,
-                    file_name=f"{run_name}.log",
-                    mime="text/plain",
-                    width="stretch",
-                )
+                # Full log only when not live refreshing (would be re-read every 3s)
+                if not auto_refresh:
+                    st.download_button(
+                        label="⬇️ Download Logs",
+                        data=tracker.get_logs(),
+                        file_name=f"{run_name}.log",
+                        mime="text/plain",
+                        width="stretch",
+                    )
             with col_analyze:
                 # For completed runs, add button to view full analysis
                 if status in ["completed", "legacy"]:
@@ -1236,17 +1248,6 @@ def display_run_detail_page(run_path):
 def load_run_results(run_path):
     """Load a run's results into session state"""
     try:
-        excel_files = [
-            f
-            for f in os.listdir(run_path)
-            if f.endswith(".xlsx") and not f.startswith("~$")
-        ]
-        if not excel_files:
-            st.error("Geen data bestanden gevonden")
-            return
-
-        excel_path = os.path.join(run_path, excel_files[0])
-
         # Load config first
         config_path = os.path.join(run_path, "config.json")
         config = {}
@@ -1254,51 +1255,17 @@ def load_run_results(run_path):
             with open(config_path, "r") as f:
                 config = json.load(f)
 
-        # Try to read Excel file - handle both English and Dutch sheet names
         try:
-            xl = pd.ExcelFile(excel_path)
-            sheet_names = xl.sheet_names
-
-            # Try to find data sheet (support both English and Dutch)
-            data_sheet = None
-            if "All_Data" in sheet_names:
-                data_sheet = "All_Data"
-            elif "Alle Data" in sheet_names:
-                data_sheet = "Alle Data"
-            else:
-                data_sheet = 0  # First sheet
-
-            df_all = pd.read_excel(excel_path, sheet_name=data_sheet)
+            dataset = load_cached_run_dataset(run_path, config)
         except Exception as e:
-            st.error(f"Kan data niet laden uit Excel bestand: {e}")
+            st.error(f"Kan run data niet laden: {e}")
             return
 
-        # Try to read availability sheet (support both English and Dutch)
-        try:
-            xl = pd.ExcelFile(excel_path)
-            sheet_names = xl.sheet_names
-
-            avail_sheet = None
-            if "Availability" in sheet_names:
-                avail_sheet = "Availability"
-            elif "Beschikbaarheid" in sheet_names:
-                avail_sheet = "Beschikbaarheid"
-
-            if avail_sheet:
-                df_availability = pd.read_excel(excel_path, sheet_name=avail_sheet)
-            else:
-                raise ValueError("No availability sheet found")
-        except (ValueError, Exception):
-            # Calculate availability if sheet doesn't exist
-            period_start = config.get("period_start")
-            period_end = config.get("period_end")
+        if dataset is None:
+            st.error("Geen data bestanden gevonden")
+            return
 
-            try:
-                df_availability = calculate_availability(
-                    df_all, period_start, period_end
-                )
-            except:
-                df_availability = pd.DataFrame()
+        df_all, df_availability = dataset
 
         # Create df_map with availability data merged
         df_map = df_all.drop_duplicates("room_id")
@@ -1359,6 +1326,7 @@ def display_run_card(run):
 
         with col_left:
             # Config info
+            config = {}
             config_path = os.path.join(run_path, "config.json")
             if os.path.exists(config_path):
                 with open(config_path, "r") as f:
@@ -1387,14 +1355,9 @@ def display_run_card(run):
 
                 # Try to load data
                 try:
-                    excel_files = [
-                        f
-                        for f in os.listdir(run_path)
-                        if f.endswith(".xlsx") and not f.startswith("~$")
-                    ]
-                    if excel_files:
-                        excel_path = os.path.join(run_path, excel_files[0])
-                        df = pd.read_excel(excel_path, sheet_name="All_Data")
+                    dataset = load_cached_run_dataset(run_path, config)
+                    if dataset is not None:
+                        df, df_availability = dataset
 
                         col_r1, col_r2, col_r3 = st.columns(3)
                         col_r1.metric("Listings", f"{df['room_id'].nunique():,}")
@@ -1405,9 +1368,6 @@ def display_run_card(run):
                         if st.button("📊 Bekijk Data", key=f"view_{run_name}"):
                             # Load full results
                             try:
-                                df_availability = pd.read_excel(
-                                    excel_path, sheet_name="Availability"
-                                )
                                 df_map = df.drop_duplicates("room_id")
 
                                 st.session_state.current_results = {
@@ -1538,41 +1498,18 @@ def display_run_selection(runs):
         with col_info:
             st.markdown(f"**{run['gemeente']}** · {run['timestamp_display']}")
 
-            # Load and show config info
-            config_path = os.path.join(run["path"], "config.json")
-            if os.path.exists(config_path):
-                with open(config_path, "r") as f:
-                    config = json.load(f)
-
-                # Compact config display
-                period_start = config.get("period_start", "")
-                period_end = config.get("period_end", "")
-                interval = config.get("measurement_interval", "N/A")
-                st.caption(f"{period_start} → {period_end} • {interval}d interval")
+            # Compact config display (from the run catalog)
+            if run["period_start"]:
+                interval = run["measurement_interval"] or "N/A"
+                st.caption(
+                    f"{run['period_start']} → {run['period_end']} • {interval}d interval"
+                )
 
         with col_stats:
-            # Try to load quick stats - count unique listings
-            try:
-                excel_files = [
-                    f
-                    for f in os.listdir(run["path"])
-                    if f.endswith(".xlsx") and not f.startswith("~$")
-                ]
-                if excel_files:
-                    excel_path = os.path.join(run["path"], excel_files[0])
-                    # Read room_id column to count unique listings
-                    try:
-                        df_rooms = pd.read_excel(
-                            excel_path, sheet_name=0, usecols=["room_id"]
-                        )
-                        listings_count = df_rooms["room_id"].nunique()
-                        st.caption(f"{listings_count:,} accommodaties")
-                    except:
-                        # Fallback: just count rows if room_id column doesn't exist
-                        df_count = pd.read_excel(excel_path, sheet_name=0, usecols=[0])
-                        listings_count = len(df_count)
-                        st.caption(f"{listings_count:,} records")
-            except:
+            # Quick stats - count unique listings
+            if run["listings"] is not None:
+                st.caption(f"{run['listings']:,} accommodaties")
+            else:
                 st.caption("")
 
         with col_actions:
@@ -1895,11 +1832,7 @@ def display_selected_run(results, runs):
 
         # Single dynamic map - generate when needed
         try:
-            gdf_gemeenten = (
-                gpd.read_file(GPKG_PATH, layer="gemeentegebied")
-                .set_crs("EPSG:28992")
-                .to_crs("EPSG:4326")
-            )
+            gdf_gemeenten = load_gemeente_boundaries(MAP_BOUNDARY_LEVEL)
             gemeenten = config.get(
                 "gemeenten", filtered_df_map["gemeente"].unique().tolist()
             )
@@ -1928,7 +1861,9 @@ def display_selected_run(results, runs):
 
     try:
         # Create interactive timeline
-        fig_timeline = create_interactive_timeline(df_all, config)
+        fig_timeline = create_interactive_timeline(
+            df_all, config, (output_dir, path_mtime(output_dir))
+        )
         st.plotly_chart(fig_timeline, use_container_width=True)
     except Exception as e:
         logger.error(f"Error creating timeline: {e}")
@@ -2142,11 +2077,7 @@ def display_point_in_time_map(df_all, selected_date, config):
 
     # Create and display map
     try:
-        gdf_gemeenten = (
-            gpd.read_file(GPKG_PATH, layer="gemeentegebied")
-            .set_crs("EPSG:28992")
-            .to_crs("EPSG:4326")
-        )
+        gdf_gemeenten = load_gemeente_boundaries(MAP_BOUNDARY_LEVEL)
 
         gemeenten = config.get(
             "gemeenten", df_map_filtered["gemeente"].unique().tolist()
@@ -2198,11 +2129,7 @@ def display_date_range_map(df_all, date_range, config):
 
     # Create and display map
     try:
-        gdf_gemeenten = (
-            gpd.read_file(GPKG_PATH, layer="gemeentegebied")
-            .set_crs("EPSG:28992")
-            .to_crs("EPSG:4326")
-        )
+        gdf_gemeenten = load_gemeente_boundaries(MAP_BOUNDARY_LEVEL)
 
         gemeenten = config.get("gemeenten", df_map_range["gemeente"].unique().tolist())
         map_obj = create_map(df_map_range, gdf_gemeenten, gemeenten, output_dir=None)
@@ -2395,6 +2322,17 @@ def page_nieuwe_run():
         # Update session state
         st.session_state.selected_gemeenten = gemeenten
 
+        nationwide = st.checkbox(
+            "🇳🇱 Heel Nederland",
+            value=False,
+            help="Landelijke scan: tegels over het hele land, fijner waar veel listings "
+            "zijn. Listings krijgen gemeente en provincie; de data wordt per gemeente "
+            "opgeslagen.",
+        )
+        if nationwide:
+            gemeenten = list(available_gemeenten)
+            st.caption(f"Alle {len(gemeenten)} gemeenten")
+
         st.markdown("---")
 
         # Date range configuration
@@ -2559,6 +2497,23 @@ def page_nieuwe_run():
             guests_input = st.text_input("Gasten (komma-gescheiden)", value="2")
             price_min = st.number_input("Min Prijs (€)", min_value=0, value=0)
             price_max = st.number_input("Max Prijs (€)", min_value=0, value=0)
+            shared_bboxes = st.checkbox(
+                "🧩 Buurgemeenten samen scannen",
+                value=False,
+                help="Gemeenten met overlappende bounding boxes delen één API query per "
+                "datum; elke listing wordt daarna aan haar gemeente toegekend. Scheelt "
+                "calls bij aangrenzende gemeenten.",
+            )
+            scan_mode = st.radio(
+                "Scan modus",
+                ["🔍 Datum grid", "📅 Kalender per listing", "🧮 Scan plan"],
+                horizontal=True,
+                help="Kalender: listings worden met een paar zoekopdrachten gevonden, "
+                "daarna wordt per listing de beschikbaarheidskalender opgehaald (gecached). "
+                "Bij lange periodes veel minder API calls dan de datum grid. "
+                "Scan plan: lange verblijven over de periode, verfijnd waar die weinig "
+                "vinden, binnen een dekkingsdoel en API budget (nachten worden gekozen).",
+            )
 
         with col2:
             num_repeat_calls = st.number_input(
@@ -2581,6 +2536,44 @@ def page_nieuwe_run():
             currency = st.selectbox("Valuta", ["EUR", "USD", "GBP"], index=0)
             language = st.selectbox("Taal", ["nl", "en", "de"], index=0)
 
+        scan_plan_config = None
+        if scan_mode.startswith("🧮"):
+            col_goal, col_budget, col_tile = st.columns(3)
+            with col_goal:
+                coverage_goal = st.number_input(
+                    "Dekkingsdoel (%)", min_value=10, max_value=100, value=90, step=5
+                )
+            with col_budget:
+                api_budget = st.number_input(
+                    "API budget (calls, 0 = geen)", min_value=0, value=0, step=100
+                )
+            with col_tile:
+                max_tile_nights = st.number_input(
+                    "Langste verblijf (nachten)", min_value=1, max_value=28, value=7
+                )
+            scan_plan_config = {
+                "plan_scans": True,
+                "coverage_goal": coverage_goal / 100,
+                "api_budget": int(api_budget) or None,
+                "max_tile_nights": int(max_tile_nights),
+            }
+            if gemeenten and period_start < period_end:
+                try:
+                    guests_count = len([g for g in guests_input.split(",") if g.strip()])
+                    plan = plan_scans(
+                        period_start.isoformat(),
+                        period_end.isoformat(),
+                        len(gemeenten),
+                        max(1, guests_count),
+                        num_repeat_calls,
+                        coverage_goal=scan_plan_config["coverage_goal"],
+                        api_budget=scan_plan_config["api_budget"],
+                        max_tile_nights=scan_plan_config["max_tile_nights"],
+                    )
+                    st.info(plan.summary())
+                except ValueError:
+                    st.warning("⚠️ Kon geen scan plan maken")
+
         # Rate Limit Protection
         with st.expander("⏱️ Rate Limits"):
             col_delay1, col_delay2 = st.columns(2)
@@ -2603,12 +2596,103 @@ def page_nieuwe_run():
                     step=0.1,
                 )
 
+            retry_rounds = st.number_input(
+                "Retry rondes",
+                min_value=0,
+                max_value=5,
+                value=2,
+                help="Mislukte scans worden na de hoofdronde nog zo vaak opnieuw "
+                "geprobeerd, met minder workers en langere delays.",
+            )
+            hedge_budget = st.number_input(
+                "Hedge budget (%)",
+                min_value=0,
+                max_value=50,
+                value=0,
+                step=5,
+                help="Calls die langer lopen dan p90 van recente calls krijgen een tweede "
+                "request; het eerste antwoord telt. Maximaal dit percentage extra calls "
+                "(0 = uit).",
+            )
+            proxy_file = st.text_input(
+                "Proxy lijst (optioneel)",
+                value="",
+                help="Pad naar een bestand met één proxy per regel ('direct' = zonder proxy). "
+                "Calls worden over de proxies verdeeld; een proxy met een rate limit "
+                "gaat tijdelijk in quarantaine.",
+            )
+            if proxy_file and not os.path.exists(proxy_file):
+                st.warning("⚠️ Proxy lijst niet gevonden")
+
             # Recommendations
             if max_workers >= 5 and delay_between_scans < 1.0:
                 st.warning("⚠️ Rate limit risico")
             elif max_workers <= 2 and delay_between_scans >= 1.5:
                 st.success("✅ Veilig")
 
+    # Schatting op basis van eerdere runs
+    if gemeenten and period_start < period_end:
+        try:
+            estimate_config = {
+                "gemeenten": gemeenten,
+                "period_start": period_start.isoformat(),
+                "period_end": period_end.isoformat(),
+                "nights_list": [int(n.strip()) for n in nights_input.split(",")],
+                "guests_list": [int(g.strip()) for g in guests_input.split(",")],
+                "measurement_interval": measurement_interval,
+                "days_of_week": days_of_week,
+                "weeks_interval": weeks_interval,
+                "monthly_interval": monthly_interval,
+                "num_repeat_calls": num_repeat_calls,
+                "zoom_value": zoom_value,
+                "price_min": price_min,
+                "price_max": price_max,
+                "currency": currency,
+                "language": language,
+                "max_workers": max_workers,
+                "delay_between_scans": delay_between_scans,
+                "delay_between_calls": delay_between_calls,
+                "proxy_file": os.path.abspath(proxy_file) if proxy_file.strip() else None,
+                "shared_bboxes": shared_bboxes,
+                "nationwide": nationwide,
+                "engine": "calendar" if scan_mode.startswith("📅") else None,
+                **(scan_plan_config or {}),
+            }
+            col_estimate, col_probe = st.columns([5, 1])
+            # De probe draait in een apart proces; de uitkomst komt bij een volgende rerun
+            running_probe = st.session_state.get("estimate_probe")
+            probe = probe_result(*running_probe) if running_probe else None
+            with col_probe:
+                probe_running = probe is not None and probe["status"] == "running"
+                if st.button(
+                    "🔬 Probe",
+                    help=f"Kalibreer de schatting met {PROBE_SCANS} echte scans "
+                    "(kost API calls)",
+                    disabled=probe_running,
+                ):
+                    st.session_state.estimate_probe = start_probe(
+                        DATA_DIR, estimate_config, GPKG_PATH
+                    )
+                    st.rerun()
+                if probe_running and st.button("🔄", help="Ververs de probe status"):
+                    st.rerun()
+            with col_estimate:
+                if probe_running:
+                    st.caption("🔬 Probe scans lopen op de achtergrond...")
+                elif probe is not None and probe["status"] == "failed":
+                    st.warning(f"⚠️ Probe mislukt: {probe['error']}")
+                with st.spinner("Schatting..."):
+                    estimate = estimate_run(
+                        estimate_config,
+                        DATA_DIR,
+                        gpkg_path=GPKG_PATH,
+                        probe=probe["sample"] if probe else None,
+                        history=load_run_history(),
+                    )
+                st.info(estimate.summary())
+        except ValueError:
+            st.warning("⚠️ Kon geen schatting maken")
+
     # Start button
     st.markdown("---")
 
@@ -2647,6 +2731,13 @@ def page_nieuwe_run():
             monthly_interval=monthly_interval,
             delay_between_scans=delay_between_scans,
             delay_between_calls=delay_between_calls,
+            proxy_file=proxy_file.strip() or None,
+            retry_rounds=retry_rounds,
+            hedge_budget=hedge_budget / 100,
+            shared_bboxes=shared_bboxes,
+            nationwide=nationwide,
+            engine="calendar" if scan_mode.startswith("📅") else None,
+            scan_plan_config=scan_plan_config,
         )
 
 
@@ -2669,8 +2760,15 @@ def run_scraping_job(
     monthly_interval=False,
     delay_between_scans=1.0,
     delay_between_calls=0.5,
+    proxy_file=None,
+    retry_rounds=2,
+    hedge_budget=0.0,
+    shared_bboxes=False,
+    nationwide=False,
+    engine=None,
+    scan_plan_config=None,
 ):
-    """Execute the scraping job"""
+    """Create the run and submit it to the job runner (scraping runs in a worker process)"""
     import time
 
     # Safety check: ensure nights_list and guests_list are lists
@@ -2679,31 +2777,6 @@ def run_scraping_job(
     if isinstance(guests_list, int):
         guests_list = [guests_list]
 
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    gemeente_name = (
-        "_".join(gemeenten) if len(gemeenten) <= 3 else f"{gemeenten[0]}_etc"
-    )
-    output_dir = os.path.join(DATA_DIR, f"run_{gemeente_name}_{timestamp}")
-    os.makedirs(output_dir, exist_ok=True)
-
-    measurement_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    # Terminal logging
-    print("\n" + "=" * 80)
-    print(f"🚀 NEW RUN STARTED: {gemeente_name}_{timestamp}")
-    print("=" * 80)
-    print(f"📍 Gemeenten: {', '.join(gemeenten)}")
-    print(f"📅 Periode: {period_start} → {period_end}")
-    print(f"🛏️  Nachten: {nights_list}")
-    print(f"👥 Gasten: {guests_list}")
-    print(f"⚙️  Workers: {max_workers}")
-    print(f"📁 Output: {output_dir}")
-    print("=" * 80 + "\n")
-
-    # Initialize run tracker
-    tracker = RunTracker(output_dir)
-
-    # Save config
     config = {
         "gemeenten": gemeenten,
         "period_start": period_start,
@@ -2717,348 +2790,45 @@ def run_scraping_job(
         "price_max": price_max,
         "currency": currency,
         "language": language,
-        "measurement_date": measurement_date,
+        "measurement_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "days_of_week": days_of_week,
         "weeks_interval": weeks_interval,
         "monthly_interval": monthly_interval,
         "max_workers": max_workers,
         "delay_between_scans": delay_between_scans,
         "delay_between_calls": delay_between_calls,
+        "proxy_file": os.path.abspath(proxy_file) if proxy_file else None,
+        "retry_rounds": retry_rounds,
+        "hedge_budget": hedge_budget,
+        "shared_bboxes": shared_bboxes,
+        "nationwide": nationwide,
+        "engine": engine,
+        **(scan_plan_config or {}),
     }
+    output_dir = create_run(DATA_DIR, config)
 
-    with open(os.path.join(output_dir, "config.json"), "w") as f:
-        json.dump(config, f, indent=2)
-
-    # Start background scraping job using threading
-    import threading
-
-    def run_scraping_in_background():
-        """Run the actual scraping in a background thread"""
-        try:
-            _execute_scraping(
-                gemeenten,
-                period_start,
-                period_end,
-                nights_list,
-                guests_list,
-                measurement_interval,
-                num_repeat_calls,
-                zoom_value,
-                price_min,
-                price_max,
-                currency,
-                language,
-                max_workers,
-                output_dir,
-                days_of_week,
-                weeks_interval,
-                monthly_interval,
-                delay_between_scans,
-                delay_between_calls,
-                config,
-            )
-        except Exception as e:
-            tracker.fail(str(e))
+    # Terminal logging
+    print("\n" + "=" * 80)
+    print(f"🚀 NEW RUN QUEUED: {os.path.basename(output_dir)}")
+    print("=" * 80)
+    print(f"📍 Gemeenten: {', '.join(gemeenten)}")
+    print(f"📅 Periode: {period_start} → {period_end}")
+    print(f"🛏️  Nachten: {nights_list}")
+    print(f"👥 Gasten: {guests_list}")
+    print(f"⚙️  Workers: {max_workers}")
+    print(f"📁 Output: {output_dir}")
+    print("=" * 80 + "\n")
 
-    # Start thread
-    thread = threading.Thread(target=run_scraping_in_background, daemon=True)
-    thread.start()
+    submit_run(DATA_DIR, output_dir, GPKG_PATH, max_concurrent=MAX_CONCURRENT_RUNS)
 
     # Redirect to run detail page to see live logs
-    st.success("✅ Run gestart in background! Redirecting naar live logs...")
+    st.success("✅ Run ingepland! Redirecting naar live logs...")
     st.session_state.viewing_run_detail = output_dir
     st.session_state.page = "📊 Resultaten"
     time.sleep(0.5)
     st.rerun()
 
 
-def _execute_scraping(
-    gemeenten,
-    period_start,
-    period_end,
-    nights_list,
-    guests_list,
-    measurement_interval,
-    num_repeat_calls,
-    zoom_value,
-    price_min,
-    price_max,
-    currency,
-    language,
-    max_workers,
-    output_dir,
-    days_of_week,
-    weeks_interval,
-    monthly_interval,
-    delay_between_scans,
-    delay_between_calls,
-    config,
-):
-    """Execute the actual scraping (to be run in background thread)"""
-
-    # Safety check: ensure nights_list and guests_list are lists
-    if isinstance(nights_list, int):
-        nights_list = [nights_list]
-    if isinstance(guests_list, int):
-        guests_list = [guests_list]
-
-    tracker = RunTracker(output_dir)
-    measurement_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    # Set up logging handler to redirect Python logger to RunTracker
-    import logging
-
-    class TrackerLogHandler(logging.Handler):
-        """Custom logging handler that writes to RunTracker"""
-
-        def __init__(self, tracker):
-            super().__init__()
-            self.tracker = tracker
-            self.last_checkpoint = 0
-
-        def emit(self, record):
-            try:
-                # Skip all verbose logging - we only want clean progress bar updates
-                # which are generated by the monitoring thread
-                pass
-            except Exception:
-                # Don't let logging errors crash the scraper
-                pass
-
-    # Add custom handler to capture logs from scraper modules
-    handler = TrackerLogHandler(tracker)
-    handler.setLevel(logging.INFO)
-
-    # Add to relevant loggers (but handler will suppress all messages)
-    for logger_name in [
-        "src.core.scraper_core",
-        "src.data.data_processor",
-        "src.data.exporter",
-        "src.core.scraper_utils",  # Suppress generate_scan_combinations messages
-    ]:
-        logger_obj = logging.getLogger(logger_name)
-        logger_obj.addHandler(handler)
-        logger_obj.setLevel(
-            logging.CRITICAL
-        )  # Set to CRITICAL to suppress INFO messages
-
-    try:
-        # Generate scan combinations (suppressing verbose output)
-        scan_combinations, _ = generate_scan_combinations(
-            period_start,
-            period_end,
-            nights_list,
-            guests_list,
-            measurement_interval,
-            days_of_week,
-            weeks_interval,
-            monthly_interval,
-        )
-
-        total_scans = len(scan_combinations) * len(gemeenten)
-        tracker.start(total_scans=total_scans)
-
-        # Initial progress bar
-        tracker.log(f"⚡ 🔴 0/{total_scans} (0%) │ 🏠 0 listings │ ⏱️ 0.0m / ~0m")
-
-        import time
-        import threading
-
-        start_time = time.time()
-
-        # Monitor checkpoints for progress tracking
-        stop_monitoring = threading.Event()
-        last_checkpoint_count = [0]  # Track last count to avoid duplicate logs
-
-        def monitor_checkpoints():
-            """Monitor status and log progress after each scan completion"""
-            last_reported_progress = [-1]
-            last_checkpoint_count = [0]
-
-            while not stop_monitoring.is_set():
-                time.sleep(0.5)  # Check every 0.5 seconds for real-time updates
-                try:
-                    current_time = time.time()
-                    elapsed = current_time - start_time
-
-                    # Read actual progress from run_status.json
-                    status_file = os.path.join(output_dir, "run_status.json")
-                    actual_completed = 0
-                    total_listings = 0
-
-                    if os.path.exists(status_file):
-                        try:
-                            with open(status_file, "r") as f:
-                                status_data = json.load(f)
-                                actual_completed = status_data.get("progress", {}).get(
-                                    "completed_scans", 0
-                                )
-                                total_listings = status_data.get("progress", {}).get(
-                                    "total_listings", 0
-                                )
-                        except:
-                            pass
-
-                    # If no progress from status file, estimate from checkpoint files
-                    if actual_completed == 0:
-                        import glob
-
-                        checkpoint_files = glob.glob(
-                            os.path.join(output_dir, "checkpoint_*.xlsx")
-                        )
-                        num_checkpoints = len(checkpoint_files)
-
-                        # Each checkpoint ≈ 10 scans, but check for new checkpoints
-                        if num_checkpoints > last_checkpoint_count[0]:
-                            last_checkpoint_count[0] = num_checkpoints
-                            actual_completed = num_checkpoints * 10
-
-                    # Only log when progress changes (new scan completed)
-                    if actual_completed > last_reported_progress[0]:
-                        last_reported_progress[0] = actual_completed
-
-                        progress_pct = (actual_completed / total_scans) * 100
-                        avg_time = (
-                            elapsed / actual_completed if actual_completed > 0 else 0
-                        )
-                        remaining = (
-                            avg_time * (total_scans - actual_completed)
-                            if actual_completed > 0
-                            else 0
-                        )
-
-                        # Status emoji based on progress
-                        if progress_pct >= 75:
-                            status_emoji = "🟢"
-                        elif progress_pct >= 25:
-                            status_emoji = "🟡"
-                        else:
-                            status_emoji = "🔴"
-
-                        # Show update for this scan
-                        tracker.log(
-                            f"⚡ {status_emoji} {actual_completed}/{total_scans} ({progress_pct:.0f}%) │ "
-                            f"🏠 {total_listings:,} listings │ "
-                            f"⏱️ {elapsed / 60:.1f}m / ~{remaining / 60:.0f}m"
-                        )
-                        tracker.update_progress(completed_scans=actual_completed)
-
-                except Exception:
-                    pass
-
-        # Start monitoring thread
-        monitor_thread = threading.Thread(target=monitor_checkpoints, daemon=True)
-        monitor_thread.start()
-
-        df_all = scrape_all(
-            gemeenten=gemeenten,
-            scan_combinations=scan_combinations,
-            gpkg_path=GPKG_PATH,
-            num_repeat_calls=num_repeat_calls,
-            zoom_value=zoom_value,
-            price_min=price_min,
-            price_max=price_max,
-            amenities=[],
-            currency=currency,
-            language=language,
-            proxy_url="",
-            measurement_date=measurement_date,
-            show_progress=False,  # Disable tqdm progress bar
-            max_workers=max_workers,  # ⚡ Parallel scraping (configureerbaar)
-            checkpoint_dir=output_dir,  # 💾 Tussentijds opslaan
-            delay_between_scans=delay_between_scans,  # ⏱️ Rate limit protection
-            delay_between_calls=delay_between_calls,  # ⏱️ Rate limit protection
-            tracker=tracker,  # Pass tracker for real-time progress updates
-        )
-
-        # Stop monitoring
-        stop_monitoring.set()
-
-        elapsed_time = time.time() - start_time
-
-        # Update final scanning stats
-        if df_all.empty:
-            tracker.fail("Geen resultaten gevonden")
-            return
-
-        total_listings = df_all["room_id"].nunique()
-
-        # Final progress bar update
-        tracker.log(
-            f"⚡ 🟢 {total_scans}/{total_scans} (100%) │ "
-            f"🏠 {total_listings:,} listings │ ⏱️ {elapsed_time / 60:.1f}m"
-        )
-        tracker.update_progress(completed_scans=total_scans)
-
-        # Process data silently
-        df_availability = calculate_availability(df_all, period_start, period_end)
-        df_map = df_all.drop_duplicates("room_id").merge(
-            df_availability[
-                ["room_id", "days_available", "availability_rate", "total_days"]
-            ],
-            on="room_id",
-            how="left",
-        )
-
-        df_export = prepare_export_data(df_all)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        excel_filename = f"airbnb_scrape_{'_'.join(gemeenten)}_{timestamp}.xlsx"
-        excel_path = os.path.join(output_dir, excel_filename)
-        export_to_excel(df_export, excel_path, df_availability, df_all)
-
-        # Create visualizations (non-critical - don't fail run if these error)
-        try:
-            gdf_gemeenten = (
-                gpd.read_file(GPKG_PATH, layer="gemeentegebied")
-                .set_crs("EPSG:28992")
-                .to_crs("EPSG:4326")
-            )
-            create_map(df_map, gdf_gemeenten, gemeenten, output_dir)
-        except Exception as e:
-            tracker.log(f"⚠️ Map creation failed: {str(e)[:100]}")
-
-        try:
-            create_availability_timeline_graph(
-                df_all, period_start, period_end, output_dir
-            )
-        except Exception as e:
-            tracker.log(f"⚠️ Timeline graph creation failed: {str(e)[:100]}")
-
-        # Mark as complete AFTER data is saved
-        tracker.complete(total_listings=total_listings)
-        # Final summary message
-        tracker.log(
-            f"✅ Voltooid │ {len(df_all):,} records │ {total_listings:,} listings │ "
-            f"€{df_all['price'].mean():.0f} avg │ {df_availability['availability_rate'].mean():.0f}% beschikbaar"
-        )
-
-        # Terminal logging for completion
-        print("\n" + "=" * 80)
-        print(f"✅ RUN COMPLETED: {os.path.basename(output_dir)}")
-        print("=" * 80)
-        print(f"📊 Records: {len(df_all):,}")
-        print(f"🏠 Unique Listings: {total_listings:,}")
-        print(f"💰 Avg Price: €{df_all['price'].mean():.2f}")
-        print(
-            f"📈 Avg Availability: {df_availability['availability_rate'].mean():.1f}%"
-        )
-        print(f"⏱️  Duration: {elapsed_time / 60:.1f}m")
-        print(f"📁 Output: {output_dir}")
-        print("=" * 80 + "\n")
-
-    except Exception as e:
-        tracker.fail(str(e))
-        logger.exception("Scraping error")
-
-        # Terminal logging for failure
-        print("\n" + "=" * 80)
-        print(f"❌ RUN FAILED: {os.path.basename(output_dir)}")
-        print("=" * 80)
-        print(f"Error: {str(e)[:200]}")
-        print(f"📁 Output: {output_dir}")
-        print("=" * 80 + "\n")
-
-
 def display_monitoring_tab():
     """Display monitoring view as tab"""
     from src.core.run_tracker import get_all_runs, RunTracker
@@ -3260,14 +3030,41 @@ def page_instellingen():
             )
             st.metric("Data Map Grootte", f"{total_size / 1024 / 1024:.1f} MB")
 
+    if st.button("🔄 Run catalogus synchroniseren", help="Na handmatige wijzigingen"):
+        result = get_catalog(DATA_DIR).reconcile()
+        st.success(
+            f"{result['indexed']} runs geïndexeerd, {result['removed']} verwijderd"
+        )
+
+    st.markdown("---")
+
+    st.subheader("Data Cache")
+    cache_stats = get_data_cache().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Hits", f"{cache_stats['hits']:,}")
+    col2.metric("Misses", f"{cache_stats['misses']:,}")
+    col3.metric("Hit Rate", f"{cache_stats['hit_rate']:.0f}%")
+    col4.metric(
+        "Geheugen",
+        f"{cache_stats['bytes'] / 1024**2:.0f} / "
+        f"{cache_stats['max_bytes'] / 1024**2:.0f} MB",
+    )
+    st.caption(
+        f"{cache_stats['entries']} items in cache • "
+        f"{cache_stats['evictions']} verwijderd (LRU) • gedeeld door alle sessies"
+    )
+    if st.button("🗑️ Cache Legen"):
+        get_data_cache().clear()
+        st.cache_data.clear()
+        st.rerun()
+
     st.markdown("---")
 
     st.subheader("GeoPackage Status")
     if os.path.exists(GPKG_PATH):
         st.success(f"✅ GeoPackage gevonden: `{GPKG_PATH}`")
         try:
-            gdf = gpd.read_file(GPKG_PATH, layer="gemeentegebied")
-            st.info(f"Bevat {len(gdf)} gemeenten")
+            st.info(f"Bevat {len(load_gemeente_index(GPKG_PATH))} gemeenten")
         except Exception as e:
             st.error(f"Fout bij lezen GeoPackage: {e}")
     else:
@@ -3607,9 +3404,7 @@ def sidebar_navigation():
     unique_gemeenten = set()
     if runs:
         for run in runs:
-            gemeente = run.get("gemeente", "")
-            if gemeente:
-                unique_gemeenten.add(gemeente)
+            unique_gemeenten.update(run["gemeenten"])
 
     st.sidebar.metric("Beschikbare Runs", runs_count)
     if unique_gemeenten: